@@ -7,6 +7,11 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Iterable, List
 
+# ``nmea`` is a verbatim copy of services/gps-ingest/gps_ingest/nmea.py: the
+# scraper image is built from this directory alone, so it cannot depend on
+# the gps-ingest package. agents/tests checks that the copies match.
+from .nmea import NMEAReport, parse_report
+
 
 @dataclass(slots=True)
 class GpsFix:
@@ -41,110 +46,32 @@ class GpsFix:
         }
 
 
-def _validate_checksum(sentence: str) -> str:
-    body, _, checksum = sentence.partition("*")
-    if not checksum:
-        return body
-    payload = body[1:] if body.startswith("$") else body
-    value = 0
-    for char in payload:
-        value ^= ord(char)
-    expected = int(checksum.strip(), 16)
-    if value != expected:
-        raise ValueError("Invalid NMEA checksum")
-    return body
-
-
-def _parse_latitude(value: str, direction: str) -> float:
-    if not value or not direction:
-        raise ValueError("Latitude components missing")
-    degrees = int(value[:2])
-    minutes = float(value[2:])
-    coord = degrees + minutes / 60
-    if direction.upper() == "S":
-        coord *= -1
-    return coord
-
-
-def _parse_longitude(value: str, direction: str) -> float:
-    if not value or not direction:
-        raise ValueError("Longitude components missing")
-    degrees = int(value[:3])
-    minutes = float(value[3:])
-    coord = degrees + minutes / 60
-    if direction.upper() == "W":
-        coord *= -1
-    return coord
-
-
-def _parse_datetime(date_str: str | None, time_str: str) -> datetime:
-    if not time_str:
+def _timestamp(report: NMEAReport) -> datetime:
+    if report.time is None:
         raise ValueError("NMEA sentence missing time component")
-    hours = int(time_str[0:2])
-    minutes = int(time_str[2:4])
-    seconds = float(time_str[4:])
-    microseconds = int((seconds % 1) * 1_000_000)
-    seconds_int = int(seconds)
-
-    if date_str:
-        day = int(date_str[0:2])
-        month = int(date_str[2:4])
-        year_suffix = int(date_str[4:6])
-        if year_suffix >= 80:
-            year = 1900 + year_suffix
-        else:
-            year = 2000 + year_suffix
-        base = datetime(year, month, day, hours, minutes, seconds_int, tzinfo=timezone.utc)
-    else:
-        now = datetime.now(tz=timezone.utc)
-        base = now.replace(hour=hours, minute=minutes, second=seconds_int, microsecond=0)
-
-    return base.replace(microsecond=microseconds)
+    day = report.date or datetime.now(tz=timezone.utc).date()
+    return datetime.combine(day, report.time)
 
 
 def parse_nmea_sentence(sentence: str) -> GpsFix:
     """Parse a single NMEA sentence into a :class:`GpsFix`."""
 
-    normalized = _validate_checksum(sentence.strip())
-    parts = normalized.split(",")
-    if not parts or len(parts[0]) < 6:
-        raise ValueError("Unsupported NMEA sentence")
-
-    sentence_type = parts[0][3:6]
-
-    if sentence_type == "RMC":
-        status = parts[2]
-        if status != "A":
-            raise ValueError("GPS fix not active")
-        latitude = _parse_latitude(parts[3], parts[4])
-        longitude = _parse_longitude(parts[5], parts[6])
-        speed = float(parts[7]) if parts[7] else None
-        course = float(parts[8]) if parts[8] else None
-        timestamp = _parse_datetime(parts[9], parts[1])
-        return GpsFix(
-            latitude=latitude,
-            longitude=longitude,
-            timestamp=timestamp,
-            speed_knots=speed,
-            course=course,
-        )
-
-    if sentence_type == "GGA":
-        fix_quality = parts[6]
-        if fix_quality == "0":
-            raise ValueError("No GPS fix available")
-        latitude = _parse_latitude(parts[2], parts[3])
-        longitude = _parse_longitude(parts[4], parts[5])
-        altitude = float(parts[9]) if parts[9] else None
-        timestamp = _parse_datetime(None, parts[1])
-        return GpsFix(
-            latitude=latitude,
-            longitude=longitude,
-            timestamp=timestamp,
-            altitude_m=altitude,
-        )
-
-    raise ValueError(f"Unsupported NMEA sentence type: {sentence_type}")
+    report = parse_report(sentence, require_checksum=False)
+    if report is None or report.sentence_type not in ("RMC", "GGA"):
+        kind = report.sentence_type if report is not None else sentence.strip()[3:6]
+        raise ValueError(f"Unsupported NMEA sentence type: {kind}")
+    if report.latitude is None:
+        raise ValueError("Latitude components missing")
+    if report.longitude is None:
+        raise ValueError("Longitude components missing")
+    return GpsFix(
+        latitude=report.latitude,
+        longitude=report.longitude,
+        timestamp=_timestamp(report),
+        altitude_m=report.altitude_m,
+        speed_knots=report.speed_knots,
+        course=report.heading_deg,
+    )
 
 
 def parse_nmea_log(lines: Iterable[str]) -> List[GpsFix]:
@@ -0,0 +1,226 @@
+"""Dependency-free NMEA 0183 parser for the sentences that make up a fix.
+
+Sentences are handled as ``bytes`` straight from the serial port: the
+checksum is computed over the raw buffer, fields are split once and numbers
+are converted from the ``bytes`` slices without decoding the line to ``str``.
+Only RMC, GGA, VTG and GSA are understood; everything else yields ``None``
+before any field is touched.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, time, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+KNOTS_TO_KMH = 1.852
+
+# NMEA 0183 caps a sentence at 82 characters; longer ones fall back to the
+# generic mask computation below.
+_MASKS = [(1 << (8 * width)) - 1 for width in range(64)]
+
+
+class NMEAError(ValueError):
+    """Raised for sentences that are corrupt or report that no fix is available."""
+
+
+@dataclass(slots=True)
+class NMEAReport:
+    """Fields of a single NMEA sentence relevant to building a fix.
+
+    ``time`` is only set for sentences that carry the epoch UTC time (GGA,
+    RMC); VTG and GSA reports belong to whichever epoch is being assembled.
+    """
+
+    sentence_type: str
+    time: Optional[time] = None
+    date: Optional[date] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    altitude_m: Optional[float] = None
+    speed_knots: Optional[float] = None
+    speed_kmh: Optional[float] = None
+    heading_deg: Optional[float] = None
+    hdop: Optional[float] = None
+    vdop: Optional[float] = None
+
+
+def checksum(body: bytes) -> int:
+    """XOR of every byte in ``body`` (the text between ``$`` and ``*``).
+
+    The buffer is read as one integer and folded in halves down to a machine
+    word, which takes a handful of int operations instead of a Python-level
+    loop over every byte.
+    """
+
+    value = int.from_bytes(body, "little")
+    width = len(body)
+    while width > 8:
+        half = (width + 1) >> 1
+        mask = _MASKS[half] if half < len(_MASKS) else (1 << (8 * half)) - 1
+        value = (value & mask) ^ (value >> (half << 3))
+        width = half
+    value ^= value >> 32
+    value ^= value >> 16
+    value ^= value >> 8
+    return value & 0xFF
+
+
+def _float(field: bytes) -> Optional[float]:
+    return float(field) if field else None
+
+
+def _coordinate(value: bytes, hemisphere: bytes, negative: bytes) -> Optional[float]:
+    if not value or not hemisphere:
+        return None
+    raw = float(value)  # (d)ddmm.mmmm
+    degrees = raw // 100
+    coordinate = degrees + (raw - degrees * 100) / 60
+    return -coordinate if hemisphere == negative else coordinate
+
+
+# GGA and RMC of one epoch share the time field and the date rarely changes,
+# so repeated fields reuse the (immutable) objects built the first time.
+@lru_cache(maxsize=64)
+def _time(field: bytes) -> Optional[time]:
+    if not field:
+        return None
+    seconds = float(field[4:])
+    whole = int(seconds)
+    micros = min(round((seconds - whole) * 1_000_000), 999_999)
+    return time(int(field[0:2]), int(field[2:4]), whole, micros, tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=16)
+def _date(field: bytes) -> Optional[date]:
+    if not field:
+        return None
+    year = int(field[4:6])
+    return date(1900 + year if year >= 80 else 2000 + year, int(field[2:4]), int(field[0:2]))
+
+
+def _rmc(fields: List[bytes]) -> NMEAReport:
+    if fields[2] != b"A":
+        raise NMEAError("GPS fix not active")
+    speed_knots = _float(fields[7])
+    return NMEAReport(
+        sentence_type="RMC",
+        time=_time(fields[1]),
+        date=_date(fields[9]),
+        latitude=_coordinate(fields[3], fields[4], b"S"),
+        longitude=_coordinate(fields[5], fields[6], b"W"),
+        speed_knots=speed_knots,
+        speed_kmh=speed_knots * KNOTS_TO_KMH if speed_knots is not None else None,
+        heading_deg=_float(fields[8]),
+    )
+
+
+def _gga(fields: List[bytes]) -> NMEAReport:
+    if fields[6] in (b"", b"0"):
+        raise NMEAError("No GPS fix available")
+    return NMEAReport(
+        sentence_type="GGA",
+        time=_time(fields[1]),
+        latitude=_coordinate(fields[2], fields[3], b"S"),
+        longitude=_coordinate(fields[4], fields[5], b"W"),
+        altitude_m=_float(fields[9]),
+        hdop=_float(fields[8]),
+    )
+
+
+def _vtg(fields: List[bytes]) -> NMEAReport:
+    speed_knots = _float(fields[5])
+    speed_kmh = _float(fields[7])
+    if speed_kmh is None and speed_knots is not None:
+        speed_kmh = speed_knots * KNOTS_TO_KMH
+    return NMEAReport(
+        sentence_type="VTG",
+        speed_knots=speed_knots,
+        speed_kmh=speed_kmh,
+        heading_deg=_float(fields[1]),
+    )
+
+
+def _gsa(fields: List[bytes]) -> NMEAReport:
+    if fields[2] in (b"", b"1"):
+        raise NMEAError("No GPS fix available")
+    return NMEAReport(
+        sentence_type="GSA",
+        hdop=_float(fields[16]),
+        vdop=_float(fields[17]),
+    )
+
+
+_PARSERS: Dict[bytes, Callable[[List[bytes]], NMEAReport]] = {
+    b"RMC": _rmc,
+    b"GGA": _gga,
+    b"VTG": _vtg,
+    b"GSA": _gsa,
+}
+
+
+def sentence_type(sentence: bytes) -> str:
+    """Return ``RMC``/``GGA``/``VTG``/``GSA`` for ``sentence``, else ``other``.
+
+    Used to label failures without letting garbage create new label values.
+    """
+
+    comma = sentence.find(b",")
+    kind = sentence[comma - 3 : comma] if comma >= 6 else b""
+    return kind.decode("ascii") if kind in _PARSERS else "other"
+
+
+def parse_report(
+    sentence: bytes | str, *, require_checksum: bool = True
+) -> Optional[NMEAReport]:
+    """Parse one RMC, GGA, VTG or GSA sentence into an :class:`NMEAReport`.
+
+    Returns ``None`` for blank lines and other sentence types. Raises
+    :class:`NMEAError` for checksum mismatches, malformed fields and
+    sentences flagged as having no valid fix. A missing checksum is an error
+    unless ``require_checksum`` is false.
+    """
+
+    data = sentence.encode("ascii", "ignore") if isinstance(sentence, str) else sentence
+    data = data.strip()
+    if not data:
+        return None
+    if data[:1] not in (b"$", b"!"):
+        raise NMEAError("NMEA sentence must start with '$'")
+    star = data.rfind(b"*")
+    if star < 0:
+        if require_checksum:
+            raise NMEAError("NMEA checksum missing")
+        body = data[1:]
+    else:
+        body = data[1:star]
+        try:
+            expected = int(data[star + 1 :], 16)
+        except ValueError:
+            raise NMEAError("Invalid NMEA checksum") from None
+        if checksum(body) != expected:
+            raise NMEAError("Invalid NMEA checksum")
+
+    comma = body.find(b",")
+    if comma < 5:
+        raise NMEAError("Unsupported NMEA sentence")
+    parser = _PARSERS.get(body[comma - 3 : comma])
+    if parser is None:
+        return None
+    try:
+        return parser(body.split(b","))
+    except NMEAError:
+        raise
+    except (IndexError, ValueError) as exc:
+        raise NMEAError(f"Malformed NMEA sentence: {exc}") from None
+
+
+__all__ = [
+    "KNOTS_TO_KMH",
+    "NMEAError",
+    "NMEAReport",
+    "checksum",
+    "parse_report",
+    "sentence_type",
+]
@@ -58,3 +58,9 @@ def test_invalid_checksum_raises() -> None:
     sentence = "$GPRMC,081836,A,3751.65,S,14507.36,E,000.0,360.0,130998,011.3,E*00"
     with pytest.raises(ValueError, match="checksum"):
         parse_nmea_sentence(sentence)
+
+
+def test_vendored_nmea_parser_matches_gps_ingest() -> None:
+    vendored = ROOT / "agents" / "scraper" / "nmea.py"
+    upstream = ROOT / "services" / "gps-ingest" / "gps_ingest" / "nmea.py"
+    assert vendored.read_bytes() == upstream.read_bytes()
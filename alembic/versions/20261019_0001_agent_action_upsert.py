@@ -0,0 +1,34 @@
+"""Default agent action tool names so audits can be upserted by action id."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0001"
+down_revision = "20241113_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Webhook callbacks can arrive before the execute call has recorded the
+    # audit row. Upserts from that path omit ``tool_name`` so they never
+    # clobber a known value; the default keeps the insert branch valid.
+    op.alter_column(
+        "agent_action_audits",
+        "tool_name",
+        existing_type=sa.String(length=255),
+        existing_nullable=False,
+        server_default="unknown",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "agent_action_audits",
+        "tool_name",
+        existing_type=sa.String(length=255),
+        existing_nullable=False,
+        server_default=None,
+    )
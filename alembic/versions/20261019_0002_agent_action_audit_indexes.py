@@ -0,0 +1,35 @@
+"""Composite indexes backing filtered agent action audit pagination."""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20261019_0002"
+down_revision = "20261019_0001"
+branch_labels = None
+depends_on = None
+
+
+# Each filter column is paired with the ``(created_at, id)`` keyset used by
+# ``SupabaseRepository.list_agent_action_audits`` so filtered pages are served
+# from a single index range scan.
+AUDIT_INDEXES = {
+    "ix_agent_action_audits_created_at_id": ["created_at", "id"],
+    "ix_agent_action_audits_tool_created": ["tool_name", "created_at", "id"],
+    "ix_agent_action_audits_status_created": ["status", "created_at", "id"],
+    "ix_agent_action_audits_channel_created": ["channel_slug", "created_at", "id"],
+    "ix_agent_action_audits_initiator_created": ["initiator_id", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    # The single-column status index is superseded by the composite one.
+    op.drop_index("ix_agent_action_audits_status", table_name="agent_action_audits")
+    for name, columns in AUDIT_INDEXES.items():
+        op.create_index(name, "agent_action_audits", columns)
+
+
+def downgrade() -> None:
+    for name in reversed(list(AUDIT_INDEXES)):
+        op.drop_index(name, table_name="agent_action_audits")
+    op.create_index("ix_agent_action_audits_status", "agent_action_audits", ["status"])
@@ -0,0 +1,34 @@
+"""Default agent action statuses so execute upserts can omit them."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0003"
+down_revision = "20261019_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The execute handler leaves ``status`` out of its upsert unless it is
+    # terminal, so a webhook that already finished the action is not undone;
+    # the default keeps the insert branch valid.
+    op.alter_column(
+        "agent_action_audits",
+        "status",
+        existing_type=sa.String(length=50),
+        existing_nullable=False,
+        server_default="queued",
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        "agent_action_audits",
+        "status",
+        existing_type=sa.String(length=50),
+        existing_nullable=False,
+        server_default=None,
+    )
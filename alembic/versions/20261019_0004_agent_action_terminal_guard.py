@@ -0,0 +1,45 @@
+"""Keep agent action audits in their terminal status once reached."""
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "20261019_0004"
+down_revision = "20261019_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Execute responses and webhooks upsert the same row in any order. The
+    # trigger makes the merge itself refuse to leave "succeeded"/"failed", so
+    # a late or out-of-order non-terminal write cannot regress the audit and
+    # every writer needs only one request.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION agent_action_audits_keep_terminal()
+        RETURNS trigger AS $$
+        BEGIN
+            IF OLD.status IN ('succeeded', 'failed') THEN
+                NEW.status := OLD.status;
+                NEW.completed_at := COALESCE(OLD.completed_at, NEW.completed_at);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER agent_action_audits_keep_terminal
+        BEFORE UPDATE ON agent_action_audits
+        FOR EACH ROW EXECUTE FUNCTION agent_action_audits_keep_terminal()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS agent_action_audits_keep_terminal ON agent_action_audits"
+    )
+    op.execute("DROP FUNCTION IF EXISTS agent_action_audits_keep_terminal()")
@@ -1,13 +1,36 @@
 """FastAPI application entrypoint."""
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .routers import agent_actions, hardware, imei_watchlist, poi, telemetry
 from .routers.stations import router as stations_router
+from .services.agent_webhooks import get_webhook_worker
+from .services.hardware import get_hardware_manager
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    worker = get_webhook_worker()
+    if worker is not None:
+        worker.start()
+    serial_inventory = get_hardware_manager().serial_inventory
+    if serial_inventory is not None:
+        serial_inventory.start()
+    try:
+        yield
+    finally:
+        if serial_inventory is not None:
+            serial_inventory.stop()
+        if worker is not None:
+            await worker.stop()
+
 
-app = FastAPI(title="vTOC API", version="1.0.0")
+app = FastAPI(title="vTOC API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,15 +1,26 @@
 """Router for AgentKit integrations."""
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 from datetime import datetime
 from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from .. import schemas
 from ..config import Settings, get_settings
+from ..services.agent_webhooks import (
+    TERMINAL_STATUSES,
+    ClientFactory,
+    RepositoryFactory,
+    WebhookWorker,
+    apply_webhook_event,
+    get_webhook_client_factory,
+    get_webhook_repository_factory,
+    get_webhook_worker,
+)
 from ..services.agentkit import AgentKitClient, AgentKitError, get_agentkit_client
 from ..services.supabase import (
     SupabaseApiError,
@@ -87,11 +98,38 @@ async def list_tools(
 
 
 @router.get("/audits", response_model=List[schemas.AgentActionAuditRead])
-def list_audits(repo: SupabaseRepository = Depends(get_supabase_repository)):
+def list_audits(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    tool_name: Optional[str] = Query(None),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    channel_slug: Optional[str] = Query(None),
+    initiator_id: Optional[str] = Query(None),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
+    summary: bool = Query(False),
+    repo: SupabaseRepository = Depends(get_supabase_repository),
+):
     try:
-        return repo.list_agent_action_audits()
+        page = repo.list_agent_action_audits(
+            limit,
+            tool_name=tool_name,
+            status_value=status_filter,
+            channel_slug=channel_slug,
+            initiator_id=initiator_id,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            summary=summary,
+        )
     except SupabaseApiError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    # The body stays a plain list for existing clients; the keyset cursor for
+    # the next page travels in a header.
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
 
 
 @router.post(
@@ -135,54 +173,31 @@ async def execute_action(
         )
 
     status_value = response.get("status", "queued")
-    try:
-        existing_audit = repo.get_agent_action_audit_by_action_id(action_id)
-    except SupabaseApiError as exc:
-        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
     context_channel, context_initiator = _extract_context_from_metadata(payload.metadata)
     header_channel, header_initiator = _extract_context_from_headers(request.headers)
     channel_slug = context_channel or payload.channel_slug or header_channel
     initiator_id = context_initiator or payload.initiator_id or header_initiator
 
-    completed_at = None
-    if status_value in {"succeeded", "failed"}:
-        completed_at = datetime.utcnow()
+    completed_at = datetime.utcnow() if status_value in TERMINAL_STATUSES else None
 
-    if existing_audit is None:
-        audit_payload = schemas.AgentActionAuditCreate(
-            action_id=action_id,
-            tool_name=payload.tool_name,
-            status=status_value,
-            request_payload=payload.action_input,
-            response_payload=response.get("result"),
-            error_message=response.get("error"),
-            completed_at=completed_at,
-            channel_slug=channel_slug,
-            initiator_id=initiator_id,
-        )
-        try:
-            repo.create_agent_action_audit(audit_payload)
-        except SupabaseApiError as exc:
-            raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
-    else:
-        update_kwargs: Dict[str, Any] = {
-            "tool_name": payload.tool_name,
-            "status": status_value,
-            "request_payload": payload.action_input,
-            "response_payload": response.get("result"),
-            "error_message": response.get("error"),
-            "completed_at": completed_at,
-        }
-        if channel_slug is not None:
-            update_kwargs["channel_slug"] = channel_slug
-        if initiator_id is not None:
-            update_kwargs["initiator_id"] = initiator_id
-        update_payload = schemas.AgentActionAuditUpdate(**update_kwargs)
-        try:
-            repo.update_agent_action_audit(existing_audit.id, update_payload)
-        except SupabaseApiError as exc:
-            raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    # A webhook may already have recorded the final status; the upsert never
+    # replaces a terminal status, so this stays a single request.
+    audit_payload = schemas.AgentActionAuditUpsert(
+        action_id=action_id,
+        tool_name=payload.tool_name,
+        status=status_value,
+        request_payload=payload.action_input,
+        response_payload=response.get("result"),
+        error_message=response.get("error"),
+        completed_at=completed_at,
+        channel_slug=channel_slug,
+        initiator_id=initiator_id,
+    )
+    try:
+        repo.upsert_agent_action_audit(audit_payload)
+    except SupabaseApiError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
     return schemas.AgentActionExecuteResponse(
         action_id=action_id,
@@ -204,9 +219,10 @@ def _verify_signature(secret: str, signature: str | None, body: bytes) -> bool:
 @router.post("/webhook", status_code=status.HTTP_202_ACCEPTED)
 async def webhook(
     request: Request,
-    repo: SupabaseRepository = Depends(get_supabase_repository),
-    client: AgentKitClient = Depends(get_agentkit_client),
     settings: Settings = Depends(get_settings),
+    worker: Optional[WebhookWorker] = Depends(get_webhook_worker),
+    repository_factory: RepositoryFactory = Depends(get_webhook_repository_factory),
+    client_factory: ClientFactory = Depends(get_webhook_client_factory),
 ):
     body = await request.body()
     signature = request.headers.get("x-chatkit-signature")
@@ -219,63 +235,47 @@ async def webhook(
     except Exception as exc:  # pragma: no cover - Pydantic raises ValidationError
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payload") from exc
 
-    try:
-        audit = repo.get_agent_action_audit_by_action_id(event.action_id)
-    except SupabaseApiError as exc:
-        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
-
     header_channel, header_initiator = _extract_context_from_headers(request.headers)
-    channel_slug = event.channel_slug or header_channel
-    initiator_id = event.initiator_id or header_initiator
-
-    tool_name = None
-    if audit is not None:
-        tool_name = audit.tool_name
+    event = event.model_copy(
+        update={
+            "channel_slug": event.channel_slug or header_channel,
+            "initiator_id": event.initiator_id or header_initiator,
+        }
+    )
 
-    if tool_name is None and settings.is_agentkit_configured:
+    if worker is not None:
         try:
-            action_details = await client.get_action(event.action_id)
-            tool_name = action_details.get("tool_name") or action_details.get("tool")
-        except AgentKitError:
-            tool_name = "unknown"
-    elif tool_name is None:
-        tool_name = "unknown"
+            await asyncio.to_thread(worker.queue.enqueue, event)
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Webhook queue unavailable",
+            ) from exc
+        worker.notify()
+        return {"received": True, "queued": True}
 
     completed_at = None
-    if event.status in {"succeeded", "failed"}:
+    if event.status in TERMINAL_STATUSES:
         completed_at = datetime.utcnow()
 
-    if audit is None:
-        create_payload = schemas.AgentActionAuditCreate(
-            action_id=event.action_id,
-            tool_name=tool_name or "unknown",
-            status=event.status,
-            response_payload=event.result,
-            error_message=event.error,
-            completed_at=completed_at,
-            channel_slug=channel_slug,
-            initiator_id=initiator_id,
-        )
-        try:
-            repo.create_agent_action_audit(create_payload)
-        except SupabaseApiError as exc:
-            raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
-    else:
-        update_kwargs: Dict[str, Any] = {
-            "tool_name": tool_name or audit.tool_name,
-            "status": event.status,
-            "response_payload": event.result,
-            "error_message": event.error,
-            "completed_at": completed_at,
-        }
-        if channel_slug is not None:
-            update_kwargs["channel_slug"] = channel_slug
-        if initiator_id is not None:
-            update_kwargs["initiator_id"] = initiator_id
-        update_payload = schemas.AgentActionAuditUpdate(**update_kwargs)
-        try:
-            repo.update_agent_action_audit(audit.id, update_payload)
-        except SupabaseApiError as exc:
-            raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    # Repository and client are only built here: queued mode must keep
+    # accepting callbacks while Supabase or AgentKit is misconfigured.
+    client = await client_factory()
+    try:
+        with repository_factory() as repo:
+            await apply_webhook_event(
+                event, repo=repo, client=client, settings=settings, completed_at=completed_at
+            )
+    except SupabaseApiError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
     return {"received": True}
+
+
+@router.get("/webhook/queue", response_model=schemas.AgentWebhookQueueStats)
+def webhook_queue_stats(
+    worker: Optional[WebhookWorker] = Depends(get_webhook_worker),
+) -> schemas.AgentWebhookQueueStats:
+    if worker is None:
+        return schemas.AgentWebhookQueueStats(backend="inline")
+    return worker.stats()
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from ..services.hardware import (
     AdsbConfig,
@@ -14,9 +14,11 @@ from ..services.hardware import (
     GpsTestResult,
     H4MImportRequest,
     H4MImportResult,
+    HardwareJob,
     HardwareManager,
     HardwareOperationError,
     HardwareStatus,
+    SerialPortEvent,
     SerialPortInfo,
     get_hardware_manager,
 )
@@ -31,6 +33,14 @@ def hw_list_serial(
     return manager.list_serial_ports()
 
 
+@router.get("/serial/events", response_model=List[SerialPortEvent])
+def hw_serial_events(
+    since: int = Query(0, ge=0),
+    manager: HardwareManager = Depends(get_hardware_manager),
+) -> List[SerialPortEvent]:
+    return manager.serial_port_events(since)
+
+
 @router.post("/test-gps", response_model=GpsTestResult)
 def hw_test_gps(
     request: GpsTestRequest,
@@ -87,3 +97,57 @@ def h4m_import(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)
         ) from exc
+
+
+@router.post(
+    "/jobs/test-gps",
+    response_model=HardwareJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def hw_job_test_gps(
+    request: GpsTestRequest,
+    manager: HardwareManager = Depends(get_hardware_manager),
+) -> HardwareJob:
+    return manager.start_gps_test_job(request)
+
+
+@router.post(
+    "/jobs/enable-adsb",
+    response_model=HardwareJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def hw_job_enable_adsb(
+    request: AdsbToggleRequest,
+    manager: HardwareManager = Depends(get_hardware_manager),
+) -> HardwareJob:
+    return manager.start_adsb_job(request)
+
+
+@router.post(
+    "/jobs/h4m-import",
+    response_model=HardwareJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def hw_job_h4m_import(
+    request: H4MImportRequest,
+    manager: HardwareManager = Depends(get_hardware_manager),
+) -> HardwareJob:
+    return manager.start_h4m_import_job(request)
+
+
+@router.get("/jobs", response_model=List[HardwareJob])
+def hw_list_jobs(
+    manager: HardwareManager = Depends(get_hardware_manager),
+) -> List[HardwareJob]:
+    return manager.jobs.list_jobs()
+
+
+@router.get("/jobs/{job_id}", response_model=HardwareJob)
+def hw_get_job(
+    job_id: str,
+    manager: HardwareManager = Depends(get_hardware_manager),
+) -> HardwareJob:
+    job = manager.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
@@ -336,12 +336,49 @@ AgentActionAuditUpdate = create_partial_model(
 )
 
 
+AgentActionAuditUpsert = create_partial_model(
+    "AgentActionAuditUpsert",
+    AgentActionAuditBase,
+    exclude={"action_id"},
+    additional_fields={
+        "action_id": (str, ...),
+        "completed_at": (Optional[datetime], None),
+    },
+)
+
+
 class AgentActionAuditRead(
     ORMModelMixin, AgentActionAuditBase, IdentifierMixin, TimestampsMixin
 ):
     completed_at: Optional[datetime] = None
 
 
+class AgentActionAuditPage(BaseModel):
+    """Keyset-paginated slice of agent action audits."""
+
+    items: List[AgentActionAuditRead]
+    limit: int
+    next_cursor: Optional[str] = None
+
+
+class AgentWebhookQueueStats(BaseModel):
+    """Depth, lag and throughput of the asynchronous webhook queue."""
+
+    backend: str
+    pending: int = 0
+    processing: int = 0
+    failed: int = 0
+    completed: int = 0
+    oldest_pending_age_seconds: Optional[float] = None
+    processed_events: int = 0
+    coalesced_events: int = 0
+    audit_writes: int = 0
+    failed_writes: int = 0
+    last_batch_at: Optional[datetime] = None
+    last_batch_lag_seconds: Optional[float] = None
+    max_lag_seconds: float = 0.0
+
+
 class StationTimelineBase(BaseModel):
     """Base fields for station timeline entries."""
 
@@ -12,11 +12,14 @@ from .hardware.manager import (
     HardwareConfigStore,
     HardwareConfiguration,
     HardwareHealthSummary,
+    HardwareJob,
     HardwareManager,
     HardwareOperationError,
     HardwareStatus,
+    SerialPortEvent,
     SerialPortInfo,
     get_hardware_manager,
+    reset_hardware_manager,
 )
 from .supabase import (
     SupabaseApiError,
@@ -38,11 +41,14 @@ __all__ = [
     "HardwareConfigStore",
     "HardwareConfiguration",
     "HardwareHealthSummary",
+    "HardwareJob",
     "HardwareManager",
     "HardwareOperationError",
     "HardwareStatus",
+    "SerialPortEvent",
     "SerialPortInfo",
     "get_hardware_manager",
+    "reset_hardware_manager",
     "SupabaseApiError",
     "SupabaseRepository",
     "get_station_context",
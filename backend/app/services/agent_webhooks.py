@@ -0,0 +1,898 @@
+"""Durable queue and worker for AgentKit/ChatKit webhook callbacks.
+
+The webhook handler only verifies the signature and enqueues the event. A
+background :class:`WebhookWorker` drains the queue, coalesces bursts of status
+updates for the same ``action_id`` and writes a single audit upsert per action.
+
+Two queue backends are available:
+
+* :class:`SQLiteWebhookQueue` – a local, file-backed queue (the default when
+  queueing is enabled).
+* :class:`RedisWebhookQueue` – an optional adapter for deployments that already
+  run Redis. The ``redis`` package is only imported when selected.
+
+Each queue is designed for a single worker process; on start-up any events left
+in the ``processing`` state by a crashed worker are returned to ``pending``.
+Failed writes are retried with exponential backoff: a nacked event only becomes
+claimable again once its retry delay has passed.
+
+The module doubles as a small operator CLI::
+
+    python -m app.services.agent_webhooks stats
+    python -m app.services.agent_webhooks replay --state failed --action-id abc
+    python -m app.services.agent_webhooks purge --older-than-hours 24
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from fastapi import Depends
+
+from .. import schemas
+from ..config import Settings, get_settings
+from .agentkit import AgentKitClient, AgentKitError, get_agentkit_client
+from .supabase import SupabaseRepository, get_supabase_repository
+
+LOGGER = logging.getLogger(__name__)
+
+UNKNOWN_TOOL_NAME = "unknown"
+TERMINAL_STATUSES = frozenset({"succeeded", "failed"})
+QUEUE_STATES = ("pending", "processing", "done", "failed")
+
+
+class WebhookQueueError(RuntimeError):
+    """Raised when the webhook queue backend cannot be used."""
+
+
+def retry_delay(attempts: int, base: float, cap: float) -> float:
+    """Seconds to wait before retry number ``attempts`` (1 = first failure)."""
+
+    if base <= 0:
+        return 0.0
+    return min(cap, base * 2 ** max(attempts - 1, 0))
+
+
+@dataclass
+class QueuedWebhookEvent:
+    """A webhook event persisted in a queue backend."""
+
+    id: int
+    event: schemas.AgentActionWebhookEvent
+    enqueued_at: float
+    attempts: int = 0
+
+
+@dataclass
+class CoalescedWebhookUpdate:
+    """The merged result of every queued event for a single ``action_id``."""
+
+    event: schemas.AgentActionWebhookEvent
+    event_ids: List[int]
+    completed_at: Optional[datetime] = None
+    oldest_enqueued_at: float = 0.0
+
+
+def coalesce_events(
+    events: Iterable[QueuedWebhookEvent],
+) -> Dict[str, CoalescedWebhookUpdate]:
+    """Merge queued events per ``action_id`` in enqueue order.
+
+    The latest status wins and later non-null fields replace earlier ones, so a
+    ``running`` -> ``succeeded`` burst produces a single ``succeeded`` write.
+    A terminal status is never replaced by a later non-terminal one.
+    """
+
+    merged: Dict[str, CoalescedWebhookUpdate] = {}
+    for queued in sorted(events, key=lambda item: item.id):
+        event = queued.event
+        completed_at = None
+        if event.status in TERMINAL_STATUSES:
+            completed_at = datetime.utcfromtimestamp(queued.enqueued_at)
+        current = merged.get(event.action_id)
+        if current is None:
+            merged[event.action_id] = CoalescedWebhookUpdate(
+                event=event.model_copy(),
+                event_ids=[queued.id],
+                completed_at=completed_at,
+                oldest_enqueued_at=queued.enqueued_at,
+            )
+            continue
+        updates = event.model_dump(exclude_none=True)
+        current.event_ids.append(queued.id)
+        if current.event.status in TERMINAL_STATUSES and completed_at is None:
+            updates.pop("status", None)
+        else:
+            current.completed_at = completed_at
+        current.event = current.event.model_copy(update=updates)
+    return merged
+
+
+async def apply_webhook_event(
+    event: schemas.AgentActionWebhookEvent,
+    *,
+    repo: SupabaseRepository,
+    client: AgentKitClient,
+    settings: Settings,
+    completed_at: Optional[datetime] = None,
+) -> schemas.AgentActionAuditRead:
+    """Upsert the audit row for ``event`` and backfill an unknown tool name."""
+
+    # ``tool_name`` is deliberately omitted so a row written by the execute
+    # handler keeps its value; new rows fall back to the column default.
+    upsert_payload = schemas.AgentActionAuditUpsert(
+        action_id=event.action_id,
+        status=event.status,
+        response_payload=event.result,
+        error_message=event.error,
+        completed_at=completed_at,
+        channel_slug=event.channel_slug,
+        initiator_id=event.initiator_id,
+    )
+    audit = await asyncio.to_thread(repo.upsert_agent_action_audit, upsert_payload)
+
+    if audit.tool_name == UNKNOWN_TOOL_NAME and settings.is_agentkit_configured:
+        try:
+            action_details = await client.get_action(event.action_id)
+        except AgentKitError:
+            action_details = {}
+        tool_name = action_details.get("tool_name") or action_details.get("tool")
+        if tool_name:
+            audit = await asyncio.to_thread(
+                repo.update_agent_action_audit,
+                audit.id,
+                schemas.AgentActionAuditUpdate(tool_name=tool_name),
+            )
+    return audit
+
+
+# ----------------------------------------------------------------------
+# Queue backends
+# ----------------------------------------------------------------------
+class WebhookQueue:
+    """Interface shared by the webhook queue backends."""
+
+    backend = "inline"
+
+    def enqueue(self, event: schemas.AgentActionWebhookEvent) -> int:
+        raise NotImplementedError
+
+    def claim(self, limit: int) -> List[QueuedWebhookEvent]:
+        """Move up to ``limit`` pending events to ``processing`` and return them."""
+
+        raise NotImplementedError
+
+    def ack(self, event_ids: Sequence[int]) -> None:
+        raise NotImplementedError
+
+    def nack(
+        self,
+        event_ids: Sequence[int],
+        error: str,
+        max_attempts: int,
+        *,
+        retry_base: float = 0.0,
+        retry_max: float = 0.0,
+    ) -> None:
+        """Park events as ``failed`` or return them to ``pending``.
+
+        Returned events become claimable after :func:`retry_delay` seconds.
+        """
+
+        raise NotImplementedError
+
+    def replay(
+        self,
+        *,
+        states: Sequence[str] = ("failed",),
+        action_id: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> int:
+        """Re-queue stored events so the worker processes them again."""
+
+        raise NotImplementedError
+
+    def purge(self, older_than: float) -> int:
+        """Delete completed events processed before ``older_than`` (epoch seconds)."""
+
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def oldest_pending_at(self) -> Optional[float]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class SQLiteWebhookQueue(WebhookQueue):
+    """File-backed webhook queue stored in a local SQLite database."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path).expanduser()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self._path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS webhook_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                action_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL,
+                available_at REAL NOT NULL DEFAULT 0,
+                processed_at REAL,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS ix_webhook_events_state
+                ON webhook_events (state, id);
+            CREATE INDEX IF NOT EXISTS ix_webhook_events_action
+                ON webhook_events (action_id, id);
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(webhook_events)")}
+        if "available_at" not in columns:  # queues created before retry backoff
+            self._conn.execute(
+                "ALTER TABLE webhook_events ADD COLUMN available_at REAL NOT NULL DEFAULT 0"
+            )
+        self._conn.execute(
+            "UPDATE webhook_events SET state = 'pending' WHERE state = 'processing'"
+        )
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, event: schemas.AgentActionWebhookEvent) -> int:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO webhook_events (action_id, payload, enqueued_at) VALUES (?, ?, ?)",
+                (event.action_id, event.model_dump_json(), time.time()),
+            )
+            return int(cursor.lastrowid)
+
+    def claim(self, limit: int) -> List[QueuedWebhookEvent]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, payload, enqueued_at, attempts FROM webhook_events "
+                "WHERE state = 'pending' AND available_at <= ? ORDER BY id LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+            if not rows:
+                return []
+            conn.executemany(
+                "UPDATE webhook_events SET state = 'processing', attempts = attempts + 1 "
+                "WHERE id = ?",
+                [(row[0],) for row in rows],
+            )
+        return [
+            QueuedWebhookEvent(
+                id=row[0],
+                event=schemas.AgentActionWebhookEvent.model_validate_json(row[1]),
+                enqueued_at=row[2],
+                attempts=row[3] + 1,
+            )
+            for row in rows
+        ]
+
+    def ack(self, event_ids: Sequence[int]) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE webhook_events SET state = 'done', processed_at = ?, last_error = NULL "
+                "WHERE id = ?",
+                [(now, event_id) for event_id in event_ids],
+            )
+
+    def nack(
+        self,
+        event_ids: Sequence[int],
+        error: str,
+        max_attempts: int,
+        *,
+        retry_base: float = 0.0,
+        retry_max: float = 0.0,
+    ) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, attempts FROM webhook_events "
+                f"WHERE id IN ({', '.join('?' for _ in event_ids)})",
+                list(event_ids),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE webhook_events SET last_error = ?, available_at = ?, state = CASE "
+                "WHEN attempts >= ? THEN 'failed' ELSE 'pending' END WHERE id = ?",
+                [
+                    (
+                        error,
+                        now + retry_delay(attempts, retry_base, retry_max),
+                        max_attempts,
+                        event_id,
+                    )
+                    for event_id, attempts in rows
+                ],
+            )
+
+    def replay(
+        self,
+        *,
+        states: Sequence[str] = ("failed",),
+        action_id: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> int:
+        clauses = [f"state IN ({', '.join('?' for _ in states)})"]
+        params: List[Any] = list(states)
+        if action_id:
+            clauses.append("action_id = ?")
+            params.append(action_id)
+        if since is not None:
+            clauses.append("enqueued_at >= ?")
+            params.append(since)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE webhook_events SET state = 'pending', attempts = 0, "
+                f"available_at = 0, processed_at = NULL WHERE {' AND '.join(clauses)}",
+                params,
+            )
+            return cursor.rowcount
+
+    def purge(self, older_than: float) -> int:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM webhook_events WHERE state = 'done' AND processed_at < ?",
+                (older_than,),
+            )
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM webhook_events GROUP BY state"
+            ).fetchall()
+        counts = {state: 0 for state in QUEUE_STATES}
+        counts.update({state: int(total) for state, total in rows})
+        return counts
+
+    def oldest_pending_at(self) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(enqueued_at) FROM webhook_events WHERE state = 'pending'"
+            ).fetchone()
+        return row[0] if row and row[0] is not None else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisWebhookQueue(WebhookQueue):
+    """Webhook queue backed by Redis lists.
+
+    Event records live in a hash keyed by id; ``pending``/``processing``/
+    ``failed`` are lists of ids and completed ids are kept in a sorted set
+    scored by completion time so they can be replayed or purged. Events
+    waiting for a retry sit in the ``delayed`` sorted set, scored by the time
+    they become due, and are moved back to ``pending`` by :meth:`claim`.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str, *, prefix: str = "vtoc:agent-webhooks", client: Any = None) -> None:
+        if client is None:
+            try:
+                import redis  # type: ignore[import-not-found]
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise WebhookQueueError(
+                    "The redis package is required for AGENT_WEBHOOK_QUEUE_BACKEND=redis"
+                ) from exc
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self._redis = client
+        self._prefix = prefix
+        while self._redis.rpoplpush(self._key("processing"), self._key("pending")):
+            pass
+
+    def _key(self, name: str) -> str:
+        return f"{self._prefix}:{name}"
+
+    def _load(self, event_id: int) -> Optional[Dict[str, Any]]:
+        raw = self._redis.hget(self._key("events"), str(event_id))
+        return json.loads(raw) if raw else None
+
+    def _store(self, event_id: int, record: Dict[str, Any]) -> None:
+        self._redis.hset(self._key("events"), str(event_id), json.dumps(record))
+
+    def enqueue(self, event: schemas.AgentActionWebhookEvent) -> int:
+        event_id = int(self._redis.incr(self._key("seq")))
+        record = {
+            "action_id": event.action_id,
+            "event": event.model_dump(mode="json"),
+            "enqueued_at": time.time(),
+            "attempts": 0,
+        }
+        pipe = self._redis.pipeline()
+        pipe.hset(self._key("events"), str(event_id), json.dumps(record))
+        pipe.lpush(self._key("pending"), str(event_id))
+        pipe.execute()
+        return event_id
+
+    def _promote_due(self) -> None:
+        due = self._redis.zrangebyscore(self._key("delayed"), "-inf", time.time())
+        for raw_id in due:
+            # Only the caller that removed the id may re-queue it.
+            if self._redis.zrem(self._key("delayed"), raw_id):
+                self._redis.rpush(self._key("pending"), raw_id)
+
+    def claim(self, limit: int) -> List[QueuedWebhookEvent]:
+        self._promote_due()
+        claimed: List[QueuedWebhookEvent] = []
+        for _ in range(limit):
+            raw_id = self._redis.rpoplpush(self._key("pending"), self._key("processing"))
+            if raw_id is None:
+                break
+            record = self._load(int(raw_id))
+            if record is None:
+                self._redis.lrem(self._key("processing"), 0, raw_id)
+                continue
+            record["attempts"] = int(record.get("attempts", 0)) + 1
+            self._store(int(raw_id), record)
+            claimed.append(
+                QueuedWebhookEvent(
+                    id=int(raw_id),
+                    event=schemas.AgentActionWebhookEvent.model_validate(record["event"]),
+                    enqueued_at=float(record["enqueued_at"]),
+                    attempts=record["attempts"],
+                )
+            )
+        return claimed
+
+    def ack(self, event_ids: Sequence[int]) -> None:
+        now = time.time()
+        pipe = self._redis.pipeline()
+        for event_id in event_ids:
+            pipe.lrem(self._key("processing"), 0, str(event_id))
+            pipe.zadd(self._key("done"), {str(event_id): now})
+        pipe.execute()
+
+    def nack(
+        self,
+        event_ids: Sequence[int],
+        error: str,
+        max_attempts: int,
+        *,
+        retry_base: float = 0.0,
+        retry_max: float = 0.0,
+    ) -> None:
+        now = time.time()
+        for event_id in event_ids:
+            record = self._load(event_id) or {}
+            record["last_error"] = error
+            self._store(event_id, record)
+            attempts = int(record.get("attempts", 0))
+            delay = retry_delay(attempts, retry_base, retry_max)
+            pipe = self._redis.pipeline()
+            pipe.lrem(self._key("processing"), 0, str(event_id))
+            if attempts >= max_attempts:
+                pipe.rpush(self._key("failed"), str(event_id))
+            elif delay > 0:
+                pipe.zadd(self._key("delayed"), {str(event_id): now + delay})
+            else:
+                pipe.rpush(self._key("pending"), str(event_id))
+            pipe.execute()
+
+    def _candidate_ids(self, state: str) -> List[str]:
+        if state == "done":
+            return list(self._redis.zrange(self._key("done"), 0, -1))
+        return list(self._redis.lrange(self._key(state), 0, -1))
+
+    def replay(
+        self,
+        *,
+        states: Sequence[str] = ("failed",),
+        action_id: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> int:
+        replayed = 0
+        for state in states:
+            if state not in {"failed", "done"}:
+                continue
+            for raw_id in self._candidate_ids(state):
+                record = self._load(int(raw_id))
+                if record is None:
+                    continue
+                if action_id and record.get("action_id") != action_id:
+                    continue
+                if since is not None and float(record.get("enqueued_at", 0)) < since:
+                    continue
+                record["attempts"] = 0
+                self._store(int(raw_id), record)
+                pipe = self._redis.pipeline()
+                if state == "done":
+                    pipe.zrem(self._key("done"), raw_id)
+                else:
+                    pipe.lrem(self._key(state), 0, raw_id)
+                pipe.lpush(self._key("pending"), raw_id)
+                pipe.execute()
+                replayed += 1
+        return replayed
+
+    def purge(self, older_than: float) -> int:
+        expired = self._redis.zrangebyscore(self._key("done"), "-inf", older_than)
+        if not expired:
+            return 0
+        pipe = self._redis.pipeline()
+        pipe.zrem(self._key("done"), *expired)
+        pipe.hdel(self._key("events"), *expired)
+        pipe.execute()
+        return len(expired)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "pending": int(self._redis.llen(self._key("pending")))
+            + int(self._redis.zcard(self._key("delayed"))),
+            "processing": int(self._redis.llen(self._key("processing"))),
+            "done": int(self._redis.zcard(self._key("done"))),
+            "failed": int(self._redis.llen(self._key("failed"))),
+        }
+
+    def oldest_pending_at(self) -> Optional[float]:
+        raw_id = self._redis.lindex(self._key("pending"), -1)
+        if raw_id is None:
+            return None
+        record = self._load(int(raw_id))
+        return float(record["enqueued_at"]) if record else None
+
+
+def build_webhook_queue(settings: Settings) -> Optional[WebhookQueue]:
+    """Instantiate the queue selected by ``AGENT_WEBHOOK_QUEUE_BACKEND``."""
+
+    backend = settings.agent_webhook_queue_backend
+    if backend == "inline":
+        return None
+    if backend == "sqlite":
+        return SQLiteWebhookQueue(Path(settings.agent_webhook_queue_path))
+    if backend == "redis":
+        if not settings.agent_webhook_queue_redis_url:
+            raise WebhookQueueError("AGENT_WEBHOOK_QUEUE_REDIS_URL is not configured")
+        return RedisWebhookQueue(settings.agent_webhook_queue_redis_url)
+    raise WebhookQueueError(f"Unknown webhook queue backend: {backend}")
+
+
+# ----------------------------------------------------------------------
+# Worker
+# ----------------------------------------------------------------------
+RepositoryFactory = Callable[[], ContextManager[SupabaseRepository]]
+ClientFactory = Callable[[], Awaitable[AgentKitClient]]
+
+
+@dataclass
+class WebhookWorkerMetrics:
+    """Counters describing queue throughput and lag."""
+
+    processed_events: int = 0
+    coalesced_events: int = 0
+    audit_writes: int = 0
+    failed_writes: int = 0
+    last_batch_at: Optional[datetime] = None
+    last_batch_lag_seconds: Optional[float] = None
+    max_lag_seconds: float = 0.0
+
+
+@dataclass
+class WebhookWorker:
+    """Drain a :class:`WebhookQueue` and write coalesced audit updates."""
+
+    queue: WebhookQueue
+    settings: Settings
+    repository_factory: Optional[RepositoryFactory] = None
+    client_factory: Optional[ClientFactory] = None
+    metrics: WebhookWorkerMetrics = field(default_factory=WebhookWorkerMetrics)
+
+    def __post_init__(self) -> None:
+        if self.repository_factory is None:
+            self.repository_factory = self._default_repository_scope
+        if self.client_factory is None:
+            self.client_factory = self._default_client
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._last_purge = 0.0
+        self._last_batch_acked = 0
+
+    @contextlib.contextmanager
+    def _default_repository_scope(self) -> Iterator[SupabaseRepository]:
+        repository = SupabaseRepository(settings=self.settings)
+        try:
+            yield repository
+        finally:
+            repository.close()
+
+    async def _default_client(self) -> AgentKitClient:
+        return AgentKitClient(settings=self.settings)
+
+    def notify(self) -> None:
+        """Wake the worker after an in-process enqueue."""
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run_once(self) -> int:
+        """Claim and process a single batch; return the number of events handled."""
+
+        batch = await asyncio.to_thread(
+            self.queue.claim, self.settings.agent_webhook_queue_batch_size
+        )
+        self._last_batch_acked = 0
+        if not batch:
+            return 0
+        updates = coalesce_events(batch)
+        assert self.repository_factory is not None and self.client_factory is not None
+        client = await self.client_factory()
+        with self.repository_factory() as repo:
+            for update in updates.values():
+                try:
+                    await apply_webhook_event(
+                        update.event,
+                        repo=repo,
+                        client=client,
+                        settings=self.settings,
+                        completed_at=update.completed_at,
+                    )
+                except Exception as exc:
+                    LOGGER.warning(
+                        "Webhook update for %s failed: %s", update.event.action_id, exc
+                    )
+                    self.metrics.failed_writes += 1
+                    await asyncio.to_thread(
+                        self.queue.nack,
+                        update.event_ids,
+                        str(exc),
+                        self.settings.agent_webhook_queue_max_attempts,
+                        retry_base=self.settings.agent_webhook_queue_retry_base_seconds,
+                        retry_max=self.settings.agent_webhook_queue_retry_max_seconds,
+                    )
+                    continue
+                await asyncio.to_thread(self.queue.ack, update.event_ids)
+                self.metrics.audit_writes += 1
+                self._last_batch_acked += len(update.event_ids)
+
+        now = time.time()
+        lag = max(now - item.oldest_enqueued_at for item in updates.values())
+        self.metrics.processed_events += len(batch)
+        self.metrics.coalesced_events += len(batch) - len(updates)
+        self.metrics.last_batch_at = datetime.utcfromtimestamp(now)
+        self.metrics.last_batch_lag_seconds = lag
+        self.metrics.max_lag_seconds = max(self.metrics.max_lag_seconds, lag)
+        return len(batch)
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        interval = self.settings.agent_webhook_queue_poll_seconds
+        while True:
+            try:
+                processed = await self.run_once()
+                self._maybe_purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # pragma: no cover - keep the worker alive
+                LOGGER.exception("Webhook queue worker iteration failed")
+                processed = 0
+            # Drain back-to-back only while writes succeed; after a batch that
+            # failed entirely, wait instead of hammering an unavailable backend.
+            if processed and self._last_batch_acked:
+                continue
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            self._wakeup.clear()
+            # Give a burst of callbacks a moment to land so they coalesce.
+            await asyncio.sleep(self.settings.agent_webhook_queue_coalesce_seconds)
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        retention = self.settings.agent_webhook_queue_retention_hours * 3600
+        self.queue.purge(now - retention)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def stats(self) -> schemas.AgentWebhookQueueStats:
+        counts = self.queue.counts()
+        oldest = self.queue.oldest_pending_at()
+        return schemas.AgentWebhookQueueStats(
+            backend=self.queue.backend,
+            pending=counts.get("pending", 0),
+            processing=counts.get("processing", 0),
+            failed=counts.get("failed", 0),
+            completed=counts.get("done", 0),
+            oldest_pending_age_seconds=(time.time() - oldest) if oldest is not None else None,
+            processed_events=self.metrics.processed_events,
+            coalesced_events=self.metrics.coalesced_events,
+            audit_writes=self.metrics.audit_writes,
+            failed_writes=self.metrics.failed_writes,
+            last_batch_at=self.metrics.last_batch_at,
+            last_batch_lag_seconds=self.metrics.last_batch_lag_seconds,
+            max_lag_seconds=self.metrics.max_lag_seconds,
+        )
+
+
+_worker: Optional[WebhookWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_webhook_worker() -> Optional[WebhookWorker]:
+    """Return the process-wide worker, or ``None`` when webhooks run inline."""
+
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            settings = get_settings()
+            queue = build_webhook_queue(settings)
+            if queue is None:
+                return None
+            _worker = WebhookWorker(queue=queue, settings=settings)
+        return _worker
+
+
+def get_webhook_repository_factory(
+    settings: Settings = Depends(get_settings),
+) -> RepositoryFactory:
+    """Return how inline webhook writes open a repository.
+
+    Nothing is constructed until the factory is called, so queued webhooks
+    are accepted even when Supabase is not configured.
+    """
+
+    return functools.partial(contextlib.contextmanager(get_supabase_repository), settings)
+
+
+def get_webhook_client_factory() -> ClientFactory:
+    """Return how inline webhook writes obtain an AgentKit client."""
+
+    return get_agentkit_client
+
+
+def reset_webhook_worker() -> None:
+    """Drop the cached worker so tests can rebuild it with new settings."""
+
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.queue.close()
+        _worker = None
+
+
+# ----------------------------------------------------------------------
+# Operator CLI
+# ----------------------------------------------------------------------
+def _parse_since(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and replay queued agent webhooks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Print queue depth and lag")
+    replay = subparsers.add_parser("replay", help="Re-queue failed or completed events")
+    replay.add_argument(
+        "--state",
+        action="append",
+        choices=["failed", "done"],
+        help="States to replay (default: failed)",
+    )
+    replay.add_argument("--action-id", help="Only replay events for this action")
+    replay.add_argument("--since", help="Only replay events enqueued after this ISO timestamp")
+    purge = subparsers.add_parser("purge", help="Delete completed events")
+    purge.add_argument("--older-than-hours", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    queue = build_webhook_queue(get_settings())
+    if queue is None:
+        parser.error("AGENT_WEBHOOK_QUEUE_BACKEND is 'inline'; there is no queue to manage")
+    try:
+        if args.command == "stats":
+            oldest = queue.oldest_pending_at()
+            print(
+                json.dumps(
+                    {
+                        "backend": queue.backend,
+                        **queue.counts(),
+                        "oldest_pending_age_seconds": (
+                            time.time() - oldest if oldest is not None else None
+                        ),
+                    },
+                    indent=2,
+                )
+            )
+        elif args.command == "replay":
+            count = queue.replay(
+                states=args.state or ["failed"],
+                action_id=args.action_id,
+                since=_parse_since(args.since),
+            )
+            print(f"Re-queued {count} webhook event(s)")
+        else:
+            count = queue.purge(time.time() - args.older_than_hours * 3600)
+            print(f"Purged {count} completed webhook event(s)")
+    finally:
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
+
+
+__all__ = [
+    "CoalescedWebhookUpdate",
+    "QueuedWebhookEvent",
+    "RedisWebhookQueue",
+    "SQLiteWebhookQueue",
+    "UNKNOWN_TOOL_NAME",
+    "WebhookQueue",
+    "WebhookQueueError",
+    "WebhookWorker",
+    "WebhookWorkerMetrics",
+    "apply_webhook_event",
+    "build_webhook_queue",
+    "coalesce_events",
+    "get_webhook_client_factory",
+    "get_webhook_repository_factory",
+    "get_webhook_worker",
+    "reset_webhook_worker",
+]
@@ -1,5 +1,6 @@
 """Hardware service exports."""
 
+from .jobs import HardwareJob
 from .manager import (
     AdsbConfig,
     AdsbToggleRequest,
@@ -15,9 +16,10 @@ from .manager import (
     HardwareManager,
     HardwareOperationError,
     HardwareStatus,
-    SerialPortInfo,
     get_hardware_manager,
+    reset_hardware_manager,
 )
+from .serial_inventory import SerialPortEvent, SerialPortInfo, SerialPortInventory
 
 __all__ = [
     "AdsbConfig",
@@ -31,9 +33,13 @@ __all__ = [
     "HardwareConfigStore",
     "HardwareConfiguration",
     "HardwareHealthSummary",
+    "HardwareJob",
     "HardwareManager",
     "HardwareOperationError",
     "HardwareStatus",
+    "SerialPortEvent",
     "SerialPortInfo",
+    "SerialPortInventory",
     "get_hardware_manager",
+    "reset_hardware_manager",
 ]
@@ -0,0 +1,270 @@
+"""Streaming, resumable extraction of H4M airspace/IQ archives."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+# (member name, size, archive fingerprint, opener)
+Member = Tuple[str, int, str, Callable[[], IO[bytes]]]
+
+MANIFEST_NAME = ".h4m-import.json"
+ZIP_SUFFIXES = {".zip", ".kmz"}
+TAR_SUFFIXES = {".tar", ".tgz", ".tbz2", ".txz"}
+CHUNK_SIZE = 1024 * 1024
+
+
+class H4MImportError(RuntimeError):
+    """Raised when an archive cannot be imported safely."""
+
+
+def _archive_kind(source: Path) -> Optional[str]:
+    suffixes = [suffix.lower() for suffix in source.suffixes]
+    if suffixes and suffixes[-1] in ZIP_SUFFIXES:
+        return "zip"
+    if (suffixes and suffixes[-1] in TAR_SUFFIXES) or suffixes[-2:-1] == [".tar"]:
+        return "tar"
+    return None
+
+
+def _archive_stem(source: Path) -> str:
+    name = source.name
+    for suffix in (".tar.gz", ".tar.bz2", ".tar.xz"):
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return source.stem
+
+
+def _safe_target(root: Path, member: str) -> Path:
+    relative = PurePosixPath(member)
+    if relative.is_absolute() or ".." in relative.parts:
+        raise H4MImportError(f"Refusing to extract unsafe archive member: {member}")
+    return root.joinpath(*relative.parts)
+
+
+def hash_file(path: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _Progress:
+    """Accumulate counters and rate-limit progress callbacks.
+
+    Extraction and the hash pool both report, so updates and callbacks are
+    serialised by a lock.
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback], bytes_total: Optional[int]) -> None:
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._last_report = 0.0
+        self.state: Dict[str, Any] = {
+            "members_total": None,
+            "members_done": 0,
+            "members_skipped": 0,
+            "files_indexed": 0,
+            "bytes_total": bytes_total,
+            "bytes_done": 0,
+            "bytes_per_second": 0.0,
+            "elapsed_seconds": 0.0,
+            "current": None,
+        }
+
+    def report(self, *, force: bool = False, **updates: Any) -> None:
+        with self._lock:
+            self.state.update(updates)
+            if self._callback is None:
+                return
+            now = time.monotonic()
+            if not force and now - self._last_report < 0.25:
+                return
+            self._last_report = now
+            elapsed = now - self._started
+            self.state["elapsed_seconds"] = round(elapsed, 3)
+            rate = self.state["bytes_done"] / elapsed if elapsed else 0.0
+            self.state["bytes_per_second"] = round(rate, 1)
+            self._callback(dict(self.state))
+
+
+class _Index:
+    """Thread-safe ``member -> {size, sha256, source}`` map persisted beside the data.
+
+    ``source`` fingerprints the archive member (zip CRC or tar mtime) so a
+    re-import of a changed archive can tell stale files from finished ones.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.path = root / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def add(self, member: str, size: int, source: str, sha256: str) -> None:
+        with self._lock:
+            self.entries[member] = {"size": size, "sha256": sha256, "source": source}
+
+    def matches(self, member: str, size: int, source: str) -> bool:
+        with self._lock:
+            entry = self.entries.get(member)
+        return entry is not None and entry.get("size") == size and entry.get("source") == source
+
+    def discard(self, member: str) -> None:
+        with self._lock:
+            self.entries.pop(member, None)
+
+    def flush(self) -> None:
+        with self._lock:
+            payload = json.dumps(self.entries, indent=2, sort_keys=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def _iter_zip(source: Path) -> Iterator[Member]:
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            stamp = f"crc32:{info.CRC:08x}"
+            yield info.filename, info.file_size, stamp, lambda info=info: archive.open(info)
+
+
+def _iter_tar(source: Path) -> Iterator[Member]:
+    # ``r|*`` reads the archive strictly sequentially, so compressed tarballs
+    # are never decompressed twice.
+    with tarfile.open(source, mode="r|*") as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            handle = archive.extractfile(info)
+            if handle is None:  # pragma: no cover - regular files always have data
+                continue
+            stamp = f"mtime:{int(info.mtime)}"
+            yield info.name, info.size, stamp, lambda handle=handle: handle
+
+
+def stream_h4m_archive(
+    source: Path,
+    destination: Path,
+    extract: bool = True,
+    *,
+    on_progress: Optional[ProgressCallback] = None,
+    hash_workers: int = 4,
+) -> Dict[str, Any]:
+    """Import ``source`` under ``destination`` without buffering the archive.
+
+    Archive members are streamed to ``<name>.part`` files and renamed once
+    complete. Finished files are hashed on a thread pool while extraction
+    continues and recorded in ``.h4m-import.json`` at the top of the
+    extracted tree together with the member's archive fingerprint (zip CRC
+    or tar mtime). Re-running an import skips a member only when the file
+    exists and its manifest entry matches the member's size and
+    fingerprint, so an interrupted import resumes while a changed archive
+    replaces stale files.
+    """
+
+    if not source.exists():
+        raise H4MImportError(f"H4M archive not found: {source}")
+    destination.mkdir(parents=True, exist_ok=True)
+    kind = _archive_kind(source) if extract else None
+
+    if kind is None:
+        target = destination / source.name
+        progress = _Progress(on_progress, source.stat().st_size)
+        progress.report(force=True, members_total=1, current=source.name)
+        with source.open("rb") as reader, target.open("wb") as writer:
+            for chunk in iter(lambda: reader.read(CHUNK_SIZE), b""):
+                writer.write(chunk)
+                progress.report(bytes_done=progress.state["bytes_done"] + len(chunk))
+        shutil.copystat(source, target)
+        progress.report(force=True, members_done=1, current=None)
+        return {"destination": str(target), "files": [str(target)], "skipped": 0}
+
+    root = destination / _archive_stem(source)
+    root.mkdir(parents=True, exist_ok=True)
+    index = _Index(root)
+    files: List[str] = []
+    pending: List[Future[None]] = []
+    members_total: Optional[int] = None
+    bytes_total: Optional[int] = None
+    if kind == "zip":
+        with zipfile.ZipFile(source) as archive:
+            infos = [info for info in archive.infolist() if not info.is_dir()]
+        members_total = len(infos)
+        bytes_total = sum(info.file_size for info in infos)
+    progress = _Progress(on_progress, bytes_total)
+    progress.report(force=True, members_total=members_total)
+
+    def _index_member(member: str, path: Path, size: int, stamp: str) -> None:
+        index.add(member, size, stamp, hash_file(path))
+        progress.report(files_indexed=len(index.entries))
+
+    members = _iter_zip(source) if kind == "zip" else _iter_tar(source)
+    with ThreadPoolExecutor(max_workers=max(hash_workers, 1), thread_name_prefix="h4m-hash") as pool:
+        try:
+            for member, size, stamp, opener in members:
+                target = _safe_target(root, member)
+                files.append(str(target))
+                done = progress.state["members_done"] + 1
+                if (
+                    index.matches(member, size, stamp)
+                    and target.exists()
+                    and target.stat().st_size == size
+                ):
+                    progress.report(
+                        members_done=done,
+                        members_skipped=progress.state["members_skipped"] + 1,
+                        bytes_done=progress.state["bytes_done"] + size,
+                        current=member,
+                    )
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                part = target.with_name(target.name + ".part")
+                with opener() as reader, part.open("wb") as writer:
+                    for chunk in iter(lambda: reader.read(CHUNK_SIZE), b""):
+                        writer.write(chunk)
+                        progress.report(
+                            bytes_done=progress.state["bytes_done"] + len(chunk), current=member
+                        )
+                os.replace(part, target)
+                index.discard(member)
+                pending.append(pool.submit(_index_member, member, target, size, stamp))
+                progress.report(members_done=done)
+        finally:
+            for future in pending:
+                future.result()
+            index.flush()
+
+    progress.report(force=True, members_total=progress.state["members_done"], current=None)
+    return {
+        "destination": str(root),
+        "files": files,
+        "skipped": progress.state["members_skipped"],
+        "manifest": str(index.path),
+    }
+
+
+__all__ = [
+    "H4MImportError",
+    "MANIFEST_NAME",
+    "ProgressCallback",
+    "hash_file",
+    "stream_h4m_archive",
+]
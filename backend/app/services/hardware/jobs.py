@@ -0,0 +1,237 @@
+"""Asynchronous command execution and job tracking for hardware operations."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import uuid
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Sequence
+
+from pydantic import BaseModel, ConfigDict, Field
+
+OutputCallback = Callable[[str], None]
+AsyncProcessRunner = Callable[
+    [Sequence[str], Optional[float], Optional[OutputCallback]], Awaitable[str]
+]
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class HardwareJob(BaseModel):
+    """State of a hardware command submitted through the job API."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    id: str
+    kind: str
+    device: Optional[str] = None
+    status: JobStatus = "queued"
+    output: List[str] = Field(default_factory=list)
+    progress: Optional[dict[str, Any]] = None
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+async def run_command_streaming(
+    command: Sequence[str],
+    timeout: Optional[float],
+    on_output: Optional[OutputCallback] = None,
+) -> str:
+    """Run ``command`` without blocking the event loop.
+
+    Each stdout line is handed to ``on_output`` as soon as it is read. The
+    process is killed when ``timeout`` elapses. Returns the collected stdout;
+    raises :class:`HardwareOperationError` on non-zero exit or timeout.
+    """
+
+    from .manager import HardwareOperationError  # local import avoids a cycle
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as exc:
+        raise HardwareOperationError(f"Command failed: {' '.join(command)}: {exc}") from exc
+
+    stdout_lines: List[str] = []
+
+    async def _read_stdout() -> None:
+        assert process.stdout is not None  # for mypy
+        async for raw in process.stdout:
+            line = raw.decode("utf-8", errors="replace").rstrip("\n")
+            stdout_lines.append(line)
+            if on_output is not None:
+                on_output(line)
+
+    async def _communicate() -> bytes:
+        assert process.stderr is not None  # for mypy
+        _, stderr = await asyncio.gather(_read_stdout(), process.stderr.read())
+        await process.wait()
+        return stderr
+
+    try:
+        stderr = await asyncio.wait_for(_communicate(), timeout=timeout)
+    except asyncio.TimeoutError as exc:
+        with contextlib.suppress(ProcessLookupError):
+            process.kill()
+        await process.wait()
+        raise HardwareOperationError(
+            f"Command timed out after {timeout}s: {' '.join(command)}"
+        ) from exc
+
+    stdout = "\n".join(stdout_lines)
+    if process.returncode != 0:
+        output = stdout or stderr.decode("utf-8", errors="replace") or f"exit {process.returncode}"
+        raise HardwareOperationError(f"Command failed: {' '.join(command)}: {output.strip()}")
+    return stdout
+
+
+class JobReporter:
+    """Callable handed to job work: ``reporter(line)`` streams output and
+    :meth:`progress` replaces the job's progress snapshot.
+
+    Both may be called from worker threads.
+    """
+
+    def __init__(self, job: HardwareJob, max_output_lines: int) -> None:
+        self._job = job
+        self._max_output_lines = max_output_lines
+
+    def __call__(self, line: str) -> None:
+        output = self._job.output
+        output.append(line)
+        if len(output) > self._max_output_lines:
+            del output[: len(output) - self._max_output_lines]
+
+    def progress(self, snapshot: dict[str, Any]) -> None:
+        self._job.progress = snapshot
+
+
+JobWork = Callable[[JobReporter], Awaitable[dict[str, Any]]]
+
+
+class HardwareJobRegistry:
+    """Track background hardware jobs and cap concurrency per device."""
+
+    def __init__(
+        self,
+        *,
+        per_device_limit: int = 1,
+        max_finished_jobs: int = 200,
+        max_output_lines: int = 500,
+    ) -> None:
+        self._per_device_limit = max(per_device_limit, 1)
+        self._max_finished_jobs = max_finished_jobs
+        self._max_output_lines = max_output_lines
+        self._jobs: "OrderedDict[str, HardwareJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task[None]] = {}
+        # Semaphores belong to an event loop, so keep one set per loop.
+        self._slots: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]
+        ] = weakref.WeakKeyDictionary()
+
+    @contextlib.asynccontextmanager
+    async def device_slot(self, device: Optional[str]) -> AsyncIterator[None]:
+        """Hold one of the concurrency slots reserved for ``device``."""
+
+        loop = asyncio.get_running_loop()
+        slots = self._slots.setdefault(loop, {})
+        key = device or "default"
+        semaphore = slots.get(key)
+        if semaphore is None:
+            semaphore = slots[key] = asyncio.Semaphore(self._per_device_limit)
+        async with semaphore:
+            yield
+
+    def submit(
+        self,
+        kind: str,
+        device: Optional[str],
+        work: JobWork,
+    ) -> HardwareJob:
+        """Schedule ``work`` on the running loop and return the queued job.
+
+        The job stays ``queued`` until the registry holds a :meth:`device_slot`
+        for ``device``; ``work`` then runs inside it, so it must not take the
+        same slot again. ``work`` receives a :class:`JobReporter` for streamed
+        output and progress. Raising :class:`HardwareJobFailed` marks the job
+        failed while still recording a result payload.
+        """
+
+        job = HardwareJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            device=device,
+            created_at=datetime.utcnow(),
+        )
+        self._jobs[job.id] = job
+        task = asyncio.get_running_loop().create_task(self._run(job, work))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        self._prune()
+        return job.model_copy(deep=True)
+
+    async def _run(
+        self,
+        job: HardwareJob,
+        work: JobWork,
+    ) -> None:
+        try:
+            async with self.device_slot(job.device):
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                job.result = await work(JobReporter(job, self._max_output_lines))
+            job.status = "succeeded"
+        except HardwareJobFailed as exc:
+            job.result = exc.result
+            job.error = str(exc)
+            job.status = "failed"
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at]
+        for job_id in finished[: max(len(finished) - self._max_finished_jobs, 0)]:
+            self._jobs.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[HardwareJob]:
+        job = self._jobs.get(job_id)
+        return job.model_copy(deep=True) if job is not None else None
+
+    def list_jobs(self) -> List[HardwareJob]:
+        return [job.model_copy(deep=True) for job in reversed(self._jobs.values())]
+
+    async def wait(self, job_id: str) -> Optional[HardwareJob]:
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.get(job_id)
+
+
+class HardwareJobFailed(RuntimeError):
+    """Raised by job work functions to fail a job while keeping its result."""
+
+    def __init__(self, message: str, result: Optional[dict[str, Any]] = None) -> None:
+        super().__init__(message)
+        self.result = result
+
+
+__all__ = [
+    "AsyncProcessRunner",
+    "HardwareJob",
+    "HardwareJobFailed",
+    "HardwareJobRegistry",
+    "JobReporter",
+    "JobWork",
+    "OutputCallback",
+    "run_command_streaming",
+]
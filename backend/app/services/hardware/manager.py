@@ -1,10 +1,13 @@
 """Hardware orchestration helpers."""
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import json
 import os
-import shutil
 import subprocess
+import tempfile
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -12,21 +15,23 @@ from typing import Any, Callable, Iterable, List, Optional, Sequence
 
 from pydantic import BaseModel, Field, ConfigDict
 
+from .h4m_import import H4MImportError, ProgressCallback, stream_h4m_archive
+from .jobs import (
+    AsyncProcessRunner,
+    HardwareJob,
+    HardwareJobFailed,
+    HardwareJobRegistry,
+    JobReporter,
+    OutputCallback,
+    run_command_streaming,
+)
+from .serial_inventory import SerialPortEvent, SerialPortInfo, SerialPortInventory
+
 
 class HardwareOperationError(RuntimeError):
     """Raised when an operation interacting with hardware fails."""
 
 
-class SerialPortInfo(BaseModel):
-    """Description of a serial port reported by the system."""
-
-    model_config = ConfigDict(extra="forbid")
-
-    device: str
-    description: Optional[str] = None
-    hwid: Optional[str] = None
-
-
 class GpsTestRequest(BaseModel):
     """Input payload used to run a GPS self-test."""
 
@@ -156,7 +161,13 @@ class HardwareStatus(BaseModel):
 
 
 class HardwareConfigStore:
-    """Persist and retrieve :class:`HardwareConfiguration` instances."""
+    """Persist and retrieve :class:`HardwareConfiguration` instances.
+
+    Parsed configurations are cached against the file's inode, size and
+    modification time so repeated loads only hit the disk for a ``stat``.
+    Writes go to a temporary sibling file that is fsynced and then moved into
+    place with :func:`os.replace`, so readers never observe a partial file.
+    """
 
     def __init__(self, path: Optional[Path] = None) -> None:
         default_path = (
@@ -165,42 +176,99 @@ class HardwareConfigStore:
             .resolve()
         )
         self._path = path.resolve() if path is not None else default_path
+        self._lock = threading.Lock()
+        self._cached: Optional[HardwareConfiguration] = None
+        self._cached_stamp: Optional[tuple[int, int, int]] = None
 
     @property
     def path(self) -> Path:
         return self._path
 
+    @staticmethod
+    def _stamp(stat_result: os.stat_result) -> tuple[int, int, int]:
+        return (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+
     def load(self) -> HardwareConfiguration:
-        if not self._path.exists():
+        try:
+            stamp = self._stamp(self._path.stat())
+        except FileNotFoundError:
             return HardwareConfiguration()
+        except OSError as exc:  # pragma: no cover - disk error
+            raise HardwareOperationError(f"Failed to read hardware configuration: {exc}") from exc
+        with self._lock:
+            if self._cached is not None and self._cached_stamp == stamp:
+                return self._cached.model_copy(deep=True)
         try:
             raw = self._path.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return HardwareConfiguration()
         except OSError as exc:  # pragma: no cover - disk error
             raise HardwareOperationError(f"Failed to read hardware configuration: {exc}") from exc
         if not raw:
             return HardwareConfiguration()
         try:
             payload = json.loads(raw)
-            return HardwareConfiguration.model_validate(payload)
+            config = HardwareConfiguration.model_validate(payload)
         except Exception as exc:  # pragma: no cover - invalid file contents
             raise HardwareOperationError("Hardware configuration file is corrupt") from exc
+        with self._lock:
+            self._cached = config
+            self._cached_stamp = stamp
+        return config.model_copy(deep=True)
 
     def save(self, config: HardwareConfiguration) -> HardwareConfiguration:
+        data = config.model_dump_json(indent=2, exclude_none=True)
+        tmp_name: Optional[str] = None
         try:
             self._path.parent.mkdir(parents=True, exist_ok=True)
-            self._path.write_text(
-                config.model_dump_json(indent=2, exclude_none=True), encoding="utf-8"
+            fd, tmp_name = tempfile.mkstemp(
+                prefix=f".{self._path.name}.", suffix=".tmp", dir=self._path.parent
             )
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_name, self._path)
+            tmp_name = None
+            self._fsync_directory(self._path.parent)
+            stamp = self._stamp(self._path.stat())
         except OSError as exc:  # pragma: no cover - disk error
             raise HardwareOperationError(f"Failed to write hardware configuration: {exc}") from exc
+        finally:
+            if tmp_name is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_name)
+        with self._lock:
+            self._cached = config.model_copy(deep=True)
+            self._cached_stamp = stamp
         return config
 
+    @staticmethod
+    def _fsync_directory(directory: Path) -> None:
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+        except OSError:  # pragma: no cover - platforms without directory handles
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:  # pragma: no cover - filesystems that reject directory fsync
+            pass
+        finally:
+            os.close(dir_fd)
+
 
 ProcessRunner = Callable[[Sequence[str], Optional[float]], subprocess.CompletedProcess[str]]
-H4MImporter = Callable[[Path, Path, bool], dict[str, Any]]
+# Importers used by background jobs also receive an ``on_progress`` keyword.
+H4MImporter = Callable[..., dict[str, Any]]
 SerialPortProvider = Callable[[], Iterable[Any]]
 
 
+def _adsb_slot(request: AdsbToggleRequest) -> str:
+    """Device slot key for ADS-B commands; receivers without a name share one."""
+
+    return request.device or "adsb"
+
+
 @dataclass
 class HardwareManager:
     """Coordinate interactions with station-attached hardware."""
@@ -209,28 +277,37 @@ class HardwareManager:
     serial_provider: SerialPortProvider | None = None
     process_runner: ProcessRunner | None = None
     h4m_importer: H4MImporter | None = None
+    async_process_runner: AsyncProcessRunner | None = None
+    jobs: HardwareJobRegistry = field(default_factory=HardwareJobRegistry)
+    serial_inventory: SerialPortInventory | None = None
 
     def __post_init__(self) -> None:
-        self._config: Optional[HardwareConfiguration] = None
+        # Serialises read-modify-write cycles against the configuration file.
+        self._lock = threading.RLock()
         if self.serial_provider is None:
             self.serial_provider = self._default_serial_provider
+        if self.async_process_runner is None:
+            # A custom synchronous runner (tests, dry-run shims) stays the source
+            # of truth; otherwise commands run as asyncio subprocesses.
+            if self.process_runner is not None:
+                self.async_process_runner = self._threaded_process_runner
+            else:
+                self.async_process_runner = run_command_streaming
         if self.process_runner is None:
             self.process_runner = self._default_process_runner
         if self.h4m_importer is None:
             self.h4m_importer = self._default_h4m_importer
+        if self.serial_inventory is None:
+            self.serial_inventory = SerialPortInventory(self._scan_serial_ports)
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
     def _get_config(self) -> HardwareConfiguration:
-        if self._config is None:
-            self._config = self.config_store.load()
-        return self._config
+        return self.config_store.load()
 
     def _save_config(self, config: HardwareConfiguration) -> HardwareConfiguration:
-        saved = self.config_store.save(config)
-        self._config = saved
-        return saved
+        return self.config_store.save(config)
 
     def _default_serial_provider(self) -> Iterable[Any]:
         try:  # pragma: no cover - pyserial may be missing in CI
@@ -256,34 +333,67 @@ class HardwareManager:
                 f"Command failed: {' '.join(command)}: {output.strip()}"
             ) from exc
 
-    def _default_h4m_importer(self, source: Path, destination: Path, extract: bool) -> dict[str, Any]:
+    def _default_h4m_importer(
+        self,
+        source: Path,
+        destination: Path,
+        extract: bool,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> dict[str, Any]:
         if not source.exists():
             raise HardwareOperationError(f"H4M archive not found: {source}")
-        destination.mkdir(parents=True, exist_ok=True)
-        files: list[str] = []
-        target: Path
-        if extract and shutil.which("unzip") and source.suffix.lower() in {".zip", ".kmz"}:
-            # Attempt to unpack archives commonly used for airspace datasets.
-            target = destination / source.stem
-            target.mkdir(parents=True, exist_ok=True)
-            shutil.unpack_archive(str(source), str(target))
-            for item in target.rglob("*"):
-                if item.is_file():
-                    files.append(str(item))
-        else:
-            target = destination / source.name
-            shutil.copy2(source, target)
-            files.append(str(target))
-        return {"destination": str(target), "files": files}
+        try:
+            return stream_h4m_archive(source, destination, extract, on_progress=on_progress)
+        except H4MImportError as exc:
+            raise HardwareOperationError(str(exc)) from exc
 
     def _run_command(self, command: Sequence[str], timeout: Optional[float]) -> subprocess.CompletedProcess[str]:
         assert self.process_runner is not None  # for mypy
         return self.process_runner(command, timeout)
 
-    # ------------------------------------------------------------------
-    # Public API
-    # ------------------------------------------------------------------
-    def list_serial_ports(self) -> List[SerialPortInfo]:
+    async def _threaded_process_runner(
+        self,
+        command: Sequence[str],
+        timeout: Optional[float],
+        on_output: Optional[OutputCallback] = None,
+    ) -> str:
+        completed = await asyncio.to_thread(self._run_command, command, timeout)
+        stdout = completed.stdout or ""
+        if on_output is not None:
+            for line in stdout.splitlines():
+                on_output(line)
+        return stdout
+
+    async def _run_command_async(
+        self,
+        command: Sequence[str],
+        timeout: Optional[float],
+        on_output: Optional[OutputCallback] = None,
+    ) -> str:
+        assert self.async_process_runner is not None  # for mypy
+        return await self.async_process_runner(command, timeout, on_output)
+
+    @staticmethod
+    def _gps_command(request: GpsTestRequest) -> List[str]:
+        return ["gpsctl", "--device", request.port, "--baud", str(request.baudrate)]
+
+    def _build_adsb_config(self, request: AdsbToggleRequest) -> AdsbConfig:
+        return AdsbConfig(
+            enabled=request.enabled,
+            device=request.device,
+            gain=request.gain,
+            frequency=request.frequency,
+            options=dict(request.options),
+            last_updated_at=datetime.utcnow(),
+        )
+
+    def _store_adsb_config(self, adsb_config: AdsbConfig) -> None:
+        with self._lock:
+            config = self._get_config()
+            config.adsb = adsb_config
+            self._save_config(config)
+
+    def _scan_serial_ports(self) -> List[SerialPortInfo]:
         assert self.serial_provider is not None  # for mypy
         ports: List[SerialPortInfo] = []
         for port in self.serial_provider():
@@ -298,14 +408,21 @@ class HardwareManager:
             ports.append(info)
         return ports
 
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def list_serial_ports(self) -> List[SerialPortInfo]:
+        assert self.serial_inventory is not None  # for mypy
+        return self.serial_inventory.snapshot()
+
+    def serial_port_events(self, since: int = 0) -> List[SerialPortEvent]:
+        """Return attach/detach events recorded after sequence ``since``."""
+
+        assert self.serial_inventory is not None  # for mypy
+        return self.serial_inventory.events_since(since)
+
     def test_gps(self, request: GpsTestRequest) -> GpsTestResult:
-        command = [
-            "gpsctl",
-            "--device",
-            request.port,
-            "--baud",
-            str(request.baudrate),
-        ]
+        command = self._gps_command(request)
         try:
             completed = self._run_command(command, timeout=request.timeout_seconds)
             output = (completed.stdout or "").strip()
@@ -317,8 +434,25 @@ class HardwareManager:
                 error=str(exc),
             )
 
+    async def test_gps_async(
+        self, request: GpsTestRequest, on_output: Optional[OutputCallback] = None
+    ) -> GpsTestResult:
+        """Event-loop friendly :meth:`test_gps` sharing the per-device slot."""
+
+        async with self.jobs.device_slot(request.port):
+            return await self._test_gps_in_slot(request, on_output)
+
+    async def _test_gps_in_slot(
+        self, request: GpsTestRequest, on_output: Optional[OutputCallback]
+    ) -> GpsTestResult:
+        command = self._gps_command(request)
+        try:
+            output = await self._run_command_async(command, request.timeout_seconds, on_output)
+        except HardwareOperationError as exc:
+            return GpsTestResult(success=False, command=command, error=str(exc))
+        return GpsTestResult(success=True, command=command, output=output.strip())
+
     def register_base_station(self, registration: BaseStationRegistration) -> BaseStationConfig:
-        config = self._get_config()
         stored = BaseStationConfig(
             callsign=registration.callsign,
             serial_number=registration.serial_number,
@@ -328,28 +462,59 @@ class HardwareManager:
             notes=registration.notes,
             registered_at=datetime.utcnow(),
         )
-        config.base_station = stored
-        self._save_config(config)
+        with self._lock:
+            config = self._get_config()
+            config.base_station = stored
+            self._save_config(config)
         return stored
 
     def enable_adsb(self, request: AdsbToggleRequest) -> AdsbConfig:
-        config = self._get_config()
-        adsb_config = AdsbConfig(
-            enabled=request.enabled,
-            device=request.device,
-            gain=request.gain,
-            frequency=request.frequency,
-            options=dict(request.options),
-            last_updated_at=datetime.utcnow(),
-        )
+        adsb_config = self._build_adsb_config(request)
         timeout = request.timeout_seconds
         command = request.start_command if request.enabled else request.stop_command
         if command:
             self._run_command(command, timeout=timeout)
-        config.adsb = adsb_config
-        self._save_config(config)
+        self._store_adsb_config(adsb_config)
+        return adsb_config
+
+    async def enable_adsb_async(
+        self, request: AdsbToggleRequest, on_output: Optional[OutputCallback] = None
+    ) -> AdsbConfig:
+        """Event-loop friendly :meth:`enable_adsb` sharing the per-device slot."""
+
+        async with self.jobs.device_slot(_adsb_slot(request)):
+            return await self._enable_adsb_in_slot(request, on_output)
+
+    async def _enable_adsb_in_slot(
+        self, request: AdsbToggleRequest, on_output: Optional[OutputCallback]
+    ) -> AdsbConfig:
+        adsb_config = self._build_adsb_config(request)
+        command = request.start_command if request.enabled else request.stop_command
+        if command:
+            await self._run_command_async(command, request.timeout_seconds, on_output)
+        await asyncio.to_thread(self._store_adsb_config, adsb_config)
         return adsb_config
 
+    def start_gps_test_job(self, request: GpsTestRequest) -> HardwareJob:
+        """Queue a GPS self-test; must be called from a running event loop."""
+
+        async def _work(on_output: OutputCallback) -> dict[str, Any]:
+            result = await self._test_gps_in_slot(request, on_output)
+            if not result.success:
+                raise HardwareJobFailed(result.error or "GPS test failed", result.model_dump())
+            return result.model_dump()
+
+        return self.jobs.submit("test-gps", request.port, _work)
+
+    def start_adsb_job(self, request: AdsbToggleRequest) -> HardwareJob:
+        """Queue an ADS-B toggle; must be called from a running event loop."""
+
+        async def _work(on_output: OutputCallback) -> dict[str, Any]:
+            config = await self._enable_adsb_in_slot(request, on_output)
+            return config.model_dump(mode="json")
+
+        return self.jobs.submit("enable-adsb", _adsb_slot(request), _work)
+
     def get_status(self) -> HardwareStatus:
         config = self._get_config()
         ports = self.list_serial_ports()
@@ -365,32 +530,76 @@ class HardwareManager:
         )
         return HardwareStatus(configuration=config, serial_ports=ports, health=health)
 
-    def import_h4m(self, request: H4MImportRequest) -> H4MImportResult:
+    def _h4m_destination(self, request: H4MImportRequest) -> Path:
+        if request.destination_dir:
+            return Path(request.destination_dir).expanduser().resolve()
+        return self.config_store.path.parent / "h4m"
+
+    def _import_h4m(
+        self, request: H4MImportRequest, on_progress: Optional[ProgressCallback] = None
+    ) -> H4MImportResult:
         source = Path(request.source_path).expanduser().resolve()
-        destination = (
-            Path(request.destination_dir).expanduser().resolve()
-            if request.destination_dir
-            else self.config_store.path.parent / "h4m"
-        )
+        destination = self._h4m_destination(request)
         importer = self.h4m_importer
         assert importer is not None  # for mypy
         try:
-            result = importer(source, destination, request.extract)
+            if on_progress is None:
+                result = importer(source, destination, request.extract)
+            else:
+                result = importer(source, destination, request.extract, on_progress=on_progress)
         except HardwareOperationError:
             raise
         except Exception as exc:  # pragma: no cover - unexpected importer failure
             raise HardwareOperationError(f"Failed to import H4M archive: {exc}") from exc
-        config = self._get_config()
-        config.last_h4m_import_at = datetime.utcnow()
-        self._save_config(config)
+        with self._lock:
+            config = self._get_config()
+            config.last_h4m_import_at = datetime.utcnow()
+            self._save_config(config)
         return H4MImportResult(
             imported=True,
             destination=result.get("destination", str(destination)),
             files=result.get("files", []),
         )
 
+    def import_h4m(self, request: H4MImportRequest) -> H4MImportResult:
+        return self._import_h4m(request)
+
+    def start_h4m_import_job(self, request: H4MImportRequest) -> HardwareJob:
+        """Queue an H4M import; must be called from a running event loop.
+
+        Imports into the same destination are serialised through the job
+        registry's device slots, keyed on the destination directory. Re-submitting an interrupted import resumes
+        it because already extracted members are skipped.
+        """
+
+        destination = str(self._h4m_destination(request))
+
+        async def _work(reporter: JobReporter) -> dict[str, Any]:
+            result = await asyncio.to_thread(self._import_h4m, request, reporter.progress)
+            return result.model_dump()
+
+        return self.jobs.submit("h4m-import", destination, _work)
+
+
+_manager: Optional[HardwareManager] = None
+_manager_lock = threading.Lock()
+
 
 def get_hardware_manager() -> HardwareManager:
-    """FastAPI dependency that returns a :class:`HardwareManager`."""
+    """FastAPI dependency that returns the process-wide :class:`HardwareManager`."""
+
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = HardwareManager()
+        return _manager
+
+
+def reset_hardware_manager() -> None:
+    """Drop the shared manager so the next call picks up new configuration."""
 
-    return HardwareManager()
+    global _manager
+    with _manager_lock:
+        if _manager is not None and _manager.serial_inventory is not None:
+            _manager.serial_inventory.stop()
+        _manager = None
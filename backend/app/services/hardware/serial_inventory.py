@@ -0,0 +1,212 @@
+"""Cached serial port inventory with attach/detach notifications."""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Literal, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, ConfigDict
+
+LOGGER = logging.getLogger(__name__)
+
+# ``/dev`` changes whenever a device node is created or removed and the by-id
+# directory tracks USB serial adapters, so their mtimes are a cheap change
+# signal compared with walking sysfs through ``comports()``.
+DEFAULT_WATCH_PATHS: Tuple[Path, ...] = (Path("/dev"), Path("/dev/serial/by-id"))
+
+
+class SerialPortInfo(BaseModel):
+    """Description of a serial port reported by the system."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    device: str
+    description: Optional[str] = None
+    hwid: Optional[str] = None
+
+
+class SerialPortEvent(BaseModel):
+    """A serial port appearing or disappearing from the inventory."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    sequence: int
+    event: Literal["attached", "detached"]
+    port: SerialPortInfo
+    occurred_at: datetime
+
+
+PortScanner = Callable[[], List[SerialPortInfo]]
+PortListener = Callable[[SerialPortEvent], None]
+
+
+class SerialPortInventory:
+    """Keep a snapshot of serial ports fresh without rescanning per request.
+
+    A background thread (see :meth:`start`) polls the mtimes of
+    ``watch_paths`` and only rescans when they change, or at least every
+    ``max_age_seconds``. Without the watcher, :meth:`snapshot` performs the
+    same check inline. Differences between scans are published to listeners
+    and kept in a bounded event log for polling consumers.
+    """
+
+    def __init__(
+        self,
+        scanner: PortScanner,
+        *,
+        watch_paths: Sequence[Path] = DEFAULT_WATCH_PATHS,
+        poll_interval_seconds: float = 1.0,
+        max_age_seconds: float = 30.0,
+        event_history: int = 256,
+    ) -> None:
+        self._scanner = scanner
+        self._watch_paths = tuple(watch_paths)
+        self._poll_interval = poll_interval_seconds
+        self._max_age = max_age_seconds
+        self._lock = threading.Lock()
+        self._ports: Optional[List[SerialPortInfo]] = None
+        self._fingerprint: Optional[Tuple[Optional[int], ...]] = None
+        self._scanned_at = 0.0
+        self._events: Deque[SerialPortEvent] = deque(maxlen=event_history)
+        self._sequence = itertools.count(1)
+        self._listeners: List[PortListener] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+    def _current_fingerprint(self) -> Tuple[Optional[int], ...]:
+        stamps: List[Optional[int]] = []
+        for path in self._watch_paths:
+            try:
+                stamps.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def _is_stale(self, fingerprint: Tuple[Optional[int], ...]) -> bool:
+        return (
+            self._ports is None
+            or fingerprint != self._fingerprint
+            or time.monotonic() - self._scanned_at >= self._max_age
+        )
+
+    def refresh(self, *, force: bool = False) -> List[SerialPortEvent]:
+        """Rescan if the watched paths changed; return the resulting events."""
+
+        fingerprint = self._current_fingerprint()
+        with self._lock:
+            if not force and not self._is_stale(fingerprint):
+                return []
+        ports = self._scanner()
+        with self._lock:
+            previous: Dict[str, SerialPortInfo] = {
+                port.device: port for port in (self._ports or [])
+            }
+            first_scan = self._ports is None
+            self._ports = ports
+            self._fingerprint = fingerprint
+            self._scanned_at = time.monotonic()
+            if first_scan:
+                return []
+            current = {port.device: port for port in ports}
+            now = datetime.utcnow()
+            events = [
+                SerialPortEvent(
+                    sequence=next(self._sequence), event="detached", port=port, occurred_at=now
+                )
+                for device, port in previous.items()
+                if device not in current
+            ]
+            events += [
+                SerialPortEvent(
+                    sequence=next(self._sequence), event="attached", port=port, occurred_at=now
+                )
+                for device, port in current.items()
+                if device not in previous
+            ]
+            self._events.extend(events)
+            listeners = list(self._listeners)
+        for event in events:
+            for listener in listeners:
+                try:
+                    listener(event)
+                except Exception:  # pragma: no cover - listener bugs must not stop scans
+                    LOGGER.exception("Serial port listener failed")
+        return events
+
+    def snapshot(self) -> List[SerialPortInfo]:
+        """Return the cached ports, rescanning inline only when no watcher runs."""
+
+        if not self.is_watching:
+            self.refresh()
+        with self._lock:
+            return list(self._ports or [])
+
+    # ------------------------------------------------------------------
+    # Notifications
+    # ------------------------------------------------------------------
+    def subscribe(self, listener: PortListener) -> Callable[[], None]:
+        """Register ``listener`` for attach/detach events; returns an unsubscribe."""
+
+        with self._lock:
+            self._listeners.append(listener)
+
+        def _unsubscribe() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return _unsubscribe
+
+    def events_since(self, sequence: int = 0) -> List[SerialPortEvent]:
+        with self._lock:
+            return [event for event in self._events if event.sequence > sequence]
+
+    # ------------------------------------------------------------------
+    # Watcher thread
+    # ------------------------------------------------------------------
+    @property
+    def is_watching(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:  # pragma: no cover - keep the watcher alive
+                LOGGER.exception("Serial port inventory refresh failed")
+            self._stop.wait(self._poll_interval)
+
+    def start(self) -> None:
+        if self.is_watching:
+            return
+        self._stop.clear()
+        self.refresh(force=True)
+        self._thread = threading.Thread(
+            target=self._watch, name="serial-port-inventory", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._poll_interval + 1)
+        self._thread = None
+
+
+__all__ = [
+    "DEFAULT_WATCH_PATHS",
+    "PortListener",
+    "PortScanner",
+    "SerialPortEvent",
+    "SerialPortInfo",
+    "SerialPortInventory",
+]
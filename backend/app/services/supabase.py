@@ -1,8 +1,10 @@
 """Supabase repository abstraction for telemetry and agent audits."""
 from __future__ import annotations
 
+import base64
+import binascii
 from datetime import datetime
-from typing import Any, Dict, Generator, Iterable, List, Optional
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
 
 import httpx
 from fastapi import Depends, HTTPException, Request, status
@@ -13,6 +15,11 @@ from ..utils.stations import resolve_station_slug as _resolve_station_slug_from_
 
 TELEMETRY_SCHEMA = "telemetry"
 
+AGENT_AUDIT_SUMMARY_COLUMNS = (
+    "id,action_id,tool_name,status,error_message,channel_slug,initiator_id,"
+    "created_at,updated_at,completed_at"
+)
+
 
 class SupabaseApiError(Exception):
     """Raised when Supabase returns an error response."""
@@ -987,17 +994,77 @@ class SupabaseRepository:
     # ------------------------------------------------------------------
     # Agent action audits
     # ------------------------------------------------------------------
+    @staticmethod
+    def encode_audit_cursor(audit: schemas.AgentActionAuditRead) -> str:
+        raw = f"{audit.created_at.isoformat()}|{audit.id}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    @staticmethod
+    def decode_audit_cursor(cursor: str) -> Tuple[str, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            created_at, audit_id = raw.rsplit("|", 1)
+            datetime.fromisoformat(created_at)
+            return created_at, int(audit_id)
+        except (binascii.Error, UnicodeError, ValueError) as exc:
+            raise SupabaseApiError(status.HTTP_400_BAD_REQUEST, "Invalid cursor") from exc
+
     def list_agent_action_audits(
-        self, limit: int = 100
-    ) -> List[schemas.AgentActionAuditRead]:
-        response = self._request(
-            "GET",
-            "agent_action_audits",
-            params={"select": "*", "order": "created_at.desc"},
-            headers={"Range": f"0-{max(limit - 1, 0)}"},
-        )
+        self,
+        limit: int = 100,
+        *,
+        tool_name: Optional[str] = None,
+        status_value: Optional[str] = None,
+        channel_slug: Optional[str] = None,
+        initiator_id: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        summary: bool = False,
+    ) -> schemas.AgentActionAuditPage:
+        """Return audits newest first using ``(created_at, id)`` keyset pagination.
+
+        Every filter maps onto one of the composite ``(column, created_at, id)``
+        indexes so pages stay index-backed regardless of table size. ``summary``
+        drops the request/response payload columns.
+        """
+
+        limit = max(limit, 1)
+        params: Dict[str, Any] = {
+            "select": AGENT_AUDIT_SUMMARY_COLUMNS if summary else "*",
+            "order": "created_at.desc,id.desc",
+            "limit": limit + 1,
+        }
+        for column, value in (
+            ("tool_name", tool_name),
+            ("status", status_value),
+            ("channel_slug", channel_slug),
+            ("initiator_id", initiator_id),
+        ):
+            if value is not None:
+                params[column] = f"eq.{value}"
+
+        conditions: List[str] = []
+        if created_after is not None:
+            conditions.append(f'created_at.gte."{created_after.isoformat()}"')
+        if created_before is not None:
+            conditions.append(f'created_at.lt."{created_before.isoformat()}"')
+        if cursor:
+            cursor_created_at, cursor_id = self.decode_audit_cursor(cursor)
+            conditions.append(
+                f'or(created_at.lt."{cursor_created_at}",'
+                f'and(created_at.eq."{cursor_created_at}",id.lt.{cursor_id}))'
+            )
+        if conditions:
+            params["and"] = f"({','.join(conditions)})"
+
+        response = self._request("GET", "agent_action_audits", params=params)
         data = self._json(response) or []
-        return [schemas.AgentActionAuditRead.model_validate(item) for item in data]
+        items = [schemas.AgentActionAuditRead.model_validate(item) for item in data[:limit]]
+        next_cursor = None
+        if len(data) > limit and items:
+            next_cursor = self.encode_audit_cursor(items[-1])
+        return schemas.AgentActionAuditPage(items=items, limit=limit, next_cursor=next_cursor)
 
     def get_agent_action_audit_by_action_id(
         self, action_id: str
@@ -1042,6 +1109,28 @@ class SupabaseRepository:
         record = self._ensure_single(response, not_found_message="Audit not found")
         return schemas.AgentActionAuditRead.model_validate(record)
 
+    def upsert_agent_action_audit(
+        self, payload: schemas.AgentActionAuditUpsert
+    ) -> schemas.AgentActionAuditRead:
+        """Insert or merge an audit row keyed on ``action_id`` in one request.
+
+        Only the fields set on ``payload`` are written, so callers that do not
+        know a value (for example the webhook and ``tool_name``) leave the
+        stored column untouched. A database trigger keeps a terminal status
+        (and its ``completed_at``) once stored, so execute responses and
+        webhooks may arrive in any order.
+        """
+
+        response = self._request(
+            "POST",
+            "agent_action_audits",
+            params={"on_conflict": "action_id"},
+            json=payload.model_dump(mode="json", exclude_none=True),
+            headers={"Prefer": "resolution=merge-duplicates,return=representation"},
+        )
+        record = self._ensure_single(response)
+        return schemas.AgentActionAuditRead.model_validate(record)
+
     # ------------------------------------------------------------------
     # POI (Person of Interest)
     # ------------------------------------------------------------------
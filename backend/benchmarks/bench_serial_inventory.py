@@ -0,0 +1,88 @@
+"""Serial inventory benchmark: walking sysfs per request vs the cached snapshot.
+
+Run from the repository root::
+
+    python backend/benchmarks/bench_serial_inventory.py --ports 64 --reads 200
+
+A fake ``/sys/class/tty`` + ``/dev/serial/by-id`` tree with ``--ports``
+USB serial adapters is built in a temporary directory. The cold path walks
+it the way pyserial's Linux backend does (list ttys, stat the device node,
+read ``product``/``serial``); the cached path serves
+``SerialPortInventory.snapshot()``, which only stats the watched directories.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.app.services.hardware import SerialPortInfo, SerialPortInventory  # noqa: E402
+
+
+def make_fake_sysfs(root: Path, count: int) -> None:
+    by_id = root / "dev" / "serial" / "by-id"
+    by_id.mkdir(parents=True)
+    for index in range(count):
+        name = f"ttyUSB{index}"
+        device_dir = root / "sys" / "class" / "tty" / name / "device"
+        device_dir.mkdir(parents=True)
+        (device_dir / "product").write_text(f"u-blox GNSS receiver {name}\n")
+        (device_dir / "serial").write_text(f"SN-{name}\n")
+        (root / "dev" / name).touch()
+        os.symlink(f"../../{name}", by_id / f"usb-{name}-if00")
+
+
+def sysfs_scanner(root: Path) -> List[SerialPortInfo]:
+    ports: List[SerialPortInfo] = []
+    for entry in sorted((root / "sys" / "class" / "tty").iterdir()):
+        if not (root / "dev" / entry.name).exists() or not (entry / "device").is_dir():
+            continue
+        product = (entry / "device" / "product").read_text().strip()
+        serial = (entry / "device" / "serial").read_text().strip()
+        ports.append(
+            SerialPortInfo(device=f"/dev/{entry.name}", description=product, hwid=f"USB SER={serial}")
+        )
+    return ports
+
+
+def measure(label: str, read: Callable[[], List[SerialPortInfo]], reads: int) -> float:
+    started = time.perf_counter()
+    for _ in range(reads):
+        ports = read()
+    elapsed = (time.perf_counter() - started) / reads
+    print(f"  {label:16} {elapsed * 1e6:10.1f} us/read ({len(ports)} ports)")
+    return elapsed
+
+
+def run(port_count: int, reads: int) -> None:
+    with tempfile.TemporaryDirectory(prefix="bench-serial-") as tmp:
+        root = Path(tmp)
+        make_fake_sysfs(root, port_count)
+        inventory = SerialPortInventory(
+            lambda: sysfs_scanner(root),
+            watch_paths=(root / "dev", root / "dev" / "serial" / "by-id"),
+        )
+        inventory.refresh(force=True)
+        print(f"{port_count} ports, {reads} reads")
+        cold = measure("sysfs walk", lambda: sysfs_scanner(root), reads)
+        cached = measure("cached snapshot", inventory.snapshot, reads)
+        print(f"  speed-up {cold / cached:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", type=int, default=64)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+    run(args.ports, args.reads)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """ChatKit action handlers for hardware management."""
 from __future__ import annotations
 
+import asyncio
 from typing import Any, Dict, Optional
 
 from backend.app.services.hardware import (
@@ -25,7 +26,7 @@ def _resolve_manager(manager: Optional[HardwareManager] = None) -> HardwareManag
 
 async def hw_list_serial(manager: Optional[HardwareManager] = None) -> Dict[str, Any]:
     mgr = _resolve_manager(manager)
-    ports = mgr.list_serial_ports()
+    ports = await asyncio.to_thread(mgr.list_serial_ports)
     return {"ports": [port.model_dump() for port in ports]}
 
 
@@ -34,7 +35,7 @@ async def hw_test_gps(
 ) -> Dict[str, Any]:
     mgr = _resolve_manager(manager)
     request = GpsTestRequest.model_validate(payload)
-    result = mgr.test_gps(request)
+    result = await mgr.test_gps_async(request)
     data = result.model_dump()
     if not result.success:
         raise HardwareActionError(result.error or "GPS test failed")
@@ -47,7 +48,7 @@ async def hw_register_base_station(
     mgr = _resolve_manager(manager)
     registration = BaseStationRegistration.model_validate(payload)
     try:
-        stored = mgr.register_base_station(registration)
+        stored = await asyncio.to_thread(mgr.register_base_station, registration)
     except HardwareOperationError as exc:
         raise HardwareActionError(str(exc)) from exc
     return stored.model_dump()
@@ -59,7 +60,7 @@ async def hw_enable_adsb(
     mgr = _resolve_manager(manager)
     request = AdsbToggleRequest.model_validate(payload)
     try:
-        config = mgr.enable_adsb(request)
+        config = await mgr.enable_adsb_async(request)
     except HardwareOperationError as exc:
         raise HardwareActionError(str(exc)) from exc
     return config.model_dump()
@@ -67,7 +68,7 @@ async def hw_enable_adsb(
 
 async def hw_status(manager: Optional[HardwareManager] = None) -> Dict[str, Any]:
     mgr = _resolve_manager(manager)
-    status: HardwareStatus = mgr.get_status()
+    status: HardwareStatus = await asyncio.to_thread(mgr.get_status)
     return status.model_dump()
 
 
@@ -77,7 +78,7 @@ async def h4m_import(
     mgr = _resolve_manager(manager)
     request = H4MImportRequest.model_validate(payload)
     try:
-        result = mgr.import_h4m(request)
+        result = await asyncio.to_thread(mgr.import_h4m, request)
     except HardwareOperationError as exc:
         raise HardwareActionError(str(exc)) from exc
     return result.model_dump()
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import hashlib
 import hmac
 import json
@@ -6,11 +8,17 @@ from datetime import datetime
 from typing import Any, Dict, List
 
 import pytest
+import httpx
 from fastapi.testclient import TestClient
 
 from backend.app import schemas
 from backend.app.config import reset_settings_cache
 from backend.app.main import app
+from backend.app.services.agent_webhooks import (
+    TERMINAL_STATUSES,
+    get_webhook_client_factory,
+    get_webhook_repository_factory,
+)
 from backend.app.services.agentkit import get_agentkit_client
 from backend.app.services.supabase import get_supabase_repository
 
@@ -27,18 +35,29 @@ class FakeSupabaseRepository:
         self._audits_by_id: Dict[int, schemas.AgentActionAuditRead] = {}
         self._ids_by_action: Dict[str, int] = {}
         self._id_seq = 1
+        self.lookups = 0
+        self.upserts = 0
 
-    def list_agent_action_audits(self, limit: int = 100) -> List[schemas.AgentActionAuditRead]:
+    def list_agent_action_audits(
+        self, limit: int = 100, **filters: Any
+    ) -> schemas.AgentActionAuditPage:
+        self.list_filters = filters
         audits = sorted(
             self._audits_by_id.values(),
-            key=lambda audit: audit.created_at,
+            key=lambda audit: (audit.created_at, audit.id),
             reverse=True,
         )
-        return audits[:limit]
+        if filters.get("tool_name"):
+            audits = [audit for audit in audits if audit.tool_name == filters["tool_name"]]
+        next_cursor = str(audits[limit - 1].id) if len(audits) > limit else None
+        return schemas.AgentActionAuditPage(
+            items=audits[:limit], limit=limit, next_cursor=next_cursor
+        )
 
     def get_agent_action_audit_by_action_id(
         self, action_id: str
     ) -> schemas.AgentActionAuditRead | None:
+        self.lookups += 1
         audit_id = self._ids_by_action.get(action_id)
         if audit_id is None:
             return None
@@ -83,6 +102,39 @@ class FakeSupabaseRepository:
         self._ids_by_action[audit.action_id] = audit_id
         return audit
 
+    def upsert_agent_action_audit(
+        self, payload: schemas.AgentActionAuditUpsert
+    ) -> schemas.AgentActionAuditRead:
+        self.upserts += 1
+        updates = payload.model_dump(exclude_none=True)
+        audit_id = self._ids_by_action.get(payload.action_id)
+        if audit_id is None:
+            updates.setdefault("tool_name", "unknown")
+            updates.setdefault("status", "queued")
+            return self.create_agent_action_audit(
+                schemas.AgentActionAuditCreate(**updates)
+            )
+        updates.pop("action_id")
+        stored = self._audits_by_id[audit_id]
+        if stored.status in TERMINAL_STATUSES:
+            # Mirrors the agent_action_audits_keep_terminal trigger.
+            updates.pop("status", None)
+            if stored.completed_at is not None:
+                updates.pop("completed_at", None)
+        return self.update_agent_action_audit(
+            audit_id, schemas.AgentActionAuditUpdate(**updates)
+        )
+
+
+def _signed_webhook(body: Dict[str, Any]) -> tuple[bytes, Dict[str, str]]:
+    raw = json.dumps(body).encode("utf-8")
+    signature = hmac.new(
+        os.environ["CHATKIT_WEBHOOK_SECRET"].encode("utf-8"),
+        raw,
+        hashlib.sha256,
+    ).hexdigest()
+    return raw, {"x-chatkit-signature": signature, "content-type": "application/json"}
+
 
 class DummyAgentKit:
     def __init__(self) -> None:
@@ -131,6 +183,25 @@ def dummy_agentkit() -> DummyAgentKit:
     return DummyAgentKit()
 
 
+def _override_dependencies(repo: FakeSupabaseRepository, client_factory) -> None:
+    app.dependency_overrides[get_agentkit_client] = client_factory
+    app.dependency_overrides[get_supabase_repository] = lambda: repo
+    app.dependency_overrides[get_webhook_client_factory] = lambda: client_factory
+    app.dependency_overrides[get_webhook_repository_factory] = (
+        lambda: lambda: contextlib.nullcontext(repo)
+    )
+
+
+def _clear_overrides() -> None:
+    for dependency in (
+        get_agentkit_client,
+        get_supabase_repository,
+        get_webhook_client_factory,
+        get_webhook_repository_factory,
+    ):
+        app.dependency_overrides.pop(dependency, None)
+
+
 @pytest.fixture()
 def client(
     fake_supabase_repo: FakeSupabaseRepository, dummy_agentkit: DummyAgentKit
@@ -140,14 +211,12 @@ def client(
     async def _override_client() -> DummyAgentKit:
         return dummy_agentkit
 
-    app.dependency_overrides[get_agentkit_client] = _override_client
-    app.dependency_overrides[get_supabase_repository] = lambda: fake_supabase_repo
+    _override_dependencies(fake_supabase_repo, _override_client)
 
     try:
         yield test_client
     finally:
-        app.dependency_overrides.pop(get_agentkit_client, None)
-        app.dependency_overrides.pop(get_supabase_repository, None)
+        _clear_overrides()
         test_client.close()
 
 
@@ -166,7 +235,7 @@ def test_execute_action_creates_audit_record(
     payload = response.json()
     assert payload["action_id"] == "agentkit-action-123"
 
-    audits = fake_supabase_repo.list_agent_action_audits()
+    audits = fake_supabase_repo.list_agent_action_audits().items
     assert len(audits) == 1
     audit = audits[0]
     assert audit.tool_name == "ping"
@@ -331,3 +400,166 @@ def test_execute_action_updates_existing_audit(
     assert audit.status == "succeeded"
     assert audit.response_payload == {"accepted": True}
     assert audit.completed_at is not None
+
+
+def test_webhook_before_execute_resolves_tool_name(
+    client: TestClient, fake_supabase_repo: FakeSupabaseRepository
+) -> None:
+    raw, headers = _signed_webhook(
+        {"action_id": "agentkit-action-999", "status": "running"}
+    )
+
+    response = client.post("/api/v1/agent-actions/webhook", content=raw, headers=headers)
+
+    assert response.status_code == 202
+    audit = fake_supabase_repo.get_agent_action_audit_by_action_id("agentkit-action-999")
+    assert audit is not None
+    assert audit.tool_name == "ping"
+    assert audit.status == "running"
+    assert audit.completed_at is None
+
+
+def test_execute_and_webhook_race_produce_single_audit(
+    fake_supabase_repo: FakeSupabaseRepository,
+    dummy_agentkit: DummyAgentKit,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    webhook_started = asyncio.Event()
+
+    async def _slow_execute(self, tool_name, action_input, metadata=None):
+        # Hold the execute request open until the callback is in flight.
+        await webhook_started.wait()
+        await asyncio.sleep(0)
+        return {"action_id": "agentkit-action-123", "status": "queued"}
+
+    monkeypatch.setattr(DummyAgentKit, "execute_action", _slow_execute, raising=True)
+
+    async def _override_client() -> DummyAgentKit:
+        return dummy_agentkit
+
+    _override_dependencies(fake_supabase_repo, _override_client)
+
+    raw, headers = _signed_webhook(
+        {
+            "action_id": "agentkit-action-123",
+            "status": "succeeded",
+            "result": {"accepted": True},
+            "channel_slug": "ops-alpha",
+        }
+    )
+
+    async def _run() -> tuple[httpx.Response, httpx.Response]:
+        async with httpx.AsyncClient(app=app, base_url="http://testserver") as http:
+
+            async def _webhook() -> httpx.Response:
+                webhook_started.set()
+                return await http.post(
+                    "/api/v1/agent-actions/webhook", content=raw, headers=headers
+                )
+
+            return await asyncio.gather(
+                http.post(
+                    "/api/v1/agent-actions/execute",
+                    json={"tool_name": "ping", "action_input": {"host": "1.1.1.1"}},
+                ),
+                _webhook(),
+            )
+
+    try:
+        execute_response, webhook_response = asyncio.run(_run())
+    finally:
+        _clear_overrides()
+
+    assert execute_response.status_code == 202
+    assert webhook_response.status_code == 202
+    assert fake_supabase_repo.lookups == 0
+
+    audits = fake_supabase_repo.list_agent_action_audits().items
+    assert len(audits) == 1
+    audit = audits[0]
+    assert audit.tool_name == "ping"
+    assert audit.request_payload == {"host": "1.1.1.1"}
+    assert audit.response_payload == {"accepted": True}
+    assert audit.channel_slug == "ops-alpha"
+    assert audit.status == "succeeded"
+    assert audit.completed_at is not None
+
+
+def test_execute_after_terminal_webhook_keeps_final_status(
+    client: TestClient,
+    fake_supabase_repo: FakeSupabaseRepository,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    raw, headers = _signed_webhook(
+        {"action_id": "agentkit-action-123", "status": "succeeded"}
+    )
+    response = client.post("/api/v1/agent-actions/webhook", content=raw, headers=headers)
+    assert response.status_code == 202
+
+    async def _queued(self, tool_name, action_input, metadata=None):
+        return {"action_id": "agentkit-action-123", "status": "queued"}
+
+    monkeypatch.setattr(DummyAgentKit, "execute_action", _queued, raising=True)
+    upserts = fake_supabase_repo.upserts
+    response = client.post(
+        "/api/v1/agent-actions/execute",
+        json={"tool_name": "ping", "action_input": {"host": "1.1.1.1"}},
+    )
+
+    assert response.status_code == 202
+    assert fake_supabase_repo.upserts == upserts + 1
+    audit = fake_supabase_repo.get_agent_action_audit_by_action_id("agentkit-action-123")
+    assert audit.status == "succeeded"
+    assert audit.tool_name == "ping"
+    assert audit.request_payload == {"host": "1.1.1.1"}
+
+
+def test_late_non_terminal_webhook_keeps_final_status(
+    client: TestClient, fake_supabase_repo: FakeSupabaseRepository
+) -> None:
+    for body in (
+        {"action_id": "agentkit-action-123", "status": "succeeded", "result": {"ok": True}},
+        {"action_id": "agentkit-action-123", "status": "running"},
+    ):
+        raw, headers = _signed_webhook(body)
+        response = client.post("/api/v1/agent-actions/webhook", content=raw, headers=headers)
+        assert response.status_code == 202
+
+    audit = fake_supabase_repo.get_agent_action_audit_by_action_id("agentkit-action-123")
+    assert audit.status == "succeeded"
+    assert audit.completed_at is not None
+    assert audit.response_payload == {"ok": True}
+
+
+def test_list_audits_forwards_filters_and_cursor_header(
+    client: TestClient, fake_supabase_repo: FakeSupabaseRepository
+) -> None:
+    for index in range(3):
+        fake_supabase_repo.create_agent_action_audit(
+            schemas.AgentActionAuditCreate(
+                action_id=f"action-{index}", tool_name="ping", status="queued"
+            )
+        )
+    fake_supabase_repo.create_agent_action_audit(
+        schemas.AgentActionAuditCreate(action_id="other", tool_name="scan", status="queued")
+    )
+
+    response = client.get(
+        "/api/v1/agent-actions/audits",
+        params={
+            "limit": 2,
+            "tool_name": "ping",
+            "status": "queued",
+            "created_after": "2024-01-01T00:00:00",
+            "summary": "true",
+        },
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 2
+    assert {item["tool_name"] for item in body} == {"ping"}
+    assert response.headers["x-next-cursor"]
+    assert fake_supabase_repo.list_filters["status_value"] == "queued"
+    assert fake_supabase_repo.list_filters["summary"] is True
+    assert fake_supabase_repo.list_filters["created_after"] == datetime(2024, 1, 1)
@@ -0,0 +1,252 @@
+import asyncio
+import contextlib
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import schemas
+from backend.app.config import Settings, get_settings
+from backend.app.main import app
+from backend.app.services import agent_webhooks
+from backend.app.services.agent_webhooks import (
+    QueuedWebhookEvent,
+    SQLiteWebhookQueue,
+    WebhookWorker,
+    coalesce_events,
+    get_webhook_worker,
+)
+
+SECRET = "queue-secret"
+
+
+class RecordingRepository:
+    def __init__(self, fail_times: int = 0) -> None:
+        self.upserts: List[schemas.AgentActionAuditUpsert] = []
+        self.fail_times = fail_times
+
+    def upsert_agent_action_audit(
+        self, payload: schemas.AgentActionAuditUpsert
+    ) -> schemas.AgentActionAuditRead:
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("supabase unavailable")
+        self.upserts.append(payload)
+        now = datetime.utcnow()
+        return schemas.AgentActionAuditRead(
+            id=len(self.upserts),
+            tool_name="ping",
+            created_at=now,
+            updated_at=now,
+            **payload.model_dump(exclude_none=True),
+        )
+
+
+class DummyAgentKit:
+    async def get_action(self, action_id: str) -> Dict[str, Any]:
+        raise AssertionError("tool name lookup not expected")
+
+
+def _settings(**overrides: Any) -> Settings:
+    values: Dict[str, Any] = {
+        "chatkit_webhook_secret": SECRET,
+        "agent_webhook_queue_backend": "sqlite",
+        "agent_webhook_queue_max_attempts": 2,
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def _worker(
+    queue: SQLiteWebhookQueue, repo: RecordingRepository, **overrides: Any
+) -> WebhookWorker:
+    async def _client() -> DummyAgentKit:
+        return DummyAgentKit()
+
+    return WebhookWorker(
+        queue=queue,
+        settings=_settings(**overrides),
+        repository_factory=lambda: contextlib.nullcontext(repo),
+        client_factory=_client,
+    )
+
+
+def _event(status: str, **extra: Any) -> schemas.AgentActionWebhookEvent:
+    return schemas.AgentActionWebhookEvent(action_id="action-1", status=status, **extra)
+
+
+@pytest.fixture()
+def queue(tmp_path: Path) -> SQLiteWebhookQueue:
+    store = SQLiteWebhookQueue(tmp_path / "webhooks.sqlite3")
+    yield store
+    store.close()
+
+
+def test_webhook_handler_only_enqueues(queue: SQLiteWebhookQueue) -> None:
+    repo = RecordingRepository()
+    worker = _worker(queue, repo)
+    app.dependency_overrides[get_webhook_worker] = lambda: worker
+    # No repository or AgentKit overrides: queued mode must not build either,
+    # so it keeps working while Supabase is unreachable or unconfigured.
+    app.dependency_overrides[get_settings] = lambda: worker.settings.model_copy(
+        update={"supabase_url": None, "agentkit_api_key": ""}
+    )
+
+    raw = json.dumps({"action_id": "action-1", "status": "running"}).encode("utf-8")
+    signature = hmac.new(SECRET.encode("utf-8"), raw, hashlib.sha256).hexdigest()
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/api/v1/agent-actions/webhook",
+            content=raw,
+            headers={
+                "x-chatkit-signature": signature,
+                "x-chatkit-channel": "ops-alpha",
+                "content-type": "application/json",
+            },
+        )
+        stats = client.get("/api/v1/agent-actions/webhook/queue").json()
+    finally:
+        app.dependency_overrides.pop(get_webhook_worker, None)
+        app.dependency_overrides.pop(get_settings, None)
+
+    assert response.status_code == 202
+    assert response.json() == {"received": True, "queued": True}
+    assert repo.upserts == []
+    assert stats["backend"] == "sqlite"
+    assert stats["pending"] == 1
+    assert stats["oldest_pending_age_seconds"] is not None
+
+    claimed = queue.claim(10)
+    assert [item.event.channel_slug for item in claimed] == ["ops-alpha"]
+
+
+def test_coalescing_never_replaces_a_terminal_status() -> None:
+    events = [
+        QueuedWebhookEvent(1, _event("succeeded", result={"accepted": True}), 100.0),
+        QueuedWebhookEvent(2, _event("running", channel_slug="ops-alpha"), 101.0),
+    ]
+
+    merged = coalesce_events(events)["action-1"]
+
+    assert merged.event.status == "succeeded"
+    assert merged.event.result == {"accepted": True}
+    assert merged.event.channel_slug == "ops-alpha"
+    assert merged.completed_at == datetime.utcfromtimestamp(100.0)
+    assert merged.event_ids == [1, 2]
+
+
+def test_worker_coalesces_updates_per_action(queue: SQLiteWebhookQueue) -> None:
+    repo = RecordingRepository()
+    worker = _worker(queue, repo)
+    queue.enqueue(_event("queued", channel_slug="ops-alpha"))
+    queue.enqueue(_event("running"))
+    queue.enqueue(_event("succeeded", result={"accepted": True}))
+    queue.enqueue(
+        schemas.AgentActionWebhookEvent(action_id="action-2", status="failed", error="boom")
+    )
+
+    processed = asyncio.run(worker.run_once())
+
+    assert processed == 4
+    assert len(repo.upserts) == 2
+    merged = {item.action_id: item for item in repo.upserts}
+    assert merged["action-1"].status == "succeeded"
+    assert merged["action-1"].channel_slug == "ops-alpha"
+    assert merged["action-1"].response_payload == {"accepted": True}
+    assert merged["action-1"].completed_at is not None
+    assert merged["action-2"].error_message == "boom"
+    assert worker.metrics.coalesced_events == 2
+    assert worker.metrics.last_batch_lag_seconds is not None
+    assert queue.counts()["done"] == 4
+
+
+def test_failed_events_are_parked_and_replayable(queue: SQLiteWebhookQueue) -> None:
+    repo = RecordingRepository(fail_times=2)
+    worker = _worker(queue, repo, agent_webhook_queue_retry_base_seconds=0)
+    queue.enqueue(_event("succeeded"))
+
+    asyncio.run(worker.run_once())
+    assert queue.counts()["pending"] == 1
+    asyncio.run(worker.run_once())
+    assert queue.counts()["failed"] == 1
+    assert worker.metrics.failed_writes == 2
+
+    assert queue.replay(action_id="action-1") == 1
+    asyncio.run(worker.run_once())
+
+    assert [item.status for item in repo.upserts] == ["succeeded"]
+    assert queue.counts()["failed"] == 0
+
+
+def test_failed_events_back_off_before_retrying(
+    queue: SQLiteWebhookQueue, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    repo = RecordingRepository(fail_times=2)
+    worker = _worker(
+        queue,
+        repo,
+        agent_webhook_queue_max_attempts=5,
+        agent_webhook_queue_retry_base_seconds=10,
+    )
+    queue.enqueue(_event("succeeded"))
+    now = time.time()
+    monkeypatch.setattr(agent_webhooks.time, "time", lambda: now)
+
+    assert asyncio.run(worker.run_once()) == 1
+    # The retry is not due yet: nothing is claimed and the event stays pending.
+    assert asyncio.run(worker.run_once()) == 0
+    assert queue.counts()["pending"] == 1
+
+    now += 10
+    assert asyncio.run(worker.run_once()) == 1
+    assert worker.metrics.failed_writes == 2
+    now += 10  # the second failure doubled the delay
+    assert asyncio.run(worker.run_once()) == 0
+    now += 10
+    assert asyncio.run(worker.run_once()) == 1
+    assert [item.status for item in repo.upserts] == ["succeeded"]
+    assert queue.counts()["done"] == 1
+
+
+def test_worker_does_not_spin_on_failing_batches(queue: SQLiteWebhookQueue) -> None:
+    repo = RecordingRepository(fail_times=1000)
+    worker = _worker(
+        queue,
+        repo,
+        agent_webhook_queue_max_attempts=1000,
+        agent_webhook_queue_retry_base_seconds=0,
+        agent_webhook_queue_poll_seconds=0.1,
+        agent_webhook_queue_coalesce_seconds=0,
+    )
+    queue.enqueue(_event("succeeded"))
+
+    async def _run_briefly() -> None:
+        worker.start()
+        await asyncio.sleep(0.35)
+        await worker.stop()
+
+    asyncio.run(_run_briefly())
+
+    assert 1 <= worker.metrics.failed_writes <= 5
+    assert queue.counts()["failed"] == 0
+
+
+def test_processing_events_survive_restart(tmp_path: Path) -> None:
+    path = tmp_path / "webhooks.sqlite3"
+    first = SQLiteWebhookQueue(path)
+    first.enqueue(_event("running"))
+    assert len(first.claim(10)) == 1
+    first.close()
+
+    second = SQLiteWebhookQueue(path)
+    try:
+        assert second.counts()["pending"] == 1
+    finally:
+        second.close()
@@ -68,7 +68,7 @@ class FakeHardwareManager:
     def list_serial_ports(self) -> list[SerialPortInfo]:
         return self.serial_ports
 
-    def test_gps(self, request: GpsTestRequest) -> GpsTestResult:
+    async def test_gps_async(self, request: GpsTestRequest) -> GpsTestResult:
         self.gps_requests.append(request)
         return self.gps_result
 
@@ -86,7 +86,7 @@ class FakeHardwareManager:
             registered_at=datetime.utcnow(),
         )
 
-    def enable_adsb(self, request: AdsbToggleRequest) -> AdsbConfig:
+    async def enable_adsb_async(self, request: AdsbToggleRequest) -> AdsbConfig:
         self.adsb_payloads.append(request)
         return AdsbConfig(
             enabled=request.enabled,
@@ -145,7 +145,7 @@ async def test_hw_register_base_station_action() -> None:
 @pytest.mark.anyio("asyncio")
 async def test_hw_enable_adsb_action_handles_error() -> None:
     class ErrorManager(FakeHardwareManager):
-        def enable_adsb(self, request: AdsbToggleRequest) -> AdsbConfig:
+        async def enable_adsb_async(self, request: AdsbToggleRequest) -> AdsbConfig:
             raise HardwareOperationError("boom")
 
     manager = ErrorManager()
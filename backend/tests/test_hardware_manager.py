@@ -1,5 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from subprocess import CompletedProcess
@@ -10,6 +18,7 @@ import pytest
 from backend.app.services.hardware import (
     AdsbConfig,
     AdsbToggleRequest,
+    BaseStationRegistration,
     GpsTestRequest,
     HardwareConfigStore,
     HardwareConfiguration,
@@ -18,7 +27,11 @@ from backend.app.services.hardware import (
     HardwareStatus,
     H4MImportRequest,
     SerialPortInfo,
+    get_hardware_manager,
+    reset_hardware_manager,
 )
+from backend.app.services.hardware.h4m_import import stream_h4m_archive
+from backend.app.services.hardware.jobs import run_command_streaming
 
 
 class MemoryConfigStore(HardwareConfigStore):
@@ -190,3 +203,234 @@ def test_get_status_aggregates_config() -> None:
     assert isinstance(status, HardwareStatus)
     assert status.health.gps == "unconfigured"
     assert status.health.details["serial_ports"] == 1
+
+
+def test_get_hardware_manager_is_shared(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("VTOC_HARDWARE_CONFIG", str(tmp_path / "hardware.json"))
+    reset_hardware_manager()
+    try:
+        assert get_hardware_manager() is get_hardware_manager()
+    finally:
+        reset_hardware_manager()
+
+
+def test_config_store_caches_until_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "hardware.json"
+    store = HardwareConfigStore(path)
+    store.save(HardwareConfiguration(last_h4m_import_at=datetime(2024, 1, 1)))
+
+    first = store.load()
+    first.last_h4m_import_at = None
+    assert store.load().last_h4m_import_at == datetime(2024, 1, 1)
+
+    path.write_text(json.dumps({"last_h4m_import_at": "2025-06-01T00:00:00"}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert store.load().last_h4m_import_at == datetime(2025, 6, 1)
+
+
+def test_concurrent_mutations_keep_config_consistent(tmp_path: Path) -> None:
+    path = tmp_path / "hardware.json"
+    manager = HardwareManager(
+        config_store=HardwareConfigStore(path),
+        serial_provider=lambda: [],
+        process_runner=lambda command, timeout: CompletedProcess(command, 0, "", ""),
+    )
+
+    def _register(index: int) -> None:
+        manager.register_base_station(BaseStationRegistration(callsign=f"BASE-{index}"))
+
+    def _toggle(index: int) -> None:
+        manager.enable_adsb(
+            AdsbToggleRequest(enabled=index % 2 == 0, device=f"rtl{index}")
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(_register, index) for index in range(40)]
+        futures += [pool.submit(_toggle, index) for index in range(40)]
+        for future in futures:
+            future.result()
+
+    stored = HardwareConfiguration.model_validate_json(path.read_text())
+    assert stored.base_station is not None
+    assert stored.adsb is not None
+    assert stored.base_station.callsign.startswith("BASE-")
+    assert [entry.name for entry in tmp_path.iterdir()] == ["hardware.json"]
+
+
+def test_run_command_streaming_reports_lines() -> None:
+    lines: List[str] = []
+    command = [sys.executable, "-c", "print('fix 1'); print('fix 2')"]
+
+    output = asyncio.run(run_command_streaming(command, 5.0, lines.append))
+
+    assert lines == ["fix 1", "fix 2"]
+    assert output == "fix 1\nfix 2"
+
+
+def test_run_command_streaming_kills_on_timeout() -> None:
+    command = [sys.executable, "-c", "import time; time.sleep(5)"]
+
+    with pytest.raises(HardwareOperationError, match="timed out"):
+        asyncio.run(run_command_streaming(command, 0.2))
+
+
+def test_gps_jobs_are_capped_per_device() -> None:
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def runner(command, timeout, on_output=None) -> str:
+        device = command[2]
+        active[device] = active.get(device, 0) + 1
+        peak[device] = max(peak.get(device, 0), active[device])
+        if on_output is not None:
+            on_output(f"probing {device}")
+        await asyncio.sleep(0.01)
+        active[device] -= 1
+        return "lock"
+
+    manager = HardwareManager(
+        config_store=MemoryConfigStore(),
+        serial_provider=lambda: [],
+        async_process_runner=runner,
+    )
+
+    async def _run() -> list:
+        jobs = [
+            manager.start_gps_test_job(GpsTestRequest(port=port))
+            for port in ["/dev/ttyUSB0", "/dev/ttyUSB0", "/dev/ttyUSB0", "/dev/ttyUSB1"]
+        ]
+        return [await manager.jobs.wait(job.id) for job in jobs]
+
+    finished = asyncio.run(_run())
+
+    assert [job.status for job in finished] == ["succeeded"] * 4
+    assert finished[0].output == ["probing /dev/ttyUSB0"]
+    assert finished[0].result["output"] == "lock"
+    assert peak == {"/dev/ttyUSB0": 1, "/dev/ttyUSB1": 1}
+
+
+def test_jobs_waiting_for_a_device_stay_queued() -> None:
+    release = asyncio.Event()
+
+    async def runner(command, timeout, on_output=None) -> str:
+        await release.wait()
+        return "lock"
+
+    manager = HardwareManager(
+        config_store=MemoryConfigStore(),
+        serial_provider=lambda: [],
+        async_process_runner=runner,
+    )
+
+    async def _run() -> tuple:
+        first = manager.start_gps_test_job(GpsTestRequest(port="/dev/ttyUSB0"))
+        second = manager.start_gps_test_job(GpsTestRequest(port="/dev/ttyUSB0"))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        running, waiting = manager.jobs.get(first.id), manager.jobs.get(second.id)
+        release.set()
+        return running, waiting, await manager.jobs.wait(second.id)
+
+    running, waiting, finished = asyncio.run(_run())
+
+    assert running.status == "running" and running.started_at is not None
+    assert waiting.status == "queued" and waiting.started_at is None
+    assert finished.status == "succeeded"
+    assert finished.started_at >= running.started_at
+
+
+def _write_zip(path: Path, members: dict[str, bytes]) -> None:
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+def test_h4m_import_job_streams_and_resumes(tmp_path: Path) -> None:
+    members = {f"airspace/tile-{index}.bin": os.urandom(4096) for index in range(6)}
+    archive = tmp_path / "dataset.zip"
+    _write_zip(archive, members)
+    manager = HardwareManager(config_store=MemoryConfigStore(), serial_provider=lambda: [])
+    request = H4MImportRequest(source_path=str(archive), destination_dir=str(tmp_path / "h4m"))
+
+    async def _run() -> Any:
+        job = manager.start_h4m_import_job(request)
+        return await manager.jobs.wait(job.id)
+
+    first = asyncio.run(_run())
+    root = tmp_path / "h4m" / "dataset"
+    manifest = json.loads((root / ".h4m-import.json").read_text())
+
+    assert first.status == "succeeded"
+    assert first.device == str(tmp_path / "h4m")
+    assert first.progress["members_done"] == 6
+    assert first.progress["bytes_done"] == first.progress["bytes_total"] == 6 * 4096
+    assert first.progress["bytes_per_second"] >= 0
+    assert len(first.result["files"]) == 6
+    assert manifest["airspace/tile-0.bin"]["sha256"] == hashlib.sha256(
+        members["airspace/tile-0.bin"]
+    ).hexdigest()
+
+    # Simulate an interrupted import: one member missing, one half-written.
+    (root / "airspace" / "tile-4.bin").unlink()
+    (root / "airspace" / "tile-5.bin").rename(root / "airspace" / "tile-5.bin.part")
+
+    second = asyncio.run(_run())
+
+    assert second.status == "succeeded"
+    assert second.progress["members_skipped"] == 4
+    assert (root / "airspace" / "tile-5.bin").read_bytes() == members["airspace/tile-5.bin"]
+    assert not (root / "airspace" / "tile-5.bin.part").exists()
+
+
+def test_h4m_reimport_replaces_members_changed_in_the_archive(tmp_path: Path) -> None:
+    members = {f"airspace/tile-{index}.bin": os.urandom(1024) for index in range(3)}
+    archive = tmp_path / "dataset.zip"
+    _write_zip(archive, members)
+    manager = HardwareManager(config_store=MemoryConfigStore(), serial_provider=lambda: [])
+    request = H4MImportRequest(source_path=str(archive), destination_dir=str(tmp_path / "h4m"))
+    manager.import_h4m(request)
+
+    # Same size, new content: the existing file must not be taken as done.
+    members["airspace/tile-1.bin"] = os.urandom(1024)
+    _write_zip(archive, members)
+    progress: List[dict] = []
+    stream_h4m_archive(archive, tmp_path / "h4m", on_progress=progress.append)
+
+    root = tmp_path / "h4m" / "dataset"
+    manifest = json.loads((root / ".h4m-import.json").read_text())
+    assert progress[-1]["members_skipped"] == 2
+    assert (root / "airspace" / "tile-1.bin").read_bytes() == members["airspace/tile-1.bin"]
+    assert manifest["airspace/tile-1.bin"]["sha256"] == hashlib.sha256(
+        members["airspace/tile-1.bin"]
+    ).hexdigest()
+
+
+def test_h4m_import_streams_tarballs(tmp_path: Path) -> None:
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "iq.cfile").write_bytes(b"\x00\x01" * 1024)
+    archive = tmp_path / "capture.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        tar.add(source_dir / "iq.cfile", arcname="iq/iq.cfile")
+    manager = HardwareManager(config_store=MemoryConfigStore(), serial_provider=lambda: [])
+
+    result = manager.import_h4m(
+        H4MImportRequest(source_path=str(archive), destination_dir=str(tmp_path / "h4m"))
+    )
+
+    assert result.destination == str(tmp_path / "h4m" / "capture")
+    assert result.files == [str(tmp_path / "h4m" / "capture" / "iq" / "iq.cfile")]
+
+
+def test_h4m_import_rejects_path_traversal(tmp_path: Path) -> None:
+    archive = tmp_path / "evil.zip"
+    _write_zip(archive, {"../escape.txt": b"nope"})
+    manager = HardwareManager(config_store=MemoryConfigStore(), serial_provider=lambda: [])
+
+    with pytest.raises(HardwareOperationError, match="unsafe"):
+        manager.import_h4m(
+            H4MImportRequest(source_path=str(archive), destination_dir=str(tmp_path / "h4m"))
+        )
+    assert not (tmp_path / "escape.txt").exists()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime
 from typing import List
 
@@ -201,3 +202,36 @@ def test_hw_register_base_station_error(client: TestClient, dummy_manager: Dummy
     )
     assert response.status_code == 500
     assert response.json()["detail"] == "failed"
+
+
+def test_gps_job_can_be_polled() -> None:
+    async def runner(command, timeout, on_output=None) -> str:
+        if on_output is not None:
+            on_output("$GPGGA,lock")
+        return "$GPGGA,lock"
+
+    manager = HardwareManager(serial_provider=lambda: [], async_process_runner=runner)
+    app.dependency_overrides[get_hardware_manager] = lambda: manager
+    try:
+        with TestClient(app) as test_client:
+            response = test_client.post(
+                "/api/v1/hardware/jobs/test-gps", json={"port": "/dev/ttyUSB0"}
+            )
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+
+            for _ in range(50):
+                job = test_client.get(f"/api/v1/hardware/jobs/{job_id}").json()
+                if job["status"] in {"succeeded", "failed"}:
+                    break
+                time.sleep(0.01)
+
+            missing = test_client.get("/api/v1/hardware/jobs/unknown")
+    finally:
+        app.dependency_overrides.pop(get_hardware_manager, None)
+
+    assert job["status"] == "succeeded"
+    assert job["device"] == "/dev/ttyUSB0"
+    assert job["output"] == ["$GPGGA,lock"]
+    assert job["result"]["success"] is True
+    assert missing.status_code == 404
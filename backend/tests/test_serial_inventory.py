@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import List
+
+from backend.app.services.hardware import (
+    HardwareManager,
+    SerialPortEvent,
+    SerialPortInfo,
+    SerialPortInventory,
+)
+
+
+def _make_fake_sysfs(root: Path, count: int) -> None:
+    """Lay out a /sys/class/tty + /dev/serial/by-id tree like a busy USB hub."""
+
+    (root / "dev" / "serial" / "by-id").mkdir(parents=True)
+    for index in range(count):
+        _attach(root, f"ttyUSB{index}")
+
+
+def _attach(root: Path, name: str) -> None:
+    device_dir = root / "sys" / "class" / "tty" / name / "device"
+    device_dir.mkdir(parents=True)
+    (device_dir / "product").write_text(f"u-blox GNSS receiver {name}\n")
+    (device_dir / "serial").write_text(f"SN-{name}\n")
+    (root / "dev" / name).touch()
+    os.symlink(f"../../{name}", root / "dev" / "serial" / "by-id" / f"usb-{name}-if00")
+
+
+def _detach(root: Path, name: str) -> None:
+    (root / "dev" / "serial" / "by-id" / f"usb-{name}-if00").unlink()
+    (root / "dev" / name).unlink()
+
+
+def _sysfs_scanner(root: Path) -> List[SerialPortInfo]:
+    """Walk the fake tree the way pyserial's Linux backend walks sysfs."""
+
+    ports: List[SerialPortInfo] = []
+    tty_root = root / "sys" / "class" / "tty"
+    for entry in sorted(tty_root.iterdir()):
+        device = root / "dev" / entry.name
+        if not device.exists() or not (entry / "device").is_dir():
+            continue
+        product = (entry / "device" / "product").read_text().strip()
+        serial = (entry / "device" / "serial").read_text().strip()
+        ports.append(
+            SerialPortInfo(device=f"/dev/{entry.name}", description=product, hwid=f"USB SER={serial}")
+        )
+    return ports
+
+
+def _inventory(root: Path, **kwargs: float) -> SerialPortInventory:
+    return SerialPortInventory(
+        lambda: _sysfs_scanner(root),
+        watch_paths=(root / "dev", root / "dev" / "serial" / "by-id"),
+        **kwargs,
+    )
+
+
+def test_snapshot_rescans_only_when_watched_paths_change(tmp_path: Path) -> None:
+    _make_fake_sysfs(tmp_path, 2)
+    scans: List[int] = []
+
+    def scanner() -> List[SerialPortInfo]:
+        scans.append(1)
+        return _sysfs_scanner(tmp_path)
+
+    inventory = SerialPortInventory(
+        scanner, watch_paths=(tmp_path / "dev", tmp_path / "dev" / "serial" / "by-id")
+    )
+
+    assert [port.device for port in inventory.snapshot()] == ["/dev/ttyUSB0", "/dev/ttyUSB1"]
+    inventory.snapshot()
+    assert len(scans) == 1
+
+    _attach(tmp_path, "ttyUSB7")
+    by_id = tmp_path / "dev" / "serial" / "by-id"
+    os.utime(by_id, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+    assert "/dev/ttyUSB7" in [port.device for port in inventory.snapshot()]
+    assert len(scans) == 2
+
+
+def test_attach_and_detach_events_are_published(tmp_path: Path) -> None:
+    _make_fake_sysfs(tmp_path, 1)
+    inventory = _inventory(tmp_path)
+    received: List[SerialPortEvent] = []
+    unsubscribe = inventory.subscribe(received.append)
+    inventory.refresh(force=True)
+
+    _attach(tmp_path, "ttyACM0")
+    _detach(tmp_path, "ttyUSB0")
+    events = inventory.refresh(force=True)
+
+    assert [(event.event, event.port.device) for event in events] == [
+        ("detached", "/dev/ttyUSB0"),
+        ("attached", "/dev/ttyACM0"),
+    ]
+    assert received == events
+    assert [event.sequence for event in inventory.events_since(events[0].sequence)] == [
+        events[1].sequence
+    ]
+
+    unsubscribe()
+    _detach(tmp_path, "ttyACM0")
+    inventory.refresh(force=True)
+    assert len(received) == 2
+
+
+def test_watcher_serves_snapshot_and_detects_attach(tmp_path: Path) -> None:
+    _make_fake_sysfs(tmp_path, 1)
+    inventory = _inventory(tmp_path, poll_interval_seconds=0.01)
+    manager = HardwareManager(serial_inventory=inventory)
+    inventory.start()
+    try:
+        assert inventory.is_watching
+        _attach(tmp_path, "ttyUSB1")
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and not manager.serial_port_events():
+            time.sleep(0.01)
+    finally:
+        inventory.stop()
+
+    assert not inventory.is_watching
+    assert [event.port.device for event in manager.serial_port_events()] == ["/dev/ttyUSB1"]
+    assert len(manager.list_serial_ports()) == 2
+
+
+def test_repeated_snapshots_do_not_walk_sysfs(tmp_path: Path) -> None:
+    """Hot-path reads of a 64-port tree are served from the cached snapshot."""
+
+    _make_fake_sysfs(tmp_path, 64)
+    walks: List[int] = []
+
+    def scanner() -> List[SerialPortInfo]:
+        walks.append(1)
+        return _sysfs_scanner(tmp_path)
+
+    inventory = SerialPortInventory(
+        scanner, watch_paths=(tmp_path / "dev", tmp_path / "dev" / "serial" / "by-id")
+    )
+    inventory.refresh(force=True)
+
+    for _ in range(50):
+        ports = inventory.snapshot()
+
+    assert len(ports) == 64
+    assert len(walks) == 1
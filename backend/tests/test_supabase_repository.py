@@ -1,6 +1,10 @@
+from datetime import datetime
+
+import httpx
 import pytest
 from fastapi import status
 
+from backend.app import schemas
 from backend.app.config import Settings
 from backend.app.services.supabase import SupabaseApiError, SupabaseRepository
 
@@ -16,6 +20,17 @@ class DummyClient:
         self.closed = True
 
 
+class RecordingClient(DummyClient):
+    def __init__(self, response: httpx.Response) -> None:
+        super().__init__()
+        self.response = response
+        self.calls = []
+
+    def request(self, method, path, **kwargs):
+        self.calls.append({"method": method, "path": path, **kwargs})
+        return self.response
+
+
 def _settings(**kwargs) -> Settings:
     defaults = {
         "supabase_url": "https://example.supabase.co",
@@ -45,3 +60,76 @@ def test_supabase_repository_raises_when_supabase_disabled() -> None:
 
     assert excinfo.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
     assert "not configured" in excinfo.value.detail
+
+
+def test_upsert_agent_action_audit_merges_on_action_id() -> None:
+    record = {
+        "id": 7,
+        "action_id": "action-1",
+        "tool_name": "ping",
+        "status": "succeeded",
+        "created_at": "2024-04-18T12:00:00",
+        "updated_at": "2024-04-18T12:00:05",
+    }
+    client = RecordingClient(httpx.Response(201, json=[record]))
+    repo = SupabaseRepository(settings=_settings(), client=client)
+
+    audit = repo.upsert_agent_action_audit(
+        schemas.AgentActionAuditUpsert(action_id="action-1", status="succeeded")
+    )
+
+    assert audit.id == 7
+    assert len(client.calls) == 1
+    call = client.calls[0]
+    assert call["method"] == "POST"
+    assert call["path"] == "agent_action_audits"
+    assert call["params"] == {"on_conflict": "action_id"}
+    assert call["json"] == {"action_id": "action-1", "status": "succeeded"}
+    assert "resolution=merge-duplicates" in call["headers"]["Prefer"]
+
+
+def test_list_agent_action_audits_uses_keyset_filters() -> None:
+    rows = [
+        {
+            "id": audit_id,
+            "action_id": f"action-{audit_id}",
+            "tool_name": "ping",
+            "status": "succeeded",
+            "created_at": "2024-04-18T12:00:00",
+            "updated_at": "2024-04-18T12:00:00",
+        }
+        for audit_id in (9, 8, 7)
+    ]
+    client = RecordingClient(httpx.Response(200, json=rows))
+    repo = SupabaseRepository(settings=_settings(), client=client)
+
+    page = repo.list_agent_action_audits(
+        2,
+        tool_name="ping",
+        created_after=datetime(2024, 4, 1),
+        summary=True,
+    )
+
+    params = client.calls[0]["params"]
+    assert params["limit"] == 3
+    assert params["tool_name"] == "eq.ping"
+    assert params["order"] == "created_at.desc,id.desc"
+    assert "request_payload" not in params["select"]
+    assert params["and"] == '(created_at.gte."2024-04-01T00:00:00")'
+    assert [item.id for item in page.items] == [9, 8]
+    assert page.next_cursor is not None
+
+    repo.list_agent_action_audits(2, cursor=page.next_cursor)
+    assert client.calls[1]["params"]["and"] == (
+        '(or(created_at.lt."2024-04-18T12:00:00",'
+        'and(created_at.eq."2024-04-18T12:00:00",id.lt.8)))'
+    )
+
+
+def test_list_agent_action_audits_rejects_bad_cursor() -> None:
+    repo = SupabaseRepository(settings=_settings(), client=DummyClient())
+
+    with pytest.raises(SupabaseApiError) as excinfo:
+        repo.list_agent_action_audits(cursor="not-a-cursor")
+
+    assert excinfo.value.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,135 @@
+"""Change detection for aircraft records between polls."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Degrees of latitude per meter; also used for longitude, which errs on the
+# side of reporting a change away from the equator.
+DEGREES_PER_METER = 1 / 111_320
+
+# Stale entries are swept once the cache is this much larger than the set of
+# aircraft in the latest snapshot.
+_EVICT_SLACK = 64
+
+
+# Fields compared between polls, in signature order.
+_FIELDS = (
+    "lat",
+    "lon",
+    "alt_baro",
+    "alt_geom",
+    "gs",
+    "ias",
+    "tas",
+    "track",
+    "baro_rate",
+    "geom_rate",
+    "flight",
+    "squawk",
+    "version",
+    "nic",
+    "rc",
+)
+
+
+def _moved(
+    reported: Tuple[Any, ...], current: Tuple[Any, ...], thresholds: Tuple[float, ...]
+) -> bool:
+    for old, new, threshold in zip(reported, current, thresholds):
+        if old == new:
+            continue
+        if (
+            threshold > 0
+            and isinstance(old, (int, float))
+            and isinstance(new, (int, float))
+            and abs(new - old) < threshold
+        ):
+            continue
+        return True  # also e.g. alt_baro switching to "ground"
+    return False
+
+
+class ChangeDetector:
+    """Report aircraft whose significant state changed since the last poll.
+
+    Each aircraft is reduced to a tuple of its significant fields and
+    compared with the tuple last *reported* for it, so an unchanged aircraft
+    costs a single tuple equality instead of serialising the record. ``seen``
+    and ``seen_pos`` tick on every poll and are ignored; position, altitude,
+    speed, track and vertical rate only count as changed once they are at
+    least their threshold away from the reported value (``0`` compares exact
+    values). Jitter below the threshold is therefore never reported, while a
+    slow drift is reported once it adds up to the threshold.
+
+    An aircraft missing from one snapshot counts as new when it reappears.
+    Entries for aircraft that left are evicted lazily, in one sweep once the
+    cache has grown well past the current snapshot, so the cost per record
+    stays constant.
+    """
+
+    def __init__(
+        self,
+        *,
+        position_m: float = 1.0,
+        altitude_ft: float = 0.0,
+        speed_kt: float = 0.0,
+        track_deg: float = 0.0,
+        rate_fpm: float = 0.0,
+    ) -> None:
+        position = position_m * DEGREES_PER_METER
+        self._thresholds = (
+            (position, position, altitude_ft, altitude_ft)
+            + (speed_kt,) * 3
+            + (track_deg, rate_fpm, rate_fpm)
+            + (0.0,) * 5
+        )
+        self._state: Dict[str, Tuple[Tuple[Any, ...], int]] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def signature(self, record: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Return the tuple compared between polls for ``record``."""
+
+        get = record.get
+        return tuple(get(field) for field in _FIELDS)
+
+    def collect(self, aircraft_list: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return the records of ``aircraft_list`` that changed significantly."""
+
+        self._generation += 1
+        generation = self._generation
+        previous = generation - 1
+        state = self._state
+        signature = self.signature
+        thresholds = self._thresholds
+        changed: List[Dict[str, Any]] = []
+        live = 0
+        for record in aircraft_list:
+            hex_id = record.get("hex")
+            if not hex_id:
+                continue
+            live += 1
+            current = signature(record)
+            entry: Optional[Tuple[Tuple[Any, ...], int]] = state.get(hex_id)
+            if (
+                entry is None
+                or entry[1] < previous
+                or (entry[0] != current and _moved(entry[0], current, thresholds))
+            ):
+                changed.append(record)
+                state[hex_id] = (current, generation)
+            else:
+                state[hex_id] = (entry[0], generation)
+        if len(state) > 2 * live + _EVICT_SLACK:
+            self._evict(generation)
+        return changed
+
+    def _evict(self, generation: int) -> None:
+        self._state = {
+            hex_id: entry for hex_id, entry in self._state.items() if entry[1] == generation
+        }
+
+
+__all__ = ["ChangeDetector"]
@@ -6,6 +6,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
+from .stream import parse_stream_url
+
 
 @dataclass(slots=True)
 class Settings:
@@ -13,26 +15,49 @@ class Settings:
 
     backend_base_url: str = "http://backend:8000"
     telemetry_endpoint: str = "/api/v1/telemetry/events"
+    telemetry_batch_endpoint: Optional[str] = None
     telemetry_source_slug: str = "adsb-ingest"
     station_id: Optional[int] = None
     poll_interval_seconds: float = 2.0
     request_timeout: float = 5.0
     push_timeout: float = 5.0
+    push_batch_size: int = 250
+    push_concurrency: int = 8
     health_ttl_seconds: float = 30.0
+    change_position_m: float = 1.0
+    change_altitude_ft: float = 0.0
+    change_speed_kt: float = 0.0
+    change_track_deg: float = 0.0
+    change_rate_fpm: float = 0.0
+    delta_history: int = 64
+    trail_points: int = 100
+    trail_expiry_seconds: float = 300.0
+    trail_max_aircraft: int = 5000
+    geofence_url: Optional[str] = None
+    geofence_file: Optional[Path] = None
+    geofence_overlay_type: str = "geofence"
+    geofence_refresh_seconds: float = 300.0
+    geofence_cell_degrees: float = 0.25
     readsb_url: Optional[str] = "http://readsb:8080/data/aircraft.json"
     readsb_file: Optional[Path] = None
+    readsb_stream: Optional[str] = None
+    stream_min_interval: float = 0.5
+    stream_expiry_seconds: float = 60.0
     log_level: str = "INFO"
 
     @classmethod
     def from_env(cls) -> "Settings":
         """Create a settings object from environment variables."""
 
-        backend_base_url = os.getenv("BACKEND_BASE_URL", cls.backend_base_url)
+        # Slotted dataclasses do not keep defaults as class attributes.
+        defaults = cls()
+        backend_base_url = os.getenv("BACKEND_BASE_URL", defaults.backend_base_url)
         telemetry_endpoint = os.getenv(
-            "TELEMETRY_ENDPOINT", cls.telemetry_endpoint
+            "TELEMETRY_ENDPOINT", defaults.telemetry_endpoint
         )
+        telemetry_batch_endpoint = os.getenv("TELEMETRY_BATCH_ENDPOINT") or None
         telemetry_source_slug = os.getenv(
-            "TELEMETRY_SOURCE_SLUG", cls.telemetry_source_slug
+            "TELEMETRY_SOURCE_SLUG", defaults.telemetry_source_slug
         )
         station_id_raw = os.getenv("STATION_ID")
         station_id: Optional[int]
@@ -45,29 +70,101 @@ class Settings:
                 raise ValueError("STATION_ID must be an integer if provided") from None
 
         poll_interval_seconds = float(
-            os.getenv("POLL_INTERVAL_SECONDS", cls.poll_interval_seconds)
+            os.getenv("POLL_INTERVAL_SECONDS", defaults.poll_interval_seconds)
         )
-        request_timeout = float(os.getenv("REQUEST_TIMEOUT", cls.request_timeout))
-        push_timeout = float(os.getenv("PUSH_TIMEOUT", cls.push_timeout))
+        request_timeout = float(os.getenv("REQUEST_TIMEOUT", defaults.request_timeout))
+        push_timeout = float(os.getenv("PUSH_TIMEOUT", defaults.push_timeout))
+        try:
+            push_batch_size = int(os.getenv("PUSH_BATCH_SIZE", defaults.push_batch_size))
+            push_concurrency = int(os.getenv("PUSH_CONCURRENCY", defaults.push_concurrency))
+        except ValueError:
+            raise ValueError("PUSH_BATCH_SIZE and PUSH_CONCURRENCY must be integers") from None
+        if push_batch_size < 1 or push_concurrency < 1:
+            raise ValueError("PUSH_BATCH_SIZE and PUSH_CONCURRENCY must be positive")
         health_ttl_seconds = float(
-            os.getenv("HEALTH_TTL_SECONDS", cls.health_ttl_seconds)
+            os.getenv("HEALTH_TTL_SECONDS", defaults.health_ttl_seconds)
+        )
+        change_position_m = float(
+            os.getenv("CHANGE_POSITION_METERS", defaults.change_position_m)
+        )
+        change_altitude_ft = float(os.getenv("CHANGE_ALTITUDE_FT", defaults.change_altitude_ft))
+        change_speed_kt = float(os.getenv("CHANGE_SPEED_KT", defaults.change_speed_kt))
+        change_track_deg = float(os.getenv("CHANGE_TRACK_DEG", defaults.change_track_deg))
+        change_rate_fpm = float(os.getenv("CHANGE_RATE_FPM", defaults.change_rate_fpm))
+        delta_history = int(os.getenv("DELTA_HISTORY", defaults.delta_history))
+        if delta_history < 1:
+            raise ValueError("DELTA_HISTORY must be positive")
+        try:
+            trail_points = int(os.getenv("TRAIL_POINTS", defaults.trail_points))
+            trail_max_aircraft = int(
+                os.getenv("TRAIL_MAX_AIRCRAFT", defaults.trail_max_aircraft)
+            )
+        except ValueError:
+            raise ValueError("TRAIL_POINTS and TRAIL_MAX_AIRCRAFT must be integers") from None
+        if trail_points < 1 or trail_max_aircraft < 1:
+            raise ValueError("TRAIL_POINTS and TRAIL_MAX_AIRCRAFT must be positive")
+        trail_expiry_seconds = float(
+            os.getenv("TRAIL_EXPIRY_SECONDS", defaults.trail_expiry_seconds)
+        )
+        geofence_url = os.getenv("GEOFENCE_URL") or None
+        geofence_file_raw = os.getenv("GEOFENCE_FILE")
+        geofence_file = Path(geofence_file_raw) if geofence_file_raw else None
+        geofence_overlay_type = os.getenv(
+            "GEOFENCE_OVERLAY_TYPE", defaults.geofence_overlay_type
         )
-        readsb_url = os.getenv("READSB_URL", cls.readsb_url)
+        geofence_refresh_seconds = float(
+            os.getenv("GEOFENCE_REFRESH_SECONDS", defaults.geofence_refresh_seconds)
+        )
+        geofence_cell_degrees = float(
+            os.getenv("GEOFENCE_CELL_DEGREES", defaults.geofence_cell_degrees)
+        )
+        if geofence_cell_degrees <= 0:
+            raise ValueError("GEOFENCE_CELL_DEGREES must be positive")
+        readsb_url = os.getenv("READSB_URL", defaults.readsb_url)
         readsb_file_raw = os.getenv("READSB_FILE")
         readsb_file = Path(readsb_file_raw) if readsb_file_raw else None
-        log_level = os.getenv("LOG_LEVEL", cls.log_level)
+        readsb_stream = os.getenv("READSB_STREAM") or None
+        if readsb_stream:
+            parse_stream_url(readsb_stream)
+        stream_min_interval = float(
+            os.getenv("STREAM_MIN_INTERVAL", defaults.stream_min_interval)
+        )
+        stream_expiry_seconds = float(
+            os.getenv("STREAM_EXPIRY_SECONDS", defaults.stream_expiry_seconds)
+        )
+        log_level = os.getenv("LOG_LEVEL", defaults.log_level)
 
         return cls(
             backend_base_url=backend_base_url,
             telemetry_endpoint=telemetry_endpoint,
+            telemetry_batch_endpoint=telemetry_batch_endpoint,
             telemetry_source_slug=telemetry_source_slug,
             station_id=station_id,
             poll_interval_seconds=poll_interval_seconds,
             request_timeout=request_timeout,
             push_timeout=push_timeout,
+            push_batch_size=push_batch_size,
+            push_concurrency=push_concurrency,
             health_ttl_seconds=health_ttl_seconds,
+            change_position_m=change_position_m,
+            change_altitude_ft=change_altitude_ft,
+            change_speed_kt=change_speed_kt,
+            change_track_deg=change_track_deg,
+            change_rate_fpm=change_rate_fpm,
+            delta_history=delta_history,
+            trail_points=trail_points,
+            trail_expiry_seconds=trail_expiry_seconds,
+            trail_max_aircraft=trail_max_aircraft,
+            geofence_url=geofence_url,
+            geofence_file=geofence_file,
+            geofence_overlay_type=geofence_overlay_type,
+            geofence_refresh_seconds=geofence_refresh_seconds,
+            geofence_cell_degrees=geofence_cell_degrees,
             readsb_url=readsb_url,
             readsb_file=readsb_file,
+            readsb_stream=readsb_stream,
+            stream_min_interval=stream_min_interval,
+            stream_expiry_seconds=stream_expiry_seconds,
             log_level=log_level,
         )
 
@@ -0,0 +1,149 @@
+"""Versioned per-poll diffs of the aircraft snapshot for incremental clients."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+_MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotDiff:
+    """What changed between snapshot ``version - 1`` and ``version``.
+
+    ``added`` holds full records, ``updated`` only the fields that differ
+    from what clients were last sent (removed fields are ``None``), and
+    ``removed`` the hex ids that left the snapshot.
+    """
+
+    version: int
+    added: Dict[str, Dict[str, Any]]
+    updated: Dict[str, Dict[str, Any]]
+    removed: Tuple[str, ...]
+
+
+def _changed_fields(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    fields = {key: value for key, value in new.items() if old.get(key, _MISSING) != value}
+    for key in old.keys() - new.keys():
+        fields[key] = None
+    return fields
+
+
+class DeltaFeed:
+    """Keep the last ``capacity`` snapshot diffs and merge them on request.
+
+    Only records reported as changed by the proxy's change detection are
+    diffed, against the copy clients last received, so ``seen`` ticks and
+    sub-threshold jitter never reach the feed.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.version = 0
+        self._diffs: Deque[SnapshotDiff] = deque(maxlen=capacity)
+        self._known: Dict[str, Dict[str, Any]] = {}
+
+    def record(
+        self,
+        version: int,
+        changed: Iterable[Dict[str, Any]],
+        present: Set[str],
+    ) -> SnapshotDiff:
+        """Record the diff producing ``version`` from the previous snapshot.
+
+        ``changed`` are the changed records and ``present`` the hex ids of
+        every aircraft in the new snapshot.
+        """
+
+        if version <= self.version:
+            raise ValueError("snapshot versions must increase")
+        if version != self.version + 1:
+            self._diffs.clear()  # a gap; older diffs cannot be chained any more
+        known = self._known
+        added: Dict[str, Dict[str, Any]] = {}
+        updated: Dict[str, Dict[str, Any]] = {}
+        for record in changed:
+            hex_id = record.get("hex")
+            if not hex_id:
+                continue
+            previous = known.get(hex_id)
+            if previous is None:
+                added[hex_id] = record
+            else:
+                fields = _changed_fields(previous, record)
+                if fields:
+                    updated[hex_id] = fields
+            known[hex_id] = record
+        removed: Tuple[str, ...] = ()
+        if len(known) != len(present):
+            removed = tuple(hex_id for hex_id in known if hex_id not in present)
+            for hex_id in removed:
+                del known[hex_id]
+        diff = SnapshotDiff(version=version, added=added, updated=updated, removed=removed)
+        self._diffs.append(diff)
+        self.version = version
+        return diff
+
+    def since(self, version: int) -> Optional[SnapshotDiff]:
+        """Merge every diff after ``version``.
+
+        Returns ``None`` when the diffs needed are no longer (or were never)
+        retained, in which case the client has to resync from a snapshot.
+        """
+
+        if version == self.version:
+            return SnapshotDiff(version=version, added={}, updated={}, removed=())
+        if version > self.version or not self._diffs or version < self._diffs[0].version - 1:
+            return None
+        added: Dict[str, Dict[str, Any]] = {}
+        updated: Dict[str, Dict[str, Any]] = {}
+        removed: Set[str] = set()
+        for diff in self._diffs:
+            if diff.version <= version:
+                continue
+            for hex_id in diff.removed:
+                added.pop(hex_id, None)
+                updated.pop(hex_id, None)
+                removed.add(hex_id)
+            for hex_id, record in diff.added.items():
+                removed.discard(hex_id)
+                updated.pop(hex_id, None)
+                added[hex_id] = record
+            for hex_id, fields in diff.updated.items():
+                if hex_id in added:
+                    added[hex_id] = {**added[hex_id], **fields}
+                else:
+                    updated[hex_id] = {**updated.get(hex_id, {}), **fields}
+        return SnapshotDiff(
+            version=self.version,
+            added=added,
+            updated=updated,
+            removed=tuple(sorted(removed)),
+        )
+
+
+def delta_payload(diff: SnapshotDiff, since: int) -> Dict[str, Any]:
+    """JSON body for a merged diff returned to clients."""
+
+    updated: List[Dict[str, Any]] = [
+        {"hex": hex_id, **fields} for hex_id, fields in diff.updated.items()
+    ]
+    return {
+        "version": diff.version,
+        "since": since,
+        "resync": False,
+        "added": list(diff.added.values()),
+        "updated": updated,
+        "removed": list(diff.removed),
+    }
+
+
+def resync_payload(snapshot: Dict[str, Any], version: int, since: Optional[int]) -> Dict[str, Any]:
+    """JSON body telling a client to replace its state with ``snapshot``."""
+
+    return {"version": version, "since": since, "resync": True, **snapshot}
+
+
+__all__ = ["DeltaFeed", "SnapshotDiff", "delta_payload", "resync_payload"]
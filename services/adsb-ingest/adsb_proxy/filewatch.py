@@ -0,0 +1,154 @@
+"""Read ``READSB_FILE`` only when readsb has actually rewritten it."""
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INOTIFY = "inotify"
+STAT = "stat"
+
+# <sys/inotify.h>
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+Signature = Tuple[int, int, int]
+
+
+class _Inotify:
+    """Minimal ctypes binding watching one directory for changes to one name."""
+
+    def __init__(self, directory: Path, name: str) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # The directory is watched because readsb replaces the file by rename.
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+        self.fd = fd
+        self._name = os.fsencode(name)
+
+    def drain(self) -> bool:
+        """Consume pending events; return whether any concerned the file."""
+
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                relevant = relevant or name == self._name
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Detect rewrites of a file by inotify, or by polling its stat.
+
+    :meth:`read` returns the content only when the file's inode, size or
+    mtime differ from the last content the caller :meth:`commit`-ted, and
+    only if the file did not change while it was being read. Unchanged
+    polls are counted in ``skipped_polls``.
+    """
+
+    def __init__(self, path: Path, *, use_inotify: bool = True) -> None:
+        self.path = Path(path)
+        self.reads = 0
+        self.skipped_polls = 0
+        self._consumed: Optional[Signature] = None
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(self.path.parent, self.path.name)
+            except (OSError, AttributeError) as exc:
+                logger.info("inotify unavailable for %s, polling stat instead: %s", self.path, exc)
+
+    @property
+    def mode(self) -> str:
+        return INOTIFY if self._inotify is not None else STAT
+
+    def _signature(self) -> Optional[Signature]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def read(self) -> Optional[Tuple[bytes, Signature]]:
+        """Return ``(content, signature)`` if the file changed, else ``None``.
+
+        Raises :class:`FileNotFoundError` when the file does not exist.
+        """
+
+        signature = self._signature()
+        if signature is None:
+            raise FileNotFoundError(self.path)
+        if signature == self._consumed:
+            self.skipped_polls += 1
+            return None
+        data = self.path.read_bytes()
+        if self._signature() != signature:
+            return None  # rewritten while reading; pick it up on the next poll
+        self.reads += 1
+        return data, signature
+
+    def commit(self, signature: Signature) -> None:
+        """Mark the content read with ``signature`` as successfully parsed."""
+
+        self._consumed = signature
+
+    async def wait(self, timeout: float) -> None:
+        """Sleep up to ``timeout`` seconds, waking early when inotify fires."""
+
+        if self._inotify is None:
+            await asyncio.sleep(timeout)
+            return
+        inotify = self._inotify
+        if inotify.drain():
+            return
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def on_readable() -> None:
+            if inotify.drain() and not ready.done():
+                ready.set_result(None)
+
+        loop.add_reader(inotify.fd, on_readable)
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(inotify.fd)
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+__all__ = ["FileWatcher", "INOTIFY", "STAT"]
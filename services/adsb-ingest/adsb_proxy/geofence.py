@@ -0,0 +1,313 @@
+"""Geofences built from backend overlays and entry/exit detection."""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6_371_008.8
+# Widens circle bounding boxes so rounding never excludes a boundary point.
+_BBOX_MARGIN_DEGREES = 1e-6
+
+ENTER = "enter"
+EXIT = "exit"
+
+# Fences covering more grid cells than this are tested for every aircraft
+# instead of being copied into each cell.
+_MAX_CELLS_PER_FENCE = 4096
+
+Ring = Tuple[Tuple[float, float], ...]  # (lon, lat) vertices, GeoJSON order
+Polygon = Tuple[Ring, ...]  # exterior ring followed by holes
+BBox = Tuple[float, float, float, float]  # west, south, east, north
+
+_NOWHERE: FrozenSet[str] = frozenset()
+
+
+def _ring_contains(ring: Ring, lat: float, lon: float) -> bool:
+    """Even-odd ray casting; points exactly on an edge may go either way."""
+
+    inside = False
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y2 > lat) != (y1 > lat) and lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+@dataclass(frozen=True, slots=True)
+class Fence:
+    """A named area: polygons (with holes) or a circle.
+
+    Polygons crossing the antimeridian are not supported.
+    """
+
+    slug: str
+    name: str
+    bbox: BBox
+    polygons: Tuple[Polygon, ...] = ()
+    center: Optional[Tuple[float, float]] = None  # (lat, lon)
+    radius_m: float = 0.0
+
+    @property
+    def kind(self) -> str:
+        return "circle" if self.center is not None else "polygon"
+
+    @classmethod
+    def circle(cls, slug: str, name: str, lat: float, lon: float, radius_m: float) -> "Fence":
+        if radius_m <= 0:
+            raise ValueError("radius_m must be positive")
+        # Exact extent of a spherical cap: the angular radius in latitude, and
+        # asin(sin r / cos lat) in longitude, reached poleward of the centre's
+        # parallel rather than on it.
+        angle = radius_m / EARTH_RADIUS_M
+        dlat = math.degrees(angle) + _BBOX_MARGIN_DEGREES
+        coslat = math.cos(math.radians(lat))
+        west, east = -180.0, 180.0
+        if angle < math.pi / 2 and math.sin(angle) < coslat:
+            dlon = math.degrees(math.asin(math.sin(angle) / coslat)) + _BBOX_MARGIN_DEGREES
+            # A circle reaching a pole or across the antimeridian keeps the
+            # full longitude range.
+            if -180.0 <= lon - dlon and lon + dlon <= 180.0:
+                west, east = lon - dlon, lon + dlon
+        bbox = (west, max(-90.0, lat - dlat), east, min(90.0, lat + dlat))
+        return cls(slug, name, bbox, center=(lat, lon), radius_m=radius_m)
+
+    @classmethod
+    def polygon(
+        cls, slug: str, name: str, polygons: Sequence[Sequence[Sequence[Sequence[float]]]]
+    ) -> "Fence":
+        """Build from GeoJSON ``MultiPolygon``-style coordinates."""
+
+        built: List[Polygon] = []
+        for polygon in polygons:
+            rings = []
+            for ring in polygon:
+                vertices = tuple((float(point[0]), float(point[1])) for point in ring)
+                if len(vertices) > 1 and vertices[0] == vertices[-1]:
+                    vertices = vertices[:-1]
+                if len(vertices) < 3:
+                    raise ValueError("polygon rings need at least three vertices")
+                rings.append(vertices)
+            if rings:
+                built.append(tuple(rings))
+        if not built:
+            raise ValueError("polygon has no rings")
+        lons = [lon for polygon in built for lon, _ in polygon[0]]
+        lats = [lat for polygon in built for _, lat in polygon[0]]
+        bbox = (min(lons), min(lats), max(lons), max(lats))
+        return cls(slug, name, bbox, polygons=tuple(built))
+
+    def contains(self, lat: float, lon: float) -> bool:
+        west, south, east, north = self.bbox
+        if not (south <= lat <= north and west <= lon <= east):
+            return False
+        if self.center is not None:
+            return _haversine_m(lat, lon, *self.center) <= self.radius_m
+        for exterior, *holes in self.polygons:
+            if _ring_contains(exterior, lat, lon) and not any(
+                _ring_contains(hole, lat, lon) for hole in holes
+            ):
+                return True
+        return False
+
+
+def fence_from_overlay(overlay: Dict[str, Any]) -> Fence:
+    """Build a fence from an overlay record.
+
+    The overlay's ``configuration`` holds a GeoJSON ``geometry`` (or is one):
+    a ``Polygon`` or ``MultiPolygon``, or a ``Point`` with ``radius_m`` for
+    a circle. Raises :class:`ValueError` for anything else.
+    """
+
+    slug = str(overlay.get("slug") or overlay.get("id") or "")
+    if not slug:
+        raise ValueError("overlay has no slug")
+    name = str(overlay.get("name") or slug)
+    configuration = overlay.get("configuration") or {}
+    if not isinstance(configuration, dict):
+        raise ValueError(f"overlay {slug}: configuration must be an object")
+    geometry = configuration.get("geometry", configuration)
+    if not isinstance(geometry, dict):
+        raise ValueError(f"overlay {slug}: geometry must be an object")
+    kind = geometry.get("type")
+    coordinates = geometry.get("coordinates")
+    try:
+        if kind == "Point":
+            radius = configuration.get("radius_m", geometry.get("radius_m"))
+            lon, lat = float(coordinates[0]), float(coordinates[1])
+            return Fence.circle(slug, name, lat, lon, float(radius))
+        if kind == "Polygon":
+            return Fence.polygon(slug, name, [coordinates])
+        if kind == "MultiPolygon":
+            return Fence.polygon(slug, name, coordinates)
+    except (TypeError, IndexError, ValueError) as exc:
+        raise ValueError(f"overlay {slug}: invalid {kind} geometry: {exc}") from None
+    raise ValueError(f"overlay {slug}: unsupported geometry type {kind!r}")
+
+
+def fences_from_overlays(overlays: Iterable[Dict[str, Any]], overlay_type: str) -> List[Fence]:
+    """Build fences from the active overlays of ``overlay_type``, skipping bad ones."""
+
+    fences = []
+    for overlay in overlays:
+        if not isinstance(overlay, dict) or overlay.get("overlay_type") != overlay_type:
+            continue
+        if overlay.get("is_active") is False:
+            continue
+        try:
+            fences.append(fence_from_overlay(overlay))
+        except ValueError as exc:
+            logger.warning("Skipping geofence: %s", exc)
+    return fences
+
+
+class FenceIndex:
+    """Uniform lat/lon grid mapping each cell to the fences overlapping it.
+
+    A lookup costs one dict access plus exact tests against the few fences
+    whose bounding box covers the aircraft's cell.
+    """
+
+    def __init__(self, fences: Iterable[Fence], cell_degrees: float = 0.25) -> None:
+        if cell_degrees <= 0:
+            raise ValueError("cell_degrees must be positive")
+        self.fences: Tuple[Fence, ...] = tuple(fences)
+        self.by_slug: Dict[str, Fence] = {fence.slug: fence for fence in self.fences}
+        self._cell = cell_degrees
+        self._grid: Dict[Tuple[int, int], Tuple[Fence, ...]] = {}
+        self._large: Tuple[Fence, ...] = ()
+        cells: Dict[Tuple[int, int], List[Fence]] = {}
+        large = []
+        for fence in self.fences:
+            west, south, east, north = fence.bbox
+            x0, y0 = int(west // cell_degrees), int(south // cell_degrees)
+            x1, y1 = int(east // cell_degrees), int(north // cell_degrees)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) > _MAX_CELLS_PER_FENCE:
+                large.append(fence)
+                continue
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    cells.setdefault((x, y), []).append(fence)
+        self._grid = {key: tuple(value) for key, value in cells.items()}
+        self._large = tuple(large)
+
+    def __len__(self) -> int:
+        return len(self.fences)
+
+    def containing(self, lat: float, lon: float) -> FrozenSet[str]:
+        """Slugs of the fences containing the point."""
+
+        cell = self._cell
+        # ``//`` yields floats such as -123.0, which hash and compare equal to
+        # the integer cell keys; skipping int() keeps the lookup cheap.
+        candidates = self._grid.get((lon // cell, lat // cell), ())
+        if self._large:
+            candidates = candidates + self._large
+        if not candidates:
+            return _NOWHERE
+        inside = [fence.slug for fence in candidates if fence.contains(lat, lon)]
+        return frozenset(inside) if inside else _NOWHERE
+
+
+@dataclass(frozen=True, slots=True)
+class Transition:
+    """An aircraft entering or leaving a fence."""
+
+    fence: Fence
+    kind: str  # ENTER or EXIT
+    record: Dict[str, Any]
+
+
+class GeofenceMonitor:
+    """Track which fences each aircraft is in and report transitions.
+
+    Aircraft without a position keep their last known membership. Aircraft
+    that drop out of the snapshot are forgotten without an exit, since a lost
+    signal is not a crossing; they enter again when seen inside a fence.
+    Positions unchanged since the previous snapshot are not re-tested.
+    """
+
+    def __init__(self, index: Optional[FenceIndex] = None) -> None:
+        self.index = index or FenceIndex(())
+        self._state: Dict[str, Tuple[float, float, FrozenSet[str]]] = {}
+
+    def set_index(self, index: FenceIndex) -> None:
+        """Swap in new fences; memberships of removed fences are dropped silently."""
+
+        slugs = {fence.slug for fence in index.fences}
+        self.index = index
+        # NaN positions force a re-test, so changed geometry is picked up on
+        # the next update.
+        self._state = {
+            hex_id: (math.nan, math.nan, inside & slugs)
+            for hex_id, (_, _, inside) in self._state.items()
+        }
+
+    def inside(self) -> Dict[str, List[str]]:
+        """Hex ids currently inside each fence."""
+
+        members: Dict[str, List[str]] = {fence.slug: [] for fence in self.index.fences}
+        for hex_id, (_, _, inside) in self._state.items():
+            for slug in inside:
+                members[slug].append(hex_id)
+        return members
+
+    def update(self, aircraft: Iterable[Dict[str, Any]]) -> List[Transition]:
+        if not self.index.fences:
+            self._state = {}
+            return []
+        fences = self.index.by_slug
+        containing = self.index.containing
+        previous = self._state
+        state: Dict[str, Tuple[float, float, FrozenSet[str]]] = {}
+        transitions: List[Transition] = []
+        for record in aircraft:
+            hex_id = record.get("hex")
+            if not hex_id:
+                continue
+            lat = record.get("lat")
+            lon = record.get("lon")
+            last = previous.get(hex_id)
+            if not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)):
+                if last is not None:
+                    state[hex_id] = last
+                continue
+            if last is not None and last[0] == lat and last[1] == lon:
+                state[hex_id] = last
+                continue
+            inside = containing(lat, lon)
+            state[hex_id] = (lat, lon, inside)
+            was_inside = last[2] if last is not None else _NOWHERE
+            if inside == was_inside:
+                continue
+            for slug in inside - was_inside:
+                transitions.append(Transition(fences[slug], ENTER, record))
+            for slug in was_inside - inside:
+                transitions.append(Transition(fences[slug], EXIT, record))
+        self._state = state
+        return transitions
+
+
+__all__ = [
+    "ENTER",
+    "EXIT",
+    "Fence",
+    "FenceIndex",
+    "GeofenceMonitor",
+    "Transition",
+    "fence_from_overlay",
+    "fences_from_overlays",
+]
@@ -1,13 +1,16 @@
 """FastAPI application exposing ADS-B proxy endpoints."""
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 
 from .config import Settings
 from .proxy import AircraftProxy
+from .trails import parse_bbox
 
 settings = Settings.from_env()
 logging.basicConfig(level=getattr(logging, settings.log_level.upper(), logging.INFO))
@@ -30,8 +33,75 @@ async def shutdown_event() -> None:
 
 
 @app.get("/aircraft.json", response_model=None)
-async def get_aircraft() -> Dict[str, Any]:
-    return await proxy.get_snapshot()
+async def get_aircraft(request: Request) -> Response:
+    snapshot = proxy.encoded_snapshot
+    headers = {
+        "ETag": snapshot.etag,
+        "X-Snapshot-Version": str(snapshot.version),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if snapshot.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    body, encoding = snapshot.select(request.headers.get("accept-encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/aircraft/delta")
+async def get_aircraft_delta(since: Optional[int] = None) -> Dict[str, Any]:
+    return proxy.delta_since(since)
+
+
+async def _push_deltas(websocket: WebSocket, since: Optional[int]) -> None:
+    while True:
+        payload = proxy.delta_since(since)
+        if payload["resync"] or payload["added"] or payload["updated"] or payload["removed"]:
+            await websocket.send_json(payload)
+        since = payload["version"]
+        await proxy.wait_for_version(since)
+
+
+@app.websocket("/aircraft/delta/ws")
+async def aircraft_delta_ws(websocket: WebSocket, since: Optional[int] = None) -> None:
+    """Push a diff (or a resync) whenever a new snapshot version is published."""
+    await websocket.accept()
+    sender = asyncio.create_task(_push_deltas(websocket, since))
+    try:
+        # Nothing is expected from the client; reading notices disconnects
+        # while the sender is waiting for the next version.
+        while not sender.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        sender.cancel()
+        with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+            await sender
+
+
+@app.get("/aircraft/{hex_id}/trail")
+async def get_aircraft_trail(hex_id: str, since: Optional[float] = None) -> Dict[str, Any]:
+    trail = proxy.trail(hex_id, since)
+    if trail is None:
+        raise HTTPException(status_code=404, detail=f"No trail for aircraft {hex_id}")
+    return trail
+
+
+@app.get("/trails")
+async def get_trails(bbox: str, since: Optional[float] = None) -> Dict[str, Any]:
+    """Trails of the aircraft whose latest position lies within ``bbox``."""
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    return {"bbox": list(box), "trails": proxy.trails(box, since)}
+
+
+@app.get("/geofences")
+async def get_geofences() -> Dict[str, Any]:
+    return {"geofences": proxy.geofences()}
 
 
 @app.get("/healthz")
@@ -44,6 +114,8 @@ async def get_health() -> Dict[str, Any]:
     }
     if status.error:
         payload["error"] = status.error
+    if status.file_watch is not None:
+        payload["file_watch"] = status.file_watch
     return payload
 
 
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import asyncio
-import copy
 import json
 import logging
 from dataclasses import dataclass
@@ -13,10 +12,26 @@ from urllib.parse import urljoin
 
 import httpx
 
+from .changes import ChangeDetector
 from .config import Settings
+from .delta import DeltaFeed, delta_payload, resync_payload
+from .filewatch import INOTIFY, FileWatcher
+from .geofence import (
+    Fence,
+    FenceIndex,
+    GeofenceMonitor,
+    Transition,
+    fences_from_overlays,
+)
+from .snapshot import EMPTY_SNAPSHOT, EncodedSnapshot
+from .stream import AircraftTracker, StreamSource
+from .trails import BBox, TrailStore
 
 logger = logging.getLogger(__name__)
 
+# Backends answering the batch endpoint with one of these do not support it.
+_BATCH_UNSUPPORTED = {404, 405, 501}
+
 
 def _normalise_snapshot(snapshot: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     if not snapshot:
@@ -26,40 +41,13 @@ def _normalise_snapshot(snapshot: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     return snapshot
 
 
-def _aircraft_hash(record: Dict[str, Any]) -> str:
-    """Return a stable hash of an aircraft record."""
-
-    # We only care about keys that typically change between updates.
-    interesting = {
-        key: record.get(key)
-        for key in (
-            "hex",
-            "version",
-            "seen",
-            "seen_pos",
-            "lat",
-            "lon",
-            "alt_baro",
-            "alt_geom",
-            "gs",
-            "ias",
-            "tas",
-            "track",
-            "baro_rate",
-            "geom_rate",
-            "nic",
-            "rc",
-        )
-    }
-    return json.dumps(interesting, sort_keys=True, separators=(",", ":"))
-
-
 @dataclass(slots=True)
 class HealthStatus:
     status: str
     last_update: Optional[datetime]
     last_push: Optional[datetime]
     error: Optional[str]
+    file_watch: Optional[Dict[str, Any]] = None
 
 
 class AircraftProxy:
@@ -81,38 +69,158 @@ class AircraftProxy:
             timeout=settings.request_timeout
         )
         self._snapshot: Dict[str, Any] = {"aircraft": []}
-        self._hashes: Dict[str, str] = {}
+        self._encoded: EncodedSnapshot = EMPTY_SNAPSHOT
+        self._changes = ChangeDetector(
+            position_m=settings.change_position_m,
+            altitude_ft=settings.change_altitude_ft,
+            speed_kt=settings.change_speed_kt,
+            track_deg=settings.change_track_deg,
+            rate_fpm=settings.change_rate_fpm,
+        )
+        self._watcher: Optional[FileWatcher] = (
+            FileWatcher(Path(settings.readsb_file)) if settings.readsb_file else None
+        )
+        self._delta = DeltaFeed(settings.delta_history)
+        self._delta_published = asyncio.Event()
+        self._trails = TrailStore(
+            capacity=settings.trail_points,
+            expiry=settings.trail_expiry_seconds,
+            max_aircraft=settings.trail_max_aircraft,
+        )
+        self._geofences = GeofenceMonitor()
+        self._geofence_task: Optional[asyncio.Task[None]] = None
         self._last_update: Optional[datetime] = None
         self._last_push: Optional[datetime] = None
         self._last_error: Optional[str] = None
         self._lock = asyncio.Lock()
         self._polling_task: Optional[asyncio.Task[None]] = None
         self._stopping = asyncio.Event()
-        endpoint = settings.telemetry_endpoint.lstrip("/")
-        self._telemetry_url = urljoin(
-            settings.backend_base_url.rstrip("/") + "/", endpoint
+        self._telemetry_url = self._backend_url(settings.telemetry_endpoint)
+        self._batch_url: Optional[str] = (
+            self._backend_url(settings.telemetry_batch_endpoint)
+            if settings.telemetry_batch_endpoint
+            else None
+        )
+
+    def _backend_url(self, endpoint: str) -> str:
+        return urljoin(
+            self.settings.backend_base_url.rstrip("/") + "/", endpoint.lstrip("/")
         )
 
     async def start(self) -> None:
         if self._polling_task and not self._polling_task.done():
             return
         self._stopping.clear()
+        if self.settings.geofence_url or self.settings.geofence_file:
+            self._geofence_task = asyncio.create_task(
+                self._geofence_loop(), name="adsb-geofence-loop"
+            )
+        if self.settings.readsb_stream:
+            source = StreamSource(
+                self.settings.readsb_stream,
+                AircraftTracker(expiry=self.settings.stream_expiry_seconds),
+            )
+            self._polling_task = asyncio.create_task(
+                self._stream_loop(source), name="adsb-stream-loop"
+            )
+            return
         self._polling_task = asyncio.create_task(self._poll_loop(), name="adsb-poll-loop")
 
     async def stop(self) -> None:
         self._stopping.set()
-        if self._polling_task:
-            self._polling_task.cancel()
-            try:
-                await self._polling_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._polling_task, self._geofence_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
         await self._backend_client.aclose()
         await self._fetch_client.aclose()
+        if self._watcher is not None:
+            self._watcher.close()
 
     async def get_snapshot(self) -> Dict[str, Any]:
-        async with self._lock:
-            return copy.deepcopy(self._snapshot)
+        """Return the latest snapshot; it is shared and must not be mutated."""
+        return self._snapshot
+
+    @property
+    def encoded_snapshot(self) -> EncodedSnapshot:
+        """The latest snapshot serialised and compressed for HTTP clients."""
+        return self._encoded
+
+    def delta_since(self, since: Optional[int]) -> Dict[str, Any]:
+        """Return the changes after snapshot ``since``, or a full resync.
+
+        Clients without a version, too far behind the retained history or
+        ahead of this process (e.g. after a restart) get the whole snapshot.
+        """
+        diff = self._delta.since(since) if since is not None else None
+        if diff is None:
+            return resync_payload(self._snapshot, self._encoded.version, since)
+        return delta_payload(diff, since)
+
+    async def wait_for_version(self, version: int) -> None:
+        """Wait until a snapshot newer than ``version`` has been published."""
+        while self._encoded.version <= version:
+            await self._delta_published.wait()
+
+    def trail(self, hex_id: str, since: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the recorded positions of one aircraft, or ``None``."""
+        return self._trails.trail(hex_id, since)
+
+    def trails(self, bbox: BBox, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return the trails of aircraft currently inside ``bbox``."""
+        return self._trails.trails(bbox, since)
+
+    def set_geofences(self, fences: Iterable[Fence]) -> None:
+        """Replace the fences checked against every snapshot."""
+        self._geofences.set_index(FenceIndex(fences, self.settings.geofence_cell_degrees))
+
+    def geofences(self) -> List[Dict[str, Any]]:
+        """Return the loaded fences with the aircraft currently inside each."""
+        inside = self._geofences.inside()
+        return [
+            {
+                "slug": fence.slug,
+                "name": fence.name,
+                "kind": fence.kind,
+                "bbox": list(fence.bbox),
+                "aircraft": sorted(inside[fence.slug]),
+            }
+            for fence in self._geofences.index.fences
+        ]
+
+    async def load_geofences(self) -> bool:
+        """(Re)load fences from ``geofence_url`` or ``geofence_file``.
+
+        The current fences are kept if the source cannot be read.
+        """
+        try:
+            if self.settings.geofence_url:
+                response = await self._backend_client.get(
+                    self._backend_url(self.settings.geofence_url)
+                )
+                response.raise_for_status()
+                overlays = response.json()
+            elif self.settings.geofence_file:
+                text = await asyncio.to_thread(Path(self.settings.geofence_file).read_text)
+                overlays = json.loads(text)
+            else:
+                return False
+        except (httpx.HTTPError, OSError, ValueError) as exc:
+            logger.warning("Failed to load geofences: %s", exc)
+            self._last_error = f"Failed to load geofences: {exc}"
+            return False
+        if isinstance(overlays, dict):
+            overlays = overlays.get("overlays", [])
+        if not isinstance(overlays, list):
+            logger.warning("Geofence source did not return a list of overlays")
+            return False
+        fences = fences_from_overlays(overlays, self.settings.geofence_overlay_type)
+        self.set_geofences(fences)
+        logger.info("Loaded %d geofences", len(fences))
+        return True
 
     async def ingest_snapshot(self, snapshot: Dict[str, Any]) -> None:
         """Public helper for injecting a snapshot (primarily for tests)."""
@@ -133,6 +241,15 @@ class AircraftProxy:
             last_update=self._last_update,
             last_push=self._last_push,
             error=self._last_error,
+            file_watch=(
+                {
+                    "mode": self._watcher.mode,
+                    "reads": self._watcher.reads,
+                    "skipped_polls": self._watcher.skipped_polls,
+                }
+                if self._watcher is not None
+                else None
+            ),
         )
 
     async def _poll_loop(self) -> None:
@@ -145,26 +262,115 @@ class AircraftProxy:
             except Exception as exc:  # pragma: no cover - defensive logging
                 logger.exception("Unexpected error in poll loop: %s", exc)
                 self._last_error = str(exc)
+            await self._wait_for_next_poll()
+
+    async def _wait_for_next_poll(self) -> None:
+        timeout = self.settings.poll_interval_seconds
+        if self._watcher is None or self._watcher.mode != INOTIFY:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            return
+        # With inotify the file is read as soon as readsb replaces it.
+        waiters = {
+            asyncio.ensure_future(self._stopping.wait()),
+            asyncio.ensure_future(self._watcher.wait(timeout)),
+        }
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _geofence_loop(self) -> None:
+        while not self._stopping.is_set():
+            await self.load_geofences()
             try:
                 await asyncio.wait_for(
-                    self._stopping.wait(), timeout=self.settings.poll_interval_seconds
+                    self._stopping.wait(), timeout=self.settings.geofence_refresh_seconds
                 )
             except asyncio.TimeoutError:
                 pass
 
+    async def _stream_loop(self, source: StreamSource) -> None:
+        """Publish the streamed state whenever it changes.
+
+        Bursts of messages are coalesced into at most one snapshot per
+        ``stream_min_interval``. Without messages the state is still
+        republished every ``poll_interval_seconds`` to age out aircraft,
+        except while disconnected, so ``/healthz`` goes stale. A reader task
+        that exits on its own is logged and restarted.
+        """
+        logger.info(
+            "Starting ADS-B %s stream from %s:%s", source.kind, source.host, source.port
+        )
+        reader = asyncio.create_task(source.run(), name="adsb-stream-reader")
+        try:
+            while not self._stopping.is_set():
+                if reader.done():
+                    reader = self._restart_stream_reader(source, reader)
+                try:
+                    await asyncio.wait_for(
+                        source.changed.wait(), timeout=self.settings.poll_interval_seconds
+                    )
+                except asyncio.TimeoutError:
+                    if not source.connected:
+                        self._last_error = source.last_error
+                        continue
+                source.changed.clear()
+                try:
+                    await self._handle_snapshot(source.tracker.snapshot())
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    logger.exception("Unexpected error in stream loop: %s", exc)
+                    self._last_error = str(exc)
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(), timeout=self.settings.stream_min_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+
+    def _restart_stream_reader(
+        self, source: StreamSource, reader: "asyncio.Task[None]"
+    ) -> "asyncio.Task[None]":
+        exc = None if reader.cancelled() else reader.exception()
+        if exc is not None:
+            logger.error(
+                "ADS-B stream reader failed; restarting", exc_info=(type(exc), exc, exc.__traceback__)
+            )
+            self._last_error = f"stream reader failed: {exc!r}"
+        else:
+            logger.error("ADS-B stream reader stopped; restarting")
+        return asyncio.create_task(source.run(), name="adsb-stream-reader")
+
     async def _fetch_snapshot(self) -> Optional[Dict[str, Any]]:
-        if self.settings.readsb_file:
-            path = Path(self.settings.readsb_file)
+        if self._watcher is not None:
+            path = self._watcher.path
             try:
-                snapshot = json.loads(path.read_text(encoding="utf-8"))
+                result = self._watcher.read()
             except FileNotFoundError:
                 logger.warning("aircraft.json missing at %s", path)
                 self._last_error = f"aircraft.json missing at {path}"
                 return {"aircraft": []}
-            except json.JSONDecodeError as exc:
-                logger.error("Invalid aircraft.json: %s", exc)
+            if result is None:
+                return None  # unchanged since the last successful read
+            data, signature = result
+            try:
+                snapshot = json.loads(data)
+            except ValueError as exc:
+                # Most likely caught mid-write; keep the previous snapshot and
+                # read the file again on the next poll.
+                logger.warning("Invalid aircraft.json, retrying: %s", exc)
                 self._last_error = f"Invalid aircraft.json: {exc}"
-                return {"aircraft": []}
+                return None
+            self._watcher.commit(signature)
             return snapshot
         if not self.settings.readsb_url:
             return None
@@ -180,48 +386,111 @@ class AircraftProxy:
     async def _handle_snapshot(self, snapshot: Dict[str, Any]) -> None:
         snapshot = _normalise_snapshot(snapshot)
         async with self._lock:
+            # Serialise and compress once per poll, off the event loop, so
+            # readers only ever pick up a finished, immutable snapshot.
+            encoded = await asyncio.to_thread(
+                EncodedSnapshot.build, snapshot, self._encoded.version + 1
+            )
+            aircraft = snapshot.get("aircraft", [])
+            changed = self._collect_changes(aircraft)
+            transitions = self._geofences.update(aircraft)
+            self._delta.record(
+                encoded.version,
+                changed,
+                {record["hex"] for record in aircraft if record.get("hex")},
+            )
+            now = snapshot.get("now")
+            self._trails.update(aircraft, now if isinstance(now, (int, float)) else None)
             self._snapshot = snapshot
+            self._encoded = encoded
             self._last_update = datetime.now(timezone.utc)
-        changed = self._collect_changes(snapshot.get("aircraft", []))
-        if changed:
-            if await self._push_updates(changed):
+            # Wake WebSocket clients waiting for this version.
+            published, self._delta_published = self._delta_published, asyncio.Event()
+            published.set()
+        if changed or transitions:
+            if await self._push_updates(changed, transitions):
                 self._last_push = datetime.now(timezone.utc)
                 self._last_error = None
 
     def _collect_changes(
         self, aircraft_list: Iterable[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        seen_hex: Dict[str, str] = {}
-        changed: List[Dict[str, Any]] = []
-        for record in aircraft_list:
-            hex_id = record.get("hex")
-            if not hex_id:
-                continue
-            record_hash = _aircraft_hash(record)
-            seen_hex[hex_id] = record_hash
-            if self._hashes.get(hex_id) != record_hash:
-                changed.append(record)
-        # Drop stale aircraft from cache
-        for missing in set(self._hashes) - set(seen_hex):
-            del self._hashes[missing]
-        for hex_id, record_hash in seen_hex.items():
-            self._hashes[hex_id] = record_hash
-        return changed
-
-    async def _push_updates(self, aircraft_list: Iterable[Dict[str, Any]]) -> bool:
+        return self._changes.collect(aircraft_list)
+
+    async def _push_updates(
+        self,
+        aircraft_list: Iterable[Dict[str, Any]],
+        transitions: Iterable[Transition] = (),
+    ) -> bool:
+        events = [
+            event
+            for event in (self._build_event(record) for record in aircraft_list)
+            if event is not None
+        ]
+        events.extend(
+            event
+            for event in (self._build_geofence_event(transition) for transition in transitions)
+            if event is not None
+        )
+        if not events:
+            return True
+        if self._batch_url is not None:
+            return await self._push_batches(events)
+        return await self._push_individually(events)
+
+    async def _push_batches(self, events: List[Dict[str, Any]]) -> bool:
+        """Send ``events`` as ``{"events": [...]}`` chunks of ``push_batch_size``.
+
+        If the backend does not know the batch endpoint, batch mode is
+        switched off and the remaining events are pushed one by one.
+        """
+
+        assert self._batch_url is not None
         success = True
-        for record in aircraft_list:
-            payload = self._build_event(record)
-            if payload is None:
-                continue
+        size = self.settings.push_batch_size
+        for start in range(0, len(events), size):
+            chunk = events[start : start + size]
             try:
-                response = await self._backend_client.post(self._telemetry_url, json=payload)
+                response = await self._backend_client.post(
+                    self._batch_url, json={"events": chunk}
+                )
+                if response.status_code in _BATCH_UNSUPPORTED:
+                    logger.warning(
+                        "Batch telemetry endpoint %s unsupported (HTTP %s); "
+                        "pushing events individually",
+                        self._batch_url,
+                        response.status_code,
+                    )
+                    self._batch_url = None
+                    return await self._push_individually(events[start:]) and success
                 response.raise_for_status()
             except httpx.HTTPError as exc:
-                logger.warning("Failed to push telemetry update: %s", exc)
+                logger.warning("Failed to push telemetry batch: %s", exc)
                 self._last_error = str(exc)
                 success = False
         return success
+
+    async def _push_individually(self, events: List[Dict[str, Any]]) -> bool:
+        """Post one request per event, at most ``push_concurrency`` at a time."""
+
+        semaphore = asyncio.Semaphore(self.settings.push_concurrency)
+
+        async def push(event: Dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    response = await self._backend_client.post(
+                        self._telemetry_url, json=event
+                    )
+                    response.raise_for_status()
+                except httpx.HTTPError as exc:
+                    logger.warning("Failed to push telemetry update: %s", exc)
+                    self._last_error = str(exc)
+                    return False
+                return True
+
+        results = await asyncio.gather(*(push(event) for event in events))
+        return all(results)
+
     def _build_event(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         hex_id = record.get("hex")
         if not hex_id:
@@ -260,5 +529,18 @@ class AircraftProxy:
         }
         return event
 
+    def _build_geofence_event(self, transition: Transition) -> Optional[Dict[str, Any]]:
+        event = self._build_event(transition.record)
+        if event is None:
+            return None
+        fence = transition.fence
+        event["status"] = f"geofence_{transition.kind}"
+        event["payload"]["geofence"] = {
+            "slug": fence.slug,
+            "name": fence.name,
+            "transition": transition.kind,
+        }
+        return event
+
 
 __all__ = ["AircraftProxy", "HealthStatus"]
@@ -0,0 +1,92 @@
+"""Immutable, pre-encoded aircraft snapshots served to map clients."""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    """Map content codings in an ``Accept-Encoding`` header to their q-values."""
+
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedSnapshot:
+    """A snapshot serialised once per poll, with compressed variants.
+
+    The ETag is weak because the identity, gzip and brotli bodies are
+    equivalent representations of the same document.
+    """
+
+    version: int
+    body: bytes
+    gzip: bytes
+    brotli: Optional[bytes]
+    etag: str
+
+    @classmethod
+    def build(cls, snapshot: Dict[str, Any], version: int) -> "EncodedSnapshot":
+        body = json.dumps(snapshot, separators=(",", ":")).encode("utf-8")
+        return cls.from_body(body, version)
+
+    @classmethod
+    def from_body(cls, body: bytes, version: int) -> "EncodedSnapshot":
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        return cls(
+            version=version,
+            body=body,
+            gzip=gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+            brotli=brotli.compress(body, quality=BROTLI_QUALITY) if brotli else None,
+            etag=f'W/"{digest}"',
+        )
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an ``If-None-Match`` header names this snapshot."""
+
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag.removeprefix("W/") in tags
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Return the smallest body the client accepts and its coding."""
+
+        accepted = _accepted(accept_encoding or "")
+        wildcard = accepted.get("*", 0.0)
+        if self.brotli is not None and accepted.get("br", wildcard) > 0:
+            return self.brotli, "br"
+        if accepted.get("gzip", wildcard) > 0:
+            return self.gzip, "gzip"
+        return self.body, None
+
+
+EMPTY_SNAPSHOT = EncodedSnapshot.build({"aircraft": []}, 0)
+
+__all__ = ["EMPTY_SNAPSHOT", "EncodedSnapshot"]
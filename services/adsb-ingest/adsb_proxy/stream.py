@@ -0,0 +1,539 @@
+"""Incremental aircraft state from readsb's SBS-1 or Beast TCP outputs.
+
+Instead of re-reading the whole ``aircraft.json`` every poll, the proxy can
+connect to readsb's BaseStation (``sbs://host:30003``) or Beast
+(``beast://host:30005``) output and update one aircraft per message. The
+Beast decoder handles DF17/18 extended squitter identification, airborne
+position (CPR, baro altitude) and velocity, plus altitude and squawk replies
+(DF4/5/20/21) for aircraft already being tracked.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SBS = "sbs"
+BEAST = "beast"
+DEFAULT_PORTS = {SBS: 30003, BEAST: 30005}
+
+# Even/odd CPR frames further apart than this are not combined.
+CPR_MAX_AGE = 10.0
+
+_ESCAPE = 0x1A
+# Beast frame type -> message length; every frame also carries a 6-byte
+# timestamp and a 1-byte signal level.
+_BEAST_LENGTHS = {0x31: 2, 0x32: 7, 0x33: 14}
+_CALLSIGN_CHARS = "#ABCDEFGHIJKLMNOPQRSTUVWXYZ##### ###############0123456789######"
+
+
+def parse_stream_url(url: str) -> Tuple[str, str, int]:
+    """Split ``sbs://host[:port]`` or ``beast://host[:port]``."""
+
+    kind, sep, address = url.partition("://")
+    kind = kind.lower()
+    if not sep or kind not in DEFAULT_PORTS:
+        raise ValueError("READSB_STREAM must be sbs://host[:port] or beast://host[:port]")
+    host, _, port_raw = address.rstrip("/").rpartition(":")
+    if not host:
+        host, port_raw = address.rstrip("/"), ""
+    if not host:
+        raise ValueError("READSB_STREAM is missing a host")
+    try:
+        port = int(port_raw) if port_raw else DEFAULT_PORTS[kind]
+    except ValueError:
+        raise ValueError("READSB_STREAM has an invalid port") from None
+    return kind, host, port
+
+
+def _crc24_table() -> List[int]:
+    table = []
+    for byte in range(256):
+        crc = byte << 16
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0xFFF409) if crc & 0x800000 else crc << 1
+        table.append(crc & 0xFFFFFF)
+    return table
+
+
+_CRC_TABLE = _crc24_table()
+
+
+def crc24(data: bytes) -> int:
+    """Mode S CRC-24 of ``data``."""
+
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFF) ^ _CRC_TABLE[(crc >> 16) ^ byte]
+    return crc
+
+
+def _bits(value: int, width: int, start: int, length: int) -> int:
+    return (value >> (width - start - length)) & ((1 << length) - 1)
+
+
+def _altitude_q(code: int, q_bit: int, m_bit: Optional[int] = None) -> Optional[int]:
+    """Decode a 25 ft (Q=1) altitude code; Gillham-coded altitudes are skipped."""
+
+    if not (code >> q_bit) & 1:
+        return None
+    if m_bit is not None and (code >> m_bit) & 1:
+        return None  # metric altitude
+    value = code
+    for bit in sorted((b for b in (q_bit, m_bit) if b is not None), reverse=True):
+        value = ((value >> (bit + 1)) << bit) | (value & ((1 << bit) - 1))
+    return value * 25 - 1000
+
+
+def _squawk(identity: int) -> str:
+    # Bit order (MSB first): C1 A1 C2 A2 C4 A4 X B1 D1 B2 D2 B4 D4.
+    def digit(*positions: int) -> int:
+        return sum(((identity >> (12 - position)) & 1) << weight for weight, position in enumerate(positions))
+
+    a = digit(1, 3, 5)
+    b = digit(7, 9, 11)
+    c = digit(0, 2, 4)
+    d = digit(8, 10, 12)
+    return f"{a}{b}{c}{d}"
+
+
+def _nl(latitude: float) -> int:
+    """Number of CPR longitude zones at ``latitude``."""
+
+    latitude = abs(latitude)
+    if latitude < 1e-9:
+        return 59
+    if latitude > 87:
+        return 1
+    if latitude == 87:
+        return 2
+    a = 1 - math.cos(math.pi / 30)
+    b = math.cos(math.pi / 180 * latitude) ** 2
+    return int(math.floor(2 * math.pi / math.acos(1 - a / b)))
+
+
+def cpr_global(
+    even: Tuple[int, int], odd: Tuple[int, int], latest_odd: bool
+) -> Optional[Tuple[float, float]]:
+    """Globally decode an airborne even/odd CPR pair into latitude/longitude."""
+
+    lat_even, lon_even = even[0] / 131072, even[1] / 131072
+    lat_odd, lon_odd = odd[0] / 131072, odd[1] / 131072
+    j = math.floor(59 * lat_even - 60 * lat_odd + 0.5)
+    rlat_even = 6.0 * (j % 60 + lat_even)
+    rlat_odd = 360 / 59 * (j % 59 + lat_odd)
+    if rlat_even >= 270:
+        rlat_even -= 360
+    if rlat_odd >= 270:
+        rlat_odd -= 360
+    if _nl(rlat_even) != _nl(rlat_odd):
+        return None  # the pair straddles a zone boundary
+    if latest_odd:
+        latitude = rlat_odd
+        zones = max(_nl(rlat_odd) - 1, 1)
+        m = math.floor(lon_even * (_nl(rlat_odd) - 1) - lon_odd * _nl(rlat_odd) + 0.5)
+        longitude = 360 / zones * (m % zones + lon_odd)
+    else:
+        latitude = rlat_even
+        zones = max(_nl(rlat_even), 1)
+        m = math.floor(lon_even * (_nl(rlat_even) - 1) - lon_odd * _nl(rlat_even) + 0.5)
+        longitude = 360 / zones * (m % zones + lon_even)
+    if longitude >= 180:
+        longitude -= 360
+    return latitude, longitude
+
+
+class BeastFramer:
+    """Split a Beast byte stream into ``(type, message, signal)`` frames.
+
+    ``0x1a`` starts a frame and is doubled when it occurs inside one;
+    partial frames are kept until the next :meth:`feed`.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = b""
+
+    def feed(self, data: bytes) -> List[Tuple[int, bytes, int]]:
+        buf = self._buffer + data
+        size = len(buf)
+        frames: List[Tuple[int, bytes, int]] = []
+        index = 0
+        while True:
+            start = buf.find(b"\x1a", index)
+            if start < 0:
+                index = size
+                break
+            if start + 1 >= size:
+                index = start
+                break
+            length = _BEAST_LENGTHS.get(buf[start + 1])
+            if length is None:
+                index = start + 1  # not a frame start; resynchronise
+                continue
+            need = 7 + length
+            out = bytearray()
+            cursor = start + 2
+            complete = corrupt = False
+            while cursor < size:
+                byte = buf[cursor]
+                if byte == _ESCAPE:
+                    if cursor + 1 >= size:
+                        break
+                    if buf[cursor + 1] != _ESCAPE:
+                        corrupt = True  # a new frame began inside this one
+                        break
+                    cursor += 1
+                out.append(byte)
+                cursor += 1
+                if len(out) == need:
+                    complete = True
+                    break
+            if complete:
+                frames.append((buf[start + 1], bytes(out[7:]), out[6]))
+                index = cursor
+            elif corrupt:
+                index = cursor
+            else:
+                index = start
+                break
+        self._buffer = buf[index:]
+        return frames
+
+
+@dataclass(slots=True)
+class _Aircraft:
+    record: Dict[str, Any]
+    last_seen: float
+    last_position: Optional[float] = None
+    messages: int = 0
+    cpr: Dict[bool, Tuple[int, int, float]] = field(default_factory=dict)
+
+
+class AircraftTracker:
+    """Aircraft state maintained one message at a time.
+
+    :meth:`snapshot` renders the state in readsb's ``aircraft.json`` layout
+    (``seen``/``seen_pos`` relative to now) so the rest of the proxy cannot
+    tell a stream from a polled file. Aircraft silent for ``expiry`` seconds
+    are dropped.
+    """
+
+    def __init__(self, expiry: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.expiry = expiry
+        self._clock = clock
+        self._aircraft: Dict[str, _Aircraft] = {}
+
+    def __len__(self) -> int:
+        return len(self._aircraft)
+
+    def _touch(self, hex_id: str, create: bool = True) -> Optional[_Aircraft]:
+        now = self._clock()
+        state = self._aircraft.get(hex_id)
+        if state is None:
+            if not create:
+                return None
+            state = self._aircraft[hex_id] = _Aircraft(record={"hex": hex_id}, last_seen=now)
+        state.last_seen = now
+        state.messages += 1
+        return state
+
+    def _update(self, state: _Aircraft, **fields: Any) -> bool:
+        record = state.record
+        changed = False
+        for key, value in fields.items():
+            if value is not None and record.get(key) != value:
+                record[key] = value
+                changed = True
+        return changed
+
+    def apply_sbs(self, line: str) -> bool:
+        """Apply one BaseStation ``MSG`` line; return whether state changed."""
+
+        parts = line.rstrip("\r\n").split(",")
+        if len(parts) < 11 or parts[0] != "MSG" or not parts[4]:
+            return False
+        state = self._touch(parts[4].strip().lower())
+        assert state is not None
+
+        def value(index: int, kind: Callable[[str], Any] = float) -> Any:
+            if index >= len(parts) or not parts[index].strip():
+                return None
+            try:
+                return kind(parts[index].strip())
+            except ValueError:
+                return None
+
+        on_ground = value(21, int)
+        altitude: Any = value(11)
+        if on_ground:
+            altitude = "ground"
+        elif altitude is not None:
+            altitude = int(altitude)
+        latitude, longitude = value(14), value(15)
+        if latitude is not None and longitude is not None:
+            state.last_position = state.last_seen
+        rate = value(16)
+        return self._update(
+            state,
+            flight=value(10, str),
+            alt_baro=altitude,
+            gs=value(12),
+            track=value(13),
+            lat=latitude,
+            lon=longitude,
+            baro_rate=int(rate) if rate is not None else None,
+            squawk=value(17, str),
+        )
+
+    def apply_mode_s(self, message: bytes) -> bool:
+        """Apply one Mode S message; return whether state changed."""
+
+        if len(message) < 7:
+            return False
+        df = message[0] >> 3
+        if df in (17, 18) and len(message) == 14:
+            if crc24(message) != 0:
+                return False
+            return self._extended_squitter(message)
+        if df in (4, 5, 20, 21):
+            # Replies carry the address in the parity field; only trust
+            # them for aircraft already identified by a squitter.
+            address = crc24(message[:-3]) ^ int.from_bytes(message[-3:], "big")
+            state = self._touch(f"{address:06x}", create=False)
+            if state is None:
+                return False
+            code = int.from_bytes(message[2:4], "big") & 0x1FFF
+            if df in (4, 20):
+                return self._update(state, alt_baro=_altitude_q(code, q_bit=4, m_bit=6))
+            return self._update(state, squawk=_squawk(code))
+        return False
+
+    def _extended_squitter(self, message: bytes) -> bool:
+        state = self._touch(message[1:4].hex())
+        assert state is not None
+        me = int.from_bytes(message[4:11], "big")
+        type_code = _bits(me, 56, 0, 5)
+        if 1 <= type_code <= 4:
+            chars = (_CALLSIGN_CHARS[_bits(me, 56, 8 + 6 * i, 6)] for i in range(8))
+            flight = "".join(chars).replace("#", "").rstrip()
+            return self._update(state, flight=flight or None)
+        if 9 <= type_code <= 18:
+            altitude = _altitude_q(_bits(me, 56, 8, 12), q_bit=4)
+            changed = self._update(state, alt_baro=altitude)
+            odd = bool(_bits(me, 56, 21, 1))
+            now = state.last_seen
+            state.cpr[odd] = (_bits(me, 56, 22, 17), _bits(me, 56, 39, 17), now)
+            other = state.cpr.get(not odd)
+            if other is None or now - other[2] > CPR_MAX_AGE:
+                return changed
+            even_frame, odd_frame = (other, state.cpr[odd]) if odd else (state.cpr[odd], other)
+            position = cpr_global(even_frame[:2], odd_frame[:2], latest_odd=odd)
+            if position is None:
+                return changed
+            state.last_position = now
+            latitude, longitude = position
+            return self._update(state, lat=round(latitude, 6), lon=round(longitude, 6)) or changed
+        if type_code == 19:
+            subtype = _bits(me, 56, 5, 3)
+            if subtype not in (1, 2):
+                return False
+            east, north = _bits(me, 56, 14, 10), _bits(me, 56, 25, 10)
+            fields: Dict[str, Any] = {}
+            if east and north:
+                scale = 4 if subtype == 2 else 1
+                v_east = (east - 1) * scale * (-1 if _bits(me, 56, 13, 1) else 1)
+                v_north = (north - 1) * scale * (-1 if _bits(me, 56, 24, 1) else 1)
+                fields["gs"] = round(math.hypot(v_east, v_north), 1)
+                fields["track"] = round(math.degrees(math.atan2(v_east, v_north)) % 360, 2)
+            rate = _bits(me, 56, 37, 9)
+            if rate:
+                fields["baro_rate"] = (rate - 1) * 64 * (-1 if _bits(me, 56, 36, 1) else 1)
+            return self._update(state, **fields)
+        return False
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Return an ``aircraft.json``-style snapshot and drop expired aircraft."""
+
+        clock = self._clock() if now is None else now
+        aircraft = []
+        expired = []
+        for hex_id, state in self._aircraft.items():
+            age = clock - state.last_seen
+            if age > self.expiry:
+                expired.append(hex_id)
+                continue
+            record = dict(state.record, messages=state.messages, seen=round(age, 1))
+            if state.last_position is not None:
+                record["seen_pos"] = round(clock - state.last_position, 1)
+            aircraft.append(record)
+        for hex_id in expired:
+            del self._aircraft[hex_id]
+        return {"now": round(time.time(), 1), "messages": sum(a["messages"] for a in aircraft), "aircraft": aircraft}
+
+
+class StreamSource:
+    """Read an SBS or Beast TCP stream into an :class:`AircraftTracker`.
+
+    ``changed`` is set whenever a message altered an aircraft. The connection
+    is re-established with exponential backoff until :meth:`run` is cancelled,
+    including after a line too long to buffer or an unexpected error.
+    Messages that fail to decode are skipped and counted in ``decode_errors``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        tracker: AircraftTracker,
+        *,
+        reconnect_initial: float = 1.0,
+        reconnect_max_delay: float = 30.0,
+        idle_timeout: float = 30.0,
+    ) -> None:
+        self.kind, self.host, self.port = parse_stream_url(url)
+        self.tracker = tracker
+        self.reconnect_initial = reconnect_initial
+        self.reconnect_max_delay = reconnect_max_delay
+        self.idle_timeout = idle_timeout
+        self.changed = asyncio.Event()
+        self.connected = False
+        self.reconnects = 0
+        self.decode_errors = 0
+        self.last_error: Optional[str] = None
+
+    async def run(self) -> None:
+        delay = self.reconnect_initial
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as exc:
+                self._lost(f"Cannot connect to {self.kind}://{self.host}:{self.port}: {exc}")
+            else:
+                logger.info("Connected to %s stream at %s:%s", self.kind, self.host, self.port)
+                self.connected = True
+                delay = self.reconnect_initial
+                try:
+                    await self._read(reader)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+                    self._lost(f"{self.kind} stream lost: {exc!r}")
+                except ValueError as exc:
+                    # StreamReader.readline raises ValueError (wrapping
+                    # LimitOverrunError) for lines over its 64 KiB limit and
+                    # discards the buffer, so resynchronise on a new connection.
+                    self._lost(f"{self.kind} stream unreadable: {exc}")
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    logger.exception("Unexpected error reading %s stream", self.kind)
+                    self.last_error = f"{self.kind} stream failed: {exc!r}"
+                finally:
+                    self.connected = False
+                    writer.close()
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(max(delay * 2, 0.1), self.reconnect_max_delay)
+
+    def _lost(self, error: str) -> None:
+        logger.warning("%s", error)
+        self.last_error = error
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        tracker = self.tracker
+        framer = BeastFramer() if self.kind == BEAST else None
+        while True:
+            if framer is None:
+                line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                if not line:
+                    raise ConnectionError("stream closed by readsb")
+                try:
+                    changed = tracker.apply_sbs(line.decode("ascii", "replace"))
+                except Exception:
+                    self._decode_failed(line)
+                    continue
+                if changed:
+                    self.changed.set()
+                continue
+            data = await asyncio.wait_for(reader.read(65536), self.idle_timeout)
+            if not data:
+                raise ConnectionError("stream closed by readsb")
+            changed = False
+            for kind, message, _signal in framer.feed(data):
+                if kind == 0x31:  # Mode A/C frames carry no address
+                    continue
+                try:
+                    changed = tracker.apply_mode_s(message) or changed
+                except Exception:
+                    self._decode_failed(message)
+            if changed:
+                self.changed.set()
+
+    def _decode_failed(self, message: bytes) -> None:
+        self.decode_errors += 1
+        logger.debug("Skipping undecodable %s message %r", self.kind, message[:64], exc_info=True)
+
+
+def beast_frame(message: bytes, kind: Optional[int] = None, signal: int = 0x80) -> bytes:
+    """Encode ``message`` as a Beast frame (zero timestamp), e.g. for replays."""
+
+    if kind is None:
+        kind = 0x33 if len(message) == 14 else 0x32
+    body = bytes(6) + bytes([signal]) + message
+    return bytes([_ESCAPE, kind]) + body.replace(b"\x1a", b"\x1a\x1a")
+
+
+class _ReplayHandler(socketserver.BaseRequestHandler):
+    server: "StreamReplayServer"
+
+    def handle(self) -> None:
+        server = self.server
+        data = server.data
+        for start in range(0, len(data), server.chunk_size):
+            if server.interval:
+                time.sleep(server.interval)
+            self.request.sendall(data[start : start + server.chunk_size])
+
+
+class StreamReplayServer(socketserver.ThreadingTCPServer):
+    """Serve a recorded SBS or Beast capture to every client, then close.
+
+    ``chunk_size`` deliberately splits lines and frames across reads.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, data: bytes, chunk_size: int = 512, interval: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _ReplayHandler)
+        self.data = data
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+
+    def url(self, kind: str) -> str:
+        host, port = self.server_address[:2]
+        return f"{kind}://{host}:{port}"
+
+    def __enter__(self) -> "StreamReplayServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="stream-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+__all__ = [
+    "AircraftTracker",
+    "BeastFramer",
+    "StreamReplayServer",
+    "StreamSource",
+    "beast_frame",
+    "cpr_global",
+    "crc24",
+    "parse_stream_url",
+]
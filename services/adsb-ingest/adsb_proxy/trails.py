@@ -0,0 +1,229 @@
+"""Bounded per-aircraft position history for drawing trails."""
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# time, lat, lon as doubles plus altitude and track as floats.
+BYTES_PER_POINT = 3 * 8 + 2 * 4
+
+_NAN = math.nan
+
+BBox = Tuple[float, float, float, float]
+
+
+def parse_bbox(value: str) -> BBox:
+    """Parse ``west,south,east,north`` in degrees.
+
+    ``west`` may exceed ``east`` for a box crossing the antimeridian.
+    """
+
+    try:
+        west, south, east, north = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be west,south,east,north in degrees") from None
+    if not (-180.0 <= west <= 180.0 and -180.0 <= east <= 180.0):
+        raise ValueError("bbox longitudes must be within [-180, 180]")
+    if not -90.0 <= south <= north <= 90.0:
+        raise ValueError("bbox latitudes must be within [-90, 90] with south <= north")
+    return west, south, east, north
+
+
+def _in_bbox(lat: float, lon: float, bbox: BBox) -> bool:
+    west, south, east, north = bbox
+    if not south <= lat <= north:
+        return False
+    if west <= east:
+        return west <= lon <= east
+    return lon >= west or lon <= east
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) else _NAN
+
+
+class Trail:
+    """Fixed-size ring buffer of one aircraft's positions.
+
+    Columns are preallocated ``array`` buffers, so appending never
+    allocates and a full trail overwrites its oldest point.
+    """
+
+    __slots__ = ("times", "lats", "lons", "alts", "tracks", "start", "count", "last_seen")
+
+    def __init__(self, capacity: int) -> None:
+        self.times = array("d", bytes(8 * capacity))
+        self.lats = array("d", bytes(8 * capacity))
+        self.lons = array("d", bytes(8 * capacity))
+        self.alts = array("f", bytes(4 * capacity))
+        self.tracks = array("f", bytes(4 * capacity))
+        self.start = 0
+        self.count = 0
+        self.last_seen = 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _last(self) -> int:
+        return (self.start + self.count - 1) % len(self.times)
+
+    def append(self, when: float, lat: float, lon: float, alt: float, track: float) -> bool:
+        """Add a point unless the aircraft has not moved; return whether added."""
+
+        capacity = len(self.times)
+        if self.count:
+            last = self._last()
+            if self.lats[last] == lat and self.lons[last] == lon:
+                return False
+            when = max(when, self.times[last])
+        if self.count < capacity:
+            index = (self.start + self.count) % capacity
+            self.count += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % capacity
+        self.times[index] = when
+        self.lats[index] = lat
+        self.lons[index] = lon
+        self.alts[index] = alt
+        self.tracks[index] = track
+        return True
+
+    def latest(self) -> Tuple[float, float]:
+        last = self._last()
+        return self.lats[last], self.lons[last]
+
+    def _column(self, column: array) -> array:
+        if self.count < len(column):
+            return column[: self.count]
+        return column[self.start :] + column[: self.start]
+
+    def points(self, since: Optional[float] = None) -> List[List[Optional[float]]]:
+        """Points oldest first as ``[time, lat, lon, alt, track]``."""
+
+        times = self._column(self.times)
+        # Times never decrease, so the points after ``since`` are a suffix.
+        first = 0 if since is None else bisect_right(times, since)
+        columns = [
+            self._column(column)[first:]
+            for column in (self.lats, self.lons, self.alts, self.tracks)
+        ]
+        # NaN marks a missing altitude or track.
+        return [
+            [
+                when,
+                lat,
+                lon,
+                alt if alt == alt else None,
+                round(track, 1) if track == track else None,
+            ]
+            for when, lat, lon, alt, track in zip(times[first:], *columns)
+        ]
+
+
+class TrailStore:
+    """Position history for every aircraft seen recently.
+
+    Each aircraft keeps at most ``capacity`` points and is dropped once it
+    has been absent from snapshots for ``expiry`` seconds. At most
+    ``max_aircraft`` trails are held; beyond that the least recently seen
+    aircraft is dropped. Memory is therefore bounded by roughly
+    ``max_aircraft * (capacity * BYTES_PER_POINT + ~700 bytes)``: about
+    4 KiB per aircraft with 100 points, or 20 MiB for 5000 aircraft.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100,
+        expiry: float = 300.0,
+        max_aircraft: int = 5000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if capacity < 1 or max_aircraft < 1:
+            raise ValueError("capacity and max_aircraft must be positive")
+        self.capacity = capacity
+        self.expiry = expiry
+        self.max_aircraft = max_aircraft
+        self._clock = clock
+        # Ordered by last_seen, so expiry only looks at the oldest entries.
+        self._trails: "OrderedDict[str, Trail]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._trails)
+
+    def __contains__(self, hex_id: object) -> bool:
+        return hex_id in self._trails
+
+    def update(self, aircraft: Iterable[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """Record the positions in one snapshot taken at ``now`` (epoch seconds)."""
+
+        now = self._clock() if now is None else float(now)
+        trails = self._trails
+        for record in aircraft:
+            hex_id = record.get("hex")
+            lat = record.get("lat")
+            lon = record.get("lon")
+            trail = trails.get(hex_id) if hex_id else None
+            if trail is not None:
+                trail.last_seen = now
+                trails.move_to_end(hex_id)
+            if not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)):
+                continue
+            if trail is None:
+                if not hex_id:
+                    continue
+                trail = trails[hex_id] = Trail(self.capacity)
+                trail.last_seen = now
+                if len(trails) > self.max_aircraft:
+                    trails.popitem(last=False)
+            seen_pos = record.get("seen_pos")
+            when = now - seen_pos if isinstance(seen_pos, (int, float)) else now
+            altitude = record.get("alt_baro")
+            if not isinstance(altitude, (int, float)):
+                altitude = record.get("alt_geom")  # alt_baro may be "ground"
+            trail.append(when, lat, lon, _number(altitude), _number(record.get("track")))
+        self.expire(now)
+
+    def expire(self, now: Optional[float] = None) -> None:
+        """Drop trails of aircraft not seen for ``expiry`` seconds."""
+
+        cutoff = (self._clock() if now is None else now) - self.expiry
+        trails = self._trails
+        while trails:
+            hex_id, trail = next(iter(trails.items()))
+            if trail.last_seen >= cutoff:
+                break
+            del trails[hex_id]
+
+    def trail(self, hex_id: str, since: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return one aircraft's trail, or ``None`` if it is not tracked."""
+
+        trail = self._trails.get(hex_id.lower())
+        if trail is None:
+            return None
+        return {
+            "hex": hex_id.lower(),
+            "last_seen": trail.last_seen,
+            "points": trail.points(since),
+        }
+
+    def trails(
+        self, bbox: Optional[BBox] = None, since: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Trails of every aircraft whose latest position lies within ``bbox``."""
+
+        result = []
+        for hex_id, trail in self._trails.items():
+            if bbox is not None and not _in_bbox(*trail.latest(), bbox):
+                continue
+            result.append(
+                {"hex": hex_id, "last_seen": trail.last_seen, "points": trail.points(since)}
+            )
+        return result
+
+
+__all__ = ["BYTES_PER_POINT", "Trail", "TrailStore", "parse_bbox"]
@@ -0,0 +1,94 @@
+"""Change-detection benchmark: JSON hashing vs :class:`ChangeDetector`.
+
+Run from ``services/adsb-ingest``::
+
+    python benchmarks/bench_changes.py --aircraft 1000 5000 10000 --polls 20
+
+Every poll ticks ``seen`` on all aircraft and moves ``--moving`` of them, as
+readsb does between two ``aircraft.json`` writes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from adsb_proxy.changes import ChangeDetector  # noqa: E402
+from bench_push import scaled_snapshot  # noqa: E402
+
+_HASHED_KEYS = (
+    "hex", "version", "seen", "seen_pos", "lat", "lon", "alt_baro", "alt_geom",
+    "gs", "ias", "tas", "track", "baro_rate", "geom_rate", "nic", "rc",
+)
+
+
+class JsonHashDetector:
+    """The previous implementation: a sorted JSON dump per record per poll."""
+
+    def __init__(self) -> None:
+        self.hashes: Dict[str, str] = {}
+
+    def collect(self, aircraft_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        seen_hex: Dict[str, str] = {}
+        changed = []
+        for record in aircraft_list:
+            hex_id = record.get("hex")
+            if not hex_id:
+                continue
+            interesting = {key: record.get(key) for key in _HASHED_KEYS}
+            record_hash = json.dumps(interesting, sort_keys=True, separators=(",", ":"))
+            seen_hex[hex_id] = record_hash
+            if self.hashes.get(hex_id) != record_hash:
+                changed.append(record)
+        for missing in set(self.hashes) - set(seen_hex):
+            del self.hashes[missing]
+        self.hashes.update(seen_hex)
+        return changed
+
+
+def polls(count: int, rounds: int, moving: float) -> List[List[Dict[str, Any]]]:
+    aircraft = scaled_snapshot(count)["aircraft"]
+    step = max(int(1 / moving), 1) if moving > 0 else 0
+    snapshots = []
+    for poll in range(rounds):
+        snapshot = []
+        for index, record in enumerate(aircraft):
+            record = dict(record, seen=poll * 0.1)
+            if step and (index + poll) % step == 0:
+                record["lat"] += poll * 0.001
+            snapshot.append(record)
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def run(label: str, detector: Any, snapshots: List[List[Dict[str, Any]]]) -> None:
+    changed = 0
+    started = time.perf_counter()
+    for snapshot in snapshots:
+        changed += len(detector.collect(snapshot))
+    elapsed = time.perf_counter() - started
+    records = sum(len(snapshot) for snapshot in snapshots)
+    print(f"{label:>15}: {records / elapsed:11.0f} records/s {changed:8d} changes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--aircraft", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--moving", type=float, default=0.2, help="fraction moving per poll")
+    args = parser.parse_args()
+    for count in args.aircraft:
+        snapshots = polls(count, args.polls, args.moving)
+        print(f"{count} aircraft x {args.polls} polls")
+        run("json-hash", JsonHashDetector(), snapshots)
+        run("change-detector", ChangeDetector(), snapshots)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Bandwidth benchmark: full ``/aircraft.json`` polls vs the delta feed.
+
+Run from ``services/adsb-ingest``::
+
+    python benchmarks/bench_delta.py --aircraft 300 --polls 30 --moving 0.1
+
+A client following every version downloads either the full snapshot or the
+merged diff since its last version; both are compared uncompressed and
+gzipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from adsb_proxy.config import Settings  # noqa: E402
+from adsb_proxy.proxy import AircraftProxy  # noqa: E402
+from bench_changes import polls  # noqa: E402
+
+
+async def run(count: int, rounds: int, moving: float) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(201, json={"status": "ok"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://backend")
+    proxy = AircraftProxy(
+        Settings(backend_base_url="http://backend", readsb_url=None), backend_client=client
+    )
+    full = full_gzip = delta = delta_gzip = 0
+    version = None
+    for aircraft in polls(count, rounds, moving):
+        await proxy.ingest_snapshot({"now": 0, "aircraft": aircraft})
+        snapshot = proxy.encoded_snapshot
+        full += len(snapshot.body)
+        full_gzip += len(snapshot.gzip)
+        body = json.dumps(proxy.delta_since(version), separators=(",", ":")).encode()
+        delta += len(body)
+        delta_gzip += len(gzip.compress(body))
+        version = snapshot.version
+    await proxy.stop()
+    print(f"{count} aircraft x {rounds} polls, {moving:.0%} moving per poll")
+    print(f"  full:  {full / rounds / 1024:9.1f} KiB/poll ({full_gzip / rounds / 1024:.1f} gzip)")
+    print(f"  delta: {delta / rounds / 1024:9.1f} KiB/poll ({delta_gzip / rounds / 1024:.1f} gzip)")
+    print(f"  ratio: {full / delta:9.1f}x ({full_gzip / delta_gzip:.1f}x gzip)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--aircraft", type=int, default=300)
+    parser.add_argument("--polls", type=int, default=30)
+    parser.add_argument("--moving", type=float, default=0.1, help="fraction moving per poll")
+    args = parser.parse_args()
+    asyncio.run(run(args.aircraft, args.polls, args.moving))
+
+
+if __name__ == "__main__":
+    main()
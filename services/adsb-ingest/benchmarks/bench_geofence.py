@@ -0,0 +1,89 @@
+"""Geofence benchmark: grid-indexed lookups vs testing every fence.
+
+Run from ``services/adsb-ingest``::
+
+    python benchmarks/bench_geofence.py --aircraft 5000 --fences 300 --polls 10
+
+Fences are a mix of circles and 24-vertex polygons scattered over the area
+covered by the scaled sample traffic; every aircraft moves on every poll.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from adsb_proxy.geofence import Fence, FenceIndex, GeofenceMonitor  # noqa: E402
+from bench_push import scaled_snapshot  # noqa: E402
+
+
+class BruteForceIndex(FenceIndex):
+    """Exact tests against every fence, without the grid."""
+
+    def containing(self, lat: float, lon: float):
+        return frozenset(fence.slug for fence in self.fences if fence.contains(lat, lon))
+
+
+def make_fences(count: int, area: tuple, rng: random.Random) -> List[Fence]:
+    west, south, east, north = area
+    fences = []
+    for index in range(count):
+        lat = rng.uniform(south, north)
+        lon = rng.uniform(west, east)
+        radius_m = rng.uniform(2_000, 20_000)
+        if index % 2:
+            fences.append(Fence.circle(f"circle-{index}", "circle", lat, lon, radius_m))
+            continue
+        dlat = radius_m / 111_320
+        dlon = dlat / math.cos(math.radians(lat))
+        ring = [
+            [lon + dlon * math.cos(step * math.pi / 12), lat + dlat * math.sin(step * math.pi / 12)]
+            for step in range(24)
+        ]
+        fences.append(Fence.polygon(f"polygon-{index}", "polygon", [[ring]]))
+    return fences
+
+
+def run(count: int, fence_count: int, rounds: int) -> None:
+    aircraft = scaled_snapshot(count)["aircraft"]
+    lats = [record["lat"] for record in aircraft]
+    lons = [record["lon"] for record in aircraft]
+    area = (min(lons), min(lats), max(lons), max(lats))
+    fences = make_fences(fence_count, area, random.Random(1))
+    print(f"{count} aircraft, {fence_count} fences, {rounds} polls")
+    for label, index in (
+        ("brute force", BruteForceIndex(fences)),
+        ("grid index", FenceIndex(fences)),
+    ):
+        monitor = GeofenceMonitor(index)
+        snapshots = []
+        for poll in range(rounds):
+            snapshots.append(
+                [dict(record, lat=record["lat"] + 0.01 * poll) for record in aircraft]
+            )
+        transitions = 0
+        started = time.perf_counter()
+        for snapshot in snapshots:
+            transitions += len(monitor.update(snapshot))
+        elapsed = (time.perf_counter() - started) / rounds
+        print(f"  {label:12} {elapsed * 1000:8.2f} ms/poll ({transitions} transitions)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--aircraft", type=int, default=5000)
+    parser.add_argument("--fences", type=int, default=300)
+    parser.add_argument("--polls", type=int, default=10)
+    args = parser.parse_args()
+    run(args.aircraft, args.fences, args.polls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Push benchmark: one request per aircraft vs bounded concurrency vs batches.
+
+Run from ``services/adsb-ingest``::
+
+    python benchmarks/bench_push.py --aircraft 300 --latency-ms 20
+
+The ``tests/data`` sample is scaled up to ``--aircraft`` distinct hex ids,
+every aircraft changes between snapshots and each simulated backend request
+costs ``--latency-ms``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from adsb_proxy.config import Settings  # noqa: E402
+from adsb_proxy.proxy import AircraftProxy  # noqa: E402
+
+SAMPLE = ROOT / "tests" / "data" / "sample_aircraft.json"
+
+
+def scaled_snapshot(count: int) -> Dict[str, Any]:
+    """Repeat the sample aircraft with unique hex ids and spread positions."""
+
+    sample = json.loads(SAMPLE.read_text(encoding="utf-8"))
+    templates = sample["aircraft"]
+    aircraft = []
+    for index in range(count):
+        record = copy.deepcopy(templates[index % len(templates)])
+        record["hex"] = f"{index:06x}"
+        record["lat"] += (index // len(templates)) * 0.01
+        record["lon"] -= (index // len(templates)) * 0.01
+        aircraft.append(record)
+    return {"now": sample["now"], "aircraft": aircraft}
+
+
+async def run(label: str, settings: Settings, count: int, polls: int, latency: float) -> None:
+    requests = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal requests
+        requests += 1
+        await asyncio.sleep(latency)
+        return httpx.Response(201, json={"status": "ok"})
+
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url=settings.backend_base_url
+    )
+    proxy = AircraftProxy(settings, backend_client=client)
+    snapshot = scaled_snapshot(count)
+    started = time.perf_counter()
+    for poll in range(polls):
+        for record in snapshot["aircraft"]:
+            record["seen"] = poll * 0.5  # every aircraft changes
+        await proxy.ingest_snapshot(snapshot)
+    elapsed = time.perf_counter() - started
+    await proxy.stop()
+    print(
+        f"{label:>14}: {count * polls / elapsed:9.0f} aircraft/s "
+        f"{elapsed / polls * 1000:8.1f} ms/poll {requests:6d} requests"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--aircraft", type=int, default=300)
+    parser.add_argument("--polls", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=250)
+    args = parser.parse_args()
+
+    base = Settings(backend_base_url="http://backend", readsb_url=None)
+    modes = {
+        "sequential": dict(push_concurrency=1),
+        f"concurrent={args.concurrency}": dict(push_concurrency=args.concurrency),
+        f"batch={args.batch_size}": dict(
+            telemetry_batch_endpoint="/api/v1/telemetry/events/batch",
+            push_batch_size=args.batch_size,
+        ),
+    }
+    latency = args.latency_ms / 1000
+    for label, overrides in modes.items():
+        settings = replace(base, **overrides)
+        asyncio.run(run(label, settings, args.aircraft, args.polls, latency))
+
+
+if __name__ == "__main__":
+    main()
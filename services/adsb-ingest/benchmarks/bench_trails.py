@@ -0,0 +1,61 @@
+"""Trail store benchmark: memory and update cost for thousands of aircraft.
+
+Run from ``services/adsb-ingest``::
+
+    python benchmarks/bench_trails.py --aircraft 5000 --points 100
+
+Every aircraft moves on every poll until all trails are full, then one more
+poll is timed together with a bounding-box query.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from adsb_proxy.trails import TrailStore  # noqa: E402
+from bench_push import scaled_snapshot  # noqa: E402
+
+
+def run(count: int, points: int) -> None:
+    aircraft = scaled_snapshot(count)["aircraft"]
+    tracemalloc.start()
+    store = TrailStore(capacity=points, max_aircraft=count)
+    for poll in range(points):
+        for record in aircraft:
+            record["lat"] += 0.001
+        store.update(aircraft, now=float(poll))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    for record in aircraft:
+        record["lat"] += 0.001
+    started = time.perf_counter()
+    store.update(aircraft, now=float(points))
+    update = time.perf_counter() - started
+    lat, lon = aircraft[0]["lat"], aircraft[0]["lon"]
+    started = time.perf_counter()
+    trails = store.trails((lon - 0.5, lat - 0.5, lon + 0.5, lat + 0.5))
+    query = time.perf_counter() - started
+
+    print(f"{count} aircraft x {points} points")
+    print(f"  memory: {memory / 2**20:8.1f} MiB ({memory / count / 1024:.1f} KiB/aircraft)")
+    print(f"  update: {update * 1000:8.1f} ms/poll")
+    print(f"  bbox:   {query * 1000:8.1f} ms for {len(trails)} trails")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--aircraft", type=int, default=5000)
+    parser.add_argument("--points", type=int, default=100)
+    args = parser.parse_args()
+    run(args.aircraft, args.points)
+
+
+if __name__ == "__main__":
+    main()
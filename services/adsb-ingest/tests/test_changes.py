@@ -0,0 +1,89 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+from adsb_proxy.changes import ChangeDetector
+
+
+@pytest.fixture()
+def aircraft() -> list:
+    path = Path(__file__).parent / "data" / "sample_aircraft.json"
+    return json.loads(path.read_text(encoding="utf-8"))["aircraft"]
+
+
+def hexes(records):
+    return [record["hex"] for record in records]
+
+
+def test_seen_ticks_and_jitter_are_ignored(aircraft):
+    detector = ChangeDetector(position_m=1.0)
+    assert hexes(detector.collect(aircraft)) == ["abc123", "def456"]
+
+    ticked = copy.deepcopy(aircraft)
+    for record in ticked:
+        record["seen"] += 1.0
+        record["seen_pos"] = 3.0
+        record["lat"] += 0.000001  # ~11 cm
+    assert detector.collect(ticked) == []
+
+    ticked[1]["lat"] += 0.0001  # ~11 m
+    assert hexes(detector.collect(ticked)) == ["def456"]
+
+
+def test_thresholds_and_identity_fields(aircraft):
+    detector = ChangeDetector(altitude_ft=100, speed_kt=5, track_deg=2)
+    detector.collect(aircraft)
+
+    updated = copy.deepcopy(aircraft)
+    updated[0]["alt_baro"] += 25
+    updated[0]["gs"] += 1.0
+    updated[0]["track"] += 0.4
+    assert detector.collect(updated) == []
+
+    updated[0]["alt_baro"] = "ground"
+    updated[1]["squawk"] = "7700"
+    assert hexes(detector.collect(updated)) == ["abc123", "def456"]
+
+
+def test_reappearing_aircraft_counts_as_changed(aircraft):
+    detector = ChangeDetector()
+    detector.collect(aircraft)
+
+    assert detector.collect(aircraft[:1]) == []
+    assert hexes(detector.collect(aircraft)) == ["def456"]
+
+
+def test_departed_aircraft_are_evicted(aircraft):
+    detector = ChangeDetector()
+    template = aircraft[0]
+    for poll in range(50):
+        wave = [dict(template, hex=f"{poll:03x}{index:03x}") for index in range(20)]
+        assert len(detector.collect(wave)) == 20
+        assert len(detector) <= 2 * 20 + 64 + 20
+
+    detector.collect([])
+    assert len(detector) == 0
+
+
+def test_jitter_around_a_bucket_edge_is_not_reported(aircraft):
+    detector = ChangeDetector(position_m=1.0, altitude_ft=100)
+    record = dict(aircraft[0], lat=0.0000045, alt_baro=1050)  # 0.5 m / 50 ft: old bucket edges
+    detector.collect([record])
+
+    for poll in range(10):
+        sign = 1 if poll % 2 else -1
+        jittered = dict(record, lat=record["lat"] + sign * 0.0000009, alt_baro=1050 + sign)
+        assert detector.collect([jittered]) == []
+
+
+def test_slow_drift_is_reported_once_it_reaches_the_threshold(aircraft):
+    detector = ChangeDetector(altitude_ft=100)
+    record = dict(aircraft[0], alt_baro=1000)
+    detector.collect([record])
+
+    reported = []
+    for step in range(1, 26):
+        if detector.collect([dict(record, alt_baro=1000 + 10 * step)]):
+            reported.append(1000 + 10 * step)
+    assert reported == [1100, 1200]
@@ -0,0 +1,95 @@
+import httpx
+from adsb_proxy import main
+from adsb_proxy.config import Settings
+from adsb_proxy.delta import DeltaFeed
+from adsb_proxy.proxy import AircraftProxy
+from fastapi.testclient import TestClient
+
+
+def aircraft(hex_id, **fields):
+    return {"hex": hex_id, "lat": 1.0, "lon": 2.0, **fields}
+
+
+def test_diffs_merge_added_updated_and_removed():
+    feed = DeltaFeed(capacity=8)
+    a, b = aircraft("a"), aircraft("b")
+    feed.record(1, [a, b], {"a", "b"})
+    a2 = aircraft("a", lat=1.5, flight="TEST1")
+    c = aircraft("c")
+    feed.record(2, [a2, c], {"a", "b", "c"})
+    c2 = aircraft("c", lat=3.0)
+    feed.record(3, [c2], {"a", "c"})
+
+    diff = feed.since(1)
+    assert diff.version == 3
+    assert diff.added == {"c": c2}
+    assert diff.updated == {"a": {"lat": 1.5, "flight": "TEST1"}}
+    assert diff.removed == ("b",)
+
+    latest = feed.since(3)
+    assert (latest.added, latest.updated, latest.removed) == ({}, {}, ())
+
+    a3 = aircraft("a", lat=1.5)  # flight dropped
+    feed.record(4, [a3], {"a", "c"})
+    assert feed.since(3).updated == {"a": {"flight": None}}
+
+
+def test_removed_then_readded_aircraft_is_sent_in_full():
+    feed = DeltaFeed()
+    feed.record(1, [aircraft("a")], {"a"})
+    feed.record(2, [], set())
+    readded = aircraft("a", lat=9.0)
+    feed.record(3, [readded], {"a"})
+
+    diff = feed.since(1)
+    assert diff.added == {"a": readded}
+    assert diff.removed == ()
+
+
+def test_clients_too_far_behind_or_ahead_must_resync():
+    feed = DeltaFeed(capacity=2)
+    for version in range(1, 5):
+        feed.record(version, [aircraft("a", lat=float(version))], {"a"})
+
+    assert feed.since(2) is not None
+    assert feed.since(1) is None
+    assert feed.since(7) is None
+
+
+def _proxy() -> AircraftProxy:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(201, json={"status": "ok"})
+
+    backend_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://backend"
+    )
+    return AircraftProxy(
+        Settings(backend_base_url="http://backend", readsb_url=None),
+        backend_client=backend_client,
+    )
+
+
+def test_delta_endpoint_and_websocket(monkeypatch):
+    proxy = _proxy()
+    monkeypatch.setattr(main, "proxy", proxy)
+    first = {"now": 1, "aircraft": [aircraft("a"), aircraft("b")]}
+    second = {"now": 2, "aircraft": [aircraft("a", lat=1.5, seen=0.2)]}
+
+    with TestClient(main.app) as client:
+        client.portal.call(proxy.ingest_snapshot, first)
+
+        resync = client.get("/aircraft/delta").json()
+        assert resync["resync"] is True
+        assert resync["version"] == 1
+        assert resync["aircraft"] == first["aircraft"]
+
+        with client.websocket_connect("/aircraft/delta/ws?since=1") as websocket:
+            client.portal.call(proxy.ingest_snapshot, second)
+            pushed = websocket.receive_json()
+
+        assert pushed["version"] == 2
+        assert pushed["updated"] == [{"hex": "a", "lat": 1.5, "seen": 0.2}]
+        assert pushed["removed"] == ["b"]
+        assert client.get("/aircraft/delta?since=1").json() == pushed
+        assert client.get("/aircraft/delta?since=2").json()["updated"] == []
+        assert client.get("/aircraft/delta?since=99").json()["resync"] is True
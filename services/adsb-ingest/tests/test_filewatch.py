@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from adsb_proxy.config import Settings
+from adsb_proxy.filewatch import INOTIFY, STAT, FileWatcher
+from adsb_proxy.proxy import AircraftProxy
+
+
+def write_atomically(path, snapshot):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(snapshot))
+    os.replace(tmp, path)
+
+
+def test_unchanged_file_is_skipped(tmp_path):
+    path = tmp_path / "aircraft.json"
+    write_atomically(path, {"aircraft": [{"hex": "abc123"}]})
+    watcher = FileWatcher(path, use_inotify=False)
+    assert watcher.mode == STAT
+
+    data, signature = watcher.read()
+    assert json.loads(data)["aircraft"][0]["hex"] == "abc123"
+    watcher.commit(signature)
+    assert watcher.read() is None
+    assert watcher.read() is None
+    assert (watcher.reads, watcher.skipped_polls) == (1, 2)
+
+    # Same size and content, but a new inode from readsb's rename.
+    write_atomically(path, {"aircraft": [{"hex": "abc123"}]})
+    assert watcher.read() is not None
+
+
+def test_uncommitted_content_is_read_again(tmp_path):
+    path = tmp_path / "aircraft.json"
+    path.write_text('{"aircraft": [')
+    watcher = FileWatcher(path, use_inotify=False)
+    assert watcher.read() is not None
+    assert watcher.read() is not None
+    assert watcher.skipped_polls == 0
+
+
+def test_missing_file_raises(tmp_path):
+    watcher = FileWatcher(tmp_path / "aircraft.json", use_inotify=False)
+    with pytest.raises(FileNotFoundError):
+        watcher.read()
+
+
+async def _run_inotify_wait(tmp_path):
+    path = tmp_path / "aircraft.json"
+    write_atomically(path, {"aircraft": []})
+    watcher = FileWatcher(path)
+    if watcher.mode != INOTIFY:
+        watcher.close()
+        pytest.skip("inotify not available")
+    try:
+        started = time.monotonic()
+        await watcher.wait(0.05)  # nothing happens: waits out the timeout
+        assert time.monotonic() - started >= 0.04
+
+        async def rewrite():
+            await asyncio.sleep(0.05)
+            write_atomically(path, {"aircraft": [{"hex": "abc123"}]})
+
+        writer = asyncio.create_task(rewrite())
+        started = time.monotonic()
+        await watcher.wait(5.0)
+        assert time.monotonic() - started < 2.0
+        await writer
+    finally:
+        watcher.close()
+
+
+def test_inotify_wakes_on_rewrite(tmp_path):
+    asyncio.run(_run_inotify_wait(tmp_path))
+
+
+async def _run_proxy_file_reads(tmp_path):
+    path = tmp_path / "aircraft.json"
+    write_atomically(path, {"now": 1, "aircraft": [{"hex": "abc123", "lat": 1.0, "lon": 2.0}]})
+    settings = Settings(backend_base_url="http://backend", readsb_url=None, readsb_file=str(path))
+    proxy = AircraftProxy(settings)
+    try:
+        snapshot = await proxy._fetch_snapshot()
+        assert snapshot["aircraft"][0]["hex"] == "abc123"
+        assert await proxy._fetch_snapshot() is None
+
+        # A partial write is ignored and retried until it parses.
+        path.write_text('{"now": 2, "aircraft": [{"hex": "abc')
+        assert await proxy._fetch_snapshot() is None
+        assert "Invalid aircraft.json" in proxy.health().error
+        path.write_text('{"now": 2, "aircraft": [{"hex": "def456"}]}')
+        snapshot = await proxy._fetch_snapshot()
+        assert snapshot["aircraft"][0]["hex"] == "def456"
+
+        file_watch = proxy.health().file_watch
+        assert file_watch["reads"] == 3
+        assert file_watch["skipped_polls"] == 1
+    finally:
+        await proxy.stop()
+
+
+def test_proxy_reads_file_only_when_changed(tmp_path):
+    asyncio.run(_run_proxy_file_reads(tmp_path))
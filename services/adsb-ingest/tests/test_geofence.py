@@ -0,0 +1,198 @@
+import asyncio
+import json
+import math
+import random
+
+import httpx
+import pytest
+from adsb_proxy import main
+from adsb_proxy.config import Settings
+from adsb_proxy.geofence import (
+    EARTH_RADIUS_M,
+    ENTER,
+    EXIT,
+    Fence,
+    FenceIndex,
+    GeofenceMonitor,
+    fence_from_overlay,
+    fences_from_overlays,
+)
+from adsb_proxy.proxy import AircraftProxy
+from fastapi.testclient import TestClient
+
+SQUARE = [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.0, 0.0]]
+HOLE = [[0.4, 0.4], [0.6, 0.4], [0.6, 0.6], [0.4, 0.6], [0.4, 0.4]]
+
+
+def overlay(slug, geometry, **extra):
+    configuration = {"geometry": geometry, **extra}
+    return {"slug": slug, "name": slug.title(), "overlay_type": "geofence", "configuration": configuration}
+
+
+def test_polygon_with_hole_and_circle():
+    donut = Fence.polygon("donut", "Donut", [[SQUARE, HOLE]])
+    assert donut.contains(0.2, 0.2)
+    assert not donut.contains(0.5, 0.5)
+    assert not donut.contains(1.5, 0.5)
+    assert donut.bbox == (0.0, 0.0, 1.0, 1.0)
+
+    circle = Fence.circle("tower", "Tower", 51.47, -0.45, 5_000)
+    assert circle.contains(51.47, -0.45)
+    assert circle.contains(51.50, -0.45)  # ~3.3 km north
+    assert not circle.contains(51.52, -0.45)  # ~5.6 km north
+    assert circle.kind == "circle" and donut.kind == "polygon"
+
+
+def _destination(lat, lon, bearing, distance_m):
+    angle = distance_m / EARTH_RADIUS_M
+    phi, lam, theta = math.radians(lat), math.radians(lon), math.radians(bearing)
+    phi2 = math.asin(
+        math.sin(phi) * math.cos(angle) + math.cos(phi) * math.sin(angle) * math.cos(theta)
+    )
+    lam2 = lam + math.atan2(
+        math.sin(theta) * math.sin(angle) * math.cos(phi),
+        math.cos(angle) - math.sin(phi) * math.sin(phi2),
+    )
+    return math.degrees(phi2), (math.degrees(lam2) + 540.0) % 360.0 - 180.0
+
+
+@pytest.mark.parametrize(
+    "lat, lon, radius_m",
+    [(0.0, 0.0, 10_000), (60.0, 10.0, 50_000), (-75.0, 179.9, 80_000), (89.5, 0.0, 100_000)],
+)
+def test_circle_bbox_covers_the_whole_circle(lat, lon, radius_m):
+    circle = Fence.circle("c", "C", lat, lon, radius_m)
+    index = FenceIndex([circle], cell_degrees=0.1)
+    for bearing in range(0, 360, 5):
+        point = _destination(lat, lon, bearing, radius_m - 1.0)
+        assert circle.contains(*point), (bearing, point)
+        assert index.containing(*point) == {"c"}
+        assert not circle.contains(*_destination(lat, lon, bearing, radius_m + 1.0))
+
+
+def test_circle_at_equator_contains_point_just_inside_the_edge():
+    circle = Fence.circle("c", "C", 0.0, 0.0, 10_000)
+    assert circle.contains(9_993 / EARTH_RADIUS_M * 180 / math.pi, 0.0)
+
+
+def test_fences_from_overlays():
+    overlays = [
+        overlay("square", {"type": "Polygon", "coordinates": [SQUARE]}),
+        overlay("multi", {"type": "MultiPolygon", "coordinates": [[SQUARE], [HOLE]]}),
+        overlay("tower", {"type": "Point", "coordinates": [-0.45, 51.47]}, radius_m=5000),
+        overlay("no-radius", {"type": "Point", "coordinates": [-0.45, 51.47]}),
+        overlay("line", {"type": "LineString", "coordinates": SQUARE}),
+        {**overlay("inactive", {"type": "Polygon", "coordinates": [SQUARE]}), "is_active": False},
+        {**overlay("sensors", {"type": "Polygon", "coordinates": [SQUARE]}), "overlay_type": "map"},
+    ]
+    fences = fences_from_overlays(overlays, "geofence")
+    assert [fence.slug for fence in fences] == ["square", "multi", "tower"]
+
+    bare = {"slug": "bare", "configuration": {"type": "Polygon", "coordinates": [SQUARE]}}
+    assert fence_from_overlay(bare).contains(0.5, 0.5)
+    with pytest.raises(ValueError):
+        fence_from_overlay({"slug": "bad", "configuration": {"type": "Polygon", "coordinates": [[[0, 0]]]}})
+
+
+def test_grid_index_matches_exact_tests():
+    rng = random.Random(7)
+    fences = [
+        Fence.circle(f"c{i}", "c", rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(1e3, 8e4))
+        for i in range(40)
+    ]
+    fences.append(Fence.polygon("large", "large", [[[[-60, -60], [60, -60], [0, 60]]]]))
+    index = FenceIndex(fences, cell_degrees=0.1)
+    for _ in range(2000):
+        lat, lon = rng.uniform(-6, 6), rng.uniform(-6, 6)
+        expected = {fence.slug for fence in fences if fence.contains(lat, lon)}
+        assert index.containing(lat, lon) == expected
+
+
+def test_monitor_reports_entry_and_exit_once():
+    square = Fence.polygon("square", "Square", [[SQUARE]])
+    monitor = GeofenceMonitor(FenceIndex([square]))
+
+    def kinds(aircraft):
+        return [(t.record["hex"], t.fence.slug, t.kind) for t in monitor.update(aircraft)]
+
+    assert kinds([{"hex": "a", "lat": 2.0, "lon": 2.0}]) == []
+    assert kinds([{"hex": "a", "lat": 0.5, "lon": 0.5}]) == [("a", "square", ENTER)]
+    assert kinds([{"hex": "a", "lat": 0.6, "lon": 0.5}]) == []
+    assert kinds([{"hex": "a"}]) == []  # no position: membership kept
+    assert monitor.inside() == {"square": ["a"]}
+    assert kinds([{"hex": "a", "lat": 1.5, "lon": 0.5}]) == [("a", "square", EXIT)]
+
+    # Dropping out of the snapshot is not an exit; reappearing inside enters.
+    assert kinds([{"hex": "b", "lat": 0.5, "lon": 0.5}]) == [("b", "square", ENTER)]
+    assert kinds([]) == []
+    assert kinds([{"hex": "b", "lat": 0.5, "lon": 0.5}]) == [("b", "square", ENTER)]
+
+    # Removing a fence forgets its members without events.
+    monitor.set_index(FenceIndex([]))
+    assert kinds([{"hex": "b", "lat": 0.5, "lon": 0.5}]) == []
+
+
+async def _run_proxy_geofence_events():
+    events = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(
+                200,
+                json=[
+                    overlay("square", {"type": "Polygon", "coordinates": [SQUARE]}),
+                    {"slug": "map", "overlay_type": "map", "configuration": {}},
+                ],
+            )
+        events.append(json.loads(request.content))
+        return httpx.Response(201, json={"status": "ok"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://backend")
+    settings = Settings(
+        backend_base_url="http://backend", readsb_url=None, geofence_url="/overlays"
+    )
+    proxy = AircraftProxy(settings, backend_client=client)
+    assert await proxy.load_geofences()
+    assert [fence["slug"] for fence in proxy.geofences()] == ["square"]
+
+    await proxy.ingest_snapshot({"aircraft": [{"hex": "abc123", "lat": 2.0, "lon": 0.5}]})
+    await proxy.ingest_snapshot({"aircraft": [{"hex": "abc123", "lat": 0.5, "lon": 0.5}]})
+    await proxy.ingest_snapshot({"aircraft": [{"hex": "abc123", "lat": -1.0, "lon": 0.5}]})
+    statuses = [event["status"] for event in events]
+    assert statuses == [
+        "received",
+        "received",
+        "geofence_enter",
+        "received",
+        "geofence_exit",
+    ]
+    assert events[2]["payload"]["geofence"] == {
+        "slug": "square",
+        "name": "Square",
+        "transition": "enter",
+    }
+    return proxy
+
+
+def test_proxy_pushes_geofence_transitions(monkeypatch):
+    proxy = asyncio.run(_run_proxy_geofence_events())
+    monkeypatch.setattr(main, "proxy", proxy)
+    response = TestClient(main.app).get("/geofences")
+    assert response.status_code == 200
+    assert response.json()["geofences"][0]["aircraft"] == []
+
+
+def test_geofence_file_is_loaded(tmp_path):
+    path = tmp_path / "overlays.json"
+    path.write_text(
+        json.dumps({"overlays": [overlay("square", {"type": "Polygon", "coordinates": [SQUARE]})]})
+    )
+    proxy = AircraftProxy(
+        Settings(backend_base_url="http://backend", readsb_url=None, geofence_file=path)
+    )
+    assert asyncio.run(proxy.load_geofences())
+    assert proxy.geofences()[0]["kind"] == "polygon"
+
+    path.write_text("not json")
+    assert not asyncio.run(proxy.load_geofences())
+    assert [fence["slug"] for fence in proxy.geofences()] == ["square"]
@@ -92,3 +92,91 @@ async def _run_snapshot_without_aircraft_is_handled():
 
 def test_snapshot_without_aircraft_is_handled():
     asyncio.run(_run_snapshot_without_aircraft_is_handled())
+
+
+def _scaled_snapshot(sample_snapshot: dict, count: int) -> dict:
+    template = sample_snapshot["aircraft"][0]
+    aircraft = []
+    for index in range(count):
+        record = dict(template)
+        record["hex"] = f"{index:06x}"
+        record["lat"] = template["lat"] + index * 0.001
+        aircraft.append(record)
+    return {"now": sample_snapshot["now"], "aircraft": aircraft}
+
+
+async def _run_batch_mode_chunks_changed_aircraft(sample_snapshot):
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(201, json={"status": "ok"})
+
+    transport = httpx.MockTransport(handler)
+    backend_client = httpx.AsyncClient(transport=transport, base_url="http://backend")
+    settings = Settings(
+        backend_base_url="http://backend",
+        telemetry_batch_endpoint="/api/v1/telemetry/events/batch",
+        telemetry_source_slug="adsb-test",
+        push_batch_size=4,
+        readsb_url=None,
+    )
+    proxy = AircraftProxy(settings, backend_client=backend_client)
+
+    await proxy.ingest_snapshot(_scaled_snapshot(sample_snapshot, 10))
+
+    assert [path for path, _ in requests] == ["/api/v1/telemetry/events/batch"] * 3
+    assert [len(body["events"]) for _, body in requests] == [4, 4, 2]
+    assert requests[0][1]["events"][0]["source_slug"] == "adsb-test"
+    assert proxy.health().last_push is not None
+
+    await proxy.stop()
+
+
+def test_batch_mode_chunks_changed_aircraft(sample_snapshot):
+    asyncio.run(_run_batch_mode_chunks_changed_aircraft(sample_snapshot))
+
+
+async def _run_unsupported_batch_endpoint_falls_back(sample_snapshot):
+    paths = []
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        paths.append(request.url.path)
+        if request.url.path.endswith("/batch"):
+            return httpx.Response(404)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(201, json={"status": "ok"})
+
+    transport = httpx.MockTransport(handler)
+    backend_client = httpx.AsyncClient(transport=transport, base_url="http://backend")
+    settings = Settings(
+        backend_base_url="http://backend",
+        telemetry_batch_endpoint="/api/v1/telemetry/events/batch",
+        push_concurrency=3,
+        readsb_url=None,
+    )
+    proxy = AircraftProxy(settings, backend_client=backend_client)
+
+    snapshot = _scaled_snapshot(sample_snapshot, 10)
+    await proxy.ingest_snapshot(snapshot)
+    assert paths.count("/api/v1/telemetry/events/batch") == 1
+    assert paths.count("/api/v1/telemetry/events") == 10
+    assert peak == 3
+
+    # Batch mode stays off once the backend rejected it.
+    snapshot["aircraft"][0]["gs"] = 450.0
+    await proxy.ingest_snapshot(snapshot)
+    assert paths[-1] == "/api/v1/telemetry/events"
+    assert paths.count("/api/v1/telemetry/events/batch") == 1
+
+    await proxy.stop()
+
+
+def test_unsupported_batch_endpoint_falls_back(sample_snapshot):
+    asyncio.run(_run_unsupported_batch_endpoint_falls_back(sample_snapshot))
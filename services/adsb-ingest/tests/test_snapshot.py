@@ -0,0 +1,73 @@
+import asyncio
+import gzip
+import json
+
+import httpx
+from adsb_proxy import main
+from adsb_proxy.config import Settings
+from adsb_proxy.proxy import AircraftProxy
+from adsb_proxy.snapshot import EncodedSnapshot
+from fastapi.testclient import TestClient
+
+
+def test_encoded_snapshot_variants_and_etag():
+    snapshot = {"now": 1, "aircraft": [{"hex": "abc123", "lat": 1.5}]}
+    encoded = EncodedSnapshot.build(snapshot, version=3)
+
+    assert json.loads(encoded.body) == snapshot
+    assert gzip.decompress(encoded.gzip) == encoded.body
+    assert encoded.etag.startswith('W/"')
+    assert EncodedSnapshot.build(snapshot, version=4).etag == encoded.etag
+    assert EncodedSnapshot.build({"aircraft": []}, version=4).etag != encoded.etag
+
+    assert encoded.matches(encoded.etag)
+    assert encoded.matches(f'"other", {encoded.etag.removeprefix("W/")}')
+    assert encoded.matches("*")
+    assert not encoded.matches('"other"')
+    assert not encoded.matches(None)
+
+
+def test_select_honours_accept_encoding():
+    encoded = EncodedSnapshot.build({"aircraft": []}, version=1)
+
+    assert encoded.select(None) == (encoded.body, None)
+    assert encoded.select("gzip, deflate") == (encoded.gzip, "gzip")
+    assert encoded.select("gzip;q=0, identity") == (encoded.body, None)
+    assert encoded.select("*")[1] in {"gzip", "br"}
+    if encoded.brotli is not None:
+        assert encoded.select("gzip, br") == (encoded.brotli, "br")
+    else:
+        assert encoded.select("br") == (encoded.body, None)
+
+
+def test_aircraft_endpoint_serves_cached_bytes_and_304(monkeypatch):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(201, json={"status": "ok"})
+
+    backend_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://backend"
+    )
+    proxy = AircraftProxy(
+        Settings(backend_base_url="http://backend", readsb_url=None),
+        backend_client=backend_client,
+    )
+    snapshot = {"now": 1, "aircraft": [{"hex": "abc123", "lat": 1.5, "lon": 2.5}]}
+    asyncio.run(proxy.ingest_snapshot(snapshot))
+    monkeypatch.setattr(main, "proxy", proxy)
+    client = TestClient(main.app)
+
+    response = client.get("/aircraft.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == snapshot
+    etag = response.headers["etag"]
+
+    response = client.get("/aircraft.json", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    asyncio.run(proxy.ingest_snapshot({"now": 2, "aircraft": []}))
+    response = client.get("/aircraft.json", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == {"now": 2, "aircraft": []}
+    assert proxy.encoded_snapshot.version == 2
@@ -0,0 +1,252 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from adsb_proxy.config import Settings
+from adsb_proxy.proxy import AircraftProxy
+from adsb_proxy.stream import (
+    AircraftTracker,
+    BeastFramer,
+    StreamReplayServer,
+    StreamSource,
+    cpr_global,
+    parse_stream_url,
+)
+
+DATA = Path(__file__).parent / "data"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def by_hex(snapshot):
+    return {record["hex"]: record for record in snapshot["aircraft"]}
+
+
+def test_parse_stream_url():
+    assert parse_stream_url("sbs://readsb") == ("sbs", "readsb", 30003)
+    assert parse_stream_url("beast://10.0.0.2:31005") == ("beast", "10.0.0.2", 31005)
+    for invalid in ("readsb:30003", "http://readsb:30003", "sbs://", "beast://readsb:port"):
+        with pytest.raises(ValueError):
+            parse_stream_url(invalid)
+
+
+def test_beast_frames_survive_arbitrary_chunking():
+    data = (DATA / "sample.beast").read_bytes()
+    whole = BeastFramer().feed(data)
+    assert len(whole) == 8
+    assert whole[2][2] == 0x1A  # escaped signal byte
+
+    for size in (1, 3, 7, 22):
+        framer = BeastFramer()
+        frames = []
+        for start in range(0, len(data), size):
+            frames.extend(framer.feed(data[start : start + size]))
+        assert frames == whole
+
+    # Garbage before a frame is skipped.
+    assert BeastFramer().feed(b"\x00\x1a\x00" + data)[:1] == whole[:1]
+
+
+def test_cpr_global_decoding():
+    even, odd = (93000, 51372), (74158, 50194)
+    latitude, longitude = cpr_global(even, odd, latest_odd=False)
+    assert latitude == pytest.approx(52.25720, abs=1e-5)
+    assert longitude == pytest.approx(3.91937, abs=1e-5)
+
+
+def test_beast_messages_update_tracked_aircraft():
+    tracker = AircraftTracker()
+    for kind, message, _ in BeastFramer().feed((DATA / "sample.beast").read_bytes()):
+        if kind != 0x31:
+            tracker.apply_mode_s(message)
+
+    aircraft = by_hex(tracker.snapshot())
+    assert set(aircraft) == {"4840d6", "40621d", "485020"}
+    assert aircraft["4840d6"]["flight"] == "KLM1023"
+    assert aircraft["40621d"]["lat"] == pytest.approx(52.26578, abs=1e-5)
+    assert aircraft["40621d"]["lon"] == pytest.approx(3.93891, abs=1e-5)
+    assert aircraft["40621d"]["alt_baro"] == 37000
+    assert aircraft["40621d"]["squawk"] == "7700"
+    assert aircraft["485020"]["gs"] == pytest.approx(159.2, abs=0.1)
+    assert aircraft["485020"]["track"] == pytest.approx(182.88, abs=0.01)
+    assert aircraft["485020"]["baro_rate"] == -832
+
+    corrupted = bytearray.fromhex("8D4840D6202CC371C32CE0576098")
+    corrupted[5] ^= 0x01
+    assert not tracker.apply_mode_s(bytes(corrupted))
+
+
+def test_sbs_lines_update_state_and_aircraft_expire():
+    clock = FakeClock()
+    tracker = AircraftTracker(expiry=60.0, clock=clock)
+    changed = [tracker.apply_sbs(line) for line in (DATA / "sample.sbs").read_text().splitlines()]
+    assert changed == [True, True, True, True, True, False]
+    assert not tracker.apply_sbs((DATA / "sample.sbs").read_text().splitlines()[3])
+
+    clock.now += 30.0
+    aircraft = by_hex(tracker.snapshot())
+    assert aircraft["a1b2c3"] == {
+        "hex": "a1b2c3",
+        "flight": "UAL123",
+        "alt_baro": 35000,
+        "lat": 37.6188,
+        "lon": -122.37541,
+        "gs": 452.1,
+        "track": 181.5,
+        "baro_rate": -640,
+        "squawk": "1200",
+        "messages": 5,
+        "seen": 30.0,
+        "seen_pos": 30.0,
+    }
+    assert aircraft["d4e5f6"]["alt_baro"] == "ground"
+
+    clock.now += 31.0
+    assert tracker.snapshot()["aircraft"] == []
+    assert len(tracker) == 0
+
+
+async def _run_replay(url: str, expected: set) -> set:
+    pushed = set()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        pushed.add(json.loads(request.content)["payload"]["hex"])
+        return httpx.Response(201, json={"status": "ok"})
+
+    backend_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://backend"
+    )
+    settings = Settings(
+        backend_base_url="http://backend",
+        readsb_url=None,
+        readsb_stream=url,
+        stream_min_interval=0.01,
+        poll_interval_seconds=0.05,
+    )
+    proxy = AircraftProxy(settings, backend_client=backend_client)
+    await proxy.start()
+    try:
+        for _ in range(300):
+            if pushed >= expected:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await proxy.stop()
+    return pushed
+
+
+@pytest.mark.parametrize(
+    "recording, kind, chunk_size, expected",
+    [
+        ("sample.beast", "beast", 5, {"4840d6", "40621d", "485020"}),
+        ("sample.sbs", "sbs", 17, {"a1b2c3", "d4e5f6"}),
+    ],
+)
+def test_recorded_stream_is_replayed_and_pushed(recording, kind, chunk_size, expected):
+    data = (DATA / recording).read_bytes()
+    with StreamReplayServer(data, chunk_size=chunk_size) as server:
+        pushed = asyncio.run(_run_replay(server.url(kind), expected))
+
+    assert pushed == expected
+
+
+async def _run_source_through_overlong_line():
+    connections = 0
+
+    async def serve(reader, writer):
+        nonlocal connections
+        connections += 1
+        if connections == 1:
+            writer.write(b"MSG," + b"x" * 70_000 + b"\n")
+        writer.write(b"MSG,3,1,1,A1B2C3,1,,,,,,,,51.5,-0.1,,,,,,0\n")
+        await writer.drain()
+        await asyncio.sleep(1)
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    tracker = AircraftTracker()
+    source = StreamSource(f"sbs://127.0.0.1:{port}", tracker, reconnect_initial=0.01)
+    task = asyncio.create_task(source.run())
+    try:
+        await asyncio.wait_for(source.changed.wait(), timeout=5)
+    finally:
+        task.cancel()
+        server.close()
+    return source, tracker, connections
+
+
+def test_overlong_line_reconnects_instead_of_stopping():
+    source, tracker, connections = asyncio.run(_run_source_through_overlong_line())
+
+    assert connections == 2
+    assert "unreadable" in source.last_error
+    assert "a1b2c3" in by_hex(tracker.snapshot())
+
+
+def test_undecodable_messages_are_skipped(monkeypatch):
+    tracker = AircraftTracker()
+    source = StreamSource("sbs://127.0.0.1:30003", tracker)
+    lines = [b"bad\n", b"MSG,3,1,1,A1B2C3,1,,,,,,,,51.5,-0.1,,,,,,0\n"]
+    apply_sbs = tracker.apply_sbs
+
+    def flaky(line):
+        if line == "bad\n":
+            raise IndexError("truncated")
+        return apply_sbs(line)
+
+    monkeypatch.setattr(tracker, "apply_sbs", flaky)
+
+    async def read():
+        reader = asyncio.StreamReader()
+        for line in lines:
+            reader.feed_data(line)
+        reader.feed_eof()
+        await source._read(reader)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(read())
+    assert source.decode_errors == 1
+    assert source.changed.is_set()
+
+
+def test_stream_loop_restarts_a_failed_reader(monkeypatch):
+    runs = []
+
+    async def run(self):
+        runs.append(self)
+        if len(runs) == 1:
+            raise RuntimeError("boom")
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(StreamSource, "run", run)
+
+    async def scenario():
+        settings = Settings(
+            backend_base_url="http://backend",
+            readsb_url=None,
+            readsb_stream="sbs://127.0.0.1:30003",
+            poll_interval_seconds=0.01,
+        )
+        proxy = AircraftProxy(settings, backend_client=httpx.AsyncClient())
+        await proxy.start()
+        try:
+            for _ in range(100):
+                if len(runs) >= 2:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await proxy.stop()
+        return proxy
+
+    proxy = asyncio.run(scenario())
+    assert len(runs) == 2
+    assert "boom" in proxy._last_error
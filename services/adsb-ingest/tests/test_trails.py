@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import pytest
+from adsb_proxy import main
+from adsb_proxy.config import Settings
+from adsb_proxy.proxy import AircraftProxy
+from adsb_proxy.trails import Trail, TrailStore, parse_bbox
+from fastapi.testclient import TestClient
+
+
+def test_trail_ring_buffer_keeps_latest_points():
+    trail = Trail(3)
+    for step in range(5):
+        assert trail.append(float(step), 10.0 + step, 20.0, 1000.0 * step, 90.0)
+    assert not trail.append(5.0, 14.0, 20.0, 0.0, 0.0)  # has not moved
+    assert len(trail) == 3
+    assert [point[0] for point in trail.points()] == [2.0, 3.0, 4.0]
+    assert trail.points()[-1] == [4.0, 14.0, 20.0, 4000.0, 90.0]
+    assert [point[0] for point in trail.points(since=2.0)] == [3.0, 4.0]
+    assert trail.latest() == (14.0, 20.0)
+
+
+def test_store_records_positions_and_expires_aircraft():
+    store = TrailStore(capacity=10, expiry=60.0)
+    store.update(
+        [
+            {"hex": "abc123", "lat": 1.0, "lon": 2.0, "alt_baro": "ground", "seen_pos": 0.5},
+            {"hex": "def456", "lat": 3.0, "lon": 4.0, "alt_baro": 9000, "track": 45.25},
+            {"hex": "nopos1", "alt_baro": 1000},
+        ],
+        now=1000.0,
+    )
+    assert len(store) == 2 and "nopos1" not in store
+    assert store.trail("ABC123")["points"] == [[999.5, 1.0, 2.0, None, None]]
+    assert store.trail("def456")["points"] == [[1000.0, 3.0, 4.0, 9000.0, 45.2]]
+
+    # abc123 keeps being reported without a position; def456 disappears.
+    store.update([{"hex": "abc123"}], now=1050.0)
+    store.update([{"hex": "abc123"}], now=1070.0)
+    assert "abc123" in store
+    assert store.trail("def456") is None
+    assert store.trail("abc123")["last_seen"] == 1070.0
+
+
+def test_store_drops_least_recently_seen_beyond_limit():
+    store = TrailStore(capacity=4, max_aircraft=2)
+    store.update([{"hex": "a", "lat": 0.0, "lon": 0.0}], now=1.0)
+    store.update([{"hex": "b", "lat": 0.0, "lon": 0.0}], now=2.0)
+    store.update([{"hex": "a", "lat": 1.0, "lon": 0.0}], now=3.0)
+    store.update([{"hex": "c", "lat": 0.0, "lon": 0.0}], now=4.0)
+    assert "a" in store and "c" in store and "b" not in store
+
+
+def test_trails_filtered_by_latest_position():
+    store = TrailStore()
+    store.update(
+        [
+            {"hex": "inside", "lat": 51.5, "lon": -0.1},
+            {"hex": "outside", "lat": 48.8, "lon": 2.3},
+            {"hex": "pacific", "lat": 10.0, "lon": 179.5},
+        ],
+        now=1.0,
+    )
+    london = parse_bbox("-1,51,1,52")
+    assert [trail["hex"] for trail in store.trails(london)] == ["inside"]
+    across_antimeridian = parse_bbox("170,0,-170,20")
+    assert [trail["hex"] for trail in store.trails(across_antimeridian)] == ["pacific"]
+    for invalid in ("1,2,3", "a,b,c,d", "0,10,1,5", "0,0,200,1"):
+        with pytest.raises(ValueError):
+            parse_bbox(invalid)
+
+
+def test_trail_endpoints(monkeypatch):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(201, json={"status": "ok"})
+
+    backend_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://backend"
+    )
+    proxy = AircraftProxy(
+        Settings(backend_base_url="http://backend", readsb_url=None),
+        backend_client=backend_client,
+    )
+    for now, lat in ((100, 51.50), (102, 51.52), (104, 51.54)):
+        snapshot = {"now": now, "aircraft": [{"hex": "abc123", "lat": lat, "lon": 0.0}]}
+        asyncio.run(proxy.ingest_snapshot(snapshot))
+    monkeypatch.setattr(main, "proxy", proxy)
+    client = TestClient(main.app)
+
+    response = client.get("/aircraft/abc123/trail")
+    assert response.status_code == 200
+    assert [point[1] for point in response.json()["points"]] == [51.50, 51.52, 51.54]
+    response = client.get("/aircraft/abc123/trail", params={"since": 102})
+    assert [point[0] for point in response.json()["points"]] == [104]
+    assert client.get("/aircraft/000000/trail").status_code == 404
+
+    response = client.get("/trails", params={"bbox": "-1,51,1,52"})
+    assert [trail["hex"] for trail in response.json()["trails"]] == ["abc123"]
+    assert client.get("/trails", params={"bbox": "-1,53,1,54"}).json()["trails"] == []
+    assert client.get("/trails", params={"bbox": "nonsense"}).status_code == 400
+    assert client.get("/trails").status_code == 422
@@ -0,0 +1,89 @@
+"""CPU benchmark: raw NMEA parsing + epoch fusion vs consuming gpsd JSON.
+
+Run from ``services/gps-ingest``::
+
+    python benchmarks/bench_gpsd.py --seconds 3600
+
+Both paths turn the same simulated hour of 1 Hz fixes into ``GPSFix``
+objects: the NMEA path parses RMC/VTG/GGA/GSA/3xGSV per epoch and fuses them,
+the gpsd path decodes one TPV and one SKY report per epoch. Only this
+process's CPU time is measured; gpsd's own parsing cost moves to the gpsd
+daemon, which is usually already running for chrony.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_parser import synthetic_log  # noqa: E402
+
+from gps_ingest.config import Config  # noqa: E402
+from gps_ingest.gpsd import GpsdReader  # noqa: E402
+from gps_ingest.pipeline import PipelineMetrics  # noqa: E402
+from gps_ingest.reader import FixReader  # noqa: E402
+
+
+def gpsd_log(seconds: int) -> List[bytes]:
+    lines = []
+    for second in range(seconds):
+        clock = f"{12 + second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+        stamp = f"2024-05-01T{clock}.000Z"
+        tpv = {
+            "class": "TPV",
+            "device": "/dev/ttyACM0",
+            "mode": 3,
+            "time": stamp,
+            "ept": 0.005,
+            "lat": 48.1173 + second * 1e-6,
+            "lon": 11.5167,
+            "altHAE": 592.3,
+            "altMSL": 545.4,
+            "track": 84.4,
+            "speed": 11.5,
+            "climb": 0.0,
+            "eph": 3.2,
+            "epv": 5.1,
+        }
+        sky = {"class": "SKY", "device": "/dev/ttyACM0", "hdop": 0.9, "vdop": 1.4, "pdop": 1.6}
+        for report in (tpv, sky):
+            lines.append(json.dumps(report, separators=(",", ":")).encode() + b"\n")
+    return lines
+
+
+def measure(label: str, reader: FixReader, lines: List[bytes], seconds: int) -> float:
+    started = time.process_time()
+    fixes = 0
+    for line in lines:
+        fixes += len(reader.feed(line))
+    fixes += len(reader.flush())
+    cpu = time.process_time() - started
+    print(
+        f"{label:>5}: {len(lines):7d} lines {fixes:6d} fixes "
+        f"{cpu * 1000:8.1f} ms CPU {cpu / max(fixes, 1) * 1e6:7.1f} us/fix "
+        f"({cpu / seconds * 100:.3f}% of one core at 1 Hz)"
+    )
+    return cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=3600)
+    args = parser.parse_args()
+    config = Config(serial_port="bench", baud_rate=9600, api_url="http://localhost", api_token=None)
+
+    nmea_reader = FixReader(config, PipelineMetrics())
+    gpsd_reader = GpsdReader(config, PipelineMetrics())
+    nmea = measure("nmea", nmea_reader, synthetic_log(args.seconds), args.seconds)
+    gpsd = measure("gpsd", gpsd_reader, gpsd_log(args.seconds), args.seconds)
+    print(f"gpsd uses {gpsd / nmea:.2f}x the CPU of raw NMEA parsing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Parsing benchmark: ``gps_ingest.nmea`` vs ``pynmea2`` on recorded NMEA logs.
+
+Run from ``services/gps-ingest``::
+
+    python benchmarks/bench_parser.py path/to/receiver.log --repeat 20
+
+Without a log argument a synthetic one-hour recording is generated (RMC, VTG,
+GGA, GSA and three GSV sentences per second, like a typical u-blox puck).
+``pynmea2`` is only needed for the comparison run: ``pip install pynmea2``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from gps_ingest.nmea import NMEAError, checksum, parse_report  # noqa: E402
+
+
+def _sentence(body: str) -> bytes:
+    return f"${body}*{checksum(body.encode()):02X}\r\n".encode()
+
+
+def synthetic_log(seconds: int) -> List[bytes]:
+    lines = []
+    for second in range(seconds):
+        hhmmss = f"{12 + second // 3600:02d}{second // 60 % 60:02d}{second % 60:02d}.00"
+        lat = f"4807.{38 + second % 900:04d}"
+        lines += [
+            _sentence(f"GPRMC,{hhmmss},A,{lat},N,01131.000,E,022.4,084.4,230394,003.1,W"),
+            _sentence("GPVTG,084.4,T,081.3,M,022.4,N,041.5,K"),
+            _sentence(f"GPGGA,{hhmmss},{lat},N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"),
+            _sentence("GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1"),
+            _sentence("GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,00,13,06,292,00"),
+            _sentence("GPGSV,3,2,11,14,25,170,00,16,57,208,39,18,67,296,40,19,40,246,00"),
+            _sentence("GPGSV,3,3,11,22,42,067,42,24,14,311,43,27,05,244,00,,,,"),
+        ]
+    return lines
+
+
+def _fast(line: bytes) -> object:
+    try:
+        return parse_report(line)
+    except NMEAError:
+        return None
+
+
+def _pynmea2() -> Callable[[bytes], object] | None:
+    try:
+        import pynmea2
+    except ImportError:
+        return None
+
+    fields = {
+        "RMC": ("timestamp", "datestamp", "latitude", "longitude", "spd_over_grnd", "true_course"),
+        "GGA": ("timestamp", "latitude", "longitude", "altitude", "horizontal_dil"),
+        "VTG": ("spd_over_grnd_kmph", "true_track"),
+        "GSA": ("hdop", "vdop"),
+    }
+
+    def parse(line: bytes) -> object:
+        # pynmea2 needs ``str`` and converts fields lazily, so decode the line
+        # and read the same fields gps_ingest.nmea produces.
+        try:
+            message = pynmea2.parse(line.decode("ascii", "ignore").strip(), check=True)
+            return [getattr(message, name) for name in fields.get(message.sentence_type, ())]
+        except (pynmea2.ParseError, ValueError):
+            return None
+
+    return parse
+
+
+def run(label: str, parse: Callable[[bytes], object], lines: List[bytes], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for line in lines:
+            parse(line)
+    elapsed = time.perf_counter() - started
+    rate = len(lines) * repeat / elapsed
+    print(f"{label:>15}: {rate:12.0f} sentences/s {elapsed:7.3f}s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", nargs="?", type=Path, help="recorded NMEA log")
+    parser.add_argument("--seconds", type=int, default=3600)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.log is not None:
+        lines = [line for line in args.log.read_bytes().splitlines() if line.strip()]
+    else:
+        lines = synthetic_log(args.seconds)
+    print(f"{len(lines)} sentences x {args.repeat}")
+
+    fast = run("gps_ingest.nmea", _fast, lines, args.repeat)
+    reference = _pynmea2()
+    if reference is None:
+        print("pynmea2 not installed; skipping comparison")
+        return
+    slow = run("pynmea2", reference, lines, args.repeat)
+    print(f"{'speedup':>15}: {fast / slow:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Throughput benchmark: per-fix vs batched publishing with a fake serial source.
+
+Run from ``services/gps-ingest``::
+
+    python benchmarks/bench_publish.py --sentences 2000 --latency-ms 5
+
+Each simulated HTTP request costs ``--latency-ms``; the serial source replays
+an RMC/GGA pair per epoch as fast as the service can read it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import serial
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from gps_ingest.config import Config  # noqa: E402
+from gps_ingest.service import GPSIngestService  # noqa: E402
+
+SENTENCES = [
+    b"$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A\r\n",
+    b"$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47\r\n",
+]
+
+
+class FakeSerial:
+    def __init__(self, count: int) -> None:
+        self.remaining = count
+
+    def readline(self) -> bytes:
+        if self.remaining <= 0:
+            raise serial.SerialException("replay finished")
+        self.remaining -= 1
+        return SENTENCES[self.remaining % len(SENTENCES)]
+
+
+class SlowSession:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.requests = 0
+
+    def post(self, url, json, headers, timeout):  # noqa: A002 - mirrors requests
+        self.requests += 1
+        time.sleep(self.latency)
+        return self
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def run(sentences: int, latency: float, batch_size: int, interval: float) -> None:
+    config = Config(
+        serial_port="fake",
+        baud_rate=9600,
+        api_url="http://localhost/api/gps",
+        api_token=None,
+        batch_max_size=batch_size,
+        batch_max_interval=interval,
+        batch_api_url="http://localhost/api/gps/batch",
+        queue_max_size=max(sentences, 1),
+        epoch_fusion=False,  # every replayed sentence becomes a fix
+    )
+    session = SlowSession(latency)
+    service = GPSIngestService(config, session=session)
+    started = time.perf_counter()
+    service.publisher.start()
+    try:
+        service.stream(FakeSerial(sentences))
+    except serial.SerialException:
+        pass
+    service.publisher.stop(drain=True)
+    elapsed = time.perf_counter() - started
+    label = "per-fix" if batch_size == 1 else f"batch={batch_size}"
+    print(
+        f"{label:>10}: {sentences / elapsed:10.0f} fixes/s "
+        f"{session.requests:6d} requests {elapsed:7.3f}s "
+        f"dropped={service.metrics.dropped_fixes}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+    for batch_size in args.batch_sizes:
+        run(args.sentences, args.latency_ms / 1000, batch_size, args.interval)
+
+
+if __name__ == "__main__":
+    main()
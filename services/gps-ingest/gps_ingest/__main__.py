@@ -6,12 +6,13 @@ import logging
 
 from .config import load_config
 from .service import GPSIngestService
+from .sources import MultiSourceIngestService
 
 
 def main() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     config = load_config()
-    service = GPSIngestService(config)
+    service = MultiSourceIngestService(config) if config.multi_source else GPSIngestService(config)
     service.run()
 
 
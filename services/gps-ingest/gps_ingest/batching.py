@@ -0,0 +1,66 @@
+"""Size/time windowed accumulation of GPS fixes for bulk publishing."""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Generic, List, Optional, TypeVar
+
+Clock = Callable[[], float]
+T = TypeVar("T")
+
+
+class FixBatcher(Generic[T]):
+    """Collect fixes until ``max_size`` is reached or ``max_interval`` elapses.
+
+    The window opens with the first fix added after a flush, so an idle
+    receiver never produces empty batches.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_interval: float,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.max_interval = max_interval
+        self._clock = clock
+        self._fixes: List[T] = []
+        self._opened_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._fixes)
+
+    def add(self, fix: T) -> Optional[List[T]]:
+        """Add ``fix``; return the batch to publish when the size window fills."""
+
+        if not self._fixes:
+            self._opened_at = self._clock()
+        self._fixes.append(fix)
+        if len(self._fixes) >= self.max_size:
+            return self.drain()
+        return None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the open window elapses, or ``None`` when empty."""
+
+        if self._opened_at is None:
+            return None
+        return max(self.max_interval - (self._clock() - self._opened_at), 0.0)
+
+    def due(self) -> bool:
+        """Return ``True`` once the time window of a non-empty batch elapsed."""
+
+        return (
+            self._opened_at is not None
+            and self._clock() - self._opened_at >= self.max_interval
+        )
+
+    def drain(self) -> List[T]:
+        """Return and clear the accumulated fixes."""
+
+        fixes, self._fixes = self._fixes, []
+        self._opened_at = None
+        return fixes
@@ -3,8 +3,36 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import Mapping, Optional
+import re
+from dataclasses import dataclass, field
+from typing import List, Mapping, Optional
+
+SERIAL_SOURCE = "serial"
+TCP_SOURCE = "tcp"
+GPSD_SOURCE = "gpsd"
+DEFAULT_GPSD_PORT = 2947
+
+_SLUG_RE = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+
+@dataclass(slots=True)
+class SourceConfig:
+    """One NMEA receiver read by the multi-source service.
+
+    ``target`` is the serial device for ``serial`` sources and the host for
+    ``tcp`` and ``gpsd`` sources; ``port`` is only used by the latter two.
+    """
+
+    slug: str
+    kind: str
+    target: str
+    baud_rate: int = 9600
+    port: int = 0
+
+    def describe(self) -> str:
+        if self.kind in (TCP_SOURCE, GPSD_SOURCE):
+            return f"{self.kind}://{self.target}:{self.port}"
+        return f"{self.target}@{self.baud_rate}"
 
 
 @dataclass(slots=True)
@@ -19,6 +47,45 @@ class Config:
     reconnect_max_delay: float = 30.0
     reconnect_max_attempts: Optional[int] = None
     serial_timeout: float = 1.0
+    batch_max_size: int = 1
+    batch_max_interval: float = 1.0
+    batch_api_url: Optional[str] = None
+    queue_max_size: int = 1000
+    queue_drop_policy: str = "drop-oldest"
+    spool_dir: Optional[str] = None
+    spool_segment_bytes: int = 4 * 1024 * 1024
+    spool_max_bytes: int = 256 * 1024 * 1024
+    spool_batch_size: int = 500
+    spool_catchup_rate: float = 200.0
+    epoch_fusion: bool = True
+    epoch_timeout: float = 1.0
+    dop_scale: float = 1.0
+    decimation_enabled: bool = False
+    decimation_distance_m: float = 5.0
+    decimation_heading_deg: float = 15.0
+    decimation_speed_kmh: float = 5.0
+    decimation_heartbeat: float = 30.0
+    sources: List[SourceConfig] = field(default_factory=list)
+    gpsd_host: Optional[str] = None
+    gpsd_port: int = DEFAULT_GPSD_PORT
+    metrics_port: Optional[int] = None
+    metrics_host: str = "0.0.0.0"
+    health_max_fix_age: float = 30.0
+
+    @property
+    def multi_source(self) -> bool:
+        """Whether several receivers are read concurrently (``GPS_SOURCES``)."""
+
+        return bool(self.sources)
+
+    @property
+    def batching_enabled(self) -> bool:
+        """Whether fixes are accumulated and sent through the bulk endpoint.
+
+        Batches need ``batch_api_url``; without one fixes are posted singly.
+        """
+
+        return self.batch_max_size > 1 and bool(self.batch_api_url)
 
     @property
     def headers(self) -> dict[str, str]:
@@ -40,6 +107,89 @@ def _get_env(env: Mapping[str, str], key: str) -> str:
     return value
 
 
+def _get_bool(env: Mapping[str, str], key: str, default: bool = False) -> bool:
+    value = env.get(key)
+    if value in (None, ""):
+        return default
+    normalized = value.strip().lower()
+    if normalized in {"1", "true", "yes", "on"}:
+        return True
+    if normalized in {"0", "false", "no", "off"}:
+        return False
+    raise ValueError(f"{key} must be a boolean")
+
+
+def parse_gpsd_address(value: str) -> tuple[str, int]:
+    """Split ``host[:port]`` for gpsd, defaulting to port 2947."""
+
+    host, sep, port_raw = value.strip().rpartition(":")
+    if not sep:
+        host, port_raw = port_raw, str(DEFAULT_GPSD_PORT)
+    if not host:
+        raise ValueError(f"Invalid gpsd address: {value!r}")
+    try:
+        return host, int(port_raw)
+    except ValueError as exc:
+        raise ValueError(f"Invalid gpsd port in {value!r}") from exc
+
+
+def _parse_source(slug: str, spec: str, default_baud: int) -> SourceConfig:
+    if spec.startswith("tcp://"):
+        host, sep, port_raw = spec[len("tcp://") :].rpartition(":")
+        if not sep or not host:
+            raise ValueError(f"GPS source {slug!r} must be tcp://host:port")
+        try:
+            port = int(port_raw)
+        except ValueError as exc:
+            raise ValueError(f"GPS source {slug!r} has an invalid TCP port") from exc
+        return SourceConfig(slug=slug, kind=TCP_SOURCE, target=host, port=port)
+    if spec.startswith("gpsd://"):
+        host, port = parse_gpsd_address(spec[len("gpsd://") :])
+        return SourceConfig(slug=slug, kind=GPSD_SOURCE, target=host, port=port)
+
+    device, sep, baud_raw = spec.removeprefix("serial:").partition("@")
+    if not device:
+        raise ValueError(f"GPS source {slug!r} is missing a serial device")
+    try:
+        baud_rate = int(baud_raw) if sep else default_baud
+    except ValueError as exc:
+        raise ValueError(f"GPS source {slug!r} has an invalid baud rate") from exc
+    if baud_rate <= 0:
+        raise ValueError(f"GPS source {slug!r} has an invalid baud rate")
+    return SourceConfig(slug=slug, kind=SERIAL_SOURCE, target=device, baud_rate=baud_rate)
+
+
+def parse_sources(value: str, default_baud: int = 9600) -> List[SourceConfig]:
+    """Parse ``GPS_SOURCES``.
+
+    The value is a comma-separated list of ``slug=spec`` entries where
+    ``spec`` is a serial device with an optional ``@baud`` suffix (for
+    example ``/dev/ttyUSB0@4800``), ``tcp://host:port`` for a networked
+    NMEA stream or ``gpsd://host[:port]`` for a gpsd JSON stream.
+    """
+
+    sources: List[SourceConfig] = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        slug, sep, spec = entry.partition("=")
+        slug, spec = slug.strip(), spec.strip()
+        if not sep or not spec:
+            raise ValueError(
+                f"GPS_SOURCES entry {entry!r} must be slug=device, slug=tcp://host:port "
+                "or slug=gpsd://host[:port]"
+            )
+        if not _SLUG_RE.match(slug):
+            raise ValueError(
+                f"GPS source slug {slug!r} must be lowercase letters, digits, '-' or '_'"
+            )
+        if any(source.slug == slug for source in sources):
+            raise ValueError(f"Duplicate GPS source slug: {slug}")
+        sources.append(_parse_source(slug, spec, default_baud))
+    return sources
+
+
 def load_config(env: Mapping[str, str] | None = None) -> Config:
     """Load configuration from environment variables.
 
@@ -61,8 +211,6 @@ def load_config(env: Mapping[str, str] | None = None) -> Config:
 
     env = env or os.environ
 
-    serial_port = _get_env(env, "GPS_SERIAL")
-
     baud_raw = env.get("GPS_BAUD", "9600")
     try:
         baud_rate = int(baud_raw)
@@ -71,6 +219,14 @@ def load_config(env: Mapping[str, str] | None = None) -> Config:
     if baud_rate <= 0:
         raise ValueError("GPS_BAUD must be positive")
 
+    sources = parse_sources(env.get("GPS_SOURCES", ""), baud_rate)
+    gpsd_raw = env.get("GPS_GPSD") or None
+    gpsd_host, gpsd_port = parse_gpsd_address(gpsd_raw) if gpsd_raw else (None, DEFAULT_GPSD_PORT)
+    if sources or gpsd_host:
+        serial_port = env.get("GPS_SERIAL", "")
+    else:
+        serial_port = _get_env(env, "GPS_SERIAL")
+
     api_url = _get_env(env, "GPS_API_URL")
     api_token = env.get("GPS_API_TOKEN") or None
 
@@ -84,6 +240,59 @@ def load_config(env: Mapping[str, str] | None = None) -> Config:
     )
     serial_timeout = float(env.get("GPS_SERIAL_TIMEOUT", 1.0))
 
+    try:
+        batch_max_size = int(env.get("GPS_BATCH_MAX_SIZE", 1))
+    except ValueError as exc:
+        raise ValueError("GPS_BATCH_MAX_SIZE must be an integer") from exc
+    if batch_max_size <= 0:
+        raise ValueError("GPS_BATCH_MAX_SIZE must be positive")
+    batch_max_interval = float(env.get("GPS_BATCH_MAX_INTERVAL", 1.0))
+    if batch_max_interval <= 0:
+        raise ValueError("GPS_BATCH_MAX_INTERVAL must be positive")
+    batch_api_url = env.get("GPS_BATCH_API_URL") or None
+    if batch_max_size > 1 and batch_api_url is None:
+        raise ValueError("GPS_BATCH_API_URL is required when GPS_BATCH_MAX_SIZE is above 1")
+
+    try:
+        queue_max_size = int(env.get("GPS_QUEUE_MAX_SIZE", 1000))
+    except ValueError as exc:
+        raise ValueError("GPS_QUEUE_MAX_SIZE must be an integer") from exc
+    if queue_max_size <= 0:
+        raise ValueError("GPS_QUEUE_MAX_SIZE must be positive")
+    queue_drop_policy = env.get("GPS_QUEUE_DROP_POLICY", "drop-oldest")
+    if queue_drop_policy not in ("drop-oldest", "coalesce"):
+        raise ValueError("GPS_QUEUE_DROP_POLICY must be 'drop-oldest' or 'coalesce'")
+
+    spool_dir = env.get("GPS_SPOOL_DIR") or None
+    spool_segment_bytes = int(env.get("GPS_SPOOL_SEGMENT_BYTES", 4 * 1024 * 1024))
+    spool_max_bytes = int(env.get("GPS_SPOOL_MAX_BYTES", 256 * 1024 * 1024))
+    spool_batch_size = int(env.get("GPS_SPOOL_BATCH_SIZE", 500))
+    spool_catchup_rate = float(env.get("GPS_SPOOL_CATCHUP_RATE", 200.0))
+    if spool_segment_bytes <= 0 or spool_max_bytes <= 0 or spool_batch_size <= 0:
+        raise ValueError("GPS spool sizes must be positive")
+
+    epoch_fusion = _get_bool(env, "GPS_EPOCH_FUSION", True)
+    epoch_timeout = float(env.get("GPS_EPOCH_TIMEOUT", 1.0))
+    dop_scale = float(env.get("GPS_DOP_SCALE", 1.0))
+
+    decimation_enabled = _get_bool(env, "GPS_DECIMATION")
+    decimation_distance_m = float(env.get("GPS_DECIMATION_DISTANCE_M", 5.0))
+    decimation_heading_deg = float(env.get("GPS_DECIMATION_HEADING_DEG", 15.0))
+    decimation_speed_kmh = float(env.get("GPS_DECIMATION_SPEED_KMH", 5.0))
+    decimation_heartbeat = float(env.get("GPS_DECIMATION_HEARTBEAT", 30.0))
+
+    metrics_port_raw = env.get("GPS_METRICS_PORT")
+    try:
+        metrics_port = int(metrics_port_raw) if metrics_port_raw else None
+    except ValueError as exc:
+        raise ValueError("GPS_METRICS_PORT must be an integer") from exc
+    if metrics_port is not None and not 0 <= metrics_port <= 65535:
+        raise ValueError("GPS_METRICS_PORT must be between 0 and 65535")
+    metrics_host = env.get("GPS_METRICS_HOST") or "0.0.0.0"
+    health_max_fix_age = float(env.get("GPS_HEALTH_MAX_FIX_AGE", 30.0))
+    if health_max_fix_age <= 0:
+        raise ValueError("GPS_HEALTH_MAX_FIX_AGE must be positive")
+
     return Config(
         serial_port=serial_port,
         baud_rate=baud_rate,
@@ -93,4 +302,28 @@ def load_config(env: Mapping[str, str] | None = None) -> Config:
         reconnect_max_delay=reconnect_max_delay,
         reconnect_max_attempts=reconnect_max_attempts,
         serial_timeout=serial_timeout,
+        batch_max_size=batch_max_size,
+        batch_max_interval=batch_max_interval,
+        batch_api_url=batch_api_url,
+        queue_max_size=queue_max_size,
+        queue_drop_policy=queue_drop_policy,
+        spool_dir=spool_dir,
+        spool_segment_bytes=spool_segment_bytes,
+        spool_max_bytes=spool_max_bytes,
+        spool_batch_size=spool_batch_size,
+        spool_catchup_rate=spool_catchup_rate,
+        epoch_fusion=epoch_fusion,
+        epoch_timeout=epoch_timeout,
+        dop_scale=dop_scale,
+        decimation_enabled=decimation_enabled,
+        decimation_distance_m=decimation_distance_m,
+        decimation_heading_deg=decimation_heading_deg,
+        decimation_speed_kmh=decimation_speed_kmh,
+        decimation_heartbeat=decimation_heartbeat,
+        sources=sources,
+        gpsd_host=gpsd_host,
+        gpsd_port=gpsd_port,
+        metrics_port=metrics_port,
+        metrics_host=metrics_host,
+        health_max_fix_age=health_max_fix_age,
     )
@@ -0,0 +1,94 @@
+"""Motion-aware decimation of GPS fixes before publishing."""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Optional
+
+from .batching import Clock
+from .parser import GPSFix
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# Course over ground is noise while (nearly) stationary, so heading changes
+# only count once the receiver reports at least this speed.
+MIN_HEADING_SPEED_KMH = 2.0
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two WGS84 points in meters."""
+
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def heading_delta(a: float, b: float) -> float:
+    """Smallest absolute angle between two headings in degrees."""
+
+    delta = abs(a - b) % 360.0
+    return 360.0 - delta if delta > 180.0 else delta
+
+
+class FixDecimator:
+    """Decide whether a fix differs enough from the last published one.
+
+    A fix passes when the receiver moved at least ``min_distance_m``, its
+    heading or speed changed by the configured thresholds, or
+    ``heartbeat_seconds`` elapsed since the last published fix.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_distance_m: float = 5.0,
+        heading_threshold_deg: float = 15.0,
+        speed_threshold_kmh: float = 5.0,
+        heartbeat_seconds: float = 30.0,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self.min_distance_m = min_distance_m
+        self.heading_threshold_deg = heading_threshold_deg
+        self.speed_threshold_kmh = speed_threshold_kmh
+        self.heartbeat_seconds = heartbeat_seconds
+        self._clock = clock
+        self._last: Optional[GPSFix] = None
+        self._last_at = 0.0
+
+    def _changed(self, fix: GPSFix, last: GPSFix) -> bool:
+        if (
+            haversine_m(last.latitude, last.longitude, fix.latitude, fix.longitude)
+            >= self.min_distance_m
+        ):
+            return True
+        if fix.speed_kmh is not None and last.speed_kmh is not None:
+            if abs(fix.speed_kmh - last.speed_kmh) >= self.speed_threshold_kmh:
+                return True
+            if (
+                fix.heading_deg is not None
+                and last.heading_deg is not None
+                and fix.speed_kmh >= MIN_HEADING_SPEED_KMH
+                and heading_delta(fix.heading_deg, last.heading_deg)
+                >= self.heading_threshold_deg
+            ):
+                return True
+        return False
+
+    def accept(self, fix: GPSFix) -> bool:
+        """Return ``True`` when ``fix`` should be published."""
+
+        now = self._clock()
+        last = self._last
+        if (
+            last is None
+            or now - self._last_at >= self.heartbeat_seconds
+            or self._changed(fix, last)
+        ):
+            self._last = fix
+            self._last_at = now
+            return True
+        return False
@@ -0,0 +1,144 @@
+"""Assemble per-epoch GGA/RMC/VTG/GSA reports into complete fixes."""
+
+from __future__ import annotations
+
+import time as _time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Set
+
+from .batching import Clock
+from .parser import GPSFix, NMEAReport
+
+_MERGED_FIELDS = (
+    "latitude",
+    "longitude",
+    "altitude_m",
+    "speed_kmh",
+    "heading_deg",
+    "hdop",
+    "vdop",
+    "date",
+)
+
+
+@dataclass(slots=True)
+class _Epoch:
+    time: Optional[time]
+    opened_at: float
+    types: Set[str] = field(default_factory=set)
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    altitude_m: Optional[float] = None
+    speed_kmh: Optional[float] = None
+    heading_deg: Optional[float] = None
+    hdop: Optional[float] = None
+    vdop: Optional[float] = None
+    date: Optional[date] = None
+
+    def merge(self, report: NMEAReport) -> None:
+        self.types.add(report.sentence_type)
+        if self.time is None and report.time is not None:
+            self.time = report.time
+        for name in _MERGED_FIELDS:
+            value = getattr(report, name)
+            if value is not None:
+                setattr(self, name, value)
+
+
+class EpochAssembler:
+    """Merge the sentences a receiver emits for one UTC second into one fix.
+
+    Sentences carrying a time (GGA, RMC) key the epoch; VTG and GSA attach
+    to the epoch being assembled. An epoch is emitted as soon as it holds
+    every sentence type seen in the previous epoch, when a sentence for a
+    different time arrives, or after ``timeout`` seconds. HDOP/VDOP are
+    multiplied by ``dop_scale`` (the receiver's UERE in meters; ``1.0`` keeps
+    raw DOP) to fill ``horizontal_accuracy``/``vertical_accuracy``.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 1.0,
+        dop_scale: float = 1.0,
+        clock: Clock = _time.monotonic,
+    ) -> None:
+        self.timeout = timeout
+        self.dop_scale = dop_scale
+        self._clock = clock
+        self._current: Optional[_Epoch] = None
+        self._expected: Set[str] = set()
+        self._last_date: Optional[date] = None
+        self._last_time: Optional[time] = None
+
+    def _timestamp(self, epoch: _Epoch) -> Optional[datetime]:
+        if epoch.time is None:
+            return None
+        epoch_date = epoch.date
+        if epoch_date is None and self._last_date is not None:
+            epoch_date = self._last_date
+            if self._last_time is not None and epoch.time < self._last_time:
+                epoch_date += timedelta(days=1)  # GGA-only epoch after midnight
+        if epoch_date is None:
+            return None
+        self._last_date = epoch_date
+        self._last_time = epoch.time
+        return datetime.combine(epoch_date, epoch.time)
+
+    def _close(self) -> List[GPSFix]:
+        epoch, self._current = self._current, None
+        if epoch is None:
+            return []
+        if epoch.time is not None:
+            self._expected = set(epoch.types)
+        timestamp = self._timestamp(epoch)
+        if epoch.latitude is None or epoch.longitude is None:
+            return []
+        return [
+            GPSFix(
+                latitude=epoch.latitude,
+                longitude=epoch.longitude,
+                altitude_m=epoch.altitude_m,
+                speed_kmh=epoch.speed_kmh,
+                heading_deg=epoch.heading_deg,
+                horizontal_accuracy=(
+                    epoch.hdop * self.dop_scale if epoch.hdop is not None else None
+                ),
+                vertical_accuracy=(
+                    epoch.vdop * self.dop_scale if epoch.vdop is not None else None
+                ),
+                timestamp=timestamp,
+            )
+        ]
+
+    def feed(self, report: NMEAReport) -> List[GPSFix]:
+        """Add ``report`` and return any fixes completed by it."""
+
+        fixes = self.poll()
+        current = self._current
+        if (
+            current is not None
+            and report.time is not None
+            and current.time is not None
+            and report.time != current.time
+        ):
+            fixes += self._close()
+            current = None
+        if current is None:
+            current = self._current = _Epoch(time=report.time, opened_at=self._clock())
+        current.merge(report)
+        if self._expected and current.time is not None and self._expected <= current.types:
+            fixes += self._close()
+        return fixes
+
+    def poll(self) -> List[GPSFix]:
+        """Emit the open epoch once it has waited ``timeout`` seconds."""
+
+        if self._current is not None and self._clock() - self._current.opened_at >= self.timeout:
+            return self._close()
+        return []
+
+    def flush(self) -> List[GPSFix]:
+        """Emit whatever the open epoch holds, e.g. when the port closes."""
+
+        return self._close()
@@ -0,0 +1,226 @@
+"""Read fixes from gpsd's JSON stream instead of owning the serial port.
+
+gpsd already merges the receiver's sentences into one TPV report per epoch
+with error estimates, so this path skips NMEA parsing and epoch fusion and
+lets chrony and other clients share the receiver.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import select
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .batching import Clock
+from .config import Config
+from .parser import GPSFix
+from .pipeline import PipelineMetrics
+from .reader import FixReader
+
+logger = logging.getLogger(__name__)
+
+WATCH_COMMAND = b'?WATCH={"enable":true,"json":true}\n'
+
+# gpsd serialises "class" first, so reports we ignore (DEVICE, GST, PPS...)
+# are skipped without decoding the JSON.
+_TPV_PREFIX = b'{"class":"TPV"'
+_SKY_PREFIX = b'{"class":"SKY"'
+
+MPS_TO_KMH = 3.6
+
+# gpsd reports are a few hundred bytes; anything longer means a broken stream.
+_MAX_LINE = 65536
+
+
+def _parse_time(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class GpsdDecoder:
+    """Turn gpsd TPV reports into fixes, using SKY DOPs as a fallback.
+
+    gpsd's ``eph``/``epv`` (95% confidence, meters) fill the accuracy fields;
+    when a receiver does not provide them the latest SKY HDOP/VDOP times
+    ``dop_scale`` are used, matching NMEA epoch fusion.
+    """
+
+    def __init__(self, dop_scale: float = 1.0) -> None:
+        self.dop_scale = dop_scale
+        self.hdop: Optional[float] = None
+        self.vdop: Optional[float] = None
+
+    def _sky(self, report: Dict[str, Any]) -> None:
+        self.hdop = report.get("hdop", self.hdop)
+        self.vdop = report.get("vdop", self.vdop)
+
+    def _horizontal_accuracy(self, report: Dict[str, Any]) -> Optional[float]:
+        if report.get("eph") is not None:
+            return float(report["eph"])
+        if report.get("epx") is not None and report.get("epy") is not None:
+            return math.hypot(report["epx"], report["epy"])
+        return self.hdop * self.dop_scale if self.hdop is not None else None
+
+    def _vertical_accuracy(self, report: Dict[str, Any]) -> Optional[float]:
+        if report.get("epv") is not None:
+            return float(report["epv"])
+        return self.vdop * self.dop_scale if self.vdop is not None else None
+
+    def feed(self, line: bytes) -> Optional[GPSFix]:
+        """Return a fix for a TPV report with a 2D/3D fix, else ``None``."""
+
+        is_tpv = line.startswith(_TPV_PREFIX)
+        if not is_tpv and not line.startswith(_SKY_PREFIX):
+            return None
+        try:
+            report = json.loads(line)
+        except ValueError:
+            logger.debug("Ignoring malformed gpsd report %r", line)
+            return None
+        if not is_tpv:
+            self._sky(report)
+            return None
+        if report.get("mode", 0) < 2:
+            return None
+        latitude, longitude = report.get("lat"), report.get("lon")
+        if latitude is None or longitude is None:
+            return None
+        speed = report.get("speed")
+        altitude = report.get("altMSL", report.get("alt"))
+        return GPSFix(
+            latitude=float(latitude),
+            longitude=float(longitude),
+            altitude_m=float(altitude) if altitude is not None else None,
+            speed_kmh=float(speed) * MPS_TO_KMH if speed is not None else None,
+            heading_deg=report.get("track"),
+            horizontal_accuracy=self._horizontal_accuracy(report),
+            vertical_accuracy=self._vertical_accuracy(report),
+            timestamp=_parse_time(report.get("time")),
+        )
+
+
+class GpsdReader(FixReader):
+    """:class:`FixReader` for gpsd JSON lines; gpsd does the epoch fusion."""
+
+    def __init__(
+        self,
+        config: Config,
+        metrics: PipelineMetrics,
+        clock: Clock = time.monotonic,
+        source: Optional[str] = None,
+    ) -> None:
+        super().__init__(config, metrics, clock, source)
+        self.assembler = None
+        self.decoder = GpsdDecoder(config.dop_scale)
+
+    def _parse(self, raw: bytes) -> List[GPSFix]:
+        fix = self.decoder.feed(raw) if raw else None
+        return [fix] if fix is not None else []
+
+
+class GpsdConnection:
+    """Blocking gpsd client with the same ``readline``/``close`` as a serial port.
+
+    Lines are split from an own buffer filled by ``select``/``recv``: a file
+    from ``socket.makefile`` cannot be read again once a read timed out, and
+    gpsd is routinely quiet for longer than ``timeout``.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self._timeout = timeout
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._socket.sendall(WATCH_COMMAND)
+        self._buffer = bytearray()
+
+    def readline(self) -> bytes:
+        """Return the next report, or ``b""`` when gpsd was idle for ``timeout``.
+
+        A partial line left by a timeout is completed by a later call.
+        """
+
+        buffer = self._buffer
+        deadline = time.monotonic() + self._timeout
+        while True:
+            end = buffer.find(b"\n")
+            if end >= 0:
+                line = bytes(buffer[: end + 1])
+                del buffer[: end + 1]
+                return line
+            if len(buffer) > _MAX_LINE:
+                raise ConnectionError("gpsd sent a line longer than 64 KiB")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self._socket], [], [], remaining)[0]:
+                return b""
+            try:
+                data = self._socket.recv(65536)
+            except socket.timeout:
+                return b""
+            if not data:
+                raise ConnectionError("gpsd closed the connection")
+            buffer += data
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+class _FakeGpsdHandler(socketserver.StreamRequestHandler):
+    server: "FakeGpsd"
+
+    def handle(self) -> None:
+        server = self.server
+        self.wfile.write(b'{"class":"VERSION","release":"3.25","proto_major":3}\n')
+        server.watch_commands.append(self.rfile.readline())
+        for line in server.lines:
+            if server.interval:
+                time.sleep(server.interval)
+            self.wfile.write(line)
+        self.wfile.flush()
+
+
+class FakeGpsd(socketserver.ThreadingTCPServer):
+    """Local gpsd stand-in that streams scripted reports to every client.
+
+    After sending VERSION it waits for the client's ``?WATCH`` command,
+    writes ``reports`` (dicts or pre-encoded lines) ``interval`` seconds
+    apart and then closes the connection.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, reports: Iterable[Dict[str, Any] | bytes], interval: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _FakeGpsdHandler)
+        self.lines = [
+            report
+            if isinstance(report, bytes)
+            else json.dumps(report, separators=(",", ":")).encode() + b"\n"
+            for report in reports
+        ]
+        self.interval = interval
+        self.watch_commands: List[bytes] = []
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self.server_address[:2]
+        return str(host), int(port)
+
+    def __enter__(self) -> "FakeGpsd":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-gpsd", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,223 @@
+"""Optional HTTP endpoint exposing Prometheus metrics and a health check.
+
+``/metrics`` renders :class:`~gps_ingest.pipeline.PipelineMetrics` in the
+Prometheus text format on request, so the reader and publisher only bump
+plain counters and the hot loop pays nothing for scraping. ``/healthz``
+returns 503 once no receiver has produced a fix for ``max_fix_age`` seconds;
+fixes dropped by decimation count, so a parked vehicle stays healthy.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from .batching import Clock
+from .pipeline import LATENCY_BUCKETS, PipelineMetrics
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _newest(*stamps: Optional[float]) -> Optional[float]:
+    known = [stamp for stamp in stamps if stamp is not None]
+    return max(known) if known else None
+
+
+def _received_at(metrics: PipelineMetrics) -> Optional[float]:
+    # Fixes reach the publisher without a reader only when submitted
+    # directly, so the enqueue time covers those.
+    return _newest(metrics.last_received_at, metrics.last_fix_at)
+
+
+def _received_by_source(metrics: PipelineMetrics) -> Dict[str, float]:
+    received = dict(metrics.last_fix_by_source)
+    for source, at in metrics.last_received_by_source.items():
+        received[source] = max(at, received.get(source, at))
+    return received
+
+
+def render_metrics(metrics: PipelineMetrics, now: float) -> str:
+    """Render ``metrics`` in the Prometheus text exposition format.
+
+    ``now`` must come from the same clock as the publisher so the ages of
+    the last fixes can be computed.
+    """
+
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def sample(name: str, value: float, labels: str = "") -> None:
+        lines.append(f"{name}{labels} {_value(value)}")
+
+    counters = (
+        ("sentences_read_total", "Raw lines read from receivers.", metrics.sentences_read),
+        ("fixes_enqueued_total", "Fixes handed to the publisher.", metrics.fixes_enqueued),
+        ("fixes_decimated_total", "Fixes suppressed by decimation.", metrics.fixes_decimated),
+        ("fixes_published_total", "Fixes accepted by the API.", metrics.fixes_published),
+        ("fixes_dropped_total", "Fixes dropped by the queue policy.", metrics.dropped_fixes),
+        ("fixes_spooled_total", "Fixes written to the disk spool.", metrics.spooled_fixes),
+        ("publish_errors_total", "Failed publish attempts.", metrics.publish_errors),
+        ("reconnects_total", "Failed connection attempts and lost connections.", metrics.reconnects),
+    )
+    for name, help_text, value in counters:
+        family(f"gps_ingest_{name}", "counter", help_text)
+        sample(f"gps_ingest_{name}", value)
+
+    family("gps_ingest_parse_failures_total", "counter", "NMEA sentences rejected, by type.")
+    for kind, count in sorted(metrics.parse_failures.items()):
+        sample("gps_ingest_parse_failures_total", count, f'{{sentence="{_label(kind)}"}}')
+
+    name = "gps_ingest_publish_latency_seconds"
+    family(name, "histogram", "Time from reading a fix to the API accepting it.")
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, metrics.latency_buckets):
+        cumulative += count
+        sample(f"{name}_bucket", cumulative, f'{{le="{bound}"}}')
+    sample(f"{name}_bucket", metrics.latency_count, '{le="+Inf"}')
+    sample(f"{name}_sum", metrics.latency_sum)
+    sample(f"{name}_count", metrics.latency_count)
+
+    def age(stamp: Optional[float]) -> float:
+        return now - stamp if stamp is not None else math.inf
+
+    family(
+        "gps_ingest_seconds_since_last_fix",
+        "gauge",
+        "Age of the newest fix received, including decimated ones (+Inf before one).",
+    )
+    sample("gps_ingest_seconds_since_last_fix", age(_received_at(metrics)))
+    by_source = sorted(_received_by_source(metrics).items())
+    if by_source:
+        family(
+            "gps_ingest_source_seconds_since_last_fix",
+            "gauge",
+            "Age of the newest fix received per source, including decimated ones.",
+        )
+        for source, at in by_source:
+            sample("gps_ingest_source_seconds_since_last_fix", now - at, f'{{source="{_label(source)}"}}')
+    family(
+        "gps_ingest_seconds_since_last_enqueued_fix",
+        "gauge",
+        "Age of the newest fix handed to the publisher after decimation (+Inf before one).",
+    )
+    sample("gps_ingest_seconds_since_last_enqueued_fix", age(metrics.last_fix_at))
+
+    family("gps_ingest_queue_depth", "gauge", "Fixes waiting in the in-memory queue.")
+    sample("gps_ingest_queue_depth", metrics.queue_depth)
+    family("gps_ingest_spool_depth", "gauge", "Fixes waiting in the disk spool.")
+    sample("gps_ingest_spool_depth", metrics.spool_depth)
+    return "\n".join(lines) + "\n"
+
+
+class _MonitoringHandler(BaseHTTPRequestHandler):
+    server: "MetricsServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._reply(200, CONTENT_TYPE, self.server.render().encode())
+        elif path == "/healthz":
+            healthy, body = self.server.health()
+            self._reply(200 if healthy else 503, "application/json", json.dumps(body).encode())
+        else:
+            self._reply(404, "text/plain", b"not found\n")
+
+    def _reply(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Serve ``/metrics`` and ``/healthz`` for one service from a daemon thread.
+
+    The service is healthy while its newest fix is at most ``max_fix_age``
+    seconds old; before the first fix it gets the same grace period from
+    :meth:`start`.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        metrics: PipelineMetrics,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_fix_age: float = 30.0,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        super().__init__((host, port), _MonitoringHandler)
+        self.metrics = metrics
+        self.max_fix_age = max_fix_age
+        self._clock = clock
+        self._started_at = clock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def render(self) -> str:
+        return render_metrics(self.metrics, self._clock())
+
+    def health(self) -> tuple[bool, dict[str, object]]:
+        """Return whether fixes are flowing, with the details sent to clients."""
+
+        now = self._clock()
+        metrics = self.metrics
+        last = _received_at(metrics)
+        if last is None:
+            age = None
+            healthy = now - self._started_at <= self.max_fix_age
+        else:
+            age = now - last
+            healthy = age <= self.max_fix_age
+        return healthy, {
+            "status": "ok" if healthy else "stale",
+            "seconds_since_last_fix": age,
+            "max_fix_age": self.max_fix_age,
+            "queue_depth": self.metrics.queue_depth,
+        }
+
+    def start(self) -> None:
+        self._started_at = self._clock()
+        self._thread = threading.Thread(target=self.serve_forever, name="gps-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MetricsServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
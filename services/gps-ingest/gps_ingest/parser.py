@@ -7,7 +7,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-import pynmea2
+from .nmea import NMEAError, NMEAReport, parse_report
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,11 @@ class GPSFix:
     longitude: float
     altitude_m: Optional[float] = None
     speed_kmh: Optional[float] = None
+    heading_deg: Optional[float] = None
+    horizontal_accuracy: Optional[float] = None
+    vertical_accuracy: Optional[float] = None
     timestamp: Optional[datetime] = None
+    source: Optional[str] = None
 
     def to_payload(self) -> dict[str, float | str]:
         """Convert the fix into a JSON-serializable payload."""
@@ -33,65 +37,59 @@ class GPSFix:
             payload["altitude_m"] = self.altitude_m
         if self.speed_kmh is not None:
             payload["speed_kmh"] = self.speed_kmh
+        if self.heading_deg is not None:
+            payload["heading_deg"] = self.heading_deg
+        if self.horizontal_accuracy is not None:
+            payload["horizontal_accuracy"] = self.horizontal_accuracy
+        if self.vertical_accuracy is not None:
+            payload["vertical_accuracy"] = self.vertical_accuracy
         if self.timestamp is not None:
             payload["timestamp"] = self.timestamp.isoformat()
+        if self.source is not None:
+            payload["source"] = self.source
         return payload
 
 
-def _coerce_float(value: object) -> Optional[float]:
-    if value in (None, ""):
-        return None
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
+def parse_nmea_report(sentence: bytes | str) -> Optional[NMEAReport]:
+    """Parse RMC, GGA, VTG or GSA sentences into an :class:`NMEAReport`.
 
+    Returns ``None`` for other sentence types, checksum failures and
+    sentences flagged as having no valid fix.
+    """
 
-def _derive_timestamp(message: pynmea2.nmea.NMEASentence) -> Optional[datetime]:
-    datestamp = getattr(message, "datestamp", None)
-    timestamp = getattr(message, "timestamp", None)
-    if datestamp and timestamp:
-        return datetime.combine(datestamp, timestamp)
-    return None
+    try:
+        return parse_report(sentence)
+    except NMEAError as exc:
+        logger.debug("Failed to parse NMEA sentence %r: %s", sentence, exc)
+        return None
 
 
-def parse_nmea_sentence(sentence: str) -> Optional[GPSFix]:
+def parse_nmea_sentence(sentence: bytes | str) -> Optional[GPSFix]:
     """Parse a raw NMEA sentence into a :class:`GPSFix` instance.
 
     Returns ``None`` when the sentence cannot be parsed or does not contain
     positional information.
     """
 
-    sentence = sentence.strip()
-    if not sentence:
-        return None
+    report = parse_nmea_report(sentence)
+    return fix_from_report(report) if report is not None else None
 
-    try:
-        message = pynmea2.parse(sentence, check=True)
-    except (pynmea2.nmea.ParseError, pynmea2.nmea.ChecksumError, ValueError) as exc:
-        logger.debug("Failed to parse NMEA sentence %r: %s", sentence, exc)
-        return None
 
-    latitude = _coerce_float(getattr(message, "latitude", None))
-    longitude = _coerce_float(getattr(message, "longitude", None))
-    if latitude is None or longitude is None:
-        return None
+def fix_from_report(report: NMEAReport) -> Optional[GPSFix]:
+    """Build a fix from a single report; ``None`` when it has no position."""
 
-    altitude = _coerce_float(getattr(message, "altitude", None))
-
-    speed_knots = _coerce_float(
-        getattr(message, "spd_over_grnd", None)
-        or getattr(message, "speed", None)
-        or getattr(message, "spd_over_ground", None)
-    )
-    speed_kmh = speed_knots * 1.852 if speed_knots is not None else None
+    if report.latitude is None or report.longitude is None:
+        return None
 
-    timestamp = _derive_timestamp(message)
+    timestamp = None
+    if report.date is not None and report.time is not None:
+        timestamp = datetime.combine(report.date, report.time)
 
     return GPSFix(
-        latitude=latitude,
-        longitude=longitude,
-        altitude_m=altitude,
-        speed_kmh=speed_kmh,
+        latitude=report.latitude,
+        longitude=report.longitude,
+        altitude_m=report.altitude_m,
+        speed_kmh=report.speed_kmh,
+        heading_deg=report.heading_deg,
         timestamp=timestamp,
     )
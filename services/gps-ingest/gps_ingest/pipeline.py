@@ -0,0 +1,367 @@
+"""Bounded hand-off between the serial reader and the HTTP publisher."""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+from .batching import Clock, FixBatcher
+from .parser import GPSFix
+from .spool import FixSpool
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop-oldest"
+COALESCE = "coalesce"
+DROP_POLICIES = (DROP_OLDEST, COALESCE)
+
+# Upper bounds (seconds) of the publish latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SendCallable = Callable[[Sequence[GPSFix]], None]
+SendPayloadsCallable = Callable[[List[Dict[str, Any]]], None]
+
+
+@dataclass(slots=True)
+class QueuedFix:
+    """A parsed fix together with the monotonic time it was read."""
+
+    fix: GPSFix
+    read_at: float
+
+
+@dataclass(slots=True)
+class PipelineMetrics:
+    """Counters describing the reader/publisher hand-off."""
+
+    sentences_read: int = 0
+    parse_failures: Dict[str, int] = field(default_factory=dict)
+    reconnects: int = 0
+    last_fix_at: Optional[float] = None
+    # Newest fix produced by a receiver, including ones decimation drops.
+    last_received_at: Optional[float] = None
+    last_fix_by_source: Dict[str, float] = field(default_factory=dict)
+    last_received_by_source: Dict[str, float] = field(default_factory=dict)
+    fixes_enqueued: int = 0
+    fixes_decimated: int = 0
+    fixes_published: int = 0
+    dropped_fixes: int = 0
+    publish_errors: int = 0
+    queue_depth: int = 0
+    spooled_fixes: int = 0
+    spool_depth: int = 0
+    latency_count: int = 0
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    last_latency: Optional[float] = None
+    # Non-cumulative counts per LATENCY_BUCKETS bound, plus one for +Inf.
+    latency_buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    # Set to a list to keep every latency, e.g. for percentiles in a replay.
+    latency_samples: Optional[List[float]] = None
+
+    def observe_latency(self, seconds: float) -> None:
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_count += 1
+        self.latency_sum += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        self.last_latency = seconds
+        if self.latency_samples is not None:
+            self.latency_samples.append(seconds)
+
+    @property
+    def reduction_ratio(self) -> float:
+        """Share of parsed fixes suppressed by decimation."""
+
+        total = self.fixes_decimated + self.fixes_enqueued
+        return self.fixes_decimated / total if total else 0.0
+
+    @property
+    def latency_avg(self) -> Optional[float]:
+        return self.latency_sum / self.latency_count if self.latency_count else None
+
+    def snapshot(self) -> dict[str, float | int | None]:
+        return {
+            "sentences_read": self.sentences_read,
+            "parse_failures": sum(self.parse_failures.values()),
+            "reconnects": self.reconnects,
+            "fixes_enqueued": self.fixes_enqueued,
+            "fixes_decimated": self.fixes_decimated,
+            "reduction_ratio": self.reduction_ratio,
+            "fixes_published": self.fixes_published,
+            "dropped_fixes": self.dropped_fixes,
+            "publish_errors": self.publish_errors,
+            "queue_depth": self.queue_depth,
+            "spooled_fixes": self.spooled_fixes,
+            "spool_depth": self.spool_depth,
+            "latency_avg_seconds": self.latency_avg,
+            "latency_max_seconds": self.latency_max,
+            "latency_last_seconds": self.last_latency,
+        }
+
+
+class FixQueue:
+    """Thread-safe bounded queue applying an explicit overflow policy.
+
+    ``drop-oldest`` evicts the oldest queued fix to make room. ``coalesce``
+    replaces the newest queued fix, so a stalled backend receives the most
+    recent position once it recovers without the queue growing.
+    """
+
+    def __init__(self, max_size: int, policy: str, metrics: PipelineMetrics) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.max_size = max_size
+        self.policy = policy
+        self.metrics = metrics
+        self._items: Deque[QueuedFix] = deque()
+        self._ready = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: QueuedFix) -> None:
+        with self._ready:
+            if len(self._items) >= self.max_size:
+                self.metrics.dropped_fixes += 1
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                else:
+                    self._items.pop()
+            self._items.append(item)
+            self.metrics.fixes_enqueued += 1
+            self.metrics.queue_depth = len(self._items)
+            self._ready.notify()
+
+    def get(self, timeout: Optional[float]) -> Optional[QueuedFix]:
+        with self._ready:
+            if not self._items and timeout:
+                self._ready.wait(timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self.metrics.queue_depth = len(self._items)
+            return item
+
+    def wake(self) -> None:
+        with self._ready:
+            self._ready.notify_all()
+
+
+class FixPublisher:
+    """Drain a :class:`FixQueue` on a background thread.
+
+    Failed sends are retried with exponential backoff while the reader keeps
+    enqueuing, so a backend outage never stalls or closes the serial port;
+    the queue's drop policy bounds memory instead.
+
+    With a :class:`~gps_ingest.spool.FixSpool` attached, a failed batch is
+    written to disk instead of being held in memory. While the spool holds
+    records every new fix is appended behind them to preserve ordering, and
+    the spool is drained through ``send_spooled`` in batches of
+    ``spool_batch_size`` no faster than ``catchup_rate`` fixes per second.
+    """
+
+    def __init__(
+        self,
+        send: SendCallable,
+        *,
+        batch_size: int = 1,
+        batch_interval: float = 1.0,
+        queue_size: int = 1000,
+        drop_policy: str = DROP_OLDEST,
+        retry_initial: float = 1.0,
+        retry_max_delay: float = 30.0,
+        spool: Optional[FixSpool] = None,
+        send_spooled: Optional[SendPayloadsCallable] = None,
+        spool_batch_size: int = 500,
+        catchup_rate: float = 0.0,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        if spool is not None and send_spooled is None:
+            raise ValueError("send_spooled is required when a spool is configured")
+        self.metrics = PipelineMetrics()
+        self.queue = FixQueue(queue_size, drop_policy, self.metrics)
+        self.batcher: FixBatcher[QueuedFix] = FixBatcher(batch_size, batch_interval, clock)
+        self.spool = spool
+        self._send = send
+        self._send_spooled = send_spooled
+        self._spool_batch_size = max(spool_batch_size, 1)
+        self._catchup_rate = catchup_rate
+        self._clock = clock
+        self._retry_initial = max(retry_initial, 0.01)
+        self._retry_max_delay = retry_max_delay
+        self._retry_delay = self._retry_initial
+        self._retry_at: Optional[float] = None
+        self._pending: List[QueuedFix] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if spool is not None:
+            self.metrics.spool_depth = len(spool)
+
+    def submit(self, fix: GPSFix) -> None:
+        now = self._clock()
+        self.metrics.last_fix_at = now
+        if fix.source is not None:
+            self.metrics.last_fix_by_source[fix.source] = now
+        self.queue.put(QueuedFix(fix, now))
+
+    def _backoff(self, count: int, exc: Exception) -> None:
+        self.metrics.publish_errors += 1
+        self._retry_at = self._clock() + self._retry_delay
+        logger.error(
+            "Failed to publish %s GPS fix(es), retrying in %.1fs: %s",
+            count,
+            self._retry_delay,
+            exc,
+        )
+        self._retry_delay = min(self._retry_delay * 2, self._retry_max_delay)
+
+    def _spooling(self) -> bool:
+        return self.spool is not None and len(self.spool) > 0
+
+    def _spool_items(self, items: List[QueuedFix]) -> None:
+        assert self.spool is not None  # for mypy
+        self.spool.append(item.fix.to_payload() for item in items)
+        self.metrics.spooled_fixes += len(items)
+        self.metrics.spool_depth = len(self.spool)
+
+    def _spool_queued(self) -> None:
+        """Move queued and windowed fixes behind the records already spooled."""
+
+        items = self.batcher.drain()
+        while True:
+            item = self.queue.get(None)
+            if item is None:
+                break
+            items.append(item)
+        if items:
+            self._spool_items(items)
+
+    def _deliver(self, batch: List[QueuedFix]) -> bool:
+        try:
+            self._send([item.fix for item in batch])
+        except Exception as exc:
+            self._backoff(len(batch), exc)
+            if self.spool is not None:
+                self._spool_items(batch)
+            else:
+                self._pending = batch
+            return False
+        now = self._clock()
+        for item in batch:
+            self.metrics.observe_latency(now - item.read_at)
+        self.metrics.fixes_published += len(batch)
+        self._pending = []
+        self._retry_at = None
+        self._retry_delay = self._retry_initial
+        return True
+
+    def _drain_spool(self) -> bool:
+        assert self.spool is not None and self._send_spooled is not None  # for mypy
+        batch = self.spool.read(self._spool_batch_size)
+        if batch.records:
+            try:
+                self._send_spooled(batch.records)
+            except Exception as exc:
+                self._backoff(len(batch), exc)
+                return False
+        self.spool.commit(batch)
+        self.metrics.fixes_published += len(batch)
+        self.metrics.spool_depth = len(self.spool)
+        self._retry_delay = self._retry_initial
+        self._retry_at = None
+        if self._catchup_rate > 0:
+            self._retry_at = self._clock() + len(batch) / self._catchup_rate
+        return True
+
+    def _waiting(self, timeout: Optional[float]) -> bool:
+        if self._retry_at is not None and self._clock() < self._retry_at:
+            self._stop.wait(min(timeout or 0, self._retry_at - self._clock()))
+            return True
+        return False
+
+    def run_once(self, timeout: Optional[float] = 0.1) -> bool:
+        """Move queued fixes into the batch window and publish when it closes.
+
+        Returns ``False`` while a failed batch is waiting for its retry.
+        """
+
+        if self._spooling():
+            self._spool_queued()
+            if self._waiting(timeout):
+                return False
+            return self._drain_spool()
+
+        if self._pending:
+            if self._waiting(timeout):
+                return False
+            return self._deliver(self._pending)
+
+        wait = timeout
+        remaining = self.batcher.remaining()
+        if remaining is not None:
+            wait = min(timeout or 0, remaining)
+        item = self.queue.get(wait)
+        batch = self.batcher.add(item) if item is not None else None
+        if batch is None and self.batcher.due():
+            batch = self.batcher.drain()
+        if batch:
+            return self._deliver(batch)
+        return True
+
+    def flush(self) -> None:
+        """Synchronously publish everything queued, ignoring the time window.
+
+        Fixes that cannot be delivered stay on the spool when one is
+        configured so they are sent after the next start.
+        """
+
+        if not self._spooling():
+            self._flush_memory()
+        if self._spooling():
+            self._spool_queued()
+
+    def _flush_memory(self) -> None:
+        if self._pending and not self._deliver(self._pending):
+            return
+        while True:
+            item = self.queue.get(None)
+            if item is None:
+                break
+            batch = self.batcher.add(item)
+            if batch and not self._deliver(batch):
+                return
+        if len(self.batcher):
+            self._deliver(self.batcher.drain())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once(timeout=0.5)
+            except Exception:  # pragma: no cover - keep the publisher alive
+                logger.exception("GPS publisher iteration failed")
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gps-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self, drain: bool = True) -> None:
+        self._stop.set()
+        self.queue.wake()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if drain:
+            self.flush()
+        if self.spool is not None:
+            self.spool.close()
@@ -0,0 +1,110 @@
+"""Per-receiver parsing state shared by the single- and multi-source loops."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import List, Optional
+
+from .batching import Clock
+from .config import Config
+from .decimation import FixDecimator
+from .fusion import EpochAssembler
+from .nmea import NMEAError, NMEAReport, parse_report, sentence_type
+from .parser import GPSFix, fix_from_report
+from .pipeline import PipelineMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class FixReader:
+    """Turn raw lines from one receiver into fixes ready to publish.
+
+    Epoch fusion and decimation keep state about the previous fix, so every
+    receiver needs its own reader. Fixes are tagged with ``source`` when one
+    is given so the backend can tell receivers apart.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        metrics: PipelineMetrics,
+        clock: Clock = time.monotonic,
+        source: Optional[str] = None,
+    ) -> None:
+        self.metrics = metrics
+        self.source = source
+        self._clock = clock
+        self.assembler = (
+            EpochAssembler(config.epoch_timeout, config.dop_scale, clock)
+            if config.epoch_fusion
+            else None
+        )
+        self.decimator = (
+            FixDecimator(
+                min_distance_m=config.decimation_distance_m,
+                heading_threshold_deg=config.decimation_heading_deg,
+                speed_threshold_kmh=config.decimation_speed_kmh,
+                heartbeat_seconds=config.decimation_heartbeat,
+                clock=clock,
+            )
+            if config.decimation_enabled
+            else None
+        )
+
+    def _report(self, raw: bytes) -> Optional[NMEAReport]:
+        try:
+            return parse_report(raw)
+        except NMEAError as exc:
+            kind = sentence_type(raw)
+            failures = self.metrics.parse_failures
+            failures[kind] = failures.get(kind, 0) + 1
+            logger.debug("Failed to parse NMEA sentence %r: %s", raw, exc)
+            return None
+
+    def _parse(self, raw: bytes) -> List[GPSFix]:
+        report = self._report(raw) if raw else None
+        if self.assembler is None:
+            fix = fix_from_report(report) if report is not None else None
+            return [fix] if fix is not None else []
+        if report is None:
+            return self.assembler.poll()
+        return self.assembler.feed(report)
+
+    def _accept(self, fixes: List[GPSFix]) -> List[GPSFix]:
+        if fixes:
+            # Recorded before decimation: a parked receiver still produces
+            # fixes even though only heartbeats are published.
+            now = self._clock()
+            self.metrics.last_received_at = now
+            if self.source is not None:
+                self.metrics.last_received_by_source[self.source] = now
+        accepted = []
+        for fix in fixes:
+            if self.decimator is not None and not self.decimator.accept(fix):
+                self.metrics.fixes_decimated += 1
+                continue
+            if self.source is not None:
+                fix.source = self.source
+            accepted.append(fix)
+        return accepted
+
+    def feed(self, raw: bytes) -> List[GPSFix]:
+        """Turn one line into zero or more fixes.
+
+        Without fusion every positional sentence is a fix. With fusion the
+        line feeds the epoch assembler, and idle reads (``b""``) let it time
+        out. The raw bytes go straight to the parser without decoding.
+        """
+
+        if raw:
+            self.metrics.sentences_read += 1
+        fixes = self._parse(raw)
+        return self._accept(fixes) if fixes else fixes
+
+    def flush(self) -> List[GPSFix]:
+        """Emit the epoch being assembled, e.g. when the connection drops."""
+
+        if self.assembler is None:
+            return []
+        return self._accept(self.assembler.flush())
@@ -0,0 +1,363 @@
+"""Replay recorded NMEA logs through the ingest pipeline to size deployments.
+
+Example::
+
+    gps-ingest-replay drive.nmea --speed 10 --batch-size 50 --api-latency-ms 20
+
+Sentences are served by an in-memory serial port to the real
+:class:`~gps_ingest.service.GPSIngestService` parser, fusion and publisher,
+paced by the UTC time of the recorded epochs (``--speed 1`` is real time,
+``--max`` disables pacing). Unless ``--api-url`` is given, fixes are posted
+to a local stand-in API with configurable latency and error rate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+
+import serial
+
+from .batching import Clock
+from .config import Config
+from .service import GPSIngestService, SleepCallable
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86_400.0
+
+
+def load_log(paths: Iterable[Path | str]) -> List[bytes]:
+    """Read NMEA logs as raw lines, skipping blank ones."""
+
+    lines: List[bytes] = []
+    for path in paths:
+        data = Path(path).expanduser().read_bytes()
+        lines.extend(line + b"\r\n" for line in data.splitlines() if line.strip())
+    return lines
+
+
+_TIMED_SENTENCES = (b"RMC", b"GGA")
+
+
+def _epoch_seconds(line: bytes) -> Optional[float]:
+    """Seconds since midnight from the ``hhmmss.ss`` field of RMC/GGA lines.
+
+    Only the time field is read; pacing has no use for the rest of the
+    sentence, so it is not parsed or checksummed.
+    """
+
+    comma = line.find(b",")
+    if comma < 6 or line[comma - 3 : comma] not in _TIMED_SENTENCES:
+        return None
+    end = line.find(b",", comma + 1)
+    field = line[comma + 1 : end]
+    if end < 0 or len(field) < 6:
+        return None
+    try:
+        return int(field[:2]) * 3600 + int(field[2:4]) * 60 + float(field[4:])
+    except ValueError:
+        return None
+
+
+class ReplaySerial:
+    """In-memory stand-in for :class:`serial.Serial` serving recorded lines.
+
+    With a ``speed`` the port blocks before a sentence whose epoch time is
+    later than the last one, so the log plays back ``speed`` times faster
+    than it was recorded; ``None`` replays as fast as it is read.
+    """
+
+    def __init__(
+        self,
+        lines: Sequence[bytes],
+        *,
+        speed: Optional[float] = 1.0,
+        loops: int = 1,
+        clock: Clock = time.monotonic,
+        sleep: SleepCallable = time.sleep,
+    ) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self.lines = lines
+        self.speed = speed
+        self.loops = loops
+        self.sentences_read = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._index = 0
+        self._loop = 0
+        self._started_at = 0.0
+        self._first: Optional[float] = None  # first epoch of the log
+        self._last: Optional[float] = None  # last epoch played, offset applied
+        self._offset = 0.0
+
+    def _pace(self, line: bytes) -> None:
+        if self.speed is None:
+            return
+        epoch = _epoch_seconds(line)
+        if epoch is None:
+            return
+        if self._first is None:
+            self._first = epoch
+        if self._last is None:
+            self._started_at = self._clock()
+            self._last = epoch + self._offset
+            return
+        epoch += self._offset
+        if epoch < self._last:
+            if self._last - epoch < SECONDS_PER_DAY / 2:
+                return  # out-of-order sentence; do not rewind
+            self._offset += SECONDS_PER_DAY  # the recording crossed midnight
+            epoch += SECONDS_PER_DAY
+        self._last = epoch
+        due = self._started_at + (epoch - self._first) / self.speed
+        delay = due - self._clock()
+        if delay > 0:
+            self._sleep(delay)
+
+    def readline(self) -> bytes:
+        if self._index >= len(self.lines):
+            self._loop += 1
+            if self._loop >= self.loops or not self.lines:
+                raise serial.SerialException("replay finished")
+            self._index = 0
+            if self._first is not None and self._last is not None:
+                # Continue one second after the previous pass instead of rewinding.
+                self._offset = self._last + 1.0 - self._first
+        line = self.lines[self._index]
+        self._index += 1
+        self._pace(line)
+        self.sentences_read += 1
+        return line
+
+    def close(self) -> None:
+        pass
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    server: "StandInAPI"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server API
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        api = self.server
+        if api.latency:
+            time.sleep(api.latency)
+        if api.error_rate and api.random.random() < api.error_rate:
+            self.send_response(503)
+            self.end_headers()
+            return
+        payload = json.loads(body or b"{}")
+        count = len(payload.get("fixes", ())) if "fixes" in payload else 1
+        with api.lock:
+            api.requests += 1
+            api.fixes_received += count
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+class StandInAPI(ThreadingHTTPServer):
+    """Local HTTP server accepting single and bulk fix uploads."""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.fixes_received = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/gps"
+
+    @property
+    def bulk_url(self) -> str:
+        return f"{self.url}/batch"
+
+    def __enter__(self) -> "StandInAPI":
+        self._thread = threading.Thread(target=self.serve_forever, name="stand-in-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+@dataclass(slots=True)
+class ReplayReport:
+    """Throughput and delivery figures for one replay run."""
+
+    sentences: int
+    fixes: int
+    published: int
+    dropped: int
+    publish_errors: int
+    elapsed: float
+    latency_p50: Optional[float]
+    latency_p95: Optional[float]
+    latency_p99: Optional[float]
+    latency_max: Optional[float]
+
+    @property
+    def sentences_per_second(self) -> float:
+        return self.sentences / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def fixes_per_second(self) -> float:
+        return self.fixes / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        return {
+            "sentences": self.sentences,
+            "fixes": self.fixes,
+            "published": self.published,
+            "dropped": self.dropped,
+            "publish_errors": self.publish_errors,
+            "elapsed_seconds": self.elapsed,
+            "sentences_per_second": self.sentences_per_second,
+            "fixes_per_second": self.fixes_per_second,
+            "latency_p50_seconds": self.latency_p50,
+            "latency_p95_seconds": self.latency_p95,
+            "latency_p99_seconds": self.latency_p99,
+            "latency_max_seconds": self.latency_max,
+        }
+
+    def format(self) -> str:
+        def ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value * 1000:.1f}ms"
+
+        return (
+            f"sentences: {self.sentences} ({self.sentences_per_second:.0f}/s)\n"
+            f"fixes:     {self.fixes} ({self.fixes_per_second:.0f}/s), "
+            f"published {self.published}, dropped {self.dropped}, "
+            f"publish errors {self.publish_errors}\n"
+            f"latency:   p50 {ms(self.latency_p50)} p95 {ms(self.latency_p95)} "
+            f"p99 {ms(self.latency_p99)} max {ms(self.latency_max)}\n"
+            f"elapsed:   {self.elapsed:.3f}s"
+        )
+
+
+def percentile(samples: Sequence[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of ``samples`` (``fraction`` in ``[0, 1]``)."""
+
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def replay(
+    config: Config,
+    lines: Sequence[bytes],
+    *,
+    speed: Optional[float] = None,
+    loops: int = 1,
+    clock: Callable[[], float] = time.monotonic,
+) -> ReplayReport:
+    """Push ``lines`` through a :class:`GPSIngestService` and report the result."""
+
+    port = ReplaySerial(lines, speed=speed, loops=loops)
+    service = GPSIngestService(config, serial_factory=lambda **_: port)
+    samples: List[float] = []
+    service.metrics.latency_samples = samples
+    started = clock()
+    service.publisher.start()
+    try:
+        service.stream(port)
+    except serial.SerialException:
+        pass  # end of the log
+    finally:
+        service.publisher.stop(drain=True)
+        service.session.close()
+    elapsed = clock() - started
+    metrics = service.metrics
+    return ReplayReport(
+        sentences=port.sentences_read,
+        fixes=metrics.fixes_enqueued,
+        published=metrics.fixes_published,
+        dropped=metrics.dropped_fixes,
+        publish_errors=metrics.publish_errors,
+        elapsed=elapsed,
+        latency_p50=percentile(samples, 0.50),
+        latency_p95=percentile(samples, 0.95),
+        latency_p99=percentile(samples, 0.99),
+        latency_max=max(samples) if samples else None,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("logs", nargs="+", type=Path, help="NMEA log files")
+    rate = parser.add_mutually_exclusive_group()
+    rate.add_argument("--speed", type=float, default=1.0, help="playback speed (1 = real time)")
+    rate.add_argument("--max", action="store_true", help="replay as fast as possible")
+    parser.add_argument("--loops", type=int, default=1, help="replay the logs this many times")
+    parser.add_argument("--api-url", help="publish to this endpoint instead of the stand-in API")
+    parser.add_argument("--batch-api-url", help="bulk endpoint to use with --api-url")
+    parser.add_argument("--api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--api-error-rate", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--batch-interval", type=float, default=1.0)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--drop-policy", choices=("drop-oldest", "coalesce"), default="drop-oldest")
+    parser.add_argument("--no-fusion", action="store_true", help="publish every sentence as a fix")
+    parser.add_argument("--decimation", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.api_url and args.batch_size > 1 and not args.batch_api_url:
+        parser.error("--batch-size above 1 with --api-url needs --batch-api-url")
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    lines = load_log(args.logs)
+
+    def run(api_url: str, batch_api_url: Optional[str]) -> ReplayReport:
+        config = Config(
+            serial_port="replay",
+            baud_rate=9600,
+            api_url=api_url,
+            api_token=None,
+            reconnect_initial=0.1,
+            batch_max_size=args.batch_size,
+            batch_max_interval=args.batch_interval,
+            batch_api_url=batch_api_url,
+            queue_max_size=args.queue_size,
+            queue_drop_policy=args.drop_policy,
+            epoch_fusion=not args.no_fusion,
+            decimation_enabled=args.decimation,
+        )
+        return replay(config, lines, speed=None if args.max else args.speed, loops=args.loops)
+
+    if args.api_url:
+        report = run(args.api_url, args.batch_api_url)
+    else:
+        with StandInAPI(args.api_latency_ms / 1000, args.api_error_rate) as api:
+            report = run(api.url, api.bulk_url)
+
+    if args.json:
+        print(json.dumps(report.as_dict()))
+    else:
+        print(report.format())
+
+
+if __name__ == "__main__":
+    main()
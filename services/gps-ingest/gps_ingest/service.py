@@ -6,52 +6,94 @@ import json
 import logging
 import time
 from contextlib import contextmanager
-from typing import Callable, Iterable
+from typing import Any, Callable, Iterable, Optional, Sequence, TypeVar
 
 import requests
 import serial
 
+from .batching import Clock
 from .config import Config
-from .parser import GPSFix, parse_nmea_sentence
+from .gpsd import GpsdConnection, GpsdReader
+from .monitoring import MetricsServer
+from .parser import GPSFix
+from .pipeline import FixPublisher, PipelineMetrics
+from .reader import FixReader
+from .spool import FixSpool
 
 logger = logging.getLogger(__name__)
 
 SerialFactory = Callable[..., serial.Serial]
 SleepCallable = Callable[[float], None]
+T = TypeVar("T")
 
 
-def connect_serial_with_retry(
+def _connect_with_retry(
     config: Config,
-    serial_factory: SerialFactory,
-    sleep: SleepCallable = time.sleep,
-) -> serial.Serial:
-    """Attempt to connect to the serial device with exponential backoff."""
-
+    open_connection: Callable[[], T],
+    kind: str,
+    sleep: SleepCallable,
+    metrics: Optional[PipelineMetrics],
+) -> T:
     attempt = 0
     delay = max(config.reconnect_initial, 0)
     while True:
         try:
-            logger.info(
-                "Opening GPS serial connection on %s @ %s baud",
-                config.serial_port,
-                config.baud_rate,
-            )
-            connection = serial_factory(
-                port=config.serial_port,
-                baudrate=config.baud_rate,
-                timeout=config.serial_timeout,
-            )
-            logger.info("GPS serial connection established")
+            connection = open_connection()
+            logger.info("GPS %s connection established", kind)
             return connection
-        except serial.SerialException as exc:
+        except OSError as exc:  # includes serial.SerialException
             attempt += 1
-            logger.warning("GPS serial connection failed (attempt %s): %s", attempt, exc)
+            if metrics is not None:
+                metrics.reconnects += 1
+            logger.warning("GPS %s connection failed (attempt %s): %s", kind, attempt, exc)
             if config.reconnect_max_attempts and attempt >= config.reconnect_max_attempts:
                 raise
             sleep(delay)
             delay = min(max(delay * 2, 0.1), config.reconnect_max_delay)
 
 
+def connect_serial_with_retry(
+    config: Config,
+    serial_factory: SerialFactory,
+    sleep: SleepCallable = time.sleep,
+    metrics: Optional[PipelineMetrics] = None,
+) -> serial.Serial:
+    """Attempt to connect to the serial device with exponential backoff.
+
+    Failed attempts are counted in ``metrics.reconnects`` when given.
+    """
+
+    def open_serial() -> serial.Serial:
+        logger.info(
+            "Opening GPS serial connection on %s @ %s baud",
+            config.serial_port,
+            config.baud_rate,
+        )
+        return serial_factory(
+            port=config.serial_port,
+            baudrate=config.baud_rate,
+            timeout=config.serial_timeout,
+        )
+
+    return _connect_with_retry(config, open_serial, "serial", sleep, metrics)
+
+
+def connect_gpsd_with_retry(
+    config: Config,
+    sleep: SleepCallable = time.sleep,
+    metrics: Optional[PipelineMetrics] = None,
+) -> GpsdConnection:
+    """Connect to gpsd and enable JSON watching, with exponential backoff."""
+
+    assert config.gpsd_host is not None
+
+    def open_gpsd() -> GpsdConnection:
+        logger.info("Connecting to gpsd at %s:%s", config.gpsd_host, config.gpsd_port)
+        return GpsdConnection(config.gpsd_host, config.gpsd_port, config.serial_timeout)
+
+    return _connect_with_retry(config, open_gpsd, "gpsd", sleep, metrics)
+
+
 class GPSIngestService:
     """High-level orchestration for streaming GPS fixes to the backend API."""
 
@@ -61,25 +103,79 @@ class GPSIngestService:
         serial_factory: SerialFactory = serial.Serial,
         session: requests.Session | None = None,
         sleep: SleepCallable = time.sleep,
+        clock: Clock = time.monotonic,
     ) -> None:
         self.config = config
         self.serial_factory = serial_factory
         self.session = session or requests.Session()
         self.sleep = sleep
+        spool = (
+            FixSpool(
+                config.spool_dir,
+                segment_max_bytes=config.spool_segment_bytes,
+                max_total_bytes=config.spool_max_bytes,
+                device=(
+                    f"{config.gpsd_host}:{config.gpsd_port}"
+                    if config.gpsd_host
+                    else config.serial_port or None
+                ),
+            )
+            if config.spool_dir
+            else None
+        )
+        self.publisher = FixPublisher(
+            self._send,
+            batch_size=config.batch_max_size,
+            batch_interval=config.batch_max_interval,
+            queue_size=config.queue_max_size,
+            drop_policy=config.queue_drop_policy,
+            retry_initial=config.reconnect_initial,
+            retry_max_delay=config.reconnect_max_delay,
+            spool=spool,
+            send_spooled=self.publish_spooled,
+            spool_batch_size=config.spool_batch_size,
+            catchup_rate=config.spool_catchup_rate,
+            clock=clock,
+        )
+        reader_class = GpsdReader if config.gpsd_host else FixReader
+        self.reader = reader_class(config, self.publisher.metrics, clock)
+        self.metrics_server = (
+            MetricsServer(
+                self.metrics,
+                host=config.metrics_host,
+                port=config.metrics_port,
+                max_fix_age=config.health_max_fix_age,
+                clock=clock,
+            )
+            if config.metrics_port is not None
+            else None
+        )
+
+    @property
+    def metrics(self) -> PipelineMetrics:
+        return self.publisher.metrics
 
     @contextmanager
-    def _serial_connection(self) -> Iterable[serial.Serial]:
-        connection = connect_serial_with_retry(self.config, self.serial_factory, self.sleep)
+    def _connection(self) -> Iterable[serial.Serial | GpsdConnection]:
+        connection: serial.Serial | GpsdConnection
+        if self.config.gpsd_host:
+            connection = connect_gpsd_with_retry(self.config, self.sleep, self.metrics)
+        else:
+            connection = connect_serial_with_retry(
+                self.config, self.serial_factory, self.sleep, self.metrics
+            )
         try:
             yield connection
         finally:
             try:
                 connection.close()
-            except serial.SerialException:
-                logger.debug("Serial connection already closed")
+            except OSError:
+                logger.debug("GPS connection already closed")
 
     def publish_fix(self, fix: GPSFix) -> None:
-        payload = fix.to_payload()
+        self.publish_payload(fix.to_payload())
+
+    def publish_payload(self, payload: dict[str, Any]) -> None:
         logger.debug("Publishing GPS fix: %s", json.dumps(payload))
         response = self.session.post(
             self.config.api_url,
@@ -89,39 +185,91 @@ class GPSIngestService:
         )
         response.raise_for_status()
 
+    def publish_batch(self, fixes: Sequence[GPSFix]) -> None:
+        """Send ``fixes`` in a single request to the bulk telemetry endpoint."""
+
+        self.publish_payloads([fix.to_payload() for fix in fixes])
+
+    def publish_payloads(self, payloads: Sequence[dict[str, Any]]) -> None:
+        if not self.config.batch_api_url:
+            raise ValueError("GPS_BATCH_API_URL is not configured")
+        payload = {"fixes": list(payloads)}
+        logger.debug("Publishing batch of %s GPS fixes", len(payloads))
+        response = self.session.post(
+            self.config.batch_api_url,
+            json=payload,
+            headers=self.config.headers,
+            timeout=10,
+        )
+        response.raise_for_status()
+
+    def publish_spooled(self, payloads: Sequence[dict[str, Any]]) -> None:
+        """Upload spooled fixes through the bulk endpoint if one is configured.
+
+        Without one the backlog is replayed one fix at a time to ``api_url``;
+        a failure part-way re-sends the whole batch, which ``spool_id`` lets
+        the backend de-duplicate.
+        """
+
+        if self.config.batch_api_url:
+            self.publish_payloads(payloads)
+            return
+        for payload in payloads:
+            self.publish_payload(payload)
+
+    def _send(self, fixes: Sequence[GPSFix]) -> None:
+        if self.config.batching_enabled:
+            self.publish_batch(fixes)
+        else:
+            for fix in fixes:
+                self.publish_fix(fix)
+
     def run(self) -> None:
         """Run the ingestion loop until interrupted."""
 
         logger.info("Starting GPS ingestion service")
+        self._start_background()
         try:
             while True:
                 try:
-                    with self._serial_connection() as connection:
-                        self._stream(connection)
-                except serial.SerialException as exc:
-                    logger.warning("Serial connection lost: %s", exc)
+                    with self._connection() as connection:
+                        self.stream(connection)
+                except OSError as exc:  # includes serial.SerialException
+                    logger.warning("GPS connection lost: %s", exc)
+                    self.metrics.reconnects += 1
                     self.sleep(self.config.reconnect_initial)
         except KeyboardInterrupt:
             logger.info("GPS ingestion interrupted; shutting down")
         finally:
+            self._stop_background()
+            logger.info("GPS pipeline metrics: %s", self.metrics.snapshot())
             self.session.close()
 
-    def _stream(self, connection: serial.Serial) -> None:
-        while True:
-            raw = connection.readline()
-            if not raw:
-                continue
-            try:
-                sentence = raw.decode("ascii", errors="ignore").strip()
-            except UnicodeDecodeError:
-                logger.debug("Received undecodable bytes from GPS receiver")
-                continue
-            fix = parse_nmea_sentence(sentence)
-            if not fix:
-                continue
-            try:
-                self.publish_fix(fix)
-            except requests.RequestException as exc:
-                logger.error("Failed to publish GPS fix: %s", exc)
-                self.sleep(self.config.reconnect_initial)
-                break
+    def _start_background(self) -> None:
+        self.publisher.start()
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+            logger.info("Serving GPS metrics on %s", self.metrics_server.url)
+
+    def _stop_background(self) -> None:
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.publisher.stop()
+
+    def stream(self, connection: serial.Serial | GpsdConnection) -> None:
+        """Read sentences from an open ``connection`` until it fails.
+
+        Fixes are handed to the publisher thread, which the caller starts;
+        :meth:`run` adds reconnects and tools such as the replay harness call
+        this directly with their own connection. Publishing never happens on
+        this thread, so a slow or unreachable
+        backend cannot delay ``readline()`` or close the serial port.
+        """
+
+        try:
+            while True:
+                for fix in self.reader.feed(connection.readline()):
+                    self.publisher.submit(fix)
+        finally:
+            for fix in self.reader.flush():
+                self.publisher.submit(fix)
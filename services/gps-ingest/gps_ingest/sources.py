@@ -0,0 +1,213 @@
+"""Concurrent ingestion from several serial or TCP NMEA receivers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Protocol
+
+import requests
+import serial
+
+from .batching import Clock
+from .config import GPSD_SOURCE, SERIAL_SOURCE, Config, SourceConfig
+from .gpsd import WATCH_COMMAND, GpsdReader
+from .parser import GPSFix
+from .reader import FixReader
+from .service import GPSIngestService, SerialFactory
+
+logger = logging.getLogger(__name__)
+
+
+class LineSource(Protocol):
+    """An open connection to one receiver yielding raw NMEA lines."""
+
+    async def readline(self) -> bytes:
+        """Return the next line, or ``b""`` when nothing arrived in time."""
+
+    async def close(self) -> None:
+        ...
+
+
+class SerialLineSource:
+    """pyserial has no asyncio API; blocking reads run on a worker thread."""
+
+    def __init__(self, connection: serial.Serial, executor: ThreadPoolExecutor) -> None:
+        self._connection = connection
+        self._executor = executor
+
+    async def readline(self) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._connection.readline)
+
+    async def close(self) -> None:
+        try:
+            self._connection.close()
+        except serial.SerialException:
+            logger.debug("Serial connection already closed")
+
+
+class TcpLineSource:
+    """Line-oriented TCP stream: NMEA from ``ser2net`` or gpsd JSON reports."""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        idle_timeout: float,
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._idle_timeout = idle_timeout
+
+    async def readline(self) -> bytes:
+        try:
+            line = await asyncio.wait_for(self._reader.readline(), self._idle_timeout)
+        except asyncio.TimeoutError:
+            return b""
+        if not line:
+            raise ConnectionError("NMEA stream closed by peer")
+        return line
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            logger.debug("TCP connection already closed")
+
+
+class MultiSourceIngestService(GPSIngestService):
+    """Read every receiver in ``config.sources`` from one asyncio loop.
+
+    Each source keeps its own :class:`~gps_ingest.reader.FixReader` (epoch
+    fusion and decimation state), tags fixes with its slug and reconnects
+    with its own exponential backoff, so one unplugged puck never delays the
+    others. All sources share the publisher thread, its queue and spool, and
+    the pooled HTTP session of :class:`GPSIngestService`.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        serial_factory: SerialFactory = serial.Serial,
+        session: requests.Session | None = None,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        super().__init__(config, serial_factory=serial_factory, session=session, clock=clock)
+        self.readers: Dict[str, FixReader] = {
+            source.slug: (GpsdReader if source.kind == GPSD_SOURCE else FixReader)(
+                config, self.metrics, clock, source.slug
+            )
+            for source in config.sources
+        }
+        self.reconnects: Dict[str, int] = {source.slug: 0 for source in config.sources}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _open(self, source: SourceConfig) -> LineSource:
+        if source.kind != SERIAL_SOURCE:
+            reader, writer = await asyncio.open_connection(source.target, source.port)
+            if source.kind == GPSD_SOURCE:
+                writer.write(WATCH_COMMAND)
+                await writer.drain()
+            return TcpLineSource(reader, writer, self.config.serial_timeout)
+        assert self._executor is not None
+        loop = asyncio.get_running_loop()
+        connection = await loop.run_in_executor(
+            self._executor,
+            lambda: self.serial_factory(
+                port=source.target,
+                baudrate=source.baud_rate,
+                timeout=self.config.serial_timeout,
+            ),
+        )
+        return SerialLineSource(connection, self._executor)
+
+    def _submit(self, fixes: List[GPSFix]) -> None:
+        for fix in fixes:
+            self.publisher.submit(fix)
+
+    def _stopped(self) -> bool:
+        return self._stopping is not None and self._stopping.is_set()
+
+    async def _run_source(self, source: SourceConfig) -> None:
+        # Stopping is checked cooperatively as well as by cancelling the task:
+        # on Python < 3.12 ``wait_for`` can swallow a cancellation that races
+        # with a completed read.
+        reader = self.readers[source.slug]
+        delay = max(self.config.reconnect_initial, 0)
+        while not self._stopped():
+            try:
+                logger.info("Opening GPS source %s (%s)", source.slug, source.describe())
+                connection = await self._open(source)
+            except (OSError, ValueError) as exc:
+                logger.warning("GPS source %s unavailable: %s", source.slug, exc)
+            else:
+                try:
+                    while not self._stopped():
+                        raw = await connection.readline()
+                        if raw:
+                            delay = max(self.config.reconnect_initial, 0)
+                        self._submit(reader.feed(raw))
+                except (OSError, ValueError) as exc:
+                    logger.warning("GPS source %s lost: %s", source.slug, exc)
+                finally:
+                    self._submit(reader.flush())
+                    await connection.close()
+            if self._stopped():
+                return
+            self.reconnects[source.slug] += 1
+            self.metrics.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(max(delay * 2, 0.1), self.config.reconnect_max_delay)
+
+    async def run_async(self) -> None:
+        """Read all sources until :meth:`stop` is called."""
+
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        serial_sources = sum(source.kind == SERIAL_SOURCE for source in self.config.sources)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(serial_sources, 1), thread_name_prefix="gps-serial"
+        )
+        tasks = [
+            asyncio.create_task(self._run_source(source), name=f"gps-source-{source.slug}")
+            for source in self.config.sources
+        ]
+        try:
+            await self._stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stop(self) -> None:
+        """Ask :meth:`run_async` to return; safe to call from any thread."""
+
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    def run(self) -> None:
+        """Run the multi-source loop until interrupted."""
+
+        logger.info(
+            "Starting GPS ingestion service for %s sources: %s",
+            len(self.config.sources),
+            ", ".join(source.slug for source in self.config.sources),
+        )
+        self._start_background()
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            logger.info("GPS ingestion interrupted; shutting down")
+        finally:
+            self._stop_background()
+            logger.info("GPS reconnects per source: %s", self.reconnects)
+            logger.info("GPS pipeline metrics: %s", self.metrics.snapshot())
+            self.session.close()
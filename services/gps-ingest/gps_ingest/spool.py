@@ -0,0 +1,305 @@
+"""Append-only on-disk spool used to store fixes while the backend is down."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Each record is ``<length><crc32><json payload>`` with a little-endian header.
+HEADER = struct.Struct("<II")
+SEGMENT_SUFFIX = ".seg"
+CURSOR_NAME = "cursor.json"
+SPOOL_ID_NAME = "spool-id"
+
+Position = Tuple[int, int]
+
+
+@dataclass(slots=True)
+class SpoolBatch:
+    """Records read from the spool and the position just past the last one."""
+
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    end: Optional[Position] = None
+    counts: Dict[int, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. Windows
+        return
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover - some filesystems reject directory fsync
+        pass
+    finally:
+        os.close(fd)
+
+
+class FixSpool:
+    """Durable FIFO of fix payloads split into size-capped segment files.
+
+    Records are appended with a CRC so a write torn by power loss is detected
+    and truncated on the next open. Consumers :meth:`read` a batch, upload it
+    and then :meth:`commit` it; the read position is persisted atomically, so
+    a restart resumes exactly after the last committed record. Each record
+    carries a stable ``spool_id`` that the backend can use to discard the
+    single batch that may be replayed if the process dies between upload and
+    commit.
+
+    ``spool_id`` is ``<device>:<spool uuid>:<segment>:<offset>``: the device
+    is the record's ``source`` or the ``device`` the spool was opened for,
+    and the UUID is generated once per spool directory and kept in
+    ``spool-id``, so ids from different receivers, hosts or a recreated
+    spool never collide.
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        segment_max_bytes: int = 4 * 1024 * 1024,
+        max_total_bytes: int = 256 * 1024 * 1024,
+        fsync: bool = True,
+        device: Optional[str] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.device = device
+        self.segment_max_bytes = segment_max_bytes
+        self.max_total_bytes = max(max_total_bytes, segment_max_bytes)
+        self.fsync = fsync
+        self.dropped_records = 0
+        self.corrupt_records = 0
+        self.spool_uuid = self._load_spool_uuid()
+        self._cursor: Position = self._load_cursor()
+        self._pending: Dict[int, int] = {}
+        self._sizes: Dict[int, int] = {}
+        self._writer: Optional[BinaryIO] = None
+        self._recover()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _segment_path(self, index: int) -> Path:
+        return self.directory / f"{index:08d}{SEGMENT_SUFFIX}"
+
+    def _segments(self) -> List[int]:
+        indexes = []
+        for path in self.directory.glob(f"*{SEGMENT_SUFFIX}"):
+            try:
+                indexes.append(int(path.stem))
+            except ValueError:
+                continue
+        return sorted(indexes)
+
+    def _write_atomic(self, path: Path, text: str) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            handle.write(text)
+            handle.flush()
+            if self.fsync:
+                os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+        if self.fsync:
+            _fsync_dir(self.directory)
+
+    def _load_spool_uuid(self) -> str:
+        path = self.directory / SPOOL_ID_NAME
+        try:
+            return str(uuid.UUID(path.read_text(encoding="utf-8").strip()))
+        except (OSError, ValueError):
+            pass
+        spool_uuid = str(uuid.uuid4())
+        self._write_atomic(path, spool_uuid + "\n")
+        return spool_uuid
+
+    def _load_cursor(self) -> Position:
+        path = self.directory / CURSOR_NAME
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return int(data["segment"]), int(data["offset"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, 0
+
+    def _store_cursor(self) -> None:
+        segment, offset = self._cursor
+        self._write_atomic(
+            self.directory / CURSOR_NAME, json.dumps({"segment": segment, "offset": offset})
+        )
+
+    def _scan(self, index: int, offset: int) -> Tuple[int, int]:
+        """Return ``(valid_records, end_offset)`` of a segment from ``offset``."""
+
+        count = 0
+        with self._segment_path(index).open("rb") as handle:
+            handle.seek(offset)
+            while True:
+                header = handle.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                length, crc = HEADER.unpack(header)
+                body = handle.read(length)
+                if len(body) < length or zlib.crc32(body) != crc:
+                    break
+                offset += HEADER.size + length
+                count += 1
+        return count, offset
+
+    def _recover(self) -> None:
+        segments = self._segments()
+        cursor_segment, cursor_offset = self._cursor
+        for index in segments:
+            if index < cursor_segment:
+                # Fully consumed but not yet removed before a crash.
+                self._segment_path(index).unlink(missing_ok=True)
+                continue
+            start = cursor_offset if index == cursor_segment else 0
+            count, end = self._scan(index, start)
+            size = self._segment_path(index).stat().st_size
+            if end < size:
+                logger.warning(
+                    "Truncating %s bytes of torn spool data in %s",
+                    size - end,
+                    self._segment_path(index).name,
+                )
+                with self._segment_path(index).open("r+b") as handle:
+                    handle.truncate(end)
+            self._pending[index] = count
+            self._sizes[index] = end
+        if not self._pending:
+            self._cursor = (max(cursor_segment, (segments or [0])[-1]), 0)
+            self._pending[self._cursor[0]] = 0
+            self._sizes[self._cursor[0]] = 0
+
+    def _open_writer(self) -> BinaryIO:
+        if self._writer is None:
+            index = max(self._pending)
+            self._writer = self._segment_path(index).open("ab")
+        return self._writer
+
+    def _rotate(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        index = max(self._pending) + 1
+        self._pending[index] = 0
+        self._sizes[index] = 0
+        self._enforce_cap()
+
+    def _enforce_cap(self) -> None:
+        while sum(self._sizes.values()) > self.max_total_bytes and len(self._sizes) > 1:
+            oldest = min(self._sizes)
+            dropped = self._pending.pop(oldest, 0)
+            self._sizes.pop(oldest, None)
+            self._segment_path(oldest).unlink(missing_ok=True)
+            self.dropped_records += dropped
+            logger.warning("Spool full; dropped %s oldest fixes", dropped)
+            if self._cursor[0] <= oldest:
+                self._cursor = (min(self._sizes), 0)
+                self._store_cursor()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return sum(self._pending.values())
+
+    def append(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        """Durably append ``payloads``; returns the number of records written."""
+
+        written = 0
+        for payload in payloads:
+            body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+            index = max(self._pending)
+            size = self._sizes[index]
+            if size and size + HEADER.size + len(body) > self.segment_max_bytes:
+                self._rotate()
+                index = max(self._pending)
+            writer = self._open_writer()
+            writer.write(HEADER.pack(len(body), zlib.crc32(body)))
+            writer.write(body)
+            self._sizes[index] += HEADER.size + len(body)
+            self._pending[index] += 1
+            written += 1
+        if written and self._writer is not None:
+            self._writer.flush()
+            if self.fsync:
+                os.fsync(self._writer.fileno())
+        return written
+
+    def read(self, limit: int) -> SpoolBatch:
+        """Return up to ``limit`` records from the cursor without consuming them."""
+
+        batch = SpoolBatch()
+        cursor_segment, cursor_offset = self._cursor
+        for index in sorted(self._pending):
+            if index < cursor_segment or not self._pending[index]:
+                continue
+            if len(batch) >= limit:
+                break
+            offset = cursor_offset if index == cursor_segment else 0
+            end = self._sizes[index]
+            with self._segment_path(index).open("rb") as handle:
+                handle.seek(offset)
+                while offset < end and len(batch) < limit:
+                    record_offset = offset
+                    length, crc = HEADER.unpack(handle.read(HEADER.size))
+                    offset += HEADER.size + length
+                    body = handle.read(length)
+                    batch.counts[index] = batch.counts.get(index, 0) + 1
+                    if offset > end or zlib.crc32(body) != crc:
+                        # The rest of the segment cannot be framed reliably.
+                        self.corrupt_records += 1
+                        logger.warning(
+                            "Skipping corrupt spool data at %s:%s", index, record_offset
+                        )
+                        batch.counts[index] = self._pending[index]
+                        offset = end
+                        break
+                    record = json.loads(body)
+                    device = record.get("source") or self.device or ""
+                    record["spool_id"] = f"{device}:{self.spool_uuid}:{index}:{record_offset}"
+                    batch.records.append(record)
+            batch.end = (index, offset)
+        return batch
+
+    def commit(self, batch: SpoolBatch) -> None:
+        """Mark ``batch`` as delivered and delete fully consumed segments."""
+
+        if batch.end is None:
+            return
+        end_segment, end_offset = batch.end
+        for index, count in batch.counts.items():
+            if index in self._pending:
+                self._pending[index] = max(self._pending[index] - count, 0)
+        current = max(self._pending)
+        for index in sorted(self._pending):
+            if index >= current or index > end_segment:
+                break
+            if index < end_segment or end_offset >= self._sizes[index]:
+                self._pending.pop(index)
+                self._sizes.pop(index)
+                self._segment_path(index).unlink(missing_ok=True)
+        if end_segment in self._pending:
+            self._cursor = batch.end
+        else:
+            self._cursor = (min(self._pending), 0)
+        self._store_cursor()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,190 @@
+import pytest
+import serial
+
+from gps_ingest.batching import FixBatcher
+from gps_ingest.config import Config, load_config
+from gps_ingest.parser import GPSFix
+from gps_ingest.service import GPSIngestService
+
+RMC = b"$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A\r\n"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedSerial:
+    """Serial stand-in that replays lines and then reports a lost device."""
+
+    def __init__(self, lines, clock=None, step=0.0):
+        self.lines = list(lines)
+        self.clock = clock
+        self.step = step
+
+    def readline(self):
+        if self.clock is not None:
+            self.clock.now += self.step
+        if not self.lines:
+            raise serial.SerialException("device unplugged")
+        return self.lines.pop(0)
+
+
+class RecordingSession:
+    def __init__(self):
+        self.posts = []
+
+    def post(self, url, json, headers, timeout):
+        self.posts.append((url, json))
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _config(**overrides):
+    values = dict(
+        serial_port="/dev/ttyUSB0",
+        baud_rate=9600,
+        api_url="https://example.com/api/gps",
+        api_token=None,
+        epoch_fusion=False,
+    )
+    values.update(overrides)
+    return Config(**values)
+
+
+def test_batcher_flushes_on_size_and_time():
+    clock = FakeClock()
+    batcher = FixBatcher(max_size=3, max_interval=1.0, clock=clock)
+    fix = GPSFix(latitude=1.0, longitude=2.0)
+
+    assert batcher.add(fix) is None
+    assert batcher.add(fix) is None
+    assert batcher.add(fix) == [fix, fix, fix]
+    assert len(batcher) == 0
+
+    batcher.add(fix)
+    clock.now += 0.5
+    assert not batcher.due()
+    clock.now += 0.5
+    assert batcher.due()
+    assert batcher.drain() == [fix]
+    assert not batcher.due()
+
+
+def test_service_publishes_batches_to_bulk_endpoint():
+    session = RecordingSession()
+    service = GPSIngestService(
+        _config(batch_max_size=4, batch_max_interval=60.0, batch_api_url="https://bulk"),
+        session=session,
+    )
+
+    with pytest.raises(serial.SerialException):
+        service.stream(ScriptedSerial([RMC] * 10))
+    assert session.posts == []
+
+    service.publisher.flush()
+
+    assert [url for url, _ in session.posts] == ["https://bulk"] * 3
+    assert [len(body["fixes"]) for _, body in session.posts] == [4, 4, 2]
+
+
+def test_publisher_flushes_expired_time_window():
+    clock = FakeClock()
+    session = RecordingSession()
+    service = GPSIngestService(
+        _config(batch_max_size=50, batch_max_interval=1.0, batch_api_url="https://bulk"),
+        session=session,
+        clock=clock,
+    )
+
+    with pytest.raises(serial.SerialException):
+        service.stream(ScriptedSerial([RMC, RMC, b""], clock=clock, step=0.3))
+    service.publisher.run_once(timeout=0)
+    service.publisher.run_once(timeout=0)
+    assert session.posts == []
+
+    clock.now += 1.0
+    service.publisher.run_once(timeout=0)
+
+    assert [(url, len(body["fixes"])) for url, body in session.posts] == [("https://bulk", 2)]
+
+
+def test_single_fix_mode_is_default():
+    session = RecordingSession()
+    service = GPSIngestService(_config(), session=session)
+
+    with pytest.raises(serial.SerialException):
+        service.stream(ScriptedSerial([RMC, b"", RMC]))
+    service.publisher.flush()
+
+    assert not service.config.batching_enabled
+    assert [url for url, _ in session.posts] == ["https://example.com/api/gps"] * 2
+
+
+def test_load_config_reads_batch_window():
+    config = load_config(
+        {
+            "GPS_SERIAL": "/dev/ttyUSB0",
+            "GPS_API_URL": "https://example.com/api/gps",
+            "GPS_BATCH_MAX_SIZE": "25",
+            "GPS_BATCH_MAX_INTERVAL": "2.5",
+            "GPS_BATCH_API_URL": "https://example.com/api/gps/bulk",
+        }
+    )
+
+    assert config.batch_max_size == 25
+    assert config.batch_max_interval == 2.5
+    assert config.batching_enabled
+
+    with pytest.raises(ValueError):
+        load_config(
+            {"GPS_SERIAL": "x", "GPS_API_URL": "https://x", "GPS_BATCH_MAX_SIZE": "0"}
+        )
+    # There is no default bulk endpoint to fall back to.
+    with pytest.raises(ValueError, match="GPS_BATCH_API_URL"):
+        load_config(
+            {"GPS_SERIAL": "x", "GPS_API_URL": "https://x", "GPS_BATCH_MAX_SIZE": "25"}
+        )
+
+
+def test_batching_without_bulk_endpoint_posts_single_fixes():
+    session = RecordingSession()
+    service = GPSIngestService(_config(batch_max_size=4), session=session)
+
+    with pytest.raises(serial.SerialException):
+        service.stream(ScriptedSerial([RMC] * 2))
+    service.publisher.flush()
+
+    assert not service.config.batching_enabled
+    assert [url for url, _ in session.posts] == ["https://example.com/api/gps"] * 2
+
+
+def test_spool_drains_through_single_fix_endpoint_without_bulk(tmp_path):
+    session = RecordingSession()
+    service = GPSIngestService(_config(spool_dir=tmp_path), session=session)
+
+    service.publish_spooled([{"latitude": 1.0}, {"latitude": 2.0}])
+
+    assert session.posts == [
+        ("https://example.com/api/gps", {"latitude": 1.0}),
+        ("https://example.com/api/gps", {"latitude": 2.0}),
+    ]
+
+
+def test_spool_drains_through_configured_bulk_endpoint(tmp_path):
+    session = RecordingSession()
+    service = GPSIngestService(
+        _config(spool_dir=tmp_path, batch_api_url="https://bulk"), session=session
+    )
+
+    service.publish_spooled([{"latitude": 1.0}, {"latitude": 2.0}])
+
+    assert session.posts == [("https://bulk", {"fixes": [{"latitude": 1.0}, {"latitude": 2.0}]})]
@@ -0,0 +1,110 @@
+import math
+
+import pytest
+import serial
+
+from gps_ingest.config import Config, load_config
+from gps_ingest.decimation import FixDecimator, haversine_m, heading_delta
+from gps_ingest.parser import GPSFix, parse_nmea_sentence
+from gps_ingest.service import GPSIngestService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_haversine_and_heading_helpers():
+    # One arc-minute of latitude is one nautical mile.
+    assert haversine_m(48.0, 11.0, 48.0 + 1 / 60, 11.0) == pytest.approx(1853, rel=1e-3)
+    assert heading_delta(350.0, 10.0) == 20.0
+    assert heading_delta(10.0, 350.0) == 20.0
+
+
+def test_parser_exposes_course_over_ground():
+    fix = parse_nmea_sentence(
+        "$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A"
+    )
+    assert fix.heading_deg == pytest.approx(84.4)
+    assert fix.to_payload()["heading_deg"] == pytest.approx(84.4)
+
+
+def test_stationary_receiver_is_reduced_by_more_than_ninety_percent():
+    clock = FakeClock()
+    decimator = FixDecimator(min_distance_m=5.0, heartbeat_seconds=30.0, clock=clock)
+    published = 0
+    # 10 Hz for two minutes with ~1 m of jitter around a fixed site.
+    for tick in range(1200):
+        clock.now = tick / 10
+        jitter = math.sin(tick) * 1e-5
+        fix = GPSFix(latitude=48.1 + jitter, longitude=11.5 - jitter, speed_kmh=0.2)
+        published += decimator.accept(fix)
+
+    assert published == 4  # first fix plus a heartbeat at 30, 60 and 90 s
+    assert 1 - published / 1200 > 0.9
+
+
+def test_motion_heading_and_speed_changes_pass():
+    clock = FakeClock()
+    decimator = FixDecimator(
+        min_distance_m=10.0, heading_threshold_deg=15.0, speed_threshold_kmh=5.0, clock=clock
+    )
+    base = GPSFix(latitude=48.0, longitude=11.0, speed_kmh=30.0, heading_deg=90.0)
+
+    assert decimator.accept(base)
+    assert not decimator.accept(GPSFix(latitude=48.00001, longitude=11.0, speed_kmh=31.0, heading_deg=92.0))
+    assert decimator.accept(GPSFix(latitude=48.0002, longitude=11.0, speed_kmh=30.0, heading_deg=90.0))
+    assert decimator.accept(GPSFix(latitude=48.0002, longitude=11.0, speed_kmh=30.0, heading_deg=120.0))
+    assert decimator.accept(GPSFix(latitude=48.0002, longitude=11.0, speed_kmh=40.0, heading_deg=120.0))
+    # Heading noise while parked is ignored.
+    assert decimator.accept(GPSFix(latitude=48.0002, longitude=11.0, speed_kmh=0.5, heading_deg=120.0))
+    assert not decimator.accept(GPSFix(latitude=48.0002, longitude=11.0, speed_kmh=0.5, heading_deg=300.0))
+
+
+def test_service_reports_reduction_ratio():
+    rmc = b"$GPRMC,123519,A,4807.038,N,01131.000,E,000.0,084.4,230394,003.1,W*6E\r\n"
+
+    class ScriptedSerial:
+        def __init__(self):
+            self.lines = [rmc] * 20
+
+        def readline(self):
+            if not self.lines:
+                raise serial.SerialException("done")
+            return self.lines.pop(0)
+
+    config = Config(
+        serial_port="/dev/ttyUSB0",
+        baud_rate=9600,
+        api_url="https://example.com/api/gps",
+        api_token=None,
+        epoch_fusion=False,
+        decimation_enabled=True,
+    )
+    service = GPSIngestService(config, clock=FakeClock())
+
+    with pytest.raises(serial.SerialException):
+        service.stream(ScriptedSerial())
+
+    assert service.metrics.fixes_enqueued == 1
+    assert service.metrics.fixes_decimated == 19
+    assert service.metrics.snapshot()["reduction_ratio"] == pytest.approx(0.95)
+
+
+def test_load_config_reads_decimation_settings():
+    config = load_config(
+        {
+            "GPS_SERIAL": "/dev/ttyUSB0",
+            "GPS_API_URL": "https://example.com/api/gps",
+            "GPS_DECIMATION": "true",
+            "GPS_DECIMATION_DISTANCE_M": "2.5",
+        }
+    )
+    assert config.decimation_enabled is True
+    assert config.decimation_distance_m == 2.5
+
+    with pytest.raises(ValueError):
+        load_config({"GPS_SERIAL": "x", "GPS_API_URL": "https://x", "GPS_DECIMATION": "maybe"})
@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from functools import reduce
+
+import pytest
+import serial
+
+from gps_ingest.config import Config
+from gps_ingest.fusion import EpochAssembler
+from gps_ingest.parser import parse_nmea_report
+from gps_ingest.service import GPSIngestService
+
+
+def nmea(body: str) -> str:
+    checksum = reduce(lambda acc, char: acc ^ ord(char), body, 0)
+    return f"${body}*{checksum:02X}"
+
+
+def epoch(hhmmss: str, *, date: str = "230394"):
+    return [
+        nmea(f"GPRMC,{hhmmss},A,4807.038,N,01131.000,E,022.4,084.4,{date},003.1,W"),
+        nmea("GPVTG,084.4,T,081.3,M,022.4,N,041.5,K"),
+        nmea(f"GPGGA,{hhmmss},4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"),
+        nmea("GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1"),
+    ]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _feed(assembler, sentences):
+    fixes = []
+    for sentence in sentences:
+        report = parse_nmea_report(sentence)
+        assert report is not None, sentence
+        fixes += assembler.feed(report)
+    return fixes
+
+
+def test_epoch_sentences_merge_into_one_complete_fix():
+    assembler = EpochAssembler(dop_scale=4.0, clock=FakeClock())
+
+    assert _feed(assembler, epoch("123519")) == []
+    (fix,) = _feed(assembler, epoch("123520")[:1])
+
+    assert fix.latitude == pytest.approx(48.1173)
+    assert fix.altitude_m == pytest.approx(545.4)
+    assert fix.speed_kmh == pytest.approx(41.5)
+    assert fix.heading_deg == pytest.approx(84.4)
+    assert fix.horizontal_accuracy == pytest.approx(1.3 * 4.0)
+    assert fix.vertical_accuracy == pytest.approx(2.1 * 4.0)
+    assert fix.timestamp == datetime(1994, 3, 23, 12, 35, 19, tzinfo=timezone.utc)
+
+
+def test_learned_epoch_is_emitted_as_soon_as_it_is_complete():
+    assembler = EpochAssembler(clock=FakeClock())
+    _feed(assembler, epoch("123519"))
+
+    fixes = _feed(assembler, epoch("123520"))
+
+    assert len(fixes) == 2  # previous epoch on rollover, this one on completion
+    assert fixes[1].timestamp.second == 20
+    assert assembler.flush() == []
+
+
+def test_incomplete_epoch_times_out_and_borrows_last_date():
+    clock = FakeClock()
+    assembler = EpochAssembler(timeout=0.5, clock=clock)
+    _feed(assembler, epoch("235959"))
+    assert len(assembler.flush()) == 1
+
+    _feed(assembler, [nmea("GPGGA,000000,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,")])
+    assert assembler.poll() == []
+    clock.now = 0.6
+    (fix,) = assembler.poll()
+
+    assert fix.timestamp == datetime(1994, 3, 24, 0, 0, 0, tzinfo=timezone.utc)
+    assert fix.speed_kmh is None
+
+
+def test_reports_without_fix_are_ignored():
+    assert parse_nmea_report(nmea("GPRMC,123519,V,,,,,,,230394,,")) is None
+    assert parse_nmea_report(nmea("GPGGA,123519,,,,,0,00,,,M,,M,,")) is None
+    assert parse_nmea_report(nmea("GPGSV,1,1,01,04,40,083,46")) is None
+
+
+def test_service_publishes_one_fix_per_epoch():
+    class ScriptedSerial:
+        def __init__(self, lines):
+            self.lines = [line.encode() + b"\r\n" for line in lines]
+
+        def readline(self):
+            if not self.lines:
+                raise serial.SerialException("done")
+            return self.lines.pop(0)
+
+    config = Config(
+        serial_port="/dev/ttyUSB0",
+        baud_rate=9600,
+        api_url="https://example.com/api/gps",
+        api_token=None,
+    )
+    service = GPSIngestService(config, clock=FakeClock())
+    lines = epoch("123519") + epoch("123520") + epoch("123521")
+
+    with pytest.raises(serial.SerialException):
+        service.stream(ScriptedSerial(lines))
+
+    assert service.metrics.fixes_enqueued == 3
+    queued = [service.publisher.queue.get(None).fix for _ in range(3)]
+    assert all(fix.altitude_m and fix.speed_kmh and fix.timestamp for fix in queued)
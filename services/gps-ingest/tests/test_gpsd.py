@@ -0,0 +1,145 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from gps_ingest.config import GPSD_SOURCE, Config, load_config, parse_sources
+from gps_ingest.gpsd import WATCH_COMMAND, FakeGpsd, GpsdConnection, GpsdDecoder
+from gps_ingest.service import GPSIngestService
+from gps_ingest.sources import MultiSourceIngestService
+
+TPV = {
+    "class": "TPV",
+    "device": "/dev/ttyACM0",
+    "mode": 3,
+    "time": "2024-05-01T12:00:01.000Z",
+    "lat": 48.1173,
+    "lon": 11.5167,
+    "altHAE": 592.3,
+    "altMSL": 545.4,
+    "speed": 10.0,
+    "track": 84.4,
+    "eph": 3.2,
+    "epv": 5.1,
+}
+SKY = {"class": "SKY", "hdop": 0.9, "vdop": 1.4, "satellites": []}
+
+
+def _line(report):
+    return json.dumps(report, separators=(",", ":")).encode() + b"\n"
+
+
+def test_tpv_becomes_fix_with_gpsd_error_estimates():
+    fix = GpsdDecoder().feed(_line(TPV))
+
+    assert (fix.latitude, fix.longitude, fix.altitude_m) == (48.1173, 11.5167, 545.4)
+    assert fix.speed_kmh == pytest.approx(36.0)
+    assert fix.heading_deg == 84.4
+    assert (fix.horizontal_accuracy, fix.vertical_accuracy) == (3.2, 5.1)
+    assert fix.timestamp == datetime(2024, 5, 1, 12, 0, 1, tzinfo=timezone.utc)
+
+
+def test_sky_dops_fill_missing_error_estimates():
+    decoder = GpsdDecoder(dop_scale=4.0)
+    tpv = {key: value for key, value in TPV.items() if key not in ("eph", "epv")}
+
+    assert decoder.feed(_line(SKY)) is None
+    fix = decoder.feed(_line(tpv))
+
+    assert fix.horizontal_accuracy == pytest.approx(3.6)
+    assert fix.vertical_accuracy == pytest.approx(5.6)
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        _line({**TPV, "mode": 1}),
+        _line({"class": "DEVICES", "devices": []}),
+        b'{"class":"TPV",broken\n',
+        b"",
+    ],
+)
+def test_reports_without_fix_are_ignored(line):
+    assert GpsdDecoder().feed(line) is None
+
+
+def test_gpsd_address_replaces_serial_port():
+    config = load_config({"GPS_GPSD": "localhost", "GPS_API_URL": "https://example.com/api/gps"})
+
+    assert (config.gpsd_host, config.gpsd_port, config.serial_port) == ("localhost", 2947, "")
+    (source,) = parse_sources("base=gpsd://10.0.0.2:2948")
+    assert (source.kind, source.target, source.port) == (GPSD_SOURCE, "10.0.0.2", 2948)
+
+
+def _config(**overrides):
+    return Config(
+        serial_port="",
+        baud_rate=9600,
+        api_url="https://example.com/api/gps",
+        api_token=None,
+        reconnect_initial=0.01,
+        reconnect_max_attempts=1,
+        serial_timeout=0.2,
+        **overrides,
+    )
+
+
+def _queued(service):
+    fixes = []
+    while (item := service.publisher.queue.get(None)) is not None:
+        fixes.append(item.fix)
+    return fixes
+
+
+def test_service_streams_fixes_from_gpsd():
+    reports = [SKY, TPV, {**TPV, "time": "2024-05-01T12:00:02.000Z", "lat": 48.2}]
+    with FakeGpsd(reports) as gpsd:
+        host, port = gpsd.address
+        service = GPSIngestService(_config(gpsd_host=host, gpsd_port=port))
+        with pytest.raises(ConnectionError):
+            with service._connection() as connection:
+                service.stream(connection)
+
+    assert gpsd.watch_commands == [WATCH_COMMAND]
+    assert [fix.latitude for fix in _queued(service)] == [48.1173, 48.2]
+
+
+def test_connection_survives_idle_periods_longer_than_the_timeout():
+    reports = [TPV, {**TPV, "lat": 48.2}]
+    with FakeGpsd(reports, interval=0.3) as gpsd:
+        connection = GpsdConnection(*gpsd.address, timeout=0.05)
+        try:
+            idle = 0
+            latitudes = []
+            while len(latitudes) < 2 and idle < 100:
+                line = connection.readline()
+                if not line:
+                    idle += 1
+                elif line.startswith(b'{"class":"TPV"'):
+                    latitudes.append(json.loads(line)["lat"])
+        finally:
+            connection.close()
+
+    assert latitudes == [48.1173, 48.2]
+    assert idle >= 2  # timed out before each report and kept reading
+
+
+def test_multi_source_reads_gpsd_sources():
+    async def scenario(address):
+        host, port = address
+        service = MultiSourceIngestService(
+            _config(sources=parse_sources(f"pi=gpsd://{host}:{port}"))
+        )
+        runner = asyncio.create_task(service.run_async())
+        await asyncio.sleep(0.2)
+        service.stop()
+        await runner
+        return service
+
+    with FakeGpsd([TPV]) as gpsd:
+        service = asyncio.run(scenario(gpsd.address))
+
+    fixes = _queued(service)
+    assert fixes and all(fix.source == "pi" for fix in fixes)
+    assert fixes[0].horizontal_accuracy == 3.2
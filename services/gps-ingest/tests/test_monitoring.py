@@ -0,0 +1,201 @@
+import json
+import math
+import urllib.error
+import urllib.request
+from functools import reduce
+
+import pytest
+import serial
+
+from gps_ingest.config import Config, load_config
+from gps_ingest.monitoring import MetricsServer, render_metrics
+from gps_ingest.parser import GPSFix
+from gps_ingest.pipeline import FixPublisher, PipelineMetrics
+from gps_ingest.reader import FixReader
+from gps_ingest.service import connect_serial_with_retry
+
+
+def nmea(body: str) -> bytes:
+    checksum = reduce(lambda acc, char: acc ^ ord(char), body, 0)
+    return f"${body}*{checksum:02X}\r\n".encode()
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_config(**overrides) -> Config:
+    values = dict(
+        serial_port="/dev/ttyUSB0",
+        baud_rate=4800,
+        api_url="https://example.com",
+        api_token=None,
+        epoch_fusion=False,
+    )
+    values.update(overrides)
+    return Config(**values)
+
+
+def samples(text: str) -> dict:
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            values[name] = float(value)
+    return values
+
+
+def get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def test_reader_counts_sentences_and_failures_by_type():
+    metrics = PipelineMetrics()
+    reader = FixReader(make_config(), metrics)
+
+    good = nmea("GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,,")
+    bad_checksum = good[:-4] + b"00\r\n"
+    no_fix = nmea("GPGGA,123519,,,,,0,00,,,M,,M,,")
+    for line in (good, bad_checksum, no_fix, b"$GPXYZ,1*00\r\n", b"garbage\r\n", b""):
+        reader.feed(line)
+
+    assert metrics.sentences_read == 5
+    assert metrics.parse_failures == {"RMC": 1, "GGA": 1, "other": 2}
+
+
+def test_failed_connection_attempts_are_counted():
+    def factory(**kwargs):
+        raise serial.SerialException("nope")
+
+    metrics = PipelineMetrics()
+    config = make_config(reconnect_initial=0, reconnect_max_attempts=3)
+
+    with pytest.raises(serial.SerialException):
+        connect_serial_with_retry(config, factory, lambda delay: None, metrics)
+
+    assert metrics.reconnects == 3
+
+
+def test_render_metrics_exposes_counters_histogram_and_ages():
+    metrics = PipelineMetrics(sentences_read=7, fixes_published=2, queue_depth=4, reconnects=1)
+    metrics.parse_failures["GGA"] = 2
+    metrics.observe_latency(0.003)
+    metrics.observe_latency(0.2)
+    metrics.observe_latency(120.0)
+    metrics.last_fix_at = 95.0
+    metrics.last_fix_by_source["van-1"] = 90.0
+
+    values = samples(render_metrics(metrics, now=100.0))
+
+    assert values["gps_ingest_sentences_read_total"] == 7
+    assert values['gps_ingest_parse_failures_total{sentence="GGA"}'] == 2
+    assert values["gps_ingest_fixes_published_total"] == 2
+    assert values["gps_ingest_reconnects_total"] == 1
+    assert values["gps_ingest_queue_depth"] == 4
+    assert values['gps_ingest_publish_latency_seconds_bucket{le="0.005"}'] == 1
+    assert values['gps_ingest_publish_latency_seconds_bucket{le="0.25"}'] == 2
+    assert values['gps_ingest_publish_latency_seconds_bucket{le="60.0"}'] == 2
+    assert values['gps_ingest_publish_latency_seconds_bucket{le="+Inf"}'] == 3
+    assert values["gps_ingest_publish_latency_seconds_count"] == 3
+    assert values["gps_ingest_seconds_since_last_fix"] == 5.0
+    assert values['gps_ingest_source_seconds_since_last_fix{source="van-1"}'] == 10.0
+
+
+def test_seconds_since_last_fix_is_infinite_before_the_first_fix():
+    values = samples(render_metrics(PipelineMetrics(), now=1.0))
+
+    assert math.isinf(values["gps_ingest_seconds_since_last_fix"])
+
+
+def test_server_serves_metrics_and_health():
+    clock = FakeClock()
+    metrics = PipelineMetrics()
+
+    with MetricsServer(metrics, max_fix_age=30.0, clock=clock) as server:
+        status, body = get(f"{server.url}/healthz")
+        assert status == 200
+        assert json.loads(body)["seconds_since_last_fix"] is None
+
+        clock.now += 31.0
+        status, body = get(f"{server.url}/healthz")
+        assert status == 503
+        assert json.loads(body)["status"] == "stale"
+
+        metrics.last_fix_at = clock.now - 2.0
+        status, body = get(f"{server.url}/healthz")
+        assert status == 200
+        assert json.loads(body)["seconds_since_last_fix"] == 2.0
+
+        status, body = get(f"{server.url}/metrics")
+        assert status == 200
+        assert b"gps_ingest_seconds_since_last_fix 2.0" in body
+
+        assert get(f"{server.url}/other")[0] == 404
+
+
+def test_submitted_fixes_update_last_fix_times():
+    clock = FakeClock()
+    publisher = FixPublisher(lambda fixes: None, clock=clock)
+    publisher.submit(GPSFix(latitude=1.0, longitude=2.0, source="van-1"))
+
+    assert publisher.metrics.last_fix_at == 100.0
+    assert publisher.metrics.last_fix_by_source == {"van-1": 100.0}
+
+
+def test_decimated_fixes_keep_health_fresh():
+    clock = FakeClock()
+    metrics = PipelineMetrics()
+    reader = FixReader(make_config(decimation_enabled=True), metrics, clock)
+    parked = nmea("GPRMC,123519,A,4807.038,N,01131.000,E,000.0,084.4,230394,,")
+    server = MetricsServer(metrics, port=0, max_fix_age=30.0, clock=clock)
+    try:
+        assert len(reader.feed(parked)) == 1
+        metrics.last_fix_at = clock.now
+        clock.now += 29.0
+        assert reader.feed(parked) == []
+        clock.now += 29.0
+
+        healthy, details = server.health()
+        assert healthy
+        assert details["seconds_since_last_fix"] == 29.0
+    finally:
+        server.server_close()
+
+
+def test_fix_age_gauges_count_decimated_fixes():
+    clock = FakeClock()
+    metrics = PipelineMetrics()
+    reader = FixReader(make_config(decimation_enabled=True), metrics, clock, source="van-1")
+    parked = nmea("GPRMC,123519,A,4807.038,N,01131.000,E,000.0,084.4,230394,,")
+    assert len(reader.feed(parked)) == 1
+    metrics.last_fix_at = metrics.last_fix_by_source["van-1"] = clock.now
+    clock.now += 20.0
+    assert reader.feed(parked) == []
+    clock.now += 5.0
+
+    values = samples(render_metrics(metrics, now=clock.now))
+
+    assert values["gps_ingest_seconds_since_last_fix"] == 5.0
+    assert values['gps_ingest_source_seconds_since_last_fix{source="van-1"}'] == 5.0
+    assert values["gps_ingest_seconds_since_last_enqueued_fix"] == 25.0
+
+
+def test_metrics_settings_are_loaded_from_env():
+    env = {"GPS_SERIAL": "/dev/ttyUSB0", "GPS_API_URL": "https://example.com"}
+    assert load_config(env).metrics_port is None
+
+    config = load_config({**env, "GPS_METRICS_PORT": "9108", "GPS_HEALTH_MAX_FIX_AGE": "10"})
+    assert config.metrics_port == 9108
+    assert config.metrics_host == "0.0.0.0"
+    assert config.health_max_fix_age == 10.0
+
+    with pytest.raises(ValueError, match="GPS_METRICS_PORT"):
+        load_config({**env, "GPS_METRICS_PORT": "http"})
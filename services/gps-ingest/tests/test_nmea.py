@@ -0,0 +1,61 @@
+from datetime import date, time, timezone
+from functools import reduce
+
+import pytest
+
+from gps_ingest.nmea import NMEAError, checksum, parse_report
+
+GSA = b"$GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*39"
+
+
+@pytest.mark.parametrize("body", [b"", b"G", b"GPGGA", b"GPRMC,123519,A" * 7, b"x" * 300])
+def test_checksum_matches_bytewise_xor(body):
+    assert checksum(body) == reduce(lambda acc, byte: acc ^ byte, body, 0)
+
+
+def test_rmc_from_bytes_and_str_agree():
+    line = b"$GPRMC,092750.25,A,5321.6802,N,00630.3372,W,0.02,31.66,280511,,,A*74\r\n"
+
+    report = parse_report(line)
+
+    assert report == parse_report(line.decode())
+    assert report.time == time(9, 27, 50, 250000, tzinfo=timezone.utc)
+    assert report.date == date(2011, 5, 28)
+    assert report.longitude == pytest.approx(-6.50562, abs=1e-5)
+    assert report.speed_knots == pytest.approx(0.02)
+    assert report.speed_kmh == pytest.approx(0.02 * 1.852)
+
+
+def test_vtg_and_gsa_carry_velocity_and_dop():
+    vtg = parse_report(b"$GPVTG,054.7,T,034.4,M,005.5,N,010.2,K*48")
+    gsa = parse_report(GSA)
+
+    assert (vtg.heading_deg, vtg.speed_kmh, vtg.time) == (54.7, 10.2, None)
+    assert (gsa.hdop, gsa.vdop) == (1.3, 2.1)
+
+
+def test_other_sentence_types_are_skipped():
+    assert parse_report(b"$GPGSV,1,1,01,04,40,083,46*41") is None
+    assert parse_report(b"   ") is None
+
+
+@pytest.mark.parametrize(
+    "line, message",
+    [
+        (GSA[:-2] + b"00", "checksum"),
+        (GSA[:-3], "checksum missing"),
+        (b"$GPRMC,081836,V,3751.65,S,14507.36,E,000.0,360.0,130998,011.3,E*75", "not active"),
+        (b"$GPGGA,123519,4807.038,N*27", "Malformed"),
+    ],
+)
+def test_invalid_sentences_raise(line, message):
+    with pytest.raises(NMEAError, match=message):
+        parse_report(line)
+
+
+def test_checksum_is_optional_when_not_required():
+    line = b"$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"
+
+    report = parse_report(line, require_checksum=False)
+
+    assert report.altitude_m == 545.4
@@ -0,0 +1,121 @@
+import pytest
+import requests
+import serial
+
+from gps_ingest.config import Config
+from gps_ingest.parser import GPSFix
+from gps_ingest.pipeline import COALESCE, DROP_OLDEST, FixPublisher
+from gps_ingest.service import GPSIngestService
+
+RMC = b"$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A\r\n"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fix(index: int) -> GPSFix:
+    return GPSFix(latitude=float(index), longitude=0.0)
+
+
+def test_drop_oldest_keeps_newest_fixes():
+    sent = []
+    publisher = FixPublisher(sent.extend, queue_size=3, drop_policy=DROP_OLDEST)
+
+    for index in range(5):
+        publisher.submit(_fix(index))
+    publisher.flush()
+
+    assert [fix.latitude for fix in sent] == [2.0, 3.0, 4.0]
+    assert publisher.metrics.dropped_fixes == 2
+    assert publisher.metrics.queue_depth == 0
+
+
+def test_coalesce_replaces_newest_queued_fix():
+    sent = []
+    publisher = FixPublisher(sent.extend, queue_size=3, drop_policy=COALESCE)
+
+    for index in range(5):
+        publisher.submit(_fix(index))
+    publisher.flush()
+
+    assert [fix.latitude for fix in sent] == [0.0, 1.0, 4.0]
+    assert publisher.metrics.dropped_fixes == 2
+
+
+def test_failed_batch_is_retried_with_backoff_and_latency_recorded():
+    clock = FakeClock()
+    sent = []
+    failures = [requests.ConnectionError("down"), requests.ConnectionError("down")]
+
+    def send(fixes):
+        if failures:
+            raise failures.pop(0)
+        sent.extend(fixes)
+
+    publisher = FixPublisher(send, retry_initial=1.0, retry_max_delay=5.0, clock=clock)
+    publisher.submit(_fix(1))
+    clock.now = 0.5
+
+    assert publisher.run_once(timeout=0) is False
+    assert publisher.run_once(timeout=0) is False  # still backing off
+    clock.now = 1.5
+    assert publisher.run_once(timeout=0) is False  # second failure doubles delay
+    clock.now = 3.0
+    assert publisher.run_once(timeout=0) is False
+    clock.now = 3.5
+    assert publisher.run_once(timeout=0) is True
+
+    assert [fix.latitude for fix in sent] == [1.0]
+    assert publisher.metrics.publish_errors == 2
+    assert publisher.metrics.fixes_published == 1
+    assert publisher.metrics.last_latency == pytest.approx(3.5)
+
+
+def test_serial_reader_keeps_running_during_backend_outage():
+    class DownSession:
+        posts = 0
+
+        def post(self, *args, **kwargs):
+            DownSession.posts += 1
+            raise requests.ConnectionError("backend unreachable")
+
+        def close(self):
+            pass
+
+    class CountingSerial:
+        def __init__(self, lines):
+            self.lines = list(lines)
+            self.closed = False
+
+        def readline(self):
+            if not self.lines:
+                raise serial.SerialException("done")
+            return self.lines.pop(0)
+
+    config = Config(
+        serial_port="/dev/ttyUSB0",
+        baud_rate=9600,
+        api_url="https://example.com/api/gps",
+        api_token=None,
+        reconnect_initial=0.01,
+        queue_max_size=5,
+        epoch_fusion=False,
+    )
+    service = GPSIngestService(config, session=DownSession())
+    service.publisher.start()
+    connection = CountingSerial([RMC] * 50)
+    try:
+        with pytest.raises(serial.SerialException, match="done"):
+            service.stream(connection)
+    finally:
+        service.publisher.stop(drain=False)
+
+    assert connection.lines == []
+    assert service.metrics.fixes_enqueued == 50
+    assert service.metrics.dropped_fixes >= 40
+    assert DownSession.posts >= 1
@@ -0,0 +1,107 @@
+from functools import reduce
+
+import pytest
+import serial
+
+from gps_ingest.config import Config
+from gps_ingest import replay as replay_module
+from gps_ingest.replay import ReplaySerial, StandInAPI, load_log, percentile, replay
+
+
+def nmea(body: str) -> bytes:
+    checksum = reduce(lambda acc, char: acc ^ ord(char), body, 0)
+    return f"${body}*{checksum:02X}\r\n".encode()
+
+
+def drive(start_second: int, count: int, hour: int = 12):
+    lines = []
+    for offset in range(count):
+        second = start_second + offset
+        hhmmss = f"{hour + second // 3600:02d}{second // 60 % 60:02d}{second % 60:02d}"
+        lines.append(nmea(f"GPRMC,{hhmmss},A,4807.038,N,01131.000,E,022.4,084.4,230394,,"))
+        lines.append(nmea(f"GPGGA,{hhmmss},4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"))
+    return lines
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _read_all(port):
+    lines = []
+    with pytest.raises(serial.SerialException, match="replay finished"):
+        while True:
+            lines.append(port.readline())
+    return lines
+
+
+def test_replay_is_paced_by_epoch_time_and_speed():
+    clock = FakeClock()
+    port = ReplaySerial(drive(0, 5), speed=4.0, clock=clock, sleep=clock.sleep)
+
+    _read_all(port)
+
+    assert port.sentences_read == 10
+    assert clock.now == pytest.approx(4 / 4.0)
+
+
+def test_epoch_time_is_read_without_parsing_the_sentence(monkeypatch):
+    assert replay_module._epoch_seconds(nmea("GPRMC,123519.50,V,,,,,,,230394,,")) == 45319.5
+    assert replay_module._epoch_seconds(nmea("GPVTG,084.4,T,,M,022.4,N,041.5,K")) is None
+
+    def fail(line):
+        raise AssertionError("unpaced replay must not look at epoch times")
+
+    monkeypatch.setattr(replay_module, "_epoch_seconds", fail)
+    assert len(_read_all(ReplaySerial(drive(0, 3), speed=None))) == 6
+
+
+def test_loops_and_midnight_keep_time_moving_forward():
+    clock = FakeClock()
+    lines = drive(86_398, 2, hour=0)[:2] + drive(0, 2, hour=0)  # 23:59:58 .. 00:00:01
+    port = ReplaySerial(lines, speed=1.0, loops=2, clock=clock, sleep=clock.sleep)
+
+    _read_all(port)
+
+    assert port.sentences_read == 12
+    # 23:59:58 -> 00:00:01 is 3 s per pass, plus 1 s between passes.
+    assert clock.now == pytest.approx(7.0)
+
+
+def test_replay_reports_throughput_and_latency_against_stand_in_api(tmp_path):
+    log = tmp_path / "drive.nmea"
+    log.write_bytes(b"".join(drive(0, 30)) + b"\n$GPGSV,garbage*00\n")
+
+    with StandInAPI() as api:
+        config = Config(
+            serial_port="replay",
+            baud_rate=9600,
+            api_url=api.url,
+            api_token=None,
+            batch_max_size=10,
+            batch_api_url=api.bulk_url,
+        )
+        report = replay(config, load_log([log]), speed=None)
+
+    assert report.sentences == 61
+    assert report.fixes == 30  # fused RMC+GGA epochs
+    assert report.published == api.fixes_received == 30
+    assert api.requests == 3
+    assert report.dropped == 0
+    assert 0 < report.latency_p50 <= report.latency_p99 <= report.latency_max
+    assert "sentences: 61" in report.format()
+
+
+def test_percentile_uses_nearest_rank():
+    samples = [float(value) for value in range(1, 101)]
+
+    assert percentile(samples, 0.5) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) is None
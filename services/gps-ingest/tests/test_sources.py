@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+import serial
+
+from gps_ingest.config import SERIAL_SOURCE, TCP_SOURCE, Config, load_config, parse_sources
+from gps_ingest.sources import MultiSourceIngestService
+
+RMC = b"$GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A\r\n"
+GGA = b"$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47\r\n"
+
+
+def test_sources_are_parsed_from_env():
+    config = load_config(
+        {
+            "GPS_API_URL": "https://example.com/api/gps",
+            "GPS_BAUD": "4800",
+            "GPS_SOURCES": "primary=/dev/ttyUSB0, backup=/dev/ttyACM0@115200,"
+            "tracker=tcp://10.0.0.5:10110",
+        }
+    )
+
+    assert config.multi_source
+    assert [(s.slug, s.kind, s.target) for s in config.sources] == [
+        ("primary", SERIAL_SOURCE, "/dev/ttyUSB0"),
+        ("backup", SERIAL_SOURCE, "/dev/ttyACM0"),
+        ("tracker", TCP_SOURCE, "10.0.0.5"),
+    ]
+    assert [s.baud_rate for s in config.sources[:2]] == [4800, 115200]
+    assert config.sources[2].port == 10110
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["primary", "Primary=/dev/ttyUSB0", "a=/dev/x,a=/dev/y", "t=tcp://host", "p=/dev/x@fast"],
+)
+def test_invalid_sources_are_rejected(value):
+    with pytest.raises(ValueError):
+        parse_sources(value)
+
+
+class ScriptedSerial:
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    def readline(self):
+        if not self.lines:
+            raise serial.SerialException("unplugged")
+        return self.lines.pop(0)
+
+    def close(self):
+        pass
+
+
+def _config(sources):
+    return Config(
+        serial_port="",
+        baud_rate=9600,
+        api_url="https://example.com/api/gps",
+        api_token=None,
+        reconnect_initial=0.01,
+        reconnect_max_delay=0.05,
+        serial_timeout=0.05,
+        epoch_fusion=False,
+        sources=parse_sources(sources),
+    )
+
+
+def _published(service):
+    fixes = []
+    while (item := service.publisher.queue.get(None)) is not None:
+        fixes.append(item.fix)
+    return fixes
+
+
+def test_sources_are_read_concurrently_and_tagged():
+    opened = []
+
+    def factory(port, baudrate, timeout):
+        opened.append(port)
+        if port == "/dev/flaky" and opened.count(port) < 3:
+            raise serial.SerialException("no such device")
+        return ScriptedSerial([RMC, GGA] if port == "/dev/flaky" else [RMC])
+
+    async def scenario():
+        async def serve(reader, writer):
+            writer.write(RMC + GGA + RMC)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        service = MultiSourceIngestService(
+            _config(f"primary=/dev/ttyUSB0,flaky=/dev/flaky,net=tcp://127.0.0.1:{port}"),
+            serial_factory=factory,
+        )
+        runner = asyncio.create_task(service.run_async())
+        await asyncio.sleep(0.3)
+        service.stop()
+        await runner
+        server.close()
+        await server.wait_closed()
+        return service
+
+    service = asyncio.run(scenario())
+    by_source = {}
+    for fix in _published(service):
+        by_source[fix.source] = by_source.get(fix.source, 0) + 1
+
+    assert opened.count("/dev/flaky") >= 3  # retried with its own backoff
+    assert by_source["flaky"] >= 2
+    assert by_source["primary"] >= 1
+    assert by_source["net"] >= 3
+    assert service.reconnects["net"] >= 1  # peer closed the stream
+    assert set(by_source) == {"primary", "flaky", "net"}
+
+
+def test_fixes_carry_source_in_payload():
+    service = MultiSourceIngestService(_config("base=/dev/ttyUSB0"))
+
+    (fix,) = service.readers["base"].feed(RMC)
+
+    assert fix.to_payload()["source"] == "base"
@@ -0,0 +1,165 @@
+import requests
+
+from gps_ingest.parser import GPSFix
+from gps_ingest.pipeline import FixPublisher
+from gps_ingest.spool import FixSpool
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _records(start, stop):
+    return [{"latitude": float(index), "longitude": 0.0} for index in range(start, stop)]
+
+
+def _latitudes(records):
+    return [record["latitude"] for record in records]
+
+
+def test_records_roll_over_segments_and_are_removed_after_commit(tmp_path):
+    spool = FixSpool(tmp_path, segment_max_bytes=120, fsync=False)
+    spool.append(_records(0, 10))
+
+    assert len(spool) == 10
+    assert len(list(tmp_path.glob("*.seg"))) > 1
+
+    batch = spool.read(7)
+    assert _latitudes(batch.records) == [float(index) for index in range(7)]
+    assert len({record["spool_id"] for record in batch.records}) == 7
+    spool.commit(batch)
+
+    rest = spool.read(100)
+    assert _latitudes(rest.records) == [7.0, 8.0, 9.0]
+    spool.commit(rest)
+    assert len(spool) == 0
+    assert len(list(tmp_path.glob("*.seg"))) == 1
+
+
+def test_restart_resumes_after_last_commit_without_duplicates(tmp_path):
+    spool = FixSpool(tmp_path, segment_max_bytes=200, fsync=False)
+    spool.append(_records(0, 6))
+    spool.commit(spool.read(4))
+    uncommitted = spool.read(1)
+    spool.close()
+
+    reopened = FixSpool(tmp_path, segment_max_bytes=200, fsync=False)
+    assert len(reopened) == 2
+    replayed = reopened.read(1)
+    assert replayed.records == uncommitted.records  # same spool_id on replay
+
+    reopened.append(_records(6, 8))
+    assert _latitudes(reopened.read(10).records) == [4.0, 5.0, 6.0, 7.0]
+
+
+def test_spool_ids_are_unique_across_spools_and_sources(tmp_path):
+    first = FixSpool(tmp_path / "a", fsync=False, device="/dev/ttyUSB0")
+    second = FixSpool(tmp_path / "b", fsync=False, device="/dev/ttyUSB0")
+    for spool in (first, second):
+        spool.append([{"latitude": 1.0}, {"latitude": 2.0, "source": "van-1"}])
+
+    ids = [record["spool_id"] for record in first.read(2).records]
+    other = [record["spool_id"] for record in second.read(2).records]
+    assert not set(ids) & set(other)
+    assert ids[0].startswith(f"/dev/ttyUSB0:{first.spool_uuid}:")
+    assert ids[1].startswith(f"van-1:{first.spool_uuid}:")
+
+    first.close()
+    reopened = FixSpool(tmp_path / "a", fsync=False, device="/dev/ttyUSB0")
+    assert reopened.spool_uuid == first.spool_uuid
+    assert [record["spool_id"] for record in reopened.read(2).records] == ids
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    spool = FixSpool(tmp_path, fsync=False)
+    spool.append(_records(0, 3))
+    spool.close()
+    segment = next(tmp_path.glob("*.seg"))
+    with segment.open("ab") as handle:
+        handle.write(b"\x40\x00\x00\x00garbage")
+
+    reopened = FixSpool(tmp_path, fsync=False)
+    reopened.append(_records(3, 4))
+
+    assert len(reopened) == 4
+    assert _latitudes(reopened.read(10).records) == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_size_cap_drops_oldest_segment(tmp_path):
+    spool = FixSpool(tmp_path, segment_max_bytes=100, max_total_bytes=200, fsync=False)
+    spool.append(_records(0, 20))
+
+    assert spool.dropped_records > 0
+    assert len(spool) == 20 - spool.dropped_records
+    assert _latitudes(spool.read(100).records)[-1] == 19.0
+
+
+def test_publisher_spools_during_outage_and_catches_up_in_order(tmp_path):
+    clock = FakeClock()
+    online = {"up": False}
+    live, uploads = [], []
+
+    def send(fixes):
+        if not online["up"]:
+            raise requests.ConnectionError("backhaul down")
+        live.extend(fixes)
+
+    def send_spooled(records):
+        if not online["up"]:
+            raise requests.ConnectionError("backhaul down")
+        uploads.append(_latitudes(records))
+
+    publisher = FixPublisher(
+        send,
+        retry_initial=1.0,
+        spool=FixSpool(tmp_path, fsync=False),
+        send_spooled=send_spooled,
+        spool_batch_size=2,
+        catchup_rate=2.0,
+        clock=clock,
+    )
+    for index in range(3):
+        publisher.submit(GPSFix(latitude=float(index), longitude=0.0))
+        publisher.run_once(timeout=0)
+    assert publisher.metrics.spool_depth == 3
+
+    online["up"] = True
+    clock.now = 10.0
+    publisher.submit(GPSFix(latitude=3.0, longitude=0.0))
+    assert publisher.run_once(timeout=0) is True
+    assert publisher.run_once(timeout=0) is False  # paced at 2 fixes/s
+    clock.now = 11.0
+    assert publisher.run_once(timeout=0) is True
+
+    assert uploads == [[0.0, 1.0], [2.0, 3.0]]
+    assert live == []
+    assert publisher.metrics.spool_depth == 0
+
+    publisher.submit(GPSFix(latitude=4.0, longitude=0.0))
+    publisher.run_once(timeout=0)
+    assert [fix.latitude for fix in live] == [4.0]
+
+
+def test_undelivered_fixes_survive_restart(tmp_path):
+    def down(_):
+        raise requests.ConnectionError("down")
+
+    first = FixPublisher(down, spool=FixSpool(tmp_path, fsync=False), send_spooled=down)
+    for index in range(3):
+        first.submit(GPSFix(latitude=float(index), longitude=0.0))
+    first.stop(drain=True)
+
+    uploads = []
+    second = FixPublisher(
+        down,
+        spool=FixSpool(tmp_path, fsync=False),
+        send_spooled=lambda records: uploads.append(_latitudes(records)),
+    )
+    second.run_once(timeout=0)
+
+    assert uploads == [[0.0, 1.0, 2.0]]
+    assert len(second.spool) == 0